@@ -48,6 +48,10 @@ def create_app(config_name: str = None) -> Flask:
         app.config['SECRET_KEY'] = validated_key
         logger.info("SECRET_KEY validated successfully for production")
 
+    # Size DB pooling for gevent workers when the process is monkey-patched
+    from .utils.cooperative import init_cooperative
+    init_cooperative(app)
+
     # Initialize Sentry error tracking (before other extensions for full coverage)
     try:
         from .utils.sentry import init_sentry
@@ -105,6 +109,10 @@ def create_app(config_name: str = None) -> Flask:
     from .middleware import init_query_profiler
     init_query_profiler(app)
 
+    # Initialize request telemetry and /metrics (set TELEMETRY_ENABLED=false to disable)
+    from .middleware import init_telemetry
+    init_telemetry(app)
+
     # Initialize request ID tracking for request tracing
     from .middleware import init_request_id_tracking
     init_request_id_tracking(app)
@@ -115,6 +123,10 @@ def create_app(config_name: str = None) -> Flask:
     # Serve React frontend assets from frontend/dist/
     serve_frontend_assets(app)
 
+    # Load the admin SPA shell once per process
+    from .startup import init_spa_shell
+    init_spa_shell(app)
+
     # Register CLI commands
     from .commands import init_app as init_commands
     init_commands(app)
@@ -203,7 +215,7 @@ def create_app(config_name: str = None) -> Flask:
     @app.route('/app/')
     @app.route('/app/<path:path>')
     def shopify_app(path=None):
-        from flask import request, make_response
+        from flask import request
         shop = request.args.get('shop', '')
         host = request.args.get('host', '')
         logger.debug(f'/app request: shop={shop}, host={host}, path={path}')
@@ -219,9 +231,9 @@ def create_app(config_name: str = None) -> Flask:
         else:
             app_url = os.getenv('APP_URL', request.url_root.rstrip('/'))
 
-        # Create response with cache-control headers to prevent Shopify iframe caching
-        response = make_response(get_spa_html(shop, host, api_key, app_url))
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+        # Pre-rendered shell; prevent Shopify iframe caching but allow ETag revalidation
+        response = app.extensions['spa_shell'].response(shop, host, api_key, app_url)
+        response.headers['Cache-Control'] = 'no-cache, must-revalidate'
         response.headers['Pragma'] = 'no-cache'
         response.headers['Expires'] = '0'
         return response
@@ -229,54 +241,6 @@ def create_app(config_name: str = None) -> Flask:
     return app
 
 
-def get_spa_html(shop: str, host: str, api_key: str, app_url: str) -> str:
-    """
-    Serve the React frontend with Shopify App Bridge script injected.
-
-    Reads the built frontend from frontend/dist/index.html and injects
-    the App Bridge CDN script for Shopify embedded app functionality.
-    """
-    import os
-
-    # Find frontend dist directory (relative to app/ folder)
-    app_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(app_dir)
-    dist_path = os.path.join(project_root, 'frontend', 'dist', 'index.html')
-
-    try:
-        with open(dist_path, 'r', encoding='utf-8') as f:
-            html = f.read()
-    except FileNotFoundError:
-        # Fallback: return error message if build doesn't exist
-        return f'''<!DOCTYPE html>
-<html><head><title>TradeUp - Build Required</title></head>
-<body style="font-family: system-ui; padding: 40px; text-align: center;">
-<h1>Frontend Build Not Found</h1>
-<p>Run <code>cd frontend && npm run build</code> to build the React app.</p>
-<p>Looking for: {dist_path}</p>
-</body></html>'''
-
-    # Inject Shopify context before </head>
-    # App Bridge CDN is already in index.html, don't add it again
-    # Only inject shop if present (otherwise let App Bridge provide it)
-    shop_js = f'"{shop}"' if shop else 'null'
-    host_js = f'"{host}"' if host else 'null'
-    context_script = f'''
-    <script>
-      window.__TRADEUP_CONFIG__ = {{
-        shop: {shop_js},
-        host: {host_js},
-        apiKey: "{api_key}",
-        appUrl: "{app_url}"
-      }};
-    </script>'''
-
-    # Insert config script before </head> (App Bridge is already in the HTML)
-    html = html.replace('</head>', f'{context_script}\n  </head>')
-
-    return html
-
-
 # LEGACY INLINE SPA REMOVED - Now serving React frontend from frontend/dist/
 # The old inline SPA (2000+ lines) was replaced Jan 2026.
 
@@ -318,247 +282,8 @@ def serve_frontend_assets(app: Flask) -> None:
 
 def register_blueprints(app: Flask) -> None:
     """Register all API blueprints."""
-    # Core API
-    from .api.members import members_bp
-    from .api.trade_ins import trade_ins_bp
-    from .api.trade_ledger import trade_ledger_bp
-    from .api.dashboard import dashboard_bp
-
-    # Auth and Membership
-    from .api.auth import auth_bp
-    from .api.membership import membership_bp
-
-    # Shopify OAuth
-    from .api.shopify_oauth import shopify_oauth_bp
-
-    # Store Credit Events
-    from .api.store_credit_events import store_credit_events_bp
-
-    # Admin API
-    from .api.admin import admin_bp
-
-    # Tenant Settings
-    from .api.settings import settings_bp
-
-    # Product Setup Wizard
-    from .api.product_wizard import product_wizard_bp
-
-    # Billing (Shopify Billing API - replaces Stripe)
-    from .api.billing import billing_bp
-
-    # Partner Integrations
-    from .api.partners import partners_bp
-
-    # Promotions & Store Credit
-    from .api.promotions import promotions_bp
-
-    # Bonuses API
-    from .api.bonuses import bonuses_bp
-
-    # Tier Management
-    from .api.tiers import tiers_bp
-
-    # Customer Account (public facing)
-    from .api.customer_account import customer_account_bp
-
-    # Referral Program
-    from .api.referrals import referrals_bp
-
-    # Onboarding
-    from .api.onboarding import onboarding_bp
-
-    # Setup Checklist (progress tracking, milestones)
-    from .api.setup_checklist import setup_checklist_bp
-
-    # Shopify Data (collections, vendors, product types)
-    from .api.shopify_data import shopify_data_bp
-
-    # Scheduled Tasks (monthly credits, expiration, etc.)
-    from .api.scheduled_tasks import scheduled_tasks_bp
-
-    # Pending Distributions (approval workflow)
-    from .api.pending_distributions import pending_distributions_bp
-
-    # Analytics
-    from .api.analytics import analytics_bp
-
-    # Member Import
-    from .api.member_import import member_import_bp
-
-    # Email Notifications
-    from .api.email import email_bp
-
-    # Webhooks
-    from .webhooks.shopify import webhooks_bp
-    from .webhooks.shopify_billing import shopify_billing_webhook_bp
-    from .webhooks.customer_lifecycle import customer_lifecycle_bp
-    from .webhooks.order_lifecycle import order_lifecycle_bp
-    from .webhooks.subscription_lifecycle import subscription_lifecycle_bp
-    from .webhooks.app_lifecycle import app_lifecycle_bp
-
-    # Core API routes
-    app.register_blueprint(members_bp, url_prefix='/api/members')
-    app.register_blueprint(trade_ins_bp, url_prefix='/api/trade-ins')
-    app.register_blueprint(trade_ledger_bp, url_prefix='/api/trade-ledger')
-    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
-
-    # Auth and Membership routes
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(membership_bp, url_prefix='/api/membership')
-
-    # Shopify OAuth routes
-    app.register_blueprint(shopify_oauth_bp, url_prefix='/api/shopify')
-
-    # Store Credit Events routes
-    app.register_blueprint(store_credit_events_bp, url_prefix='/api/store-credit-events')
-
-    # Admin API routes
-    app.register_blueprint(admin_bp, url_prefix='/api/admin')
-
-    # Tenant Settings routes
-    app.register_blueprint(settings_bp, url_prefix='/api/settings')
-
-    # Product Setup Wizard routes
-    app.register_blueprint(product_wizard_bp, url_prefix='/api/products/wizard')
-
-    # Billing API routes (Shopify Billing)
-    app.register_blueprint(billing_bp, url_prefix='/api/billing')
-
-    # Partner Integration routes
-    app.register_blueprint(partners_bp, url_prefix='/api/partners')
-
-    # Promotions & Store Credit routes
-    app.register_blueprint(promotions_bp, url_prefix='/api/promotions')
-
-    # Bonuses API routes
-    app.register_blueprint(bonuses_bp, url_prefix='/api/bonuses')
-
-    # Tier Management routes
-    app.register_blueprint(tiers_bp)
-
-    # Customer Account routes (public facing)
-    app.register_blueprint(customer_account_bp, url_prefix='/api/customer')
-
-    # Referral Program routes
-    app.register_blueprint(referrals_bp, url_prefix='/api/referrals')
-
-    # Onboarding routes
-    app.register_blueprint(onboarding_bp, url_prefix='/api/onboarding')
-
-    # Setup Checklist routes (progress tracking, milestones)
-    app.register_blueprint(setup_checklist_bp, url_prefix='/api/setup')
-
-    # Shopify Data routes (collections, vendors, etc.)
-    app.register_blueprint(shopify_data_bp, url_prefix='/api/shopify-data')
-
-    # Scheduled Tasks routes (monthly credits, expiration)
-    app.register_blueprint(scheduled_tasks_bp, url_prefix='/api/scheduled-tasks')
-
-    # Pending Distributions routes (approval workflow)
-    app.register_blueprint(pending_distributions_bp, url_prefix='/api/pending-distributions')
-
-    # Analytics routes
-    app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
-
-    # Member Import routes
-    app.register_blueprint(member_import_bp, url_prefix='/api/members/import')
-
-    # Email Notification routes
-    app.register_blueprint(email_bp, url_prefix='/api/email')
-
-    # Webhook routes
-    app.register_blueprint(webhooks_bp, url_prefix='/webhook')
-    app.register_blueprint(shopify_billing_webhook_bp, url_prefix='/webhook/shopify-billing')
-    app.register_blueprint(customer_lifecycle_bp, url_prefix='/webhook')
-    app.register_blueprint(order_lifecycle_bp, url_prefix='/webhook')
-    app.register_blueprint(subscription_lifecycle_bp, url_prefix='/webhook')
-    app.register_blueprint(app_lifecycle_bp, url_prefix='/webhook')
-
-    # Shopify Flow integration
-    from .api.flow import flow_bp
-    app.register_blueprint(flow_bp, url_prefix='/flow')
-
-    # Points and Rewards (Loyalty System)
-    from .api.points import points_bp
-    from .api.rewards import rewards_bp
-    app.register_blueprint(points_bp, url_prefix='/api/points')
-    app.register_blueprint(rewards_bp, url_prefix='/api/rewards')
-
-    # App Proxy (customer-facing rewards page at /apps/rewards)
-    from .api.proxy import proxy_bp
-    app.register_blueprint(proxy_bp, url_prefix='/proxy')
-
-    # Customer Segments (Shopify Email + Flow integration)
-    from .api.segments import segments_bp
-    app.register_blueprint(segments_bp, url_prefix='/api/segments')
-
-    # Cashback Campaigns
-    from .api.cashback import cashback_bp
-    app.register_blueprint(cashback_bp, url_prefix='/api/cashback')
-
-    # Third-Party Integrations (Klaviyo, SMS, etc.)
-    from .api.integrations.klaviyo import klaviyo_bp
-    from .api.integrations.sms import sms_bp
-    from .api.integrations.thirdparty import thirdparty_bp
-    app.register_blueprint(klaviyo_bp, url_prefix='/api/integrations/klaviyo')
-    app.register_blueprint(sms_bp, url_prefix='/api/integrations/sms')
-    app.register_blueprint(thirdparty_bp, url_prefix='/api/integrations')
-
-    # Benchmark Reports
-    from .api.benchmarks import benchmarks_bp
-    app.register_blueprint(benchmarks_bp, url_prefix='/api/benchmarks')
-
-    # Gamification (Badges, Achievements, Streaks)
-    from .api.gamification import gamification_bp
-    app.register_blueprint(gamification_bp, url_prefix='/api/gamification')
-
-    # Anniversary Rewards (membership anniversary, not birthday)
-    from .api.anniversary import anniversary_bp
-    app.register_blueprint(anniversary_bp, url_prefix='/api/anniversary')
-
-    # Nudges & Reminders
-    from .api.nudges import nudges_bp
-    app.register_blueprint(nudges_bp, url_prefix='/api/nudges')
-
-    # Loyalty Page Builder
-    from .api.page_builder import page_builder_bp
-    app.register_blueprint(page_builder_bp, url_prefix='/api/page-builder')
-
-    # Loyalty Page API (draft/publish workflow)
-    from .api.loyalty_page import loyalty_page_bp
-    app.register_blueprint(loyalty_page_bp, url_prefix='/api/loyalty-page')
-
-    # Widget Visual Builder
-    from .api.widget_builder import widget_builder_bp
-    app.register_blueprint(widget_builder_bp, url_prefix='/api/widget-builder')
-
-    # Page Builder Images (LP-009)
-    from .api.page_builder_images import page_builder_images_bp
-    app.register_blueprint(page_builder_images_bp, url_prefix='/api/page-builder/images')
-
-    # Guest Checkout Points
-    from .api.guest_points import guest_points_bp
-    app.register_blueprint(guest_points_bp, url_prefix='/api/guest-points')
-
-    # Review Prompt (In-App Review Collection)
-    from .api.review_prompt import review_prompt_bp
-    app.register_blueprint(review_prompt_bp, url_prefix='/api/review-prompt')
-
-    # Support Review (Post-Support Review Prompts)
-    from .api.support_review import support_review_bp
-    app.register_blueprint(support_review_bp, url_prefix='/api/support-review')
-
-    # Review Dashboard (Aggregated Review Metrics)
-    from .api.review_dashboard import review_dashboard_bp
-    app.register_blueprint(review_dashboard_bp, url_prefix='/api/review-dashboard')
-
-    # Loyalty Page Analytics (LP-010)
-    from .api.loyalty_page_analytics import loyalty_page_analytics_bp
-    app.register_blueprint(loyalty_page_analytics_bp, url_prefix='/api/loyalty-page/analytics')
-
-    # Widget Settings API (WB-002)
-    from .api.widgets import widgets_bp
-    app.register_blueprint(widgets_bp, url_prefix='/api/widgets')
+    from .startup import init_blueprints
+    init_blueprints(app)
 
 
 def register_error_handlers(app: Flask) -> None:
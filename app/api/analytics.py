@@ -1517,6 +1517,97 @@ def export_analytics():
         return jsonify({'error': str(e)}), 500
 
 
+# ============================================================
+# RULE SIMULATION
+# ============================================================
+
+@analytics_bp.route('/simulate', methods=['POST'])
+@require_shopify_auth
+def simulate_rules():
+    """
+    Simulate the liability of earning rules, promotions or cashback campaigns
+    against the tenant's historical orders.
+
+    When the period's order history is already loaded in this process the
+    results are returned at once. Otherwise the Shopify export runs in the
+    background: the response is 202 with a run_id, and
+    GET /simulate/<run_id> returns the results once the run is done.
+
+    Request body:
+        start_date, end_date: Period to replay (default: last 90 days)
+        candidates: List of {"type": "earning_rule" | "promotion" | "cashback_campaign",
+                             "id": optional saved record, "config": optional draft fields}
+        respect_schedule: Only count orders inside each candidate's own date window
+        refresh: Re-export the order history instead of reusing the cached one
+
+    Returns:
+        Per-candidate total liability, per-tier breakdown and per-customer distribution,
+        or (202) the queued run
+    """
+    from ..services.rule_simulator import (
+        RuleSimulator, build_candidate, cached_order_history, request_simulation,
+        simulate_candidates, start_simulation_run
+    )
+    from ..utils.exceptions import ValidationError
+
+    tenant_id = g.tenant_id
+    data = request.get_json() or {}
+    candidates = data.get('candidates') or []
+    if not candidates:
+        return jsonify({'error': 'At least one candidate is required'}), 400
+
+    end_date = data.get('end_date') or datetime.utcnow().date().isoformat()
+    start_date = data.get('start_date') or (datetime.utcnow() - timedelta(days=90)).date().isoformat()
+    respect_schedule = bool(data.get('respect_schedule'))
+    refresh = bool(data.get('refresh'))
+
+    try:
+        # Reject bad candidates now rather than after a long export
+        for c in candidates:
+            build_candidate(tenant_id, c.get('type'), c.get('id'), c.get('config'))
+
+        history = None if refresh else cached_order_history(tenant_id, start_date, end_date)
+        if history is None:
+            run = request_simulation(tenant_id, start_date, end_date, candidates,
+                                     respect_schedule=respect_schedule, refresh=refresh)
+            start_simulation_run(run.id)
+            db.session.refresh(run)
+            return jsonify(run.to_dict()), 202
+
+        results = simulate_candidates(RuleSimulator(tenant_id, history), candidates, respect_schedule=respect_schedule)
+    except ValidationError as e:
+        return jsonify({'error': e.message}), 400
+    except Exception as e:
+        logger.error(f"Rule simulation error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({
+        'status': 'done',
+        'start_date': start_date,
+        'end_date': end_date,
+        'orders': history.n_orders,
+        'history_loaded_at': history.loaded_at.isoformat(),
+        'results': results,
+    })
+
+
+@analytics_bp.route('/simulate/<int:run_id>', methods=['GET'])
+@require_shopify_auth
+def get_simulation_run(run_id):
+    """
+    Status of a background simulation, with its results once done.
+
+    Returns:
+        run_id, status (pending, running, done, failed), results, error
+    """
+    from ..models.simulation_run import SimulationRun
+
+    run = SimulationRun.query.filter_by(id=run_id, tenant_id=g.tenant_id).first()
+    if not run:
+        return jsonify({'error': 'Simulation not found'}), 404
+    return jsonify(run.to_dict())
+
+
 # ============================================================
 # WEB PIXEL ENDPOINT
 # Receives events from the TradeUp Web Pixel extension
@@ -19,6 +19,7 @@ from ..models import Member, TradeInBatch, MembershipTier, StoreCreditLedger, Po
 from ..models.referral import Referral, ReferralProgram
 from ..models.loyalty_points import Reward, RewardRedemption
 from ..services.shopify_client import ShopifyClient
+from ..services.reward_redemption import RewardRedemptionEngine, RedemptionError
 
 customer_account_bp = Blueprint('customer_account', __name__)
 
@@ -967,6 +968,7 @@ def redeem_extension_reward(reward_id):
     Request body:
         customer_id: Shopify customer ID
         shop: Shop domain
+        idempotency_key: Optional retry key (or Idempotency-Key header)
 
     Returns:
         Redemption details including discount code if applicable
@@ -985,153 +987,52 @@ def redeem_extension_reward(reward_id):
     if not member:
         return jsonify({'error': 'Not enrolled in rewards program'}), 404
 
-    # Get reward
-    reward = Reward.query.filter_by(
-        id=reward_id,
-        tenant_id=member.tenant_id
-    ).first()
-
-    if not reward:
-        return jsonify({'error': 'Reward not found'}), 404
-
-    # Validate reward is active and within date range
-    now = datetime.utcnow()
-    if not reward.is_active:
-        return jsonify({'error': 'This reward is no longer available'}), 400
-
-    if reward.starts_at and reward.starts_at > now:
-        return jsonify({'error': 'This reward is not yet available'}), 400
-
-    if reward.ends_at and reward.ends_at < now:
-        return jsonify({'error': 'This reward has expired'}), 400
-
-    # Check tier restriction
-    tier_ids = reward.tier_ids if hasattr(reward, 'tier_ids') and reward.tier_ids else None
-    if tier_ids and member.tier_id not in tier_ids:
-        return jsonify({'error': 'This reward is not available for your membership tier'}), 403
-
-    # Check stock
-    if reward.stock_quantity is not None and reward.stock_quantity <= 0:
-        return jsonify({'error': 'This reward is out of stock'}), 400
-
-    # Check member's usage limit
-    if reward.max_uses_per_member:
-        member_redemptions = RewardRedemption.query.filter_by(
-            reward_id=reward_id,
-            member_id=member.id
-        ).count()
-        if member_redemptions >= reward.max_uses_per_member:
-            return jsonify({'error': 'You have reached the maximum redemptions for this reward'}), 400
-
-    # Check points balance
-    points_balance = db.session.query(
-        func.coalesce(func.sum(PointsTransaction.points), 0)
-    ).filter(
-        PointsTransaction.member_id == member.id,
-        PointsTransaction.reversed_at.is_(None)
-    ).scalar()
-
-    if int(points_balance) < reward.points_cost:
-        return jsonify({
-            'error': 'Insufficient points',
-            'points_balance': int(points_balance),
-            'points_needed': reward.points_cost
-        }), 400
-
+    engine = RewardRedemptionEngine(member.tenant_id)
     try:
-        # Generate discount code if applicable
-        import secrets
-        import string
-        discount_code = None
-        if reward.reward_type in ['discount', 'store_credit', 'free_shipping']:
-            prefix = reward.discount_code_prefix if hasattr(reward, 'discount_code_prefix') and reward.discount_code_prefix else 'REWARD'
-            random_part = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(8))
-            discount_code = f"{prefix}-{random_part}"
-
-        # Create points deduction transaction
-        points_transaction = PointsTransaction(
-            tenant_id=member.tenant_id,
-            member_id=member.id,
-            points=-reward.points_cost,
-            transaction_type='redeem',
-            source='reward',
-            reference_id=str(reward_id),
-            reference_type='reward_redemption',
-            description=f"Redeemed: {reward.name}"
-        )
-        db.session.add(points_transaction)
-
-        # Generate redemption code
-        redemption_code = f"RD-{datetime.utcnow().strftime('%Y%m%d')}-{secrets.token_hex(4).upper()}"
-
-        # Create redemption record
-        redemption = RewardRedemption(
-            tenant_id=member.tenant_id,
-            member_id=member.id,
-            reward_id=reward_id,
-            redemption_code=redemption_code,
-            points_spent=reward.points_cost,
-            status='completed' if reward.reward_type != 'product' else 'pending',
-            reward_type=reward.reward_type,
-            reward_name=reward.name,
-            reward_value=reward.credit_value if hasattr(reward, 'credit_value') else None,
-            voucher_code=discount_code,
-            voucher_expires_at=datetime.utcnow() + timedelta(days=reward.voucher_valid_days or 30),
+        result = engine.redeem(
+            reward_id, member.id,
+            created_by='customer',
             notes=data.get('notes'),
-            created_by='customer'
+            idempotency_key=request.headers.get('Idempotency-Key') or data.get('idempotency_key')
         )
-        db.session.add(redemption)
-
-        # Update stock if applicable
-        if reward.stock_quantity is not None:
-            reward.stock_quantity -= 1
-            reward.redeemed_quantity = (reward.redeemed_quantity or 0) + 1
-
-        # Update member points on the Member model
-        member.points_balance = (member.points_balance or 0) - reward.points_cost
-        member.lifetime_points_spent = (member.lifetime_points_spent or 0) + reward.points_cost
-
-        db.session.commit()
-
-        # Calculate new balance
-        new_balance = db.session.query(
-            func.coalesce(func.sum(PointsTransaction.points), 0)
-        ).filter(
-            PointsTransaction.member_id == member.id,
-            PointsTransaction.reversed_at.is_(None)
-        ).scalar()
-
-        response = {
-            'success': True,
-            'redemption': {
-                'id': redemption.id,
-                'redemption_code': redemption_code,
-                'reward_name': reward.name,
-                'reward_type': reward.reward_type,
-                'points_spent': reward.points_cost,
-                'status': redemption.status,
-                'redeemed_at': redemption.created_at.isoformat()
-            },
-            'new_balance': int(new_balance),
-            'message': f'Successfully redeemed "{reward.name}"'
-        }
-
-        # Include discount code if generated
-        if discount_code:
-            response['redemption']['discount_code'] = discount_code
-            if reward.reward_type == 'discount':
-                response['redemption']['discount_value'] = float(reward.discount_amount or reward.discount_percent or 0)
-                response['redemption']['discount_type'] = 'percent' if reward.discount_percent else 'fixed'
-            elif reward.reward_type == 'store_credit':
-                response['redemption']['credit_amount'] = float(reward.credit_value) if reward.credit_value else None
-
-        return jsonify(response), 201
-
+    except RedemptionError as e:
+        return jsonify({'error': e.message, **e.details}), e.status
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error redeeming reward: {e}")
         return jsonify({'error': f'Failed to redeem reward: {str(e)}'}), 500
 
+    redemption, reward = result.redemption, result.reward
+    if not result.replayed:
+        # Shopify call runs after commit, so no row is locked while waiting on it
+        engine.create_shopify_discount(result, member)
+
+    response = {
+        'success': True,
+        'redemption': {
+            'id': redemption.id,
+            'redemption_code': redemption.redemption_code,
+            'reward_name': redemption.reward_name,
+            'reward_type': redemption.reward_type,
+            'points_spent': redemption.points_spent,
+            'status': redemption.status,
+            'redeemed_at': redemption.created_at.isoformat()
+        },
+        'new_balance': result.new_balance,
+        'message': f'Successfully redeemed "{redemption.reward_name}"'
+    }
+
+    # Include discount code if generated
+    if redemption.voucher_code:
+        response['redemption']['discount_code'] = redemption.voucher_code
+        if reward.reward_type in ('discount', 'discount_code'):
+            response['redemption']['discount_value'] = float(reward.discount_amount or reward.discount_percent or 0)
+            response['redemption']['discount_type'] = 'percent' if reward.discount_percent else 'fixed'
+        elif reward.reward_type == 'store_credit':
+            response['redemption']['credit_amount'] = float(reward.credit_value) if reward.credit_value else None
+
+    return jsonify(response), 200 if result.replayed else 201
+
 
 @customer_account_bp.route('/extension/badges/newly-earned', methods=['POST'])
 def get_newly_earned_badges():
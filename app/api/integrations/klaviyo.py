@@ -206,15 +206,54 @@ def sync_members():
     """
     Sync all members to Klaviyo.
 
-    This is a bulk operation that may take time for large member lists.
+    Submits bulk profile import jobs containing only members whose synced
+    properties changed since the last sync. Poll /sync-jobs/<job_id> for
+    Klaviyo-side progress.
+
+    Request body (optional):
+    {
+        "force": false,       // Send every member, ignoring change detection
+        "batch_size": 1000    // Members read per database query
+    }
     """
     try:
+        data = request.get_json(silent=True) or {}
+        try:
+            batch_size = int(data.get('batch_size', 1000))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'batch_size must be an integer'}), 400
+        if batch_size < 1 or batch_size > 10000:
+            return jsonify({'error': 'batch_size must be between 1 and 10000'}), 400
+
         service = get_klaviyo_service(g.tenant_id)
 
         if not service.is_enabled():
             return jsonify({'error': 'Klaviyo not enabled'}), 400
 
-        result = service.sync_all_members()
+        result = service.sync_all_members(
+            batch_size=batch_size,
+            force=bool(data.get('force', False))
+        )
+
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@klaviyo_bp.route('/sync-jobs/<job_id>', methods=['GET'])
+@require_shopify_auth
+def get_sync_job(job_id: str):
+    """Get the status of a bulk profile import job."""
+    try:
+        service = get_klaviyo_service(g.tenant_id)
+
+        if not service.is_enabled():
+            return jsonify({'error': 'Klaviyo not enabled'}), 400
+
+        result = service.get_import_job(job_id)
+
+        if not result.get('success'):
+            return jsonify(result), 400
 
         return jsonify(result)
     except Exception as e:
@@ -13,6 +13,10 @@ from sqlalchemy import func
 from ..extensions import db
 from ..models import Member, MembershipTier
 from ..services.tier_cache_service import invalidate_tier_cache
+from ..services.member_serializer import project_member_columns, serialize_members
+from ..services.search_service import member_search_clause, search_members
+from ..utils.exceptions import ValidationError
+from ..utils.pagination import keyset_paginate, wants_cursor_pagination
 from ..services.membership_service import MembershipService
 from ..middleware.shopify_auth import require_shopify_auth, require_shopify_auth_debug
 
@@ -361,6 +365,8 @@ def list_members():
         status: Filter by status (active, cancelled, etc.)
         search: Search by name or email
         tier: Filter by tier name (case-insensitive)
+        cursor: Keyset pagination cursor (empty for the first page); replaces page
+        total: With cursor - none (default), approx or exact
     """
     try:
         tenant_id = g.tenant_id  # Use tenant_id from auth middleware
@@ -371,24 +377,15 @@ def list_members():
         search = request.args.get('search', '').strip()
         tier_filter = request.args.get('tier', '').strip()
 
-        # Use eager loading to prevent N+1 queries when accessing member.tier
-        query = Member.query.options(joinedload(Member.tier)).filter_by(tenant_id=tenant_id)
+        query = Member.query.filter_by(tenant_id=tenant_id)
 
         if status:
             query = query.filter_by(status=status)
 
-        # Search by name, email, member number, or partner customer ID
+        # Search by name, email, member number, or partner customer ID (trigram-indexed)
         # Note: first_name/last_name are derived from 'name' in to_dict(), not DB columns
         if search:
-            search_pattern = f'%{search}%'
-            query = query.filter(
-                db.or_(
-                    Member.name.ilike(search_pattern),
-                    Member.email.ilike(search_pattern),
-                    Member.member_number.ilike(search_pattern),
-                    Member.partner_customer_id.ilike(search_pattern)
-                )
-            )
+            query = query.filter(member_search_clause(search))
 
         # Filter by tier name
         if tier_filter:
@@ -399,17 +396,34 @@ def list_members():
             if tier:
                 query = query.filter(Member.tier_id == tier.id)
 
-        pagination = query.order_by(Member.created_at.desc()).paginate(
+        if wants_cursor_pagination(request.args):
+            result = keyset_paginate(
+                project_member_columns(query),
+                sort_column=Member.created_at,
+                id_column=Member.id,
+                cursor=request.args.get('cursor'),
+                limit=per_page,
+                total_mode=request.args.get('total')
+            )
+            return jsonify({
+                'members': serialize_members(tenant_id, result.items, include_stats=True),
+                **result.to_dict()
+            })
+
+        # Column-projected page + cached tier map: no per-member queries
+        pagination = project_member_columns(query).order_by(Member.created_at.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
 
         return jsonify({
-            'members': [m.to_dict(include_stats=True) for m in pagination.items],
+            'members': serialize_members(tenant_id, pagination.items, include_stats=True),
             'total': pagination.total,
             'page': page,
             'per_page': per_page,
             'pages': pagination.pages
         })
+    except ValidationError as e:
+        return jsonify({'error': e.message}), 400
     except Exception as e:
         logger.exception("Error listing members: %s", e)
         return jsonify({
@@ -419,6 +433,50 @@ def list_members():
         }), 500
 
 
+@members_bp.route('/search', methods=['GET'])
+@require_shopify_auth
+def search_members_ranked():
+    """Ranked member search for the admin members page.
+
+    Query params:
+        q: Search term (name, email, member number, partner customer ID)
+        limit: Max results (default: 20, max: 50)
+        status: Filter by status
+    """
+    tenant_id = g.tenant_id
+    term = request.args.get('q', '').strip()
+    limit = request.args.get('limit', 20, type=int)
+    status = request.args.get('status')
+
+    rows = search_members(tenant_id, term, limit=limit, status=status)
+    return jsonify({
+        'query': term,
+        'members': serialize_members(tenant_id, rows)
+    })
+
+
+@members_bp.route('/lookup', methods=['GET'])
+@require_shopify_auth
+def lookup_members():
+    """POS-style lookup by member number or email prefix.
+
+    Only uses the prefix indexes, so it stays fast for scanner/keypad input.
+
+    Query params:
+        q: Member number (TU1001, 1001) or email prefix
+        limit: Max results (default: 10, max: 50)
+    """
+    tenant_id = g.tenant_id
+    term = request.args.get('q', '').strip()
+    limit = request.args.get('limit', 10, type=int)
+
+    rows = search_members(tenant_id, term, limit=limit, prefix_only=True)
+    return jsonify({
+        'query': term,
+        'members': serialize_members(tenant_id, rows)
+    })
+
+
 @members_bp.route('/<int:member_id>', methods=['GET'])
 @require_shopify_auth
 def get_member(member_id):
@@ -255,3 +255,37 @@ def skip_onboarding():
         'success': True,
         'message': 'Onboarding skipped. You can configure everything manually in Settings.'
     })
+
+
+@onboarding_bp.route('/provisioning', methods=['GET'])
+def get_provisioning_progress():
+    """
+    Get install provisioning progress.
+
+    Returns:
+        - status: complete, running, failed or pending
+        - percent: Share of setup steps done
+        - steps: Per-step status, error and result
+    """
+    tenant = get_tenant_from_request()
+    if not tenant:
+        return jsonify({'error': 'Tenant not found'}), 404
+
+    from ..services.install_provisioning import ProvisioningPipeline
+    return jsonify(ProvisioningPipeline(tenant.id).progress())
+
+
+@onboarding_bp.route('/provisioning/retry', methods=['POST'])
+def retry_provisioning():
+    """
+    Resume install provisioning.
+
+    Runs only the steps that are not done (failed steps and anything
+    waiting on them) in the background.
+    """
+    tenant = get_tenant_from_request()
+    if not tenant:
+        return jsonify({'error': 'Tenant not found'}), 404
+
+    from ..services.install_provisioning import start_provisioning
+    return jsonify(start_provisioning(tenant.id)), 202
@@ -175,10 +175,25 @@ def list_sync_logs():
     })
 
 
+@partners_bp.route('/delivery-stats', methods=['GET'])
+@require_shopify_auth
+def delivery_stats():
+    """Per-endpoint delivery latency and error stats."""
+    tenant_id = g.tenant_id
+    hours = min(request.args.get('hours', 24, type=int), 24 * 30)
+
+    service = PartnerSyncService(tenant_id)
+
+    return jsonify({
+        'hours': hours,
+        'endpoints': service.get_endpoint_stats(hours=hours)
+    })
+
+
 @partners_bp.route('/retry-failed', methods=['POST'])
 @require_shopify_auth
 def retry_failed_syncs():
-    """Retry all failed syncs."""
+    """Re-queue all failed and dead-lettered syncs."""
     tenant_id = g.tenant_id
     data = request.json or {}
 
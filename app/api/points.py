@@ -14,7 +14,10 @@ from sqlalchemy import func, and_
 from ..extensions import db
 from ..models import Member, PointsTransaction
 from ..models.loyalty_points import EarningRule, Reward, PointsBalance
+from ..services.earning_rule_cache import invalidate_earning_rules_cache
 from ..middleware.shopify_auth import require_shopify_auth
+from ..utils.exceptions import ValidationError
+from ..utils.pagination import keyset_paginate, wants_cursor_pagination
 
 points_bp = Blueprint('points', __name__)
 
@@ -96,6 +99,8 @@ def get_points_history():
         source: Filter by source (order, referral, admin, etc.)
         start_date: Filter from date (ISO format)
         end_date: Filter to date (ISO format)
+        cursor: Keyset pagination cursor (empty for the first page); replaces page
+        total: With cursor - none (default), approx or exact
 
     Returns:
         Paginated list of points transactions
@@ -150,6 +155,30 @@ def get_points_history():
         except ValueError:
             current_app.logger.warning(f"Invalid end_date format: {end_date}")
 
+    member_info = {
+        'id': member.id,
+        'member_number': member.member_number,
+        'name': member.name
+    }
+
+    if wants_cursor_pagination(request.args):
+        try:
+            result = keyset_paginate(
+                query,
+                sort_column=PointsTransaction.created_at,
+                id_column=PointsTransaction.id,
+                cursor=request.args.get('cursor'),
+                limit=per_page,
+                total_mode=request.args.get('total')
+            )
+        except ValidationError as e:
+            return jsonify({'error': e.message}), 400
+        return jsonify({
+            'transactions': [t.to_dict() for t in result.items],
+            'pagination': result.to_dict(),
+            'member': member_info
+        })
+
     # Order by most recent first
     query = query.order_by(PointsTransaction.created_at.desc())
 
@@ -166,11 +195,7 @@ def get_points_history():
             'has_next': pagination.has_next,
             'has_prev': pagination.has_prev
         },
-        'member': {
-            'id': member.id,
-            'member_number': member.member_number,
-            'name': member.name
-        }
+        'member': member_info
     })
 
 
@@ -386,6 +411,7 @@ def create_earning_rule():
 
         db.session.add(rule)
         db.session.commit()
+        invalidate_earning_rules_cache(tenant_id)
 
         return jsonify({
             'success': True,
@@ -472,6 +498,7 @@ def update_earning_rule(rule_id):
 
         rule.updated_at = datetime.utcnow()
         db.session.commit()
+        invalidate_earning_rules_cache(tenant_id)
 
         return jsonify({
             'success': True,
@@ -507,6 +534,7 @@ def delete_earning_rule(rule_id):
     rule.is_active = False
     rule.updated_at = datetime.utcnow()
     db.session.commit()
+    invalidate_earning_rules_cache(tenant_id)
 
     return jsonify({
         'success': True,
@@ -536,6 +564,7 @@ def toggle_earning_rule(rule_id):
     rule.is_active = not rule.is_active
     rule.updated_at = datetime.utcnow()
     db.session.commit()
+    invalidate_earning_rules_cache(tenant_id)
 
     status = 'enabled' if rule.is_active else 'disabled'
     return jsonify({
@@ -628,6 +657,7 @@ def adjust_points():
         )
 
         db.session.add(transaction)
+        member.points_balance = (member.points_balance or 0) + points
         db.session.commit()
 
         # Calculate new balance
@@ -9,11 +9,14 @@ Handles:
 from datetime import datetime
 from decimal import Decimal
 from flask import Blueprint, request, jsonify, g, current_app
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, case, update
 from ..extensions import db
 from ..models import Member, PointsTransaction
 from ..models.loyalty_points import Reward, RewardRedemption
 from ..middleware.shopify_auth import require_shopify_auth
+from ..services.reward_redemption import RewardRedemptionEngine, RedemptionError
+from ..utils.exceptions import ValidationError
+from ..utils.pagination import keyset_paginate, wants_cursor_pagination
 
 rewards_bp = Blueprint('rewards', __name__)
 
@@ -439,6 +442,10 @@ def redeem_reward(reward_id):
     JSON body:
         member_id: Member ID (required)
         notes: Optional redemption notes
+        idempotency_key: Optional retry key (or Idempotency-Key header)
+
+    A retry with the same idempotency key returns the original redemption
+    (200) instead of redeeming again.
 
     Returns:
         Redemption details including discount code if applicable
@@ -451,187 +458,55 @@ def redeem_reward(reward_id):
     if not member_id:
         return jsonify({'error': 'member_id is required'}), 400
 
-    # Get reward
-    reward = Reward.query.filter_by(
-        id=reward_id,
-        tenant_id=tenant_id
-    ).first()
-
-    if not reward:
-        return jsonify({'error': 'Reward not found'}), 404
-
-    # Get member
-    member = Member.query.filter_by(
-        id=member_id,
-        tenant_id=tenant_id
-    ).first()
-
-    if not member:
-        return jsonify({'error': 'Member not found'}), 404
-
-    # Validate reward is active and within date range
-    now = datetime.utcnow()
-    if not reward.is_active:
-        return jsonify({'error': 'This reward is no longer available'}), 400
-
-    if reward.starts_at and reward.starts_at > now:
-        return jsonify({'error': 'This reward is not yet available'}), 400
-
-    if reward.ends_at and reward.ends_at < now:
-        return jsonify({'error': 'This reward has expired'}), 400
-
-    # Check tier restriction using applies_to_tier method
-    if member.tier and not reward.applies_to_tier(member.tier.name):
-        return jsonify({'error': 'This reward is not available for your membership tier'}), 403
-
-    # Check stock (use available_quantity and remaining_quantity)
-    remaining = reward.remaining_quantity()
-    if remaining is not None and remaining <= 0:
-        return jsonify({'error': 'This reward is out of stock'}), 400
-
-    # Check member's usage limit (max_redemptions_per_member is the correct field name)
-    if reward.max_redemptions_per_member:
-        member_redemptions = RewardRedemption.query.filter_by(
-            reward_id=reward_id,
-            member_id=member_id
-        ).count()
-        if member_redemptions >= reward.max_redemptions_per_member:
-            return jsonify({'error': 'You have reached the maximum redemptions for this reward'}), 400
-
-    # Check points balance
-    balance = db.session.query(
-        func.coalesce(func.sum(PointsTransaction.points), 0)
-    ).filter(
-        PointsTransaction.member_id == member_id,
-        PointsTransaction.tenant_id == tenant_id,
-        PointsTransaction.reversed_at.is_(None)
-    ).scalar()
-
-    if int(balance) < reward.points_cost:
-        return jsonify({
-            'error': 'Insufficient points',
-            'points_balance': int(balance),
-            'points_needed': reward.points_cost
-        }), 400
+    idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+    engine = RewardRedemptionEngine(tenant_id)
 
     try:
-        # Generate discount code if applicable
-        discount_code = None
-        shopify_discount_id = None
-        if reward.reward_type in ['discount', 'store_credit', 'free_shipping']:
-            import secrets
-            import string
-            prefix = reward.discount_code_prefix or 'REWARD'
-            random_part = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(8))
-            discount_code = f"{prefix}-{random_part}"
-
-            # Create discount code in Shopify via GraphQL
-            try:
-                from ..services.shopify_client import ShopifyClient
-                shopify_client = ShopifyClient(tenant_id)
-
-                # Determine discount value and type
-                if reward.reward_type == 'free_shipping':
-                    # Create free shipping discount
-                    shopify_result = shopify_client.create_reward_discount_code(
-                        code=discount_code,
-                        title=f"Reward: {reward.name}",
-                        discount_type='free_shipping',
-                        usage_limit=1,  # Single use
-                        customer_id=member.shopify_customer_id
-                    )
-                else:
-                    # Create percentage or fixed amount discount
-                    shopify_result = shopify_client.create_reward_discount_code(
-                        code=discount_code,
-                        title=f"Reward: {reward.name}",
-                        discount_type=reward.discount_type or 'fixed',
-                        discount_value=float(reward.reward_value) if reward.reward_value else 0,
-                        min_purchase=float(reward.min_purchase_amount) if reward.min_purchase_amount else None,
-                        usage_limit=1,  # Single use
-                        customer_id=member.shopify_customer_id
-                    )
-
-                if shopify_result.get('success'):
-                    shopify_discount_id = shopify_result.get('discount_id')
-                    current_app.logger.info(f"Created Shopify discount code {discount_code} for reward {reward.name}")
-                else:
-                    current_app.logger.warning(f"Failed to create Shopify discount: {shopify_result.get('error')}")
-                    # Continue anyway - member still gets the code, it just won't work in Shopify
-            except Exception as e:
-                current_app.logger.error(f"Error creating Shopify discount code: {e}")
-                # Continue with local discount code - merchant can manually create if needed
-
-        # Create points deduction transaction
-        points_transaction = PointsTransaction(
-            tenant_id=tenant_id,
-            member_id=member_id,
-            points=-reward.points_cost,
-            transaction_type='redeem',
-            source='reward',
-            reference_id=str(reward_id),
-            reference_type='reward_redemption',
-            description=f"Redeemed: {reward.name}"
-        )
-        db.session.add(points_transaction)
-
-        # Create redemption record
-        redemption = RewardRedemption(
-            tenant_id=tenant_id,
-            member_id=member_id,
-            reward_id=reward_id,
-            points_spent=reward.points_cost,
-            discount_code=discount_code,
-            status='completed' if reward.reward_type != 'product' else 'pending',
+        result = engine.redeem(
+            reward_id, member_id,
+            created_by=str(staff_id),
             notes=data.get('notes'),
-            redeemed_by=staff_id
+            idempotency_key=idempotency_key
         )
-        db.session.add(redemption)
-
-        # Update redeemed quantity
-        reward.redeemed_quantity = (reward.redeemed_quantity or 0) + 1
-
-        db.session.commit()
-
-        # Calculate new balance
-        new_balance = db.session.query(
-            func.coalesce(func.sum(PointsTransaction.points), 0)
-        ).filter(
-            PointsTransaction.member_id == member_id,
-            PointsTransaction.tenant_id == tenant_id,
-            PointsTransaction.reversed_at.is_(None)
-        ).scalar()
-
-        response = {
-            'success': True,
-            'redemption': {
-                'id': redemption.id,
-                'reward_name': reward.name,
-                'reward_type': reward.reward_type,
-                'points_spent': reward.points_cost,
-                'status': redemption.status,
-                'redeemed_at': redemption.created_at.isoformat()
-            },
-            'new_balance': int(new_balance),
-            'message': f'Successfully redeemed "{reward.name}"'
-        }
-
-        # Include discount code if generated
-        if discount_code:
-            response['redemption']['discount_code'] = discount_code
-            if reward.reward_type == 'discount':
-                response['redemption']['discount_value'] = float(reward.reward_value) if reward.reward_value else None
-                response['redemption']['discount_type'] = reward.discount_type
-            elif reward.reward_type == 'store_credit':
-                response['redemption']['credit_amount'] = float(reward.reward_value) if reward.reward_value else None
-
-        return jsonify(response), 201
-
+    except RedemptionError as e:
+        return jsonify({'error': e.message, **e.details}), e.status
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error redeeming reward: {e}")
         return jsonify({'error': f'Failed to redeem reward: {str(e)}'}), 500
 
+    redemption, reward = result.redemption, result.reward
+    if not result.replayed:
+        # Shopify call runs after commit, so no row is locked while waiting on it
+        engine.create_shopify_discount(result, redemption.member)
+
+    response = {
+        'success': True,
+        'redemption': {
+            'id': redemption.id,
+            'reward_name': redemption.reward_name,
+            'reward_type': redemption.reward_type,
+            'points_spent': redemption.points_spent,
+            'status': redemption.status,
+            'redeemed_at': redemption.created_at.isoformat()
+        },
+        'new_balance': result.new_balance,
+        'message': f'Successfully redeemed "{redemption.reward_name}"'
+    }
+
+    # Include discount code if generated
+    if redemption.voucher_code:
+        response['redemption']['discount_code'] = redemption.voucher_code
+        if reward.reward_type in ('discount', 'discount_code'):
+            percentage = bool(reward.discount_percent)
+            value = reward.discount_percent if percentage else reward.discount_amount
+            response['redemption']['discount_value'] = float(value) if value else None
+            response['redemption']['discount_type'] = 'percentage' if percentage else 'fixed'
+        elif reward.reward_type == 'store_credit':
+            response['redemption']['credit_amount'] = float(reward.credit_value) if reward.credit_value else None
+
+    return jsonify(response), 200 if result.replayed else 201
+
 
 @rewards_bp.route('/redemptions', methods=['GET'])
 @require_shopify_auth
@@ -645,6 +520,8 @@ def list_redemptions():
         status: Filter by status (pending, completed, cancelled)
         page: Page number (default 1)
         per_page: Items per page (default 20, max 100)
+        cursor: Keyset pagination cursor (empty for the first page); replaces page
+        total: With cursor - none (default), approx or exact
 
     Returns:
         Paginated list of redemptions
@@ -669,6 +546,23 @@ def list_redemptions():
     if status:
         query = query.filter(RewardRedemption.status == status)
 
+    if wants_cursor_pagination(request.args):
+        try:
+            result = keyset_paginate(
+                query,
+                sort_column=RewardRedemption.created_at,
+                id_column=RewardRedemption.id,
+                cursor=request.args.get('cursor'),
+                limit=per_page,
+                total_mode=request.args.get('total')
+            )
+        except ValidationError as e:
+            return jsonify({'error': e.message}), 400
+        return jsonify({
+            'redemptions': [r.to_dict() for r in result.items],
+            'pagination': result.to_dict()
+        })
+
     # Order and paginate
     query = query.order_by(RewardRedemption.created_at.desc())
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
@@ -734,6 +628,19 @@ def cancel_redemption(redemption_id):
         return jsonify({'error': 'Redemption is already cancelled'}), 400
 
     try:
+        now = datetime.utcnow()
+
+        # Flip the status atomically so a double-submitted cancel refunds once
+        cancelled = db.session.execute(
+            update(RewardRedemption)
+            .where(RewardRedemption.id == redemption.id, RewardRedemption.status != 'cancelled')
+            .values(status='cancelled', cancelled_at=now, cancelled_reason=reason),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        if not cancelled:
+            db.session.rollback()
+            return jsonify({'error': 'Redemption is already cancelled'}), 400
+
         # Find the original points transaction
         original_transaction = PointsTransaction.query.filter(
             PointsTransaction.member_id == redemption.member_id,
@@ -759,35 +666,38 @@ def cancel_redemption(redemption_id):
             db.session.add(refund_transaction)
 
             # Mark original as reversed
-            original_transaction.reversed_at = datetime.utcnow()
+            original_transaction.reversed_at = now
             original_transaction.reversed_reason = reason
 
-        # Update redemption status
-        redemption.status = 'cancelled'
-        redemption.cancelled_at = datetime.utcnow()
-        redemption.cancelled_reason = reason
+        # Credit the balance row back
+        new_balance = db.session.execute(
+            update(Member)
+            .where(Member.id == redemption.member_id)
+            .values(points_balance=func.coalesce(Member.points_balance, 0) + redemption.points_spent,
+                    lifetime_points_spent=case(
+                        (func.coalesce(Member.lifetime_points_spent, 0) > redemption.points_spent,
+                         Member.lifetime_points_spent - redemption.points_spent),
+                        else_=0))
+            .returning(Member.points_balance),
+            execution_options={'synchronize_session': False}
+        ).scalar()
 
         # Restore redeemed quantity count
-        reward = Reward.query.get(redemption.reward_id)
-        if reward and reward.redeemed_quantity and reward.redeemed_quantity > 0:
-            reward.redeemed_quantity -= 1
+        db.session.execute(
+            update(Reward)
+            .where(Reward.id == redemption.reward_id, Reward.redeemed_quantity > 0)
+            .values(redeemed_quantity=Reward.redeemed_quantity - 1),
+            execution_options={'synchronize_session': False}
+        )
 
         db.session.commit()
-
-        # Calculate new balance
-        new_balance = db.session.query(
-            func.coalesce(func.sum(PointsTransaction.points), 0)
-        ).filter(
-            PointsTransaction.member_id == redemption.member_id,
-            PointsTransaction.tenant_id == tenant_id,
-            PointsTransaction.reversed_at.is_(None)
-        ).scalar()
+        db.session.refresh(redemption)
 
         return jsonify({
             'success': True,
             'redemption': redemption.to_dict(),
             'points_refunded': redemption.points_spent,
-            'new_balance': int(new_balance),
+            'new_balance': int(new_balance or 0),
             'message': f'{redemption.points_spent} points refunded'
         })
 
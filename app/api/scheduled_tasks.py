@@ -13,7 +13,6 @@ Also provides internal endpoints for Trigger.dev job processing:
 
 from flask import Blueprint, request, jsonify, g
 from datetime import datetime, timedelta
-from decimal import Decimal
 from ..extensions import db
 from ..middleware.shopify_auth import require_shopify_auth
 from ..services.scheduled_tasks import scheduled_tasks_service
@@ -297,79 +296,17 @@ def process_expiration_batch():
     cursor = data.get('cursor')
     batch_size = min(data.get('batchSize', 100), 500)
 
-    now = datetime.utcnow()
+    from ..services.credit_expiration import CreditExpirationEngine
 
-    # Find expired credits
-    query = db.session.query(StoreCreditLedger).join(
-        Member, StoreCreditLedger.member_id == Member.id
-    ).filter(
-        Member.tenant_id == tenant_id,
-        StoreCreditLedger.expires_at.isnot(None),
-        StoreCreditLedger.expires_at < now,
-        StoreCreditLedger.amount > 0,
-        StoreCreditLedger.event_type != 'expiration'
-    )
-
-    if cursor:
-        query = query.filter(StoreCreditLedger.id > cursor)
-
-    query = query.order_by(StoreCreditLedger.id).limit(batch_size + 1)
-    credits = query.all()
-
-    has_more = len(credits) > batch_size
-    if has_more:
-        credits = credits[:batch_size]
-
-    processed = 0
-    expired = 0
-    expired_amount = Decimal('0')
-    errors = 0
-
-    for credit in credits:
-        processed += 1
-
-        # Check if already expired
-        already_expired = StoreCreditLedger.query.filter(
-            StoreCreditLedger.member_id == credit.member_id,
-            StoreCreditLedger.event_type == 'expiration',
-            StoreCreditLedger.source_id == f'expired:{credit.id}'
-        ).first()
-
-        if already_expired:
-            continue
-
-        try:
-            # Create expiration entry
-            expiration_entry = StoreCreditLedger(
-                member_id=credit.member_id,
-                tenant_id=tenant_id,
-                event_type='expiration',
-                amount=-credit.amount,
-                balance_after=Decimal('0'),
-                description=f'Credit expired (issued {credit.created_at.strftime("%Y-%m-%d")})',
-                source_type='expiration',
-                source_id=f'expired:{credit.id}',
-                source_reference=credit.source_reference,
-                created_by='system:trigger-dev'
-            )
-            db.session.add(expiration_entry)
-            expired += 1
-            expired_amount += credit.amount
-        except Exception as e:
-            errors += 1
-
-    if expired > 0:
-        db.session.commit()
-
-    next_cursor = credits[-1].id if credits else None
+    result = CreditExpirationEngine(tenant_id).expire_batch(cursor=cursor, batch_size=batch_size)
 
     return jsonify({
-        'processed': processed,
-        'expired': expired,
-        'expiredAmount': float(expired_amount),
-        'errors': errors,
-        'nextCursor': next_cursor,
-        'hasMore': has_more,
+        'processed': result['processed'],
+        'expired': result['expired'],
+        'expiredAmount': result['expired_amount'],
+        'errors': result['errors'],
+        'nextCursor': result['next_cursor'],
+        'hasMore': result['has_more'],
     })
 
 
@@ -24,6 +24,7 @@ from ..models import Member, MembershipTier, Tenant
 from ..models.loyalty_points import PointsBalance, PointsLedger, Reward
 from ..middleware.shopify_auth import require_shopify_auth
 from ..services.shopify_client import ShopifyClient
+from ..services.customer_tag_sync_service import CustomerTagSyncService
 
 segments_bp = Blueprint('segments', __name__)
 
@@ -299,7 +300,9 @@ def sync_customer_tags():
     - Points balance (tradeup-points-500plus, etc.)
     - Engagement status (tradeup-at-risk, etc.)
 
-    This is needed for segment queries to work.
+    This is needed for segment queries to work. Only customers whose tags
+    changed since the last sync are sent to Shopify; pass refresh=true to
+    re-read current tags from Shopify first.
 
     Returns:
         Number of customers updated
@@ -310,15 +313,19 @@ def sync_customer_tags():
     # Options
     batch_size = data.get('batch_size', 50)
     member_ids = data.get('member_ids')  # Optional: sync only specific members
+    refresh = data.get('refresh', False)  # Re-read current tags from Shopify
 
     try:
         client = ShopifyClient(tenant_id)
-        result = _sync_customer_tags(tenant_id, client, batch_size, member_ids)
+        result = _sync_customer_tags(tenant_id, client, batch_size, member_ids, refresh)
 
         return jsonify({
             'success': True,
             'synced': result.get('synced', 0),
+            'unchanged': result.get('unchanged', 0),
+            'removed': result.get('removed', 0),
             'failed': result.get('failed', 0),
+            'api_calls': result.get('api_calls', 0),
             'errors': result.get('errors', [])[:10]  # Limit errors in response
         })
 
@@ -496,11 +503,17 @@ def calculate_vip_members():
 
         # Apply VIP tags if requested
         if apply_tags:
-            for vip in vip_members:
+            for start in range(0, len(vip_members), 50):
+                chunk = vip_members[start:start + 50]
                 try:
-                    client.add_customer_tag(vip['shopify_customer_id'], 'tradeup-vip')
+                    response = client.update_customer_tags_bulk([
+                        {'customer_id': vip['shopify_customer_id'], 'add': ['tradeup-vip']}
+                        for vip in chunk
+                    ])
+                    for customer_id, error in response.get('failed', {}).items():
+                        current_app.logger.error(f"Failed to tag VIP customer {customer_id}: {error}")
                 except Exception as e:
-                    current_app.logger.error(f"Failed to tag VIP {vip['member_id']}: {e}")
+                    current_app.logger.error(f"Failed to tag VIP batch: {e}")
 
         return jsonify({
             'vip_members': vip_members,
@@ -520,101 +533,22 @@ def calculate_vip_members():
 # Helper Functions
 # ==============================================================================
 
-def _sync_customer_tags(tenant_id: int, client: ShopifyClient, batch_size: int = 50, member_ids: list = None) -> dict:
+def _sync_customer_tags(
+    tenant_id: int,
+    client: ShopifyClient,
+    batch_size: int = 50,
+    member_ids: list = None,
+    refresh: bool = False
+) -> dict:
     """
     Sync TradeUp tags to Shopify customers.
 
-    Tags applied:
-    - tradeup-member (all members)
-    - tradeup-{tier-slug} (tier membership)
-    - tradeup-points-500plus (points >= 500)
-    - tradeup-points-1000plus (points >= 1000)
-    - tradeup-reward-available (can redeem a reward)
-    - tradeup-at-risk (no activity 30 days)
-    - tradeup-new-member (joined last 30 days)
+    Diffs each member's desired tags against the local tag mirror and only
+    pushes customers whose tags changed. See CustomerTagSyncService for the
+    list of managed tags.
     """
-    result = {
-        'synced': 0,
-        'failed': 0,
-        'errors': []
-    }
-
-    # Build query
-    query = Member.query.filter(
-        Member.tenant_id == tenant_id,
-        Member.status == 'active',
-        Member.shopify_customer_id.isnot(None)
-    )
-
-    if member_ids:
-        query = query.filter(Member.id.in_(member_ids))
-
-    members = query.all()
-
-    # Get points balances
-    points_query = db.session.query(
-        PointsLedger.member_id,
-        func.sum(PointsLedger.points).label('balance')
-    ).filter(
-        PointsLedger.tenant_id == tenant_id,
-        PointsLedger.reversed_at.is_(None)
-    ).group_by(PointsLedger.member_id)
-
-    points_map = {row.member_id: int(row.balance or 0) for row in points_query.all()}
-
-    # Get cheapest reward for reward-available check
-    cheapest_reward = Reward.query.filter(
-        Reward.tenant_id == tenant_id,
-        Reward.is_active == True
-    ).order_by(Reward.points_cost.asc()).first()
-
-    min_reward_points = cheapest_reward.points_cost if cheapest_reward else 9999999
-
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-
-    for member in members:
-        try:
-            tags_to_add = ['tradeup-member']
-
-            # Tier tag
-            if member.tier:
-                tier_slug = member.tier.name.lower().replace(' ', '-')
-                tags_to_add.append(f'tradeup-{tier_slug}')
-
-            # Points threshold tags
-            points_balance = points_map.get(member.id, 0)
-            if points_balance >= 500:
-                tags_to_add.append('tradeup-points-500plus')
-            if points_balance >= 1000:
-                tags_to_add.append('tradeup-points-1000plus')
-
-            # Reward available
-            if points_balance >= min_reward_points:
-                tags_to_add.append('tradeup-reward-available')
-
-            # At-risk (no activity 30 days)
-            last_activity = member.updated_at or member.created_at
-            if last_activity and last_activity < thirty_days_ago:
-                tags_to_add.append('tradeup-at-risk')
-
-            # New member (joined last 30 days)
-            if member.created_at and member.created_at >= thirty_days_ago:
-                tags_to_add.append('tradeup-new-member')
-
-            # Add tags to Shopify customer
-            for tag in tags_to_add:
-                client.add_customer_tag(member.shopify_customer_id, tag)
-
-            result['synced'] += 1
-
-        except Exception as e:
-            result['failed'] += 1
-            result['errors'].append({
-                'member_id': member.id,
-                'error': str(e)
-            })
-
-    return result
+    service = CustomerTagSyncService(tenant_id, client=client)
+    return service.sync(member_ids=member_ids, batch_size=batch_size, refresh=refresh)
 
 
 @segments_bp.route('/sync-products', methods=['POST'])
@@ -191,11 +191,14 @@ def callback():
 
     # Exchange code for access token
     token_url = f"https://{shop}/admin/oauth/access_token"
-    token_response = requests.post(token_url, json={
-        'client_id': SHOPIFY_API_KEY,
-        'client_secret': SHOPIFY_API_SECRET,
-        'code': code,
-    })
+    try:
+        token_response = requests.post(token_url, json={
+            'client_id': SHOPIFY_API_KEY,
+            'client_secret': SHOPIFY_API_SECRET,
+            'code': code,
+        }, timeout=(5, 15))
+    except requests.RequestException as e:
+        return jsonify({'error': 'Failed to get access token', 'details': str(e)}), 502
 
     if not token_response.ok:
         return jsonify({
@@ -209,23 +212,16 @@ def callback():
     if not access_token:
         return jsonify({'error': 'No access token returned'}), 500
 
-    # Get shop info
-    shop_info = get_shop_info(shop, access_token)
-
-    # Create or update tenant
+    # Create or update tenant. Shop name, timezone and currency are filled in
+    # by the provisioning pipeline's shop_info step.
     tenant = Tenant.query.filter_by(shopify_domain=shop).first()
 
-    # Extract timezone and currency from shop info
-    shop_timezone = shop_info.get('iana_timezone', 'America/Los_Angeles')
-    shop_currency = shop_info.get('currency', 'USD')
-
     if not tenant:
         # Create new tenant
-        shop_name = shop_info.get('name', shop.replace('.myshopify.com', ''))
         shop_slug = shop.replace('.myshopify.com', '').lower()
 
         tenant = Tenant(
-            shop_name=shop_name,
+            shop_name=shop.replace('.myshopify.com', ''),
             shop_slug=shop_slug,
             shopify_domain=shop,
             shopify_access_token=access_token,
@@ -233,8 +229,8 @@ def callback():
             subscription_status='pending',
             settings={
                 'general': {
-                    'timezone': shop_timezone,
-                    'currency': shop_currency,
+                    'timezone': 'America/Los_Angeles',
+                    'currency': 'USD',
                 }
             },
         )
@@ -242,18 +238,16 @@ def callback():
     else:
         # Update existing tenant
         tenant.shopify_access_token = access_token
-        # Update settings with current shop timezone/currency
-        current_settings = tenant.settings or {}
-        general_settings = current_settings.get('general', {})
-        general_settings['timezone'] = shop_timezone
-        general_settings['currency'] = shop_currency
-        current_settings['general'] = general_settings
-        tenant.settings = current_settings
 
     db.session.commit()
 
-    # Register webhooks
-    register_webhooks(shop, access_token)
+    # Webhooks, tiers, segments etc. are set up in the background; the admin
+    # UI follows progress via /api/onboarding/provisioning
+    try:
+        from ..services.install_provisioning import start_provisioning
+        start_provisioning(tenant.id, reset=True)
+    except Exception as e:
+        logger.error("Failed to start provisioning for %s: %s", shop, e)
 
     # Redirect to billing (for new installs) or app dashboard
     if not tenant.subscription_active:
@@ -262,69 +256,6 @@ def callback():
     return redirect(f"https://{shop}/admin/apps/{SHOPIFY_API_KEY}")
 
 
-def get_shop_info(shop: str, access_token: str) -> dict:
-    """Fetch shop information from Shopify."""
-    headers = {
-        'X-Shopify-Access-Token': access_token,
-        'Content-Type': 'application/json',
-    }
-
-    response = requests.get(
-        f"https://{shop}/admin/api/2024-01/shop.json",
-        headers=headers
-    )
-
-    if response.ok:
-        return response.json().get('shop', {})
-    return {}
-
-
-def register_webhooks(shop: str, access_token: str):
-    """Register required webhooks with Shopify."""
-    headers = {
-        'X-Shopify-Access-Token': access_token,
-        'Content-Type': 'application/json',
-    }
-
-    webhooks = [
-        {
-            'topic': 'orders/paid',
-            'address': f"{APP_URL}/webhook/shopify/orders/paid",
-            'format': 'json',
-        },
-        {
-            'topic': 'orders/fulfilled',
-            'address': f"{APP_URL}/webhook/shopify/orders/fulfilled",
-            'format': 'json',
-        },
-        {
-            'topic': 'customers/create',
-            'address': f"{APP_URL}/webhook/shopify/customers/create",
-            'format': 'json',
-        },
-        {
-            'topic': 'app/uninstalled',
-            'address': f"{APP_URL}/webhook/shopify/app/uninstalled",
-            'format': 'json',
-        },
-        {
-            'topic': 'app_subscriptions/update',
-            'address': f"{APP_URL}/webhook/shopify-billing/subscriptions",
-            'format': 'json',
-        },
-    ]
-
-    for webhook in webhooks:
-        try:
-            requests.post(
-                f"https://{shop}/admin/api/2024-01/webhooks.json",
-                headers=headers,
-                json={'webhook': webhook}
-            )
-        except Exception as e:
-            logger.warning("Failed to register webhook %s: %s", webhook['topic'], e)
-
-
 @shopify_oauth_bp.route('/uninstall', methods=['POST'])
 def handle_uninstall():
     """
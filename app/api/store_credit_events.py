@@ -5,7 +5,7 @@ For running promotional store credit events like Trade Night.
 from datetime import datetime
 from flask import Blueprint, request, jsonify, g
 from ..middleware.shopify_auth import require_shopify_auth
-from ..services.store_credit_events import StoreCreditEventsService
+from ..services.store_credit_events import StoreCreditEventsService, FETCH_MODES
 
 store_credit_events_bp = Blueprint('store_credit_events', __name__)
 
@@ -15,7 +15,7 @@ def get_service_for_tenant():
     tenant = getattr(g, 'tenant', None)
     if not tenant or not tenant.shopify_access_token:
         return None
-    return StoreCreditEventsService(tenant.shopify_domain, tenant.shopify_access_token)
+    return StoreCreditEventsService(tenant.shopify_domain, tenant.shopify_access_token, tenant_id=tenant.id)
 
 
 def validate_filter_lists(data: dict) -> tuple:
@@ -71,6 +71,7 @@ def preview_event():
         collection_ids: List of collection GIDs to filter by (optional)
         product_tags: List of product tags to filter by (optional)
         audience: 'all_customers' (default) or 'members_only' (optional)
+        fetch_mode: 'rest' (default) or 'bulk' for large date ranges (optional)
 
     Returns:
         Preview with order counts, customer totals, top customers
@@ -102,6 +103,10 @@ def preview_event():
     if audience not in ('all_customers', 'members_only'):
         return jsonify({'error': 'audience must be "all_customers" or "members_only"'}), 400
 
+    fetch_mode = data.get('fetch_mode', 'rest')
+    if fetch_mode not in FETCH_MODES:
+        return jsonify({'error': 'fetch_mode must be "rest" or "bulk"'}), 400
+
     try:
         result = service.preview_event(
             start_datetime=data['start_datetime'],
@@ -111,7 +116,8 @@ def preview_event():
             include_authorized=data.get('include_authorized', True),
             collection_ids=collection_ids,
             product_tags=product_tags,
-            audience=audience
+            audience=audience,
+            fetch_mode=fetch_mode
         )
 
         # Transform to frontend-expected format
@@ -152,6 +158,8 @@ def run_event():
         collection_ids: List of collection GIDs to filter by (optional)
         product_tags: List of product tags to filter by (optional)
         audience: 'all_customers' (default) or 'members_only' (optional)
+        fetch_mode: 'rest' (default) or 'bulk' for large date ranges (optional)
+        reuse_preview: Reuse credits from a matching recent preview (default false)
 
     Returns:
         Event results with success/failure counts
@@ -185,6 +193,10 @@ def run_event():
     if audience not in ('all_customers', 'members_only'):
         return jsonify({'error': 'audience must be "all_customers" or "members_only"'}), 400
 
+    fetch_mode = data.get('fetch_mode', 'rest')
+    if fetch_mode not in FETCH_MODES:
+        return jsonify({'error': 'fetch_mode must be "rest" or "bulk"'}), 400
+
     try:
         result = service.run_event(
             start_datetime=data['start_datetime'],
@@ -198,7 +210,9 @@ def run_event():
             delay_ms=data.get('delay_ms', 1000),
             collection_ids=collection_ids,
             product_tags=product_tags,
-            audience=audience
+            audience=audience,
+            fetch_mode=fetch_mode,
+            reuse_preview=data.get('reuse_preview', False)
         )
 
         # Transform to frontend-expected format
@@ -274,18 +288,20 @@ def list_sources():
         # Fetch orders with no source filter to see all sources
         logger.info(f"[StoreCreditEvents] Fetching orders from {start} to {end}")
         orders = service.fetch_orders(start, end, [], include_authorized=True)
-        logger.info(f"[StoreCreditEvents] Found {len(orders)} orders")
 
         # Count by source
+        total_orders = 0
         by_source = {}
         for order in orders:
+            total_orders += 1
             source = order.source_name or 'unknown'
             by_source[source] = by_source.get(source, 0) + 1
+        logger.info(f"[StoreCreditEvents] Found {total_orders} orders")
 
         return jsonify({
             'start_datetime': start,
             'end_datetime': end,
-            'total_orders': len(orders),
+            'total_orders': total_orders,
             'sources': [
                 {'name': name, 'count': count}
                 for name, count in sorted(by_source.items(), key=lambda x: -x[1])
@@ -334,7 +350,7 @@ def manual_run_event():
         return jsonify({'error': f'No tenant found for {shop_domain}'}), 404
 
     from ..services.store_credit_events import StoreCreditEventsService
-    service = StoreCreditEventsService(tenant.shopify_domain, tenant.shopify_access_token)
+    service = StoreCreditEventsService(tenant.shopify_domain, tenant.shopify_access_token, tenant_id=tenant.id)
 
     start = data.get('start_datetime')
     end = data.get('end_datetime')
@@ -408,14 +424,19 @@ def debug_orders():
         return jsonify({'error': 'start_datetime and end_datetime are required'}), 400
 
     try:
-        orders = service.fetch_orders(start, end, [], include_authorized=True)
+        orders = []
+        total_orders = 0
+        for order in service.fetch_orders(start, end, [], include_authorized=True):
+            total_orders += 1
+            if len(orders) < 20:
+                orders.append(order)
 
         return jsonify({
             'debug': True,
             'start_datetime_received': start,
             'end_datetime_received': end,
             'shop_domain': service.shop_domain,
-            'total_orders': len(orders),
+            'total_orders': total_orders,
             'orders': [
                 {
                     'id': o.id,
@@ -425,7 +446,7 @@ def debug_orders():
                     'total_price': float(o.total_price),
                     'customer_email': o.customer_email
                 }
-                for o in orders[:20]  # Limit to first 20 for debug
+                for o in orders  # Limit to first 20 for debug
             ]
         })
 
@@ -457,7 +478,7 @@ def debug_collections():
         return jsonify({'error': f'No tenant found for {shop_domain}'}), 404
 
     from ..services.store_credit_events import StoreCreditEventsService
-    service = StoreCreditEventsService(tenant.shopify_domain, tenant.shopify_access_token)
+    service = StoreCreditEventsService(tenant.shopify_domain, tenant.shopify_access_token, tenant_id=tenant.id)
 
     try:
         # Fetch collections using Shopify GraphQL
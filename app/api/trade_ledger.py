@@ -11,6 +11,9 @@ from decimal import Decimal, InvalidOperation
 from sqlalchemy import func, desc
 from ..extensions import db
 from ..models import TradeInLedger, Member
+from ..services.search_service import ledger_search_clause, search_ledger
+from ..utils.exceptions import ValidationError
+from ..utils.pagination import keyset_paginate, wants_cursor_pagination
 from ..middleware.shopify_auth import require_shopify_auth
 
 logger = logging.getLogger(__name__)
@@ -32,6 +35,8 @@ def list_entries():
     - start_date: Filter from date (ISO format)
     - end_date: Filter to date (ISO format)
     - search: Search by reference, customer name, or notes
+    - cursor: Keyset pagination cursor (empty for the first page); replaces page
+    - total: With cursor - none (default), approx or exact
     """
     try:
         tenant_id = g.tenant_id
@@ -67,16 +72,22 @@ def list_entries():
             except ValueError:
                 current_app.logger.warning(f"Invalid end_date format: {end_date}")
 
-        if search:
-            search_term = f'%{search}%'
-            query = query.filter(
-                db.or_(
-                    TradeInLedger.reference.ilike(search_term),
-                    TradeInLedger.guest_name.ilike(search_term),
-                    TradeInLedger.notes.ilike(search_term),
-                    TradeInLedger.category.ilike(search_term),
-                )
+        if search and search.strip():
+            query = query.filter(ledger_search_clause(search))
+
+        if wants_cursor_pagination(request.args):
+            result = keyset_paginate(
+                query,
+                sort_column=TradeInLedger.trade_date,
+                id_column=TradeInLedger.id,
+                cursor=request.args.get('cursor'),
+                limit=per_page,
+                total_mode=request.args.get('total')
             )
+            return jsonify({
+                'entries': [entry.to_dict() for entry in result.items],
+                **result.to_dict()
+            })
 
         # Order by most recent first
         query = query.order_by(desc(TradeInLedger.trade_date))
@@ -91,6 +102,8 @@ def list_entries():
             'per_page': per_page,
             'pages': pagination.pages,
         })
+    except ValidationError as e:
+        return jsonify({'error': e.message}), 400
     except Exception as e:
         logger.exception("Error listing entries: %s", e)
         return jsonify({'error': str(e)}), 500
@@ -192,6 +205,27 @@ def create_entry():
         return jsonify({'error': str(e)}), 500
 
 
+@trade_ledger_bp.route('/search', methods=['GET'])
+@require_shopify_auth
+def search_entries():
+    """
+    Ranked search over ledger entries.
+
+    Query params:
+    - q: Search term (reference, customer name, category, notes)
+    - limit: Max results (default: 20, max: 50)
+    """
+    tenant_id = g.tenant_id
+    term = request.args.get('q', '').strip()
+    limit = request.args.get('limit', 20, type=int)
+
+    entries = search_ledger(tenant_id, term, limit=limit)
+    return jsonify({
+        'query': term,
+        'entries': [entry.to_dict() for entry in entries],
+    })
+
+
 @trade_ledger_bp.route('/<int:entry_id>', methods=['GET'])
 @require_shopify_auth
 def get_entry(entry_id: int):
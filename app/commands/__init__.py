@@ -12,12 +12,16 @@ Usage:
     flask scheduled expire-credits --tenant-id 1      # Expire old credits
     flask scheduled expiration-warnings --tenant-id 1 # Preview expiring credits
     flask scheduled referral-stats --tenant-id 1      # Referral program stats
+
+    flask startup profile                             # Blueprint import cost
 """
 from .tiers import init_app as init_tier_commands
 from .scheduled import init_app as init_scheduled_commands
+from .startup import init_app as init_startup_commands
 
 
 def init_app(app):
     """Register all CLI commands with the Flask app."""
     init_tier_commands(app)
     init_scheduled_commands(app)
+    init_startup_commands(app)
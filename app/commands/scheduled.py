@@ -11,13 +11,18 @@ These commands can be run manually or via cron jobs:
 
 # Expiration warnings (run daily at 9 AM)
 0 9 * * * cd /app && flask scheduled expiration-warnings --tenant-id=1 --days=7
+
+# Benchmark snapshot for all tenants (run daily at 2 AM)
+0 2 * * * cd /app && flask scheduled benchmarks
+
+# Resume unfinished shop redaction purges (run every 5 minutes)
+*/5 * * * * cd /app && flask scheduled purge-tenants --max-seconds=240
 """
 
 import click
 from flask import current_app
 from flask.cli import with_appcontext
 from ..extensions import db
-from ..services.scheduled_tasks import scheduled_tasks_service
 from ..models.tenant import Tenant
 
 
@@ -37,6 +42,7 @@ def distribute_monthly_credits(tenant_id, dry_run):
 
     Run this on the 1st of each month.
     """
+    from ..services.scheduled_tasks import scheduled_tasks_service
     if tenant_id:
         tenants = [Tenant.query.get(tenant_id)]
         if not tenants[0]:
@@ -82,6 +88,7 @@ def expire_credits(tenant_id, dry_run):
 
     Run this daily.
     """
+    from ..services.scheduled_tasks import scheduled_tasks_service
     if tenant_id:
         tenants = [Tenant.query.get(tenant_id)]
         if not tenants[0]:
@@ -125,6 +132,7 @@ def expiration_warnings(tenant_id, days):
 
     Use this to send warning emails to members.
     """
+    from ..services.scheduled_tasks import scheduled_tasks_service
     tenant = Tenant.query.get(tenant_id)
     if not tenant:
         click.echo(f"Tenant {tenant_id} not found")
@@ -153,6 +161,7 @@ def referral_stats(tenant_id):
     """
     Show referral program statistics.
     """
+    from ..services.scheduled_tasks import scheduled_tasks_service
     tenant = Tenant.query.get(tenant_id)
     if not tenant:
         click.echo(f"Tenant {tenant_id} not found")
@@ -172,6 +181,37 @@ def referral_stats(tenant_id):
                       f"${r['referral_earnings']:.2f} earned")
 
 
+@scheduled_cli.command('benchmarks')
+@with_appcontext
+def compute_benchmarks():
+    """
+    Recompute benchmark metrics and peer distributions for all tenants.
+
+    Run this daily.
+    """
+    from ..services.benchmark_engine import BenchmarkEngine
+
+    summary = BenchmarkEngine().run()
+    click.echo(f"Benchmarks computed for {summary['stores']} stores "
+               f"({summary['distributions']} distributions published)")
+
+
+@scheduled_cli.command('purge-tenants')
+@click.option('--max-seconds', type=float, help='Time budget (default: run until every purge is done)')
+@with_appcontext
+def purge_tenants(max_seconds):
+    """
+    Continue unfinished shop redaction purges.
+
+    Run this every few minutes.
+    """
+    from ..services.tenant_purge import resume_tenant_purges
+
+    summary = resume_tenant_purges(max_seconds=max_seconds)
+    click.echo(f"Tenant purges: {summary['done']} done, {summary['pending']} pending, "
+               f"{summary['failed']} failed, {summary['abandoned']} abandoned, {summary['skipped']} skipped")
+
+
 def init_app(app):
     """Register CLI commands with the Flask app."""
     app.cli.add_command(scheduled_cli)
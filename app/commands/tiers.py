@@ -13,7 +13,6 @@ from flask import current_app
 from flask.cli import with_appcontext
 from ..extensions import db
 from ..models import Tenant
-from ..services.tier_service import TierService
 
 
 @click.group()
@@ -41,6 +40,7 @@ def process_expirations(tenant_id, dry_run):
         flask tiers process-expirations --tenant-id 1
         flask tiers process-expirations --dry-run
     """
+    from ..services.tier_service import TierService
     if tenant_id:
         tenants = [Tenant.query.get(tenant_id)]
         if not tenants[0]:
@@ -138,6 +138,7 @@ def check_eligibility(tenant_id, member_id, apply):
         flask tiers check-eligibility --tenant-id 1 --apply
         flask tiers check-eligibility --member-id 123
     """
+    from ..services.tier_service import TierService
     if tenant_id:
         tenants = [Tenant.query.get(tenant_id)]
         if not tenants[0]:
@@ -39,6 +39,14 @@ from .query_profiler import (
     is_profiling_enabled,
 )
 
+# Request/query/outbound telemetry with Prometheus endpoint
+from .telemetry import (
+    init_telemetry,
+    outbound_timer,
+    instrument_session,
+    httpx_event_hooks,
+)
+
 # Request ID tracking middleware
 from .request_id import (
     init_request_id_tracking,
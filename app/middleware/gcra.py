@@ -0,0 +1,376 @@
+"""
+GCRA Rate Limiting for High-Volume Public Endpoints.
+
+Generic Cell Rate Algorithm buckets per tenant and per client for each
+endpoint class (app proxy pages, storefront analytics beacons). Unlike fixed
+windows, GCRA never admits more than the configured burst at a window edge.
+App proxy requests are keyed on the Shopify-signed shop and customer, since
+they all arrive from Shopify's addresses. Beacons carry no signature, so their
+tenant bucket is only used for shops registered with the app; any other shop
+value shares one low-limit bucket.
+
+Checks are answered from process-local state in a few microseconds. Admitted
+hits are reconciled with Redis in batches (one Lua round trip per key every
+RECONCILE_INTERVAL seconds or RECONCILE_BATCH hits), which returns the shared
+debt across all workers. A client over its limit is rejected locally until its
+bucket drains, without touching Redis. Without REDIS_URL (or while Redis is
+unreachable) limits are enforced per process.
+
+Usage:
+    from app.middleware.gcra import init_gcra_limiter
+    init_gcra_limiter(app)
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import jsonify, request
+from flask_limiter.util import get_remote_address
+
+logger = logging.getLogger(__name__)
+
+# Sync a key with Redis after this many seconds or local hits, whichever first
+RECONCILE_INTERVAL = 1.0
+RECONCILE_BATCH = 20
+
+# Local key states kept before idle (fully drained) keys are evicted
+MAX_LOCAL_KEYS = 50_000
+
+# Back off from Redis for this long after an error
+REDIS_RETRY_SECONDS = 30
+
+REDIS_KEY_PREFIX = 'tradeup:gcra:'
+
+# How long the set of registered shop domains is trusted before a reload
+REGISTERED_SHOPS_TTL = 60
+
+# Tenant key for requests whose shop could not be verified
+UNVERIFIED_TENANT = 'unverified'
+
+# Adds `hits` emission intervals to the shared TAT; returns the debt (TAT - now)
+GCRA_CONSUME_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local hits = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+tat = tat + interval * hits
+redis.call('SET', KEYS[1], tostring(tat), 'PX', math.max(1, math.ceil((tat - now) * 1000)))
+return tostring(tat - now)
+"""
+
+
+@dataclass(frozen=True)
+class GCRALimit:
+    """`rate` requests per `period` seconds, allowing bursts of `burst`."""
+    rate: int
+    period: float
+    burst: int
+
+    @property
+    def interval(self) -> float:
+        """Emission interval: seconds of budget one request costs."""
+        return self.period / self.rate
+
+    @property
+    def tolerance(self) -> float:
+        """How far the TAT may run ahead of now."""
+        return self.interval * (self.burst - 1)
+
+
+@dataclass(frozen=True)
+class EndpointClass:
+    """A group of paths sharing per-tenant and per-client limits."""
+    name: str
+    prefixes: Tuple[str, ...]
+    tenant_limit: GCRALimit
+    client_limit: GCRALimit
+    # Shared by every request whose shop could not be verified
+    unverified_limit: GCRALimit
+
+
+ENDPOINT_CLASSES = (
+    EndpointClass(
+        name='proxy',
+        prefixes=('/proxy',),
+        tenant_limit=GCRALimit(rate=3000, period=60, burst=500),
+        client_limit=GCRALimit(rate=120, period=60, burst=40),
+        unverified_limit=GCRALimit(rate=600, period=60, burst=100),
+    ),
+    EndpointClass(
+        name='beacon',
+        prefixes=(
+            '/api/analytics/pixel',
+            '/api/loyalty-page/analytics/track/',
+            '/api/nudges/track/',
+            '/api/support-review/track/',
+        ),
+        tenant_limit=GCRALimit(rate=6000, period=60, burst=1000),
+        client_limit=GCRALimit(rate=300, period=60, burst=60),
+        unverified_limit=GCRALimit(rate=600, period=60, burst=100),
+    ),
+)
+
+
+@dataclass
+class _KeyState:
+    tat: float = 0.0
+    pending: int = 0
+    last_sync: float = 0.0
+    syncing: bool = False
+
+
+class RedisGCRAStore:
+    """Shared GCRA state in Redis; `consume` returns the key's debt in seconds."""
+
+    def __init__(self, client):
+        self.client = client
+        self._script = client.register_script(GCRA_CONSUME_SCRIPT)
+
+    def consume(self, key: str, limit: GCRALimit, hits: int) -> float:
+        return float(self._script(keys=[REDIS_KEY_PREFIX + key], args=[limit.interval, hits]))
+
+
+class GCRALimiter:
+    """
+    Process-local GCRA with optional batched reconciliation to a shared store.
+
+    Args:
+        store: Object with consume(key, limit, hits) -> debt seconds, or None
+        clock: Monotonic clock (injectable for tests)
+    """
+
+    def __init__(self, store=None, clock: Callable[[], float] = time.monotonic):
+        self.store = store
+        self.clock = clock
+        self._states: Dict[str, _KeyState] = {}
+        self._lock = threading.Lock()
+        self._store_down_until = 0.0
+
+    def hit(self, key: str, limit: GCRALimit) -> Tuple[bool, float]:
+        """
+        Count one request against `key`.
+
+        Returns:
+            (allowed, retry_after_seconds)
+        """
+        now = self.clock()
+        sync = 0
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                if len(self._states) >= MAX_LOCAL_KEYS:
+                    self._evict(now)
+                state = self._states[key] = _KeyState(last_sync=now)
+
+            tat = max(state.tat, now)
+            if tat - now > limit.tolerance:
+                return False, tat - now - limit.tolerance
+
+            state.tat = tat + limit.interval
+            state.pending += 1
+            if (self.store is not None and not state.syncing and now >= self._store_down_until
+                    and (state.pending >= RECONCILE_BATCH or now - state.last_sync >= RECONCILE_INTERVAL)):
+                state.syncing = True
+                sync = state.pending
+
+        if sync:
+            self._reconcile(key, limit, state, sync)
+        return True, 0.0
+
+    def _reconcile(self, key: str, limit: GCRALimit, state: _KeyState, hits: int) -> None:
+        """Send admitted hits to the shared store and adopt the shared debt."""
+        try:
+            debt = self.store.consume(key, limit, hits)
+        except Exception as e:
+            logger.warning(f'[RateLimit] Shared store unavailable, limiting per process: {e}')
+            with self._lock:
+                state.syncing = False
+                self._store_down_until = self.clock() + REDIS_RETRY_SECONDS
+            return
+
+        now = self.clock()
+        with self._lock:
+            state.pending -= hits
+            state.tat = now + debt + state.pending * limit.interval
+            state.last_sync = now
+            state.syncing = False
+
+    def _evict(self, now: float) -> None:
+        """Drop keys whose buckets have fully drained (caller holds the lock)."""
+        idle = [key for key, state in self._states.items() if state.tat <= now and not state.pending]
+        for key in idle:
+            del self._states[key]
+        if len(self._states) >= MAX_LOCAL_KEYS:
+            self._states.clear()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+def classify(path: str) -> Optional[EndpointClass]:
+    for endpoint_class in ENDPOINT_CLASSES:
+        if path.startswith(endpoint_class.prefixes):
+            return endpoint_class
+    return None
+
+
+class RegisteredShops:
+    """
+    Active tenants' shop domains, reloaded at most every REGISTERED_SHOPS_TTL.
+
+    Beacon lookups are answered from memory, so a flood of made-up shop
+    values costs no queries.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._shops: frozenset = frozenset()
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def __contains__(self, shop: str) -> bool:
+        now = self.clock()
+        if now >= self._expires:
+            with self._lock:
+                if now >= self._expires:
+                    self._expires = now + REGISTERED_SHOPS_TTL
+                    self._shops = self._load(self._shops)
+        return shop in self._shops
+
+    @staticmethod
+    def _load(previous: frozenset) -> frozenset:
+        from ..models import Tenant
+        try:
+            rows = Tenant.query.with_entities(Tenant.shopify_domain).filter(
+                Tenant.is_active.is_(True), Tenant.shopify_domain.isnot(None)
+            ).all()
+        except Exception as e:
+            logger.warning(f'[RateLimit] Could not load registered shops, keeping previous set: {e}')
+            return previous
+        return frozenset(row.shopify_domain.lower() for row in rows)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shops = frozenset()
+            self._expires = 0.0
+
+
+registered_shops = RegisteredShops()
+
+
+def get_tenant_key() -> str:
+    """
+    Tenant bucket for a beacon.
+
+    The shop comes from the `shop` param, header or Origin, none of which is
+    signed, so only shops registered with the app get their own bucket.
+    Anything else shares UNVERIFIED_TENANT, so a forged shop value cannot
+    spend a real shop's budget or mint fresh buckets.
+    """
+    shop = request.args.get('shop') or request.headers.get('X-Shop-Domain')
+    if not shop:
+        origin = request.headers.get('Origin', '')
+        shop = origin.split('://', 1)[-1] if origin else ''
+    shop = shop.strip().lower()
+    return shop if shop and shop in registered_shops else UNVERIFIED_TENANT
+
+
+def get_proxy_keys() -> Tuple[Optional[str], str]:
+    """
+    (client key, tenant key) for an app proxy request.
+
+    Proxy requests arrive from Shopify's servers, so the remote address says
+    nothing about the shopper. A request with a valid Shopify signature is
+    keyed on the signed shop and logged-in customer; anonymous shoppers share
+    only the shop's budget. Unsigned requests are keyed on their address and
+    one shared tenant, so a forged `shop` cannot spend a real shop's budget.
+    """
+    if request.args.get('signature'):
+        from ..api.proxy import verify_proxy_signature
+        is_valid, shop = verify_proxy_signature()
+        if is_valid and shop:
+            customer_id = request.args.get('logged_in_customer_id')
+            client_key = f'customer:{shop.lower()}:{customer_id}' if customer_id else None
+            return client_key, shop.lower()
+    return f'ip:{get_remote_address()}', UNVERIFIED_TENANT
+
+
+def _create_store():
+    redis_url = os.getenv('REDIS_URL')
+    if not redis_url:
+        return None
+    try:
+        import redis
+        client = redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=0.25)
+        client.ping()
+        return RedisGCRAStore(client)
+    except Exception as e:
+        logger.warning(f'[RateLimit] Redis unavailable ({e}), GCRA limits are per process')
+        return None
+
+
+limiter = GCRALimiter()
+
+
+def check_request(gcra: GCRALimiter = limiter):
+    """
+    Apply the endpoint class limits to the current request.
+
+    Returns:
+        429 response if over a limit, otherwise None
+    """
+    if request.method == 'OPTIONS':
+        return None
+    endpoint_class = classify(request.path)
+    if endpoint_class is None:
+        return None
+
+    if endpoint_class.name == 'proxy':
+        client_key, tenant_key = get_proxy_keys()
+    else:
+        client_key, tenant_key = f'ip:{get_remote_address()}', get_tenant_key()
+
+    tenant_limit = (endpoint_class.unverified_limit if tenant_key == UNVERIFIED_TENANT
+                    else endpoint_class.tenant_limit)
+    for key, limit in (
+        (client_key and f'{endpoint_class.name}:client:{client_key}', endpoint_class.client_limit),
+        (f'{endpoint_class.name}:tenant:{tenant_key}', tenant_limit),
+    ):
+        if key is None:
+            continue
+        allowed, retry_after = gcra.hit(key, limit)
+        if not allowed:
+            response = jsonify({
+                'error': 'Rate limit exceeded',
+                'message': 'Too many requests. Please try again later.',
+                'code': 'RATE_LIMIT_EXCEEDED',
+                'retry_after': round(retry_after, 3),
+            })
+            response.status_code = 429
+            response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+            return response
+    return None
+
+
+def is_gcra_path() -> bool:
+    """True for paths limited here (exempted from Flask-Limiter)."""
+    return classify(request.path) is not None
+
+
+def init_gcra_limiter(app):
+    """
+    Enforce GCRA limits on proxy and beacon paths.
+
+    Call this in the app factory after creating the Flask app.
+    """
+    limiter.store = _create_store()
+    app.before_request(check_request)
+    logger.info(f"[RateLimit] GCRA limits on {', '.join(c.name for c in ENDPOINT_CLASSES)} "
+                f"({'shared via Redis' if limiter.store else 'per process'})")
+    return limiter
@@ -3,12 +3,17 @@ API Rate Limiting Middleware.
 
 Protects TradeUp API endpoints from abuse using Flask-Limiter.
 Rate limits are shop-based for authenticated requests.
+
+App proxy and storefront beacon paths are limited by the GCRA limiter in
+gcra.py instead, which answers from process-local state.
 """
 import os
 from flask import request, g, jsonify
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
+from .gcra import init_gcra_limiter, is_gcra_path
+
 
 def get_rate_limit_key():
     """
@@ -55,7 +60,7 @@ limiter = Limiter(
     key_func=get_rate_limit_key,
     storage_uri=get_limiter_storage(),
     default_limits=["200 per minute", "5000 per hour"],  # Default limits
-    strategy="fixed-window",
+    strategy="sliding-window-counter",  # No 2x bursts at window edges, two counters per key
 )
 
 
@@ -105,4 +110,8 @@ def init_rate_limiter(app):
     # Exempt health check endpoints
     limiter.exempt(lambda: request.path in ['/health', '/', '/api/promotions/health'])
 
+    # Proxy and beacon paths are limited by GCRA, without a storage round trip
+    limiter.request_filter(is_gcra_path)
+    init_gcra_limiter(app)
+
     return limiter
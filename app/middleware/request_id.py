@@ -9,7 +9,7 @@ Generates unique request IDs for tracing requests through the system:
 """
 import uuid
 import logging
-from flask import g, request
+from flask import g, has_app_context, request
 
 
 class RequestIdFilter(logging.Filter):
@@ -20,7 +20,8 @@ class RequestIdFilter(logging.Filter):
     """
 
     def filter(self, record):
-        record.request_id = getattr(g, 'request_id', '-')
+        # Startup and lazy blueprint loading log outside any app context
+        record.request_id = getattr(g, 'request_id', '-') if has_app_context() else '-'
         return True
 
 
@@ -0,0 +1,346 @@
+"""
+Request, Query and Outbound Call Telemetry for TradeUp.
+
+Always-on, low-overhead metrics exposed in Prometheus text format at /metrics:
+- Per-endpoint request latency histograms (every request)
+- Per-request SQL query count and time (sampled requests)
+- Repeated statements (N+1 patterns) by normalized statement fingerprint
+- Outbound Shopify / SendGrid / Klaviyo / partner call latency
+- Lazy blueprint load time (import-time cost paid by a worker)
+
+Metrics are process-local. Each OS thread updates its own shard of counters,
+so the request path never takes a lock; /metrics sums the shards. Under
+gunicorn every worker process exposes its own numbers.
+
+Configuration (environment):
+    TELEMETRY_ENABLED=false             Disable entirely (default on)
+    TELEMETRY_SAMPLE_RATE=0.25          Share of requests with query telemetry
+    TELEMETRY_REPEAT_THRESHOLD=10       Same-statement count flagged as N+1
+    METRICS_TOKEN=...                   Bearer token for /metrics (required in production)
+"""
+import hashlib
+import hmac
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from flask import Response, current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+
+# Fingerprint cache entries before the cache is reset
+FINGERPRINT_CACHE_SIZE = 4096
+
+# Endpoints excluded from request metrics
+SKIP_ENDPOINTS = {'telemetry_metrics', 'static'}
+
+METRICS = {
+    'tradeup_http_request_duration_seconds': ('histogram', 'Request latency by endpoint', LATENCY_BUCKETS),
+    'tradeup_db_queries_per_request': ('histogram', 'SQL queries per sampled request', QUERY_COUNT_BUCKETS),
+    'tradeup_db_time_per_request_seconds': ('histogram', 'SQL time per sampled request', LATENCY_BUCKETS),
+    'tradeup_db_repeated_statements_total': ('counter', 'Sampled requests repeating one statement fingerprint (N+1)', None),
+    'tradeup_outbound_request_duration_seconds': ('histogram', 'Outbound API call latency by service', LATENCY_BUCKETS),
+    'tradeup_blueprint_load_seconds': ('histogram', 'Blueprint import and registration time', LATENCY_BUCKETS),
+}
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms sharded per OS thread.
+
+    A shard is only written by its own thread, so updates are plain dict and
+    list operations. The lock is only taken the first time a thread records.
+    Shards keyed by native thread id also stay bounded under gevent, where
+    every greenlet on a thread shares one shard.
+    """
+
+    def __init__(self):
+        self._shards: Dict[int, Dict[Tuple, list]] = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict[Tuple, list]:
+        thread_id = threading.get_native_id()
+        shard = self._shards.get(thread_id)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.setdefault(thread_id, {})
+        return shard
+
+    def inc(self, name: str, labels: Tuple = (), value: float = 1) -> None:
+        shard = self._shard()
+        key = (name, labels)
+        cell = shard.get(key)
+        if cell is None:
+            shard[key] = [value]
+        else:
+            cell[0] += value
+
+    def observe(self, name: str, labels: Tuple, value: float) -> None:
+        """Record a histogram sample: [bucket counts..., count, sum]."""
+        buckets = METRICS[name][2]
+        shard = self._shard()
+        key = (name, labels)
+        cell = shard.get(key)
+        if cell is None:
+            cell = shard[key] = [0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                cell[i] += 1
+                break
+        cell[-2] += 1
+        cell[-1] += value
+
+    def collect(self) -> Dict[Tuple, list]:
+        """Sum of all shards."""
+        merged: Dict[Tuple, list] = {}
+        for shard in list(self._shards.values()):
+            for key, cell in shard.copy().items():
+                total = merged.get(key)
+                if total is None:
+                    merged[key] = list(cell)
+                else:
+                    for i, value in enumerate(cell):
+                        total[i] += value
+        return merged
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shards = {}
+
+
+registry = MetricsRegistry()
+
+
+# ==================== Statement fingerprints ====================
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\([^()]*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+_fingerprints: Dict[str, Tuple[str, str]] = {}
+
+
+def normalize_statement(statement: str) -> str:
+    """SQL with literals and IN lists collapsed, so equal shapes compare equal."""
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _IN_LIST.sub('IN (?)', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+def fingerprint(statement: str) -> Tuple[str, str]:
+    """(short hash, normalized SQL) for a statement, cached by statement text."""
+    cached = _fingerprints.get(statement)
+    if cached is None:
+        normalized = normalize_statement(statement)
+        cached = (hashlib.blake2b(normalized.encode(), digest_size=6).hexdigest(), normalized)
+        if len(_fingerprints) >= FINGERPRINT_CACHE_SIZE:
+            _fingerprints.clear()
+        _fingerprints[statement] = cached
+    return cached
+
+
+# ==================== Query capture ====================
+
+_request_state = threading.local()
+_reported_repeats = set()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_request_state, 'sampled', False):
+        context._telemetry_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not getattr(_request_state, 'sampled', False):
+        return
+    start = getattr(context, '_telemetry_start', None)
+    if start is None:
+        return
+    _request_state.query_time += time.perf_counter() - start
+    _request_state.query_count += 1
+    _request_state.statements[fingerprint(statement)] += 1
+
+
+def _start_query_capture(sampled: bool) -> None:
+    _request_state.sampled = sampled
+    if sampled:
+        _request_state.query_count = 0
+        _request_state.query_time = 0.0
+        _request_state.statements = Counter()
+
+
+def _finish_query_capture(endpoint: str, threshold: int) -> None:
+    if not getattr(_request_state, 'sampled', False):
+        return
+    _request_state.sampled = False
+
+    labels = (('endpoint', endpoint),)
+    registry.observe('tradeup_db_queries_per_request', labels, _request_state.query_count)
+    registry.observe('tradeup_db_time_per_request_seconds', labels, _request_state.query_time)
+
+    for (fp, normalized), count in _request_state.statements.items():
+        if count < threshold:
+            continue
+        registry.inc('tradeup_db_repeated_statements_total', (('endpoint', endpoint), ('fingerprint', fp)))
+        if (endpoint, fp) not in _reported_repeats and len(_reported_repeats) < FINGERPRINT_CACHE_SIZE:
+            _reported_repeats.add((endpoint, fp))
+            logger.warning(f'[Telemetry] {endpoint} ran statement {fp} {count}x in one request: {normalized[:300]}')
+
+
+# ==================== Outbound calls ====================
+
+def _status_class(status_code: Optional[int]) -> str:
+    return f'{status_code // 100}xx' if status_code else 'ok'
+
+
+def observe_outbound(service: str, seconds: float, status: str) -> None:
+    registry.observe('tradeup_outbound_request_duration_seconds', (('service', service), ('status', status)), seconds)
+
+
+@contextmanager
+def outbound_timer(service: str):
+    """
+    Time an outbound call made through an SDK.
+
+    Usage:
+        with outbound_timer('sendgrid'):
+            sg.send(message)
+    """
+    start = time.perf_counter()
+    status = 'ok'
+    try:
+        yield
+    except Exception:
+        status = 'error'
+        raise
+    finally:
+        observe_outbound(service, time.perf_counter() - start, status)
+
+
+def instrument_session(session, service: str):
+    """Record latency of every response on a requests.Session (time to headers)."""
+    def record(response, *args, **kwargs):
+        observe_outbound(service, response.elapsed.total_seconds(), _status_class(response.status_code))
+
+    session.hooks['response'].append(record)
+    return session
+
+
+def httpx_event_hooks(service: str) -> Dict[str, list]:
+    """event_hooks for an httpx.Client recording latency to response headers."""
+    def on_request(req):
+        req.extensions['telemetry_start'] = time.perf_counter()
+
+    def on_response(response):
+        start = response.request.extensions.get('telemetry_start')
+        if start is not None:
+            observe_outbound(service, time.perf_counter() - start, _status_class(response.status_code))
+
+    return {'request': [on_request], 'response': [on_response]}
+
+
+# ==================== Exposition ====================
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Tuple, extra: Tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def render_prometheus() -> str:
+    """All metrics in Prometheus text exposition format (0.0.4)."""
+    samples = registry.collect()
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for (metric, labels), cell in sorted(samples.items()):
+            if metric != name:
+                continue
+            if kind == 'counter':
+                lines.append(f'{name}{_format_labels(labels)} {cell[0]:g}')
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, cell):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, (("le", f"{bound:g}"),))} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels, (("le", "+Inf"),))} {cell[-2]}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {cell[-1]:.6f}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cell[-2]}')
+    return '\n'.join(lines) + '\n'
+
+
+# ==================== Flask integration ====================
+
+def is_telemetry_enabled() -> bool:
+    return os.getenv('TELEMETRY_ENABLED', 'true').lower() != 'false'
+
+
+def init_telemetry(app):
+    """
+    Initialize request telemetry and the /metrics endpoint.
+
+    Call this in the app factory after creating the Flask app.
+    """
+    if not is_telemetry_enabled():
+        logger.info('[Telemetry] Disabled (TELEMETRY_ENABLED=false)')
+        return
+
+    app.config.setdefault('TELEMETRY_SAMPLE_RATE', float(os.getenv('TELEMETRY_SAMPLE_RATE', '0.25')))
+    app.config.setdefault('TELEMETRY_REPEAT_THRESHOLD', int(os.getenv('TELEMETRY_REPEAT_THRESHOLD', '10')))
+    app.config.setdefault('METRICS_TOKEN', os.getenv('METRICS_TOKEN'))
+    logger.info(f"[Telemetry] Enabled - sampling {app.config['TELEMETRY_SAMPLE_RATE']:.0%} of requests for query metrics")
+
+    @app.before_request
+    def start_request_telemetry():
+        g.telemetry_start = time.perf_counter()
+        _start_query_capture(random.random() < current_app.config['TELEMETRY_SAMPLE_RATE'])
+
+    @app.after_request
+    def record_request_telemetry(response):
+        start = g.pop('telemetry_start', None)
+        if start is None or request.endpoint in SKIP_ENDPOINTS:
+            _request_state.sampled = False
+            return response
+
+        endpoint = request.endpoint or '<unmatched>'
+        registry.observe('tradeup_http_request_duration_seconds', (
+            ('endpoint', endpoint), ('method', request.method), ('status', _status_class(response.status_code))
+        ), time.perf_counter() - start)
+        _finish_query_capture(endpoint, current_app.config['TELEMETRY_REPEAT_THRESHOLD'])
+        return response
+
+    @app.route('/metrics', endpoint='telemetry_metrics')
+    def metrics():
+        """Prometheus scrape endpoint."""
+        token = current_app.config.get('METRICS_TOKEN')
+        if token:
+            supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                return Response('Unauthorized', status=401)
+        elif os.getenv('FLASK_ENV') == 'production':
+            return Response('Not found', status=404)
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    return True
@@ -38,6 +38,7 @@ from .loyalty_points import (
     PointsBalance,
     PointsLedger,
     EarningRule,
+    EarningRuleUsage,
     Reward,
     RewardRedemption,
     PointsProgramConfig,
@@ -46,7 +47,7 @@ from .loyalty_points import (
     DEFAULT_EARNING_RULES,
     DEFAULT_REWARDS,
 )
-from .cashback_campaign import CashbackCampaign, CashbackRedemption
+from .cashback_campaign import CashbackCampaign, CashbackRedemption, CashbackMemberUsage
 from .gamification import Badge, MemberBadge, MemberStreak, Milestone, MemberMilestone, MemberActivity
 from .guest_points import GuestPoints
 from .review_prompt import ReviewPrompt, ReviewPromptResponse
@@ -61,6 +62,14 @@ from .loyalty_page_analytics import (
     LoyaltyPageAnalyticsSummary,
 )
 from .widget import Widget, WidgetType, DEFAULT_WIDGET_CONFIGS, seed_widgets
+from .customer_tag_mirror import CustomerTagMirror
+from .catalog_product import CatalogProduct
+from .klaviyo_profile_sync import KlaviyoProfileSync
+from .scheduler_job import SchedulerJobLease, SchedulerJobRun, SchedulerWorkUnit
+from .provisioning_step import ProvisioningStep
+from .benchmark import BenchmarkDistribution, TenantBenchmark
+from .tenant_purge import TenantPurge
+from .simulation_run import SimulationRun
 
 __all__ = [
     'Tenant',
@@ -103,6 +112,7 @@ __all__ = [
     'PointsBalance',
     'PointsLedger',
     'EarningRule',
+    'EarningRuleUsage',
     'Reward',
     'RewardRedemption',
     'PointsProgramConfig',
@@ -112,6 +122,7 @@ __all__ = [
     # Cashback Campaigns
     'CashbackCampaign',
     'CashbackRedemption',
+    'CashbackMemberUsage',
     # Gamification
     'Badge',
     'MemberBadge',
@@ -149,4 +160,23 @@ __all__ = [
     'WidgetType',
     'DEFAULT_WIDGET_CONFIGS',
     'seed_widgets',
+    # Customer Tag Sync
+    'CustomerTagMirror',
+    # Catalog Mirror
+    'CatalogProduct',
+    # Klaviyo Sync
+    'KlaviyoProfileSync',
+    # Scheduler Coordination
+    'SchedulerJobLease',
+    'SchedulerJobRun',
+    'SchedulerWorkUnit',
+    # Install Provisioning
+    'ProvisioningStep',
+    # Benchmark Snapshots
+    'BenchmarkDistribution',
+    'TenantBenchmark',
+    # Shop Redaction
+    'TenantPurge',
+    # Rule Simulation
+    'SimulationRun',
 ]
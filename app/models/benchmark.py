@@ -0,0 +1,68 @@
+"""
+Benchmark Snapshot Models.
+
+Nightly, precomputed cross-tenant benchmarks: the empirical distribution
+of each metric per industry category, and each store's metric values and
+percentile ranks against its peers. Reports read these rows instead of
+recomputing every metric per request.
+"""
+from datetime import datetime
+from ..extensions import db
+
+
+class BenchmarkDistribution(db.Model):
+    """
+    Empirical distribution of one metric across the stores of a category.
+
+    category 'all' covers every store. quantiles holds the 0th..100th
+    percentile values, each averaged over a group of stores, so any
+    percentile rank can be read back from it but no single store's value.
+    """
+    __tablename__ = 'benchmark_distributions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(50), nullable=False)  # INDUSTRY_CATEGORIES key or 'all'
+    metric = db.Column(db.String(50), nullable=False)
+
+    sample_size = db.Column(db.Integer, nullable=False)  # Stores with a value for the metric
+    quantiles = db.Column(db.JSON, nullable=False)  # [p0, p1, ..., p100]
+
+    # Breakpoints shown in reports
+    p25 = db.Column(db.Float)
+    p50 = db.Column(db.Float)
+    p75 = db.Column(db.Float)
+    p90 = db.Column(db.Float)
+
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('category', 'metric', name='uq_benchmark_distribution_category_metric'),
+    )
+
+    def __repr__(self):
+        return f'<BenchmarkDistribution {self.category}/{self.metric} n={self.sample_size}>'
+
+    def breakpoints(self) -> dict:
+        """Percentile breakpoints in the shape reports use."""
+        return {'p25': self.p25, 'p50': self.p50, 'p75': self.p75, 'p90': self.p90}
+
+
+class TenantBenchmark(db.Model):
+    """
+    One store's benchmark snapshot.
+
+    metrics maps each metric key to {'value', 'percentile', 'p50'}, ranked
+    against the store's category (or all stores where the category is too
+    small to publish a distribution).
+    """
+    __tablename__ = 'tenant_benchmarks'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False, unique=True)
+    category = db.Column(db.String(50))  # Store's industry category, if set
+
+    metrics = db.Column(db.JSON, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<TenantBenchmark tenant={self.tenant_id} {self.computed_at}>'
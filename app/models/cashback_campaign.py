@@ -199,11 +199,6 @@ class CashbackCampaign(db.Model):
 
         return True, 'Eligible'
 
-    def record_usage(self, cashback_amount: Decimal):
-        """Record a cashback redemption."""
-        self.current_uses = (self.current_uses or 0) + 1
-        self.total_cashback_issued = (self.total_cashback_issued or Decimal('0')) + cashback_amount
-
     def to_dict(self) -> Dict[str, Any]:
         """Serialize to dictionary for API responses."""
         import json
@@ -310,8 +305,9 @@ class CashbackRedemption(db.Model):
     campaign = db.relationship('CashbackCampaign', backref='redemptions')
     member = db.relationship('Member', backref='cashback_redemptions')
 
-    # Indexes
+    # Indexes (one redemption per campaign and order, so redelivered webhooks can't pay twice)
     __table_args__ = (
+        db.UniqueConstraint('campaign_id', 'shopify_order_id', name='uq_cashback_redemption_campaign_order'),
         db.Index('ix_cashback_redemption_order', 'shopify_order_id'),
         db.Index('ix_cashback_redemption_campaign', 'campaign_id'),
         db.Index('ix_cashback_redemption_member', 'member_id'),
@@ -337,3 +333,30 @@ class CashbackRedemption(db.Model):
             'issued_at': self.issued_at.isoformat() if self.issued_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
         }
+
+
+class CashbackMemberUsage(db.Model):
+    """
+    Per-member usage counter for a cashback campaign.
+
+    Claimed with a conditional increment when cashback is awarded, so
+    max_uses_per_customer holds under concurrent orders without a COUNT
+    over redemptions.
+    """
+    __tablename__ = 'cashback_member_usages'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False)
+    campaign_id = db.Column(db.Integer, db.ForeignKey('cashback_campaigns.id', ondelete='CASCADE'), nullable=False)
+    member_id = db.Column(db.Integer, db.ForeignKey('members.id', ondelete='CASCADE'), nullable=False)
+
+    uses = db.Column(db.Integer, default=0, nullable=False)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('campaign_id', 'member_id', name='uq_cashback_member_usage_campaign_member'),
+        db.Index('ix_cashback_member_usages_tenant', 'tenant_id'),
+    )
+
+    def __repr__(self):
+        return f'<CashbackMemberUsage campaign={self.campaign_id} member={self.member_id} uses={self.uses}>'
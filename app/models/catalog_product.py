@@ -0,0 +1,56 @@
+"""
+CatalogProduct Model
+
+Local mirror of the Shopify product attributes used for promotion and
+credit event filtering (collections, tags, vendor, product type). Lets
+order webhooks and bulk credit events resolve collection/tag filters
+without calling Shopify on the hot path.
+"""
+
+from datetime import datetime
+from ..extensions import db
+
+
+class CatalogProduct(db.Model):
+    """
+    Last-known filter attributes of a Shopify product.
+
+    Kept current by the products/create, products/update and products/delete
+    webhooks, plus a periodic full reconcile that also picks up collection
+    membership changes (which do not fire product webhooks).
+    """
+    __tablename__ = 'catalog_products'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False, index=True)
+    product_id = db.Column(db.BigInteger, nullable=False)  # Numeric Shopify product ID
+
+    # Collection GIDs (gid://shopify/Collection/123) and lower-cased product tags
+    collection_ids = db.Column(db.JSON, default=list, nullable=False)
+    tags = db.Column(db.JSON, default=list, nullable=False)
+    vendor = db.Column(db.String(255))
+    product_type = db.Column(db.String(255))
+
+    shopify_updated_at = db.Column(db.DateTime)
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('tenant_id', 'product_id', name='uq_catalog_product_tenant_product'),
+    )
+
+    def __repr__(self):
+        return f'<CatalogProduct {self.product_id} collections={len(self.collection_ids or [])}>'
+
+    def to_dict(self) -> dict:
+        """Serialize mirror row to dictionary."""
+        return {
+            'id': self.id,
+            'tenant_id': self.tenant_id,
+            'product_id': self.product_id,
+            'collection_ids': list(self.collection_ids or []),
+            'tags': list(self.tags or []),
+            'vendor': self.vendor,
+            'product_type': self.product_type,
+            'shopify_updated_at': self.shopify_updated_at.isoformat() if self.shopify_updated_at else None,
+            'synced_at': self.synced_at.isoformat() if self.synced_at else None,
+        }
@@ -0,0 +1,48 @@
+"""
+CustomerTagMirror Model
+
+Local mirror of the TradeUp-managed tags currently applied to each
+Shopify customer. Lets the segment tag sync compute add/remove diffs
+without reading tags back from Shopify on every run.
+"""
+
+from datetime import datetime
+from ..extensions import db
+
+
+class CustomerTagMirror(db.Model):
+    """
+    Last-known TradeUp-managed tags for a member's Shopify customer.
+
+    Only tags owned by the tag sync engine are stored here. Merchant-applied
+    and third-party tags are never mirrored and never removed.
+    """
+    __tablename__ = 'customer_tag_mirrors'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False, index=True)
+    member_id = db.Column(db.Integer, db.ForeignKey('members.id', ondelete='CASCADE'), nullable=False)
+    shopify_customer_id = db.Column(db.String(50), nullable=False)
+
+    # Sorted list of managed tags as last pushed to (or read from) Shopify
+    tags = db.Column(db.JSON, default=list, nullable=False)
+
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('tenant_id', 'member_id', name='uq_customer_tag_mirror_member'),
+    )
+
+    def __repr__(self):
+        return f'<CustomerTagMirror member={self.member_id} tags={len(self.tags or [])}>'
+
+    def to_dict(self) -> dict:
+        """Serialize mirror row to dictionary."""
+        return {
+            'id': self.id,
+            'tenant_id': self.tenant_id,
+            'member_id': self.member_id,
+            'shopify_customer_id': self.shopify_customer_id,
+            'tags': list(self.tags or []),
+            'synced_at': self.synced_at.isoformat() if self.synced_at else None,
+        }
@@ -0,0 +1,33 @@
+"""
+KlaviyoProfileSync Model
+
+Records what was last sent to Klaviyo for each member, so bulk profile
+syncs only include members whose synced properties changed.
+"""
+
+from datetime import datetime
+from ..extensions import db
+
+
+class KlaviyoProfileSync(db.Model):
+    """
+    Hash of a member's last synced Klaviyo profile attributes.
+
+    Written when a bulk import job containing the member is accepted.
+    """
+    __tablename__ = 'klaviyo_profile_syncs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False, index=True)
+    member_id = db.Column(db.Integer, db.ForeignKey('members.id', ondelete='CASCADE'), nullable=False)
+
+    properties_hash = db.Column(db.String(40), nullable=False)  # SHA-1 of the profile attributes
+    job_id = db.Column(db.String(64))  # Bulk import job that carried the last change
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('tenant_id', 'member_id', name='uq_klaviyo_profile_sync_member'),
+    )
+
+    def __repr__(self):
+        return f'<KlaviyoProfileSync member={self.member_id} job={self.job_id}>'
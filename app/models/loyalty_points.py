@@ -558,6 +558,32 @@ class EarningRule(db.Model):
         }
 
 
+class EarningRuleUsage(db.Model):
+    """
+    Per-member usage counter for an earning rule.
+
+    Maintained when rule points are awarded so max_uses_per_member checks
+    are a keyed lookup instead of a COUNT over the transaction history.
+    """
+    __tablename__ = 'earning_rule_usages'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False)
+    member_id = db.Column(db.Integer, db.ForeignKey('members.id', ondelete='CASCADE'), nullable=False)
+    rule_id = db.Column(db.Integer, db.ForeignKey('earning_rules.id', ondelete='CASCADE'), nullable=False)
+
+    uses = db.Column(db.Integer, default=0, nullable=False)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('member_id', 'rule_id', name='uq_earning_rule_usage_member_rule'),
+        db.Index('ix_earning_rule_usages_tenant', 'tenant_id'),
+    )
+
+    def __repr__(self):
+        return f'<EarningRuleUsage member={self.member_id} rule={self.rule_id} uses={self.uses}>'
+
+
 class Reward(db.Model):
     """
     Redeemable rewards catalog.
@@ -752,6 +778,7 @@ class RewardRedemption(db.Model):
 
     # Redemption reference
     redemption_code = db.Column(db.String(50), unique=True, nullable=False)  # RD-YYYYMMDD-XXXXX
+    idempotency_key = db.Column(db.String(100))  # Client key; a retry returns this redemption
 
     # Points spent
     points_spent = db.Column(db.Integer, nullable=False)
@@ -796,8 +823,11 @@ class RewardRedemption(db.Model):
     __table_args__ = (
         db.Index('ix_redemptions_member_created', 'member_id', 'created_at'),
         db.Index('ix_redemptions_tenant_status', 'tenant_id', 'status'),
+        db.Index('ix_redemptions_tenant_created', 'tenant_id', 'created_at', 'id'),
         db.Index('ix_redemptions_voucher', 'voucher_code'),
         db.Index('ix_redemptions_code', 'redemption_code'),
+        db.Index('ix_redemptions_reward_member', 'reward_id', 'member_id'),
+        db.UniqueConstraint('tenant_id', 'idempotency_key', name='uq_redemptions_tenant_idempotency_key'),
     )
 
     def __repr__(self):
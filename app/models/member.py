@@ -1,11 +1,49 @@
 """
 Member and MembershipTier models.
 """
-from datetime import datetime, date
+import calendar
+from datetime import datetime, date, timedelta
 from decimal import Decimal
+
+from sqlalchemy import event
+
 from ..extensions import db
 
 
+def calendar_key(value) -> int:
+    """Month-day key used by the calendar indexes (e.g. March 7 -> 307)."""
+    return value.month * 100 + value.day
+
+
+def calendar_window_clause(column, start: date, days_ahead: int = 0):
+    """
+    SQL condition matching calendar keys that fall within [start, start + days_ahead].
+
+    Keys are compared as ranges, wrapping at the year end. Feb 29 keys are
+    matched on Feb 28 in non-leap years, mirroring Member.get_anniversary_date().
+
+    Args:
+        column: Calendar key column (Member.anniversary_key)
+        start: First date of the window
+        days_ahead: Number of days after start to include
+
+    Returns:
+        SQLAlchemy boolean clause
+    """
+    if days_ahead >= 365:
+        return column.isnot(None)
+
+    end = start + timedelta(days=days_ahead)
+    start_key = calendar_key(start)
+    end_key = calendar_key(end)
+    if end.month == 2 and end.day == 28 and not calendar.isleap(end.year):
+        end_key = 229
+
+    if start.year == end.year:
+        return column.between(start_key, end_key)
+    return db.or_(column >= start_key, column <= end_key)
+
+
 class MembershipTier(db.Model):
     """
     Membership tier configuration.
@@ -124,11 +162,13 @@ class Member(db.Model):
     total_bonus_earned = db.Column(db.Numeric(12, 2), default=Decimal('0'))
     total_trade_ins = db.Column(db.Integer, default=0)
     total_trade_value = db.Column(db.Numeric(12, 2), default=Decimal('0'))
+    last_trade_in_at = db.Column(db.DateTime)  # created_at of most recent completed batch
 
     # Points balance (loyalty points)
     points_balance = db.Column(db.Integer, default=0)
     lifetime_points_earned = db.Column(db.Integer, default=0)
     lifetime_points_spent = db.Column(db.Integer, default=0)
+    first_purchase_at = db.Column(db.DateTime)  # First purchase points award; NULL = none yet
 
     # Referral program
     referral_code = db.Column(db.String(20), unique=True)  # Unique code for sharing
@@ -143,6 +183,9 @@ class Member(db.Model):
     # Anniversary rewards
     last_anniversary_reward_year = db.Column(db.Integer)  # Track last year anniversary reward was given
 
+    # Calendar index key (month * 100 + day), maintained on insert/update
+    anniversary_key = db.Column(db.SmallInteger)  # From get_enrollment_date()
+
     # Metadata
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -157,64 +200,71 @@ class Member(db.Model):
         db.UniqueConstraint('tenant_id', 'member_number', name='uq_tenant_member_number'),
         db.UniqueConstraint('tenant_id', 'email', name='uq_tenant_email'),
         db.UniqueConstraint('tenant_id', 'shopify_customer_id', name='uq_tenant_shopify_customer'),
+        db.Index('ix_members_anniversary_key_tenant', 'anniversary_key', 'tenant_id'),
+        db.Index('ix_members_tenant_created', 'tenant_id', 'created_at', 'id'),
     )
 
     def __repr__(self):
         return f'<Member {self.member_number}>'
 
-    @property
-    def last_trade_in_at(self):
-        """Get the date of the member's most recent trade-in batch."""
-        if not self.trade_in_batches:
-            return None
-        # Get most recent completed trade-in
-        latest = self.trade_in_batches.filter_by(status='completed').order_by(
-            db.desc('created_at')
-        ).first()
-        return latest.created_at if latest else None
+    @staticmethod
+    def serialize_columns(source, tier_data=None, include_stats=False):
+        """
+        Build the core member payload.
 
-    def to_dict(self, include_stats=False, include_subscription=False, include_referrals=False, include_anniversary=False):
+        Works on a Member instance or a column-projected row with the same
+        attribute names, so list endpoints can serialize without loading models.
+        """
         # Split name into first/last for frontend compatibility
-        name_parts = (self.name or '').split(' ', 1) if self.name else ['', '']
+        name_parts = (source.name or '').split(' ', 1) if source.name else ['', '']
         first_name = name_parts[0] if name_parts else ''
         last_name = name_parts[1] if len(name_parts) > 1 else ''
 
         data = {
-            'id': self.id,
-            'member_number': self.member_number,
-            'shopify_customer_id': self.shopify_customer_id,
-            'shopify_customer_gid': self.shopify_customer_gid,
-            'partner_customer_id': self.partner_customer_id,
-            'email': self.email,
-            'name': self.name,
+            'id': source.id,
+            'member_number': source.member_number,
+            'shopify_customer_id': source.shopify_customer_id,
+            'shopify_customer_gid': source.shopify_customer_gid,
+            'partner_customer_id': source.partner_customer_id,
+            'email': source.email,
+            'name': source.name,
             # Frontend-compatible name fields
             'first_name': first_name,
             'last_name': last_name,
-            'phone': self.phone,
-            'tier': self.tier.to_dict() if self.tier else None,
-            'status': self.status,
-            'membership_start_date': self.membership_start_date.isoformat() if self.membership_start_date else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'phone': source.phone,
+            'tier': tier_data,
+            'status': source.status,
+            'membership_start_date': source.membership_start_date.isoformat() if source.membership_start_date else None,
+            'created_at': source.created_at.isoformat() if source.created_at else None,
             # Frontend-compatible stats fields at root level
-            'trade_in_count': self.total_trade_ins or 0,
-            'total_trade_in_value': float(self.total_trade_value or 0),
-            'total_credits_issued': float(self.total_bonus_earned or 0),
-            'last_trade_in_at': self.last_trade_in_at.isoformat() if self.last_trade_in_at else None,
+            'trade_in_count': source.total_trade_ins or 0,
+            'total_trade_in_value': float(source.total_trade_value or 0),
+            'total_credits_issued': float(source.total_bonus_earned or 0),
+            'last_trade_in_at': source.last_trade_in_at.isoformat() if source.last_trade_in_at else None,
             # Points
-            'points_balance': self.points_balance or 0,
-            'lifetime_points_earned': self.lifetime_points_earned or 0,
-            'lifetime_points_spent': self.lifetime_points_spent or 0,
+            'points_balance': source.points_balance or 0,
+            'lifetime_points_earned': source.lifetime_points_earned or 0,
+            'lifetime_points_spent': source.lifetime_points_spent or 0,
             # Birthday
-            'birthday': self.birthday.strftime('%m-%d') if self.birthday else None,
+            'birthday': source.birthday.strftime('%m-%d') if source.birthday else None,
         }
 
         if include_stats:
             data['stats'] = {
-                'total_bonus_earned': float(self.total_bonus_earned or 0),
-                'total_trade_ins': self.total_trade_ins or 0,
-                'total_trade_value': float(self.total_trade_value or 0)
+                'total_bonus_earned': float(source.total_bonus_earned or 0),
+                'total_trade_ins': source.total_trade_ins or 0,
+                'total_trade_value': float(source.total_trade_value or 0)
             }
 
+        return data
+
+    def to_dict(self, include_stats=False, include_subscription=False, include_referrals=False, include_anniversary=False):
+        data = self.serialize_columns(
+            self,
+            tier_data=self.tier.to_dict() if self.tier else None,
+            include_stats=include_stats
+        )
+
         if include_subscription:
             data['subscription'] = {
                 'shopify_subscription_contract_id': self.shopify_subscription_contract_id,
@@ -282,6 +332,11 @@ class Member(db.Model):
             self.referral_code = Member.generate_referral_code()
         return self.referral_code
 
+    def record_purchase(self, at: datetime = None) -> None:
+        """Set first_purchase_at on the member's first purchase points award."""
+        if self.first_purchase_at is None:
+            self.first_purchase_at = at or datetime.utcnow()
+
     def get_enrollment_date(self) -> date:
         """
         Get the member's enrollment date for anniversary calculations.
@@ -296,6 +351,17 @@ class Member(db.Model):
             return self.created_at.date()
         return date.today()
 
+    def refresh_anniversary_key(self) -> None:
+        """Recompute anniversary_key from the enrollment date."""
+        if self.membership_start_date:
+            enrollment = self.membership_start_date
+        elif self.created_at:
+            enrollment = self.created_at.date()
+        else:
+            # created_at default is applied at flush time
+            enrollment = datetime.utcnow().date()
+        self.anniversary_key = calendar_key(enrollment)
+
     def get_anniversary_date(self, for_year: int = None) -> date:
         """
         Calculate the member's anniversary date for a given year.
@@ -371,3 +437,10 @@ class Member(db.Model):
             years -= 1
 
         return max(0, years)
+
+
+@event.listens_for(Member, 'before_insert')
+@event.listens_for(Member, 'before_update')
+def _sync_member_anniversary_key(mapper, connection, target):
+    """Keep the anniversary index key in step with the enrollment date."""
+    target.refresh_anniversary_key()
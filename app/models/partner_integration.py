@@ -101,17 +101,27 @@ class PartnerSyncLog(db.Model):
     record_reference = db.Column(db.String(100))  # TI-20260105-001, etc.
 
     # Request/Response
+    endpoint = db.Column(db.String(500))  # URL the payload is delivered to
     request_payload = db.Column(db.JSON)
     response_status = db.Column(db.Integer)  # HTTP status code
     response_body = db.Column(db.JSON)
+    duration_ms = db.Column(db.Integer)  # Latency of the last attempt
 
-    # Status
-    status = db.Column(db.String(20), default='pending')  # pending, success, failed
+    # Status: pending, sending, success, failed (retry scheduled), dead (dead-lettered)
+    status = db.Column(db.String(20), default='pending')
     error_message = db.Column(db.Text)
     retry_count = db.Column(db.Integer, default=0)
 
+    # Delivery queue - due time of the next attempt, or lease expiry while sending
+    next_attempt_at = db.Column(db.DateTime)
+    last_attempt_at = db.Column(db.DateTime)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_partner_sync_logs_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
     def __repr__(self):
         return f'<PartnerSyncLog {self.sync_type} {self.record_reference}>'
 
@@ -122,9 +132,13 @@ class PartnerSyncLog(db.Model):
             'sync_type': self.sync_type,
             'record_id': self.record_id,
             'record_reference': self.record_reference,
+            'endpoint': self.endpoint,
             'response_status': self.response_status,
+            'duration_ms': self.duration_ms,
             'status': self.status,
             'error_message': self.error_message,
             'retry_count': self.retry_count,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_attempt_at': self.last_attempt_at.isoformat() if self.last_attempt_at else None,
             'created_at': self.created_at.isoformat()
         }
@@ -53,6 +53,18 @@ class PointsTransaction(db.Model):
     member = db.relationship('Member', backref='points_transactions')
     related_transaction = db.relationship('PointsTransaction', remote_side=[id])
 
+    # Open points lots: earn rows that still hold spendable points. Partial index
+    # in FIFO order, so redemption and expiry only visit lots they actually drain.
+    __table_args__ = (
+        db.Index(
+            'ix_points_transactions_open_lots',
+            'member_id', 'expires_at', 'created_at',
+            postgresql_where=db.text("transaction_type = 'earn' AND remaining_points > 0 AND reversed_at IS NULL"),
+            sqlite_where=db.text("transaction_type = 'earn' AND remaining_points > 0 AND reversed_at IS NULL"),
+        ),
+        db.Index('ix_points_transactions_member_created', 'member_id', 'created_at', 'id'),
+    )
+
     def __repr__(self):
         return f'<PointsTransaction {self.id}: {self.points} pts for member {self.member_id}>'
 
@@ -0,0 +1,52 @@
+"""
+ProvisioningStep Model
+
+Persistent state of each install setup step (webhooks, default tiers,
+segments, membership products, ...) so an interrupted install resumes
+from the steps that have not finished and the admin UI can show progress.
+"""
+
+from datetime import datetime
+from ..extensions import db
+
+
+class ProvisioningStep(db.Model):
+    """
+    One idempotent install setup step for a tenant.
+
+    Status: pending, running, done, failed. A step is only run once all of
+    its dependencies are done.
+    """
+    __tablename__ = 'provisioning_steps'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False, index=True)
+    step = db.Column(db.String(50), nullable=False)
+
+    status = db.Column(db.String(20), default='pending', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    result = db.Column(db.JSON)  # Step output, or progress cursor for long steps
+    error = db.Column(db.Text)
+
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('tenant_id', 'step', name='uq_provisioning_step_tenant_step'),
+    )
+
+    def __repr__(self):
+        return f'<ProvisioningStep tenant={self.tenant_id} {self.step} {self.status}>'
+
+    def to_dict(self) -> dict:
+        """Serialize step to dictionary."""
+        return {
+            'step': self.step,
+            'status': self.status,
+            'attempts': self.attempts,
+            'result': self.result,
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,93 @@
+"""
+Scheduler Job Models
+
+DB-backed coordination for background jobs: a lease per job so only one
+process runs it at a time, and per-tenant work units per run so a job
+interrupted by a crash or redeploy resumes where it stopped.
+"""
+
+from datetime import datetime
+from ..extensions import db
+
+
+class SchedulerJobLease(db.Model):
+    """
+    Exclusive, expiring claim on a scheduled job.
+
+    The holder renews expires_at with a heartbeat while it runs; a lease
+    past expires_at can be taken over by any other process.
+    """
+    __tablename__ = 'scheduler_job_leases'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(100), nullable=False, unique=True)
+    owner = db.Column(db.String(200), nullable=False)  # host:pid:nonce of the holding process
+
+    acquired_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    heartbeat_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<SchedulerJobLease {self.job_id} owner={self.owner}>'
+
+
+class SchedulerJobRun(db.Model):
+    """One scheduled execution of a job (e.g. credit_expiration for 2026-10-18)."""
+    __tablename__ = 'scheduler_job_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(100), nullable=False)
+    run_key = db.Column(db.String(50), nullable=False)  # Period the run covers: date or month
+
+    status = db.Column(db.String(20), default='running', nullable=False)  # running, completed
+    summary = db.Column(db.JSON)  # Aggregated unit results once completed
+
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    completed_at = db.Column(db.DateTime)
+
+    units = db.relationship('SchedulerWorkUnit', backref='run', lazy='dynamic', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        db.UniqueConstraint('job_id', 'run_key', name='uq_scheduler_job_run_key'),
+    )
+
+    def __repr__(self):
+        return f'<SchedulerJobRun {self.job_id} {self.run_key} {self.status}>'
+
+    def to_dict(self) -> dict:
+        """Serialize run to dictionary."""
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'run_key': self.run_key,
+            'status': self.status,
+            'summary': self.summary,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+        }
+
+
+class SchedulerWorkUnit(db.Model):
+    """Work for one tenant within a job run."""
+    __tablename__ = 'scheduler_work_units'
+
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('scheduler_job_runs.id', ondelete='CASCADE'), nullable=False)
+    tenant_id = db.Column(db.Integer, nullable=False)
+
+    # pending, running, done, failed, timeout
+    status = db.Column(db.String(20), default='pending', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.UniqueConstraint('run_id', 'tenant_id', name='uq_scheduler_work_unit_tenant'),
+        db.Index('ix_scheduler_work_units_run_status', 'run_id', 'status'),
+    )
+
+    def __repr__(self):
+        return f'<SchedulerWorkUnit run={self.run_id} tenant={self.tenant_id} {self.status}>'
@@ -0,0 +1,57 @@
+"""
+SimulationRun Model
+
+A rule simulation requested through /api/analytics/simulate whose order
+history was not loaded yet. Exporting a tenant's orders from Shopify can
+take minutes, so it runs in the background and the admin UI polls this
+row for the results.
+"""
+
+from datetime import datetime
+from ..extensions import db
+
+
+class SimulationRun(db.Model):
+    """
+    One background rule simulation.
+
+    Status: pending, running, done, failed. request holds the candidates
+    and options as posted; results holds one SimulationResult dict per
+    candidate once done.
+    """
+    __tablename__ = 'simulation_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False, index=True)
+
+    status = db.Column(db.String(20), default='pending', nullable=False)
+    start_date = db.Column(db.String(40), nullable=False)
+    end_date = db.Column(db.String(40), nullable=False)
+    request = db.Column(db.JSON, nullable=False)  # {candidates, respect_schedule, refresh}
+
+    orders = db.Column(db.Integer)  # Orders in the simulated history
+    history_loaded_at = db.Column(db.DateTime)
+    results = db.Column(db.JSON)
+    error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<SimulationRun {self.id} tenant={self.tenant_id} {self.status}>'
+
+    def to_dict(self) -> dict:
+        """Serialize run status and, once done, its results."""
+        return {
+            'run_id': self.id,
+            'status': self.status,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'orders': self.orders,
+            'history_loaded_at': self.history_loaded_at.isoformat() if self.history_loaded_at else None,
+            'results': self.results,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,70 @@
+"""
+TenantPurge Model
+
+Progress of a shop redaction: the tenant's rows are deleted table by
+table in small chunks, and the position is checkpointed here so an
+interrupted purge resumes where it stopped. The row outlives the tenant
+as a record that the shop's data was deleted.
+"""
+
+from datetime import datetime
+from ..extensions import db
+
+
+class TenantPurge(db.Model):
+    """
+    Chunked deletion of one tenant's data.
+
+    Status: pending, running, done, failed (retried from next_attempt_at),
+    abandoned (failed too often, needs an operator). current_table/phase/
+    last_id point at the next chunk to delete.
+    """
+    __tablename__ = 'tenant_purges'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, nullable=False, index=True)  # No FK: the tenant is deleted last
+    shop_domain = db.Column(db.String(255), nullable=False)
+
+    status = db.Column(db.String(20), default='pending', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    failures = db.Column(db.Integer, default=0, nullable=False, server_default='0')
+    next_attempt_at = db.Column(db.DateTime)  # Earliest retry of a failed purge
+
+    # Checkpoint
+    current_table = db.Column(db.String(100))  # None before the first table
+    phase = db.Column(db.String(20))  # detach (null self-references), delete
+    last_id = db.Column(db.BigInteger, default=0, nullable=False)
+
+    rows_deleted = db.Column(db.Integer, default=0, nullable=False)
+    table_counts = db.Column(db.JSON)  # {table: rows deleted}
+    error = db.Column(db.Text)
+
+    requested_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_tenant_purges_status', 'status'),
+    )
+
+    def __repr__(self):
+        return f'<TenantPurge tenant={self.tenant_id} {self.status} {self.current_table}>'
+
+    def to_dict(self) -> dict:
+        """Serialize purge progress to dictionary."""
+        return {
+            'tenant_id': self.tenant_id,
+            'shop_domain': self.shop_domain,
+            'status': self.status,
+            'attempts': self.attempts,
+            'failures': self.failures,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'current_table': self.current_table,
+            'phase': self.phase,
+            'rows_deleted': self.rows_deleted,
+            'table_counts': self.table_counts or {},
+            'error': self.error,
+            'requested_at': self.requested_at.isoformat() if self.requested_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -4,16 +4,18 @@ Anniversary Rewards Service
 Handles anniversary tracking and automatic reward issuance for membership anniversaries.
 """
 
-from datetime import date, datetime
+import calendar
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
 
 from flask import current_app
 
 from app import db
-from app.models.member import Member
+from app.models.member import Member, calendar_window_clause
 from app.models.promotions import StoreCreditLedger, CreditEventType
 from app.models.tenant import Tenant
+from app.services.member_serializer import serialize_members
 
 
 class AnniversaryService:
@@ -95,10 +97,11 @@ class AnniversaryService:
         """
         today = date.today()
 
-        # Query all active members for this tenant
+        # Indexed calendar-key match; Python check is a cheap safety net
         members = Member.query.filter(
             Member.tenant_id == self.tenant_id,
-            Member.status == 'active'
+            Member.status == 'active',
+            calendar_window_clause(Member.anniversary_key, today)
         ).all()
 
         # Filter to those with anniversary today
@@ -124,8 +127,13 @@ class AnniversaryService:
 
         members = Member.query.filter(
             Member.tenant_id == self.tenant_id,
-            Member.status == 'active'
+            Member.status == 'active',
+            calendar_window_clause(Member.anniversary_key, today, days_ahead)
         ).all()
+        member_dicts = dict(zip(
+            (m.id for m in members),
+            serialize_members(self.tenant_id, members)
+        ))
 
         for member in members:
             days_until = member.days_until_anniversary()
@@ -137,7 +145,7 @@ class AnniversaryService:
                     anniversary_year += 1
 
                 upcoming.append({
-                    'member': member.to_dict(),
+                    'member': member_dicts[member.id],
                     'member_id': member.id,
                     'enrollment_date': member.get_enrollment_date().isoformat(),
                     'anniversary_date': member.get_anniversary_date(today.year if days_until > 0 or member.is_anniversary_today() else today.year + 1).isoformat(),
@@ -528,10 +536,11 @@ class AnniversaryService:
         today = date.today()
         reminder_members = []
 
-        # Get all active members for this tenant
+        # Only members whose anniversary falls exactly email_days_before days out
         members = Member.query.filter(
             Member.tenant_id == self.tenant_id,
-            Member.status == 'active'
+            Member.status == 'active',
+            calendar_window_clause(Member.anniversary_key, today + timedelta(days=email_days_before))
         ).all()
 
         for member in members:
@@ -704,6 +713,63 @@ class AnniversaryService:
         }
 
 
+def _days_until_key(key: int, today: date) -> int:
+    """Days from today until the next occurrence of a month-day calendar key."""
+    month, day = divmod(key, 100)
+    for year in (today.year, today.year + 1):
+        occurrence_day = 28 if (month, day) == (2, 29) and not calendar.isleap(year) else day
+        occurrence = date(year, month, occurrence_day)
+        if occurrence >= today:
+            return (occurrence - today).days
+    return -1
+
+
+def find_upcoming_anniversaries(
+    days_ahead: int = 0,
+    tenant_ids: Optional[List[int]] = None,
+    start: Optional[date] = None
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Cross-tenant lookup of active members with an anniversary in the next N days.
+
+    Uses the anniversary_key index, so the scheduler can skip tenants with
+    nobody due instead of scanning every member of every tenant.
+
+    Args:
+        days_ahead: Days after start to include (0 = start date only)
+        tenant_ids: Optional list of tenant IDs to restrict the search to
+        start: First date of the window (defaults to today)
+
+    Returns:
+        Dict of tenant_id -> list of {'member_id', 'days_until'} sorted by days_until
+    """
+    start = start or date.today()
+
+    query = db.session.query(
+        Member.id, Member.tenant_id, Member.anniversary_key
+    ).filter(
+        Member.status == 'active',
+        calendar_window_clause(Member.anniversary_key, start, days_ahead)
+    )
+    if tenant_ids is not None:
+        if not tenant_ids:
+            return {}
+        query = query.filter(Member.tenant_id.in_(tenant_ids))
+
+    upcoming: Dict[int, List[Dict[str, Any]]] = {}
+    for row in query.all():
+        days_until = _days_until_key(row.anniversary_key, start)
+        if 0 <= days_until <= days_ahead:
+            upcoming.setdefault(row.tenant_id, []).append({
+                'member_id': row.id,
+                'days_until': days_until,
+            })
+
+    for entries in upcoming.values():
+        entries.sort(key=lambda e: e['days_until'])
+    return upcoming
+
+
 # Convenience functions for simpler usage
 def get_anniversary_service(tenant_id: int, settings: Optional[Dict] = None) -> AnniversaryService:
     """Get an AnniversaryService instance for a tenant."""
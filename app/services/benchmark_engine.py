@@ -0,0 +1,359 @@
+"""
+Cross-tenant benchmark engine.
+
+Computes every store's benchmark metrics in one set-based pass (one
+GROUP BY tenant_id query per source table), builds the empirical
+distribution of each metric per industry category, and ranks every store
+against its peers. The nightly run stores the result in
+benchmark_distributions and tenant_benchmarks, so a comparison report is a
+single-row read.
+
+A distribution is only published once MIN_SAMPLE_SIZE stores report the
+metric, and every quantile point is an average over QUANTILE_GROUP
+neighbouring stores rather than an exact order statistic, so no single
+store's figure (not even the minimum or maximum) is published. Stores in
+smaller categories are ranked against all stores, and until enough stores
+exist at all, against the industry-standard DEFAULT_BENCHMARKS.
+
+Usage:
+    from app.services.benchmark_engine import BenchmarkEngine
+
+    BenchmarkEngine().run()                    # nightly snapshot, all tenants
+    BenchmarkEngine().collect([tenant_id])     # live metrics for one store
+"""
+import logging
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import and_, case, func
+
+from ..extensions import db
+from ..models.benchmark import BenchmarkDistribution, TenantBenchmark
+from ..models.member import Member
+from ..models.promotions import StoreCreditLedger
+from ..models.referral import Referral, ReferralProgram
+from ..models.tenant import Tenant
+from ..models.trade_in import TradeInBatch
+
+logger = logging.getLogger(__name__)
+
+# Distribution over every store, whatever its category
+ALL_CATEGORY = 'all'
+
+# Stores needed before a distribution is published
+MIN_SAMPLE_SIZE = 20
+
+# Neighbouring stores averaged into every published quantile point
+QUANTILE_GROUP = 5
+
+# Quantile points kept per distribution: the 0th..100th percentiles
+QUANTILE_POINTS = 101
+
+# Tenant setting holding the store's industry category
+CATEGORY_SETTING = 'benchmark_category'
+
+INDUSTRY_CATEGORIES = (
+    'sports_cards',
+    'pokemon',
+    'mtg',
+    'collectibles',
+    'comics',
+    'toys',
+    'vintage',
+    'general_retail'
+)
+
+METRIC_KEYS = (
+    'member_enrollment_rate',
+    'redemption_rate',
+    'average_trade_value',
+    'trade_frequency',
+    'tier_advancement_rate',
+    'member_clv',
+    'referral_conversion_rate',
+    'retention_90_day'
+)
+
+# Industry-standard breakpoints, used until enough stores report a metric
+DEFAULT_BENCHMARKS = {
+    'member_enrollment_rate': {'p25': 5, 'p50': 12, 'p75': 22, 'p90': 35},
+    'redemption_rate': {'p25': 15, 'p50': 35, 'p75': 55, 'p90': 72},
+    'average_trade_value': {'p25': 25, 'p50': 75, 'p75': 150, 'p90': 300},
+    'trade_frequency': {'p25': 0.5, 'p50': 1.2, 'p75': 2.5, 'p90': 4.0},
+    'tier_advancement_rate': {'p25': 8, 'p50': 18, 'p75': 32, 'p90': 48},
+    'member_clv': {'p25': 150, 'p50': 450, 'p75': 1200, 'p90': 3000},
+    'referral_conversion_rate': {'p25': 5, 'p50': 12, 'p75': 22, 'p90': 35},
+    'retention_90_day': {'p25': 25, 'p50': 45, 'p75': 65, 'p90': 82}
+}
+
+# Collectibles tend to have higher trade values and frequency
+DEFAULT_COLLECTIBLES_BENCHMARKS = {
+    'average_trade_value': {'p25': 50, 'p50': 125, 'p75': 275, 'p90': 500},
+    'trade_frequency': {'p25': 0.8, 'p50': 1.8, 'p75': 3.5, 'p90': 6.0}
+}
+
+
+@dataclass(frozen=True)
+class StoreMetrics:
+    """One store's metric values (None where the store lacks the data)."""
+    tenant_id: int
+    category: Optional[str]
+    values: Dict[str, Optional[float]]
+
+
+def empirical_quantiles(values: List[float]) -> List[float]:
+    """
+    0th..100th percentiles of `values`, smoothed over groups of stores.
+
+    Each point is the mean of the QUANTILE_GROUP sorted values centred on
+    the percentile's position (interpolating between adjacent groups), so
+    it never equals one store's value by construction. The windows slide
+    monotonically, so the points stay non-decreasing.
+    """
+    ordered = sorted(values)
+    group = min(QUANTILE_GROUP, len(ordered))
+    last_start = len(ordered) - group
+    means = [sum(ordered[start:start + group]) / group for start in range(last_start + 1)]
+
+    quantiles = []
+    for i in range(QUANTILE_POINTS):
+        position = (len(ordered) - 1) * i / (QUANTILE_POINTS - 1)
+        start = min(max(position - (group - 1) / 2, 0), last_start)
+        low = int(start)
+        high = min(low + 1, last_start)
+        quantiles.append(round(means[low] + (means[high] - means[low]) * (start - low), 4))
+    return quantiles
+
+
+def percentile_rank(value: float, quantiles: List[float]) -> int:
+    """Percentile (0-99) of `value` within a distribution's quantiles."""
+    low, high = bisect_left(quantiles, value), bisect_right(quantiles, value)
+    if high > low:
+        # Value sits on one or more quantile points: take the middle of the run
+        rank = (low + high - 1) / 2
+    elif low == 0:
+        return 0
+    elif low == len(quantiles):
+        return 99
+    else:
+        below, above = quantiles[low - 1], quantiles[low]
+        rank = low - 1 + (value - below) / (above - below)
+    return min(99, int(rank))
+
+
+def default_breakpoints(metric: str, category: Optional[str] = None) -> Dict[str, float]:
+    """Industry-standard p25/p50/p75/p90 for a metric."""
+    if category in ('sports_cards', 'pokemon', 'mtg') and metric in DEFAULT_COLLECTIBLES_BENCHMARKS:
+        return DEFAULT_COLLECTIBLES_BENCHMARKS[metric]
+    return DEFAULT_BENCHMARKS.get(metric, {'p25': 0, 'p50': 0, 'p75': 0, 'p90': 0})
+
+
+def breakpoint_rank(value: float, benchmarks: Dict[str, float]) -> int:
+    """Percentile ranking interpolated between p25/p50/p75/p90 breakpoints."""
+    p25 = benchmarks.get('p25', 0)
+    p50 = benchmarks.get('p50', 0)
+    p75 = benchmarks.get('p75', 0)
+    p90 = benchmarks.get('p90', 0)
+
+    if value <= p25:
+        # Interpolate 0-25
+        return int((value / p25) * 25) if p25 > 0 else 0
+    elif value <= p50:
+        # Interpolate 25-50
+        return 25 + int(((value - p25) / (p50 - p25)) * 25) if p50 > p25 else 25
+    elif value <= p75:
+        # Interpolate 50-75
+        return 50 + int(((value - p50) / (p75 - p50)) * 25) if p75 > p50 else 50
+    elif value <= p90:
+        # Interpolate 75-90
+        return 75 + int(((value - p75) / (p90 - p75)) * 15) if p90 > p75 else 75
+    else:
+        # Above 90th percentile
+        return min(99, 90 + int(((value - p90) / p90) * 9) if p90 > 0 else 99)
+
+
+def select_distribution(
+    distributions: Mapping[Tuple[str, str], Any],
+    metric: str,
+    category: Optional[str] = None
+) -> Optional[Any]:
+    """The category's published distribution for a metric, else the all-stores one."""
+    if category and (category, metric) in distributions:
+        return distributions[(category, metric)]
+    return distributions.get((ALL_CATEGORY, metric))
+
+
+def rank_value(
+    distributions: Mapping[Tuple[str, str], Any],
+    metric: str,
+    value: Optional[float],
+    category: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Rank a store's value against its peers.
+
+    Returns:
+        {'value', 'percentile', 'p50'}; percentile is None when value is
+    """
+    distribution = select_distribution(distributions, metric, category)
+    if distribution is not None:
+        percentile = percentile_rank(value, distribution.quantiles) if value is not None else None
+        p50 = distribution.p50
+    else:
+        breakpoints = default_breakpoints(metric, category)
+        percentile = breakpoint_rank(value, breakpoints) if value is not None else None
+        p50 = breakpoints['p50']
+    return {'value': value, 'percentile': percentile, 'p50': p50}
+
+
+def store_category(settings: Optional[dict]) -> Optional[str]:
+    """A tenant's industry category from its settings, if it picked a known one."""
+    category = (settings or {}).get(CATEGORY_SETTING)
+    return category if category in INDUSTRY_CATEGORIES else None
+
+
+def _ratio(part, whole, scale: float = 100, digits: int = 1) -> Optional[float]:
+    if not whole:
+        return None
+    return round((float(part or 0) / float(whole)) * scale, digits)
+
+
+class BenchmarkEngine:
+    """Computes, distributes and ranks benchmark metrics across tenants."""
+
+    def __init__(self, now: Optional[datetime] = None):
+        self.now = now or datetime.utcnow()
+
+    def _grouped(self, query, tenant_column, tenant_ids: Optional[List[int]]) -> Dict[int, Any]:
+        if tenant_ids is not None:
+            query = query.filter(tenant_column.in_(tenant_ids))
+        return {row[0]: row for row in query.group_by(tenant_column)}
+
+    def collect(self, tenant_ids: Optional[List[int]] = None) -> List[StoreMetrics]:
+        """
+        Metric values for active tenants (or just `tenant_ids`).
+
+        Runs one aggregate query per source table, whatever the tenant count.
+        """
+        window_start = self.now - timedelta(days=90)
+        activity_start = self.now - timedelta(days=30)
+
+        tenants = db.session.query(Tenant.id, Tenant.settings).filter(Tenant.is_active == True)
+        if tenant_ids is not None:
+            tenants = tenants.filter(Tenant.id.in_(tenant_ids))
+        tenants = tenants.order_by(Tenant.id).all()
+
+        # Members have no activity timestamp; updated_at is the activity
+        # signal the nudges and tag sync services use too
+        joined_early = Member.created_at <= window_start
+        members = self._grouped(db.session.query(
+            Member.tenant_id,
+            func.count(Member.id),
+            func.count(Member.tier_id),
+            func.sum(case((Member.status == 'active', 1), else_=0)),
+            func.sum(case((joined_early, 1), else_=0)),
+            func.sum(case((and_(
+                joined_early, func.coalesce(Member.updated_at, Member.created_at) >= activity_start
+            ), 1), else_=0)),
+        ), Member.tenant_id, tenant_ids)
+
+        completed = TradeInBatch.status == 'completed'
+        trades = self._grouped(db.session.query(
+            TradeInBatch.tenant_id,
+            func.avg(case((completed, TradeInBatch.total_trade_value))),
+            func.sum(case((and_(completed, TradeInBatch.created_at >= window_start), 1), else_=0)),
+        ), TradeInBatch.tenant_id, tenant_ids)
+
+        credit = self._grouped(db.session.query(
+            Member.tenant_id,
+            func.sum(case((StoreCreditLedger.amount > 0, StoreCreditLedger.amount), else_=0)),
+            func.sum(case((StoreCreditLedger.event_type == 'redemption', StoreCreditLedger.amount), else_=0)),
+        ).join(Member, StoreCreditLedger.member_id == Member.id), Member.tenant_id, tenant_ids)
+
+        referrals = self._grouped(db.session.query(
+            ReferralProgram.tenant_id,
+            func.count(Referral.id),
+            func.sum(case((Referral.status == 'completed', 1), else_=0)),
+        ).join(ReferralProgram, Referral.program_id == ReferralProgram.id), ReferralProgram.tenant_id, tenant_ids)
+
+        stores = []
+        for tenant_id, settings in tenants:
+            _, total, tiered, active, eligible, retained = members.get(tenant_id, (tenant_id, 0, 0, 0, 0, 0))
+            _, avg_trade, recent_trades = trades.get(tenant_id, (tenant_id, None, 0))
+            _, issued, redeemed = credit.get(tenant_id, (tenant_id, 0, 0))
+            _, referred, converted = referrals.get(tenant_id, (tenant_id, 0, 0))
+
+            values = {
+                'member_enrollment_rate': _ratio(total, (settings or {}).get('total_customers', 0)),
+                'redemption_rate': _ratio(abs(float(redeemed or 0)), issued),
+                'average_trade_value': round(float(avg_trade), 2) if avg_trade else None,
+                # Trades per active member per month, over the last 90 days
+                'trade_frequency': _ratio((recent_trades or 0) / 3, active, scale=1, digits=2),
+                'tier_advancement_rate': _ratio(tiered, total),
+                # No per-member order value is recorded yet to derive CLV from
+                'member_clv': None,
+                'referral_conversion_rate': _ratio(converted, referred),
+                'retention_90_day': _ratio(retained, eligible),
+            }
+            stores.append(StoreMetrics(tenant_id=tenant_id, category=store_category(settings), values=values))
+
+        return stores
+
+    def build_distributions(self, stores: List[StoreMetrics]) -> Dict[Tuple[str, str], BenchmarkDistribution]:
+        """Publishable per-category and all-stores distributions of each metric."""
+        samples: Dict[Tuple[str, str], List[float]] = {}
+        for store in stores:
+            for metric, value in store.values.items():
+                if value is None:
+                    continue
+                samples.setdefault((ALL_CATEGORY, metric), []).append(value)
+                if store.category:
+                    samples.setdefault((store.category, metric), []).append(value)
+
+        distributions = {}
+        for (category, metric), values in samples.items():
+            if len(values) < MIN_SAMPLE_SIZE:
+                continue
+            quantiles = empirical_quantiles(values)
+            distributions[(category, metric)] = BenchmarkDistribution(
+                category=category, metric=metric, sample_size=len(values), quantiles=quantiles,
+                p25=quantiles[25], p50=quantiles[50], p75=quantiles[75], p90=quantiles[90],
+                computed_at=self.now
+            )
+        return distributions
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Recompute the benchmark snapshot for every active tenant.
+
+        Replaces all distributions and store snapshots in one transaction.
+        """
+        stores = self.collect()
+        distributions = self.build_distributions(stores)
+
+        snapshots = [{
+            'tenant_id': store.tenant_id,
+            'category': store.category,
+            'metrics': {
+                metric: rank_value(distributions, metric, value, store.category)
+                for metric, value in store.values.items()
+            },
+            'computed_at': self.now,
+        } for store in stores]
+
+        BenchmarkDistribution.query.delete(synchronize_session=False)
+        TenantBenchmark.query.delete(synchronize_session=False)
+        db.session.add_all(distributions.values())
+        db.session.bulk_insert_mappings(TenantBenchmark, snapshots)
+        db.session.commit()
+
+        logger.info(
+            f'[Benchmarks] Snapshot complete: {len(snapshots)} stores, {len(distributions)} distributions'
+        )
+        return {
+            'stores': len(snapshots),
+            'distributions': len(distributions),
+            'computed_at': self.now.isoformat()
+        }
@@ -3,6 +3,8 @@ Benchmark Service for TradeUp.
 
 Provides industry benchmarks and store comparisons for loyalty programs.
 Helps merchants understand how their program performs relative to peers.
+Metrics and distributions are precomputed nightly by BenchmarkEngine;
+reports read the stored snapshot.
 
 Usage:
     service = get_benchmark_service(tenant_id)
@@ -10,36 +12,27 @@ Usage:
     percentile = service.get_store_percentile('member_enrollment_rate')
 """
 
-from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
-from decimal import Decimal
-from sqlalchemy import func
-from flask import current_app
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime
 
-from ..extensions import db
 from ..models.tenant import Tenant
-from ..models.member import Member
+from ..models.benchmark import BenchmarkDistribution, TenantBenchmark
+from .benchmark_engine import (
+    ALL_CATEGORY, INDUSTRY_CATEGORIES, BenchmarkEngine, StoreMetrics,
+    default_breakpoints, rank_value, select_distribution
+)
 
 
 class BenchmarkService:
     """
     Industry benchmarking and store comparison service.
 
-    Calculates anonymized benchmarks from all tenants and
-    shows where a specific store ranks.
+    Serves anonymized benchmarks from the nightly cross-tenant snapshot
+    (see benchmark_engine) and shows where a specific store ranks.
     """
 
     # Industry categories for segmentation
-    INDUSTRY_CATEGORIES = [
-        'sports_cards',
-        'pokemon',
-        'mtg',
-        'collectibles',
-        'comics',
-        'toys',
-        'vintage',
-        'general_retail'
-    ]
+    INDUSTRY_CATEGORIES = list(INDUSTRY_CATEGORIES)
 
     # Benchmark metrics with descriptions
     METRICS = {
@@ -96,6 +89,10 @@ class BenchmarkService:
     def __init__(self, tenant_id: int):
         self.tenant_id = tenant_id
         self._tenant = None
+        self._snapshot = None
+        self._snapshot_loaded = False
+        self._live = None
+        self._distributions = {}
 
     @property
     def tenant(self) -> Tenant:
@@ -124,25 +121,22 @@ class BenchmarkService:
             }
         """
         results = {}
+        distributions = self._load_distributions(category)
 
         for metric_key, metric_info in self.METRICS.items():
-            benchmark = self._calculate_benchmark(metric_key, category)
             store_value = self._get_store_metric(metric_key)
 
             results[metric_key] = {
                 **metric_info,
-                'benchmarks': benchmark,
+                'benchmarks': self._calculate_benchmark(metric_key, category),
                 'your_value': store_value,
-                'your_percentile': self._calculate_percentile(
-                    store_value,
-                    benchmark
-                ) if store_value is not None else None
+                'your_percentile': rank_value(distributions, metric_key, store_value, category)['percentile']
             }
 
         return {
             'success': True,
             'category': category or 'all',
-            'generated_at': datetime.utcnow().isoformat(),
+            'generated_at': self._generated_at(),
             'metrics': results
         }
 
@@ -162,7 +156,6 @@ class BenchmarkService:
                 'error': f'Unknown metric: {metric}'
             }
 
-        benchmark = self._calculate_benchmark(metric)
         store_value = self._get_store_metric(metric)
 
         if store_value is None:
@@ -173,7 +166,8 @@ class BenchmarkService:
                 'message': 'Not enough data to calculate this metric'
             }
 
-        percentile = self._calculate_percentile(store_value, benchmark)
+        category = self._store_category()
+        percentile = self._get_store_ranking(metric)['percentile']
 
         return {
             'success': True,
@@ -185,13 +179,16 @@ class BenchmarkService:
                 percentile,
                 self.METRICS[metric]['good_direction']
             ),
-            'benchmarks': benchmark
+            'benchmarks': self._calculate_benchmark(metric, category)
         }
 
     def get_comparison_report(self) -> Dict[str, Any]:
         """
         Generate a full comparison report for this store.
 
+        Served from the nightly snapshot when one exists (one row read);
+        stores without a snapshot yet are ranked live.
+
         Returns:
             Comprehensive benchmark report with recommendations
         """
@@ -200,15 +197,15 @@ class BenchmarkService:
         opportunities = []
 
         for metric_key, metric_info in self.METRICS.items():
-            benchmark = self._calculate_benchmark(metric_key)
-            store_value = self._get_store_metric(metric_key)
-            percentile = self._calculate_percentile(store_value, benchmark)
+            ranking = self._get_store_ranking(metric_key)
+            store_value = ranking['value']
+            percentile = ranking['percentile']
 
             metrics_data[metric_key] = {
                 'name': metric_info['name'],
                 'your_value': store_value,
                 'percentile': percentile,
-                'p50': benchmark.get('p50')
+                'p50': ranking['p50']
             }
 
             if percentile is not None:
@@ -222,7 +219,7 @@ class BenchmarkService:
                     opportunities.append({
                         'metric': metric_info['name'],
                         'percentile': percentile,
-                        'gap_to_median': benchmark.get('p50', 0) - (store_value or 0),
+                        'gap_to_median': (ranking['p50'] or 0) - (store_value or 0),
                         'recommendation': self._get_recommendation(metric_key)
                     })
 
@@ -238,7 +235,7 @@ class BenchmarkService:
 
         return {
             'success': True,
-            'generated_at': datetime.utcnow().isoformat(),
+            'generated_at': self._generated_at(),
             'overall_score': overall_score,
             'overall_grade': self._percentile_to_grade(overall_score),
             'metrics': metrics_data,
@@ -247,284 +244,74 @@ class BenchmarkService:
             'recommendations': self._generate_recommendations(opportunities)
         }
 
+    def _get_snapshot(self) -> Optional[TenantBenchmark]:
+        """This store's nightly snapshot, if the benchmark job has covered it."""
+        if not self._snapshot_loaded:
+            self._snapshot = TenantBenchmark.query.filter_by(tenant_id=self.tenant_id).first()
+            self._snapshot_loaded = True
+        return self._snapshot
+
+    def _get_live_metrics(self) -> StoreMetrics:
+        """This store's metrics computed now (no snapshot yet)."""
+        if self._live is None:
+            stores = BenchmarkEngine().collect([self.tenant_id])
+            self._live = stores[0] if stores else StoreMetrics(
+                tenant_id=self.tenant_id, category=None, values={key: None for key in self.METRICS}
+            )
+        return self._live
+
+    def _store_category(self) -> Optional[str]:
+        snapshot = self._get_snapshot()
+        return snapshot.category if snapshot else self._get_live_metrics().category
+
+    def _generated_at(self) -> str:
+        snapshot = self._get_snapshot()
+        return (snapshot.computed_at if snapshot else datetime.utcnow()).isoformat()
+
+    def _load_distributions(self, category: str = None) -> Dict[Tuple[str, str], BenchmarkDistribution]:
+        """Published distributions for a category and for all stores (one query)."""
+        if category not in self._distributions:
+            rows = BenchmarkDistribution.query.filter(
+                BenchmarkDistribution.category.in_([category or ALL_CATEGORY, ALL_CATEGORY])
+            ).all()
+            self._distributions[category] = {(row.category, row.metric): row for row in rows}
+        return self._distributions[category]
+
+    def _get_store_ranking(self, metric: str) -> Dict[str, Any]:
+        """{'value', 'percentile', 'p50'} for this store against its category."""
+        snapshot = self._get_snapshot()
+        if snapshot and metric in snapshot.metrics:
+            return snapshot.metrics[metric]
+
+        category = self._store_category()
+        return rank_value(
+            self._load_distributions(category), metric, self._get_store_metric(metric), category
+        )
+
     def _calculate_benchmark(
         self,
         metric: str,
         category: str = None
     ) -> Dict[str, float]:
         """
-        Calculate benchmark percentiles for a metric.
+        Benchmark percentiles for a metric.
 
-        Uses anonymized, aggregated data from all tenants.
-        In production, this would query actual tenant data.
-        For now, returns industry-standard benchmarks.
+        Read from the nightly cross-tenant distribution for the category
+        (or all stores); industry-standard breakpoints until one is published.
         """
-        # Industry standard benchmarks
-        # These would be calculated from actual tenant data in production
-        benchmarks = {
-            'member_enrollment_rate': {'p25': 5, 'p50': 12, 'p75': 22, 'p90': 35},
-            'redemption_rate': {'p25': 15, 'p50': 35, 'p75': 55, 'p90': 72},
-            'average_trade_value': {'p25': 25, 'p50': 75, 'p75': 150, 'p90': 300},
-            'trade_frequency': {'p25': 0.5, 'p50': 1.2, 'p75': 2.5, 'p90': 4.0},
-            'tier_advancement_rate': {'p25': 8, 'p50': 18, 'p75': 32, 'p90': 48},
-            'member_clv': {'p25': 150, 'p50': 450, 'p75': 1200, 'p90': 3000},
-            'referral_conversion_rate': {'p25': 5, 'p50': 12, 'p75': 22, 'p90': 35},
-            'retention_90_day': {'p25': 25, 'p50': 45, 'p75': 65, 'p90': 82}
-        }
-
-        # Adjust for category if provided
-        if category in ['sports_cards', 'pokemon', 'mtg']:
-            # Collectibles tend to have higher trade values
-            if metric == 'average_trade_value':
-                return {
-                    'p25': 50, 'p50': 125, 'p75': 275, 'p90': 500
-                }
-            if metric == 'trade_frequency':
-                return {
-                    'p25': 0.8, 'p50': 1.8, 'p75': 3.5, 'p90': 6.0
-                }
-
-        return benchmarks.get(metric, {'p25': 0, 'p50': 0, 'p75': 0, 'p90': 0})
+        distribution = select_distribution(self._load_distributions(category), metric, category)
+        if distribution is not None:
+            return distribution.breakpoints()
+        return default_breakpoints(metric, category)
 
     def _get_store_metric(self, metric: str) -> Optional[float]:
         """
         Get this store's value for a specific metric.
         """
-        try:
-            if metric == 'member_enrollment_rate':
-                return self._calculate_enrollment_rate()
-            elif metric == 'redemption_rate':
-                return self._calculate_redemption_rate()
-            elif metric == 'average_trade_value':
-                return self._calculate_avg_trade_value()
-            elif metric == 'trade_frequency':
-                return self._calculate_trade_frequency()
-            elif metric == 'tier_advancement_rate':
-                return self._calculate_tier_advancement_rate()
-            elif metric == 'member_clv':
-                return self._calculate_member_clv()
-            elif metric == 'referral_conversion_rate':
-                return self._calculate_referral_conversion()
-            elif metric == 'retention_90_day':
-                return self._calculate_retention_rate(90)
-            else:
-                return None
-        except Exception as e:
-            current_app.logger.error(f"Error calculating metric {metric}: {e}")
-            return None
-
-    def _calculate_enrollment_rate(self) -> Optional[float]:
-        """Calculate member enrollment rate."""
-        # Get total members
-        total_members = Member.query.filter_by(
-            tenant_id=self.tenant_id
-        ).count()
-
-        # Estimate total customers from settings or default
-        if self.tenant and self.tenant.settings:
-            total_customers = self.tenant.settings.get('total_customers', 0)
-        else:
-            total_customers = 0
-
-        if total_customers == 0:
-            # Return None if we don't have customer data
-            return None
-
-        return round((total_members / total_customers) * 100, 1)
-
-    def _calculate_redemption_rate(self) -> Optional[float]:
-        """Calculate credit/points redemption rate."""
-        try:
-            from ..models.store_credit_event import StoreCreditEvent
-
-            # Get total credits issued
-            issued = db.session.query(
-                func.sum(StoreCreditEvent.amount)
-            ).filter(
-                StoreCreditEvent.tenant_id == self.tenant_id,
-                StoreCreditEvent.event_type.in_(['issue', 'trade_in', 'bonus'])
-            ).scalar() or 0
-
-            # Get total credits redeemed
-            redeemed = db.session.query(
-                func.sum(StoreCreditEvent.amount)
-            ).filter(
-                StoreCreditEvent.tenant_id == self.tenant_id,
-                StoreCreditEvent.event_type == 'redemption'
-            ).scalar() or 0
-
-            if issued == 0:
-                return None
-
-            return round((abs(float(redeemed)) / float(issued)) * 100, 1)
-
-        except Exception:
-            return None
-
-    def _calculate_avg_trade_value(self) -> Optional[float]:
-        """Calculate average trade-in value."""
-        try:
-            from ..models.trade_in import TradeInBatch
-
-            result = db.session.query(
-                func.avg(TradeInBatch.total_value)
-            ).filter(
-                TradeInBatch.tenant_id == self.tenant_id,
-                TradeInBatch.status == 'completed'
-            ).scalar()
-
-            return round(float(result), 2) if result else None
-
-        except Exception:
-            return None
-
-    def _calculate_trade_frequency(self) -> Optional[float]:
-        """Calculate average trades per member per month."""
-        try:
-            from ..models.trade_in import TradeInBatch
-
-            # Get trades in last 90 days
-            ninety_days_ago = datetime.utcnow() - timedelta(days=90)
-
-            trade_count = TradeInBatch.query.filter(
-                TradeInBatch.tenant_id == self.tenant_id,
-                TradeInBatch.status == 'completed',
-                TradeInBatch.created_at >= ninety_days_ago
-            ).count()
-
-            # Get active members
-            active_members = Member.query.filter(
-                Member.tenant_id == self.tenant_id,
-                Member.status == 'active'
-            ).count()
-
-            if active_members == 0:
-                return None
-
-            # Monthly rate
-            monthly_trades = (trade_count / 3)  # 90 days = 3 months
-            return round(monthly_trades / active_members, 2)
-
-        except Exception:
-            return None
-
-    def _calculate_tier_advancement_rate(self) -> Optional[float]:
-        """Calculate percentage of members who advance tiers."""
-        try:
-            # Members who have advanced
-            total_members = Member.query.filter_by(
-                tenant_id=self.tenant_id
-            ).count()
-
-            if total_members == 0:
-                return None
-
-            # Members above base tier
-            advanced_members = Member.query.filter(
-                Member.tenant_id == self.tenant_id,
-                Member.tier_id.isnot(None)
-            ).count()
-
-            return round((advanced_members / total_members) * 100, 1)
-
-        except Exception:
-            return None
-
-    def _calculate_member_clv(self) -> Optional[float]:
-        """Calculate average member CLV."""
-        try:
-            from ..services.analytics_service import get_analytics_service
-
-            analytics = get_analytics_service(self.tenant_id)
-            clv_data = analytics.get_clv_breakdown()
-
-            if clv_data.get('success'):
-                summary = clv_data.get('summary', {})
-                return summary.get('average_clv')
-
-            return None
-
-        except Exception:
-            return None
-
-    def _calculate_referral_conversion(self) -> Optional[float]:
-        """Calculate referral conversion rate."""
-        try:
-            from ..models.referral import Referral
-
-            total = Referral.query.filter_by(
-                tenant_id=self.tenant_id
-            ).count()
-
-            if total == 0:
-                return None
-
-            converted = Referral.query.filter_by(
-                tenant_id=self.tenant_id,
-                status='completed'
-            ).count()
-
-            return round((converted / total) * 100, 1)
-
-        except Exception:
-            return None
-
-    def _calculate_retention_rate(self, days: int) -> Optional[float]:
-        """Calculate member retention rate."""
-        try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days)
-            retention_check = datetime.utcnow() - timedelta(days=30)
-
-            # Members who joined at least N days ago
-            eligible = Member.query.filter(
-                Member.tenant_id == self.tenant_id,
-                Member.created_at <= cutoff_date
-            ).count()
-
-            if eligible == 0:
-                return None
-
-            # Of those, how many have had activity in last 30 days
-            retained = Member.query.filter(
-                Member.tenant_id == self.tenant_id,
-                Member.created_at <= cutoff_date,
-                Member.last_activity >= retention_check
-            ).count()
-
-            return round((retained / eligible) * 100, 1)
-
-        except Exception:
-            return None
-
-    def _calculate_percentile(
-        self,
-        value: Optional[float],
-        benchmarks: Dict[str, float]
-    ) -> Optional[int]:
-        """Calculate percentile ranking given benchmarks."""
-        if value is None:
-            return None
-
-        p25 = benchmarks.get('p25', 0)
-        p50 = benchmarks.get('p50', 0)
-        p75 = benchmarks.get('p75', 0)
-        p90 = benchmarks.get('p90', 0)
-
-        if value <= p25:
-            # Interpolate 0-25
-            return int((value / p25) * 25) if p25 > 0 else 0
-        elif value <= p50:
-            # Interpolate 25-50
-            return 25 + int(((value - p25) / (p50 - p25)) * 25) if p50 > p25 else 25
-        elif value <= p75:
-            # Interpolate 50-75
-            return 50 + int(((value - p50) / (p75 - p50)) * 25) if p75 > p50 else 50
-        elif value <= p90:
-            # Interpolate 75-90
-            return 75 + int(((value - p75) / (p90 - p75)) * 15) if p90 > p75 else 75
-        else:
-            # Above 90th percentile
-            return min(99, 90 + int(((value - p90) / p90) * 9) if p90 > 0 else 99)
+        snapshot = self._get_snapshot()
+        if snapshot:
+            return snapshot.metrics.get(metric, {}).get('value')
+        return self._get_live_metrics().values.get(metric)
 
     def _interpret_percentile(
         self,
@@ -0,0 +1,272 @@
+"""
+Cashback campaign accounting.
+
+Campaign budgets and usage caps are shared by every order webhook delivered
+in parallel, so they are never read-modified-written in Python:
+
+- Budget and total uses are reserved with one conditional UPDATE ... RETURNING
+  on the campaign row; the last order that overruns the budget takes what is
+  left under a row lock.
+- Per-member uses live in cashback_member_usages and are claimed with a
+  conditional increment (or insert) instead of a COUNT over redemptions.
+- Each tenant's live campaigns are compiled once into immutable objects and
+  kept in process memory for a short TTL, like compiled earning rules.
+
+Reservations run in the caller's transaction, so a rolled-back order
+releases everything it reserved.
+
+Usage:
+    from app.services.cashback_accounting import CashbackAccounting, get_live_campaigns
+
+    accounting = CashbackAccounting(tenant_id)
+    for campaign in get_live_campaigns(tenant_id):
+        if accounting.claim_member_use(campaign, member_id):
+            granted = accounting.reserve_budget(campaign, campaign.calculate_cashback(order_total))
+"""
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..extensions import db
+from ..models.cashback_campaign import CashbackCampaign, CashbackMemberUsage
+
+logger = logging.getLogger(__name__)
+
+# Cache TTL: 60 seconds (bounds staleness across workers)
+CASHBACK_CAMPAIGN_CACHE_TTL = 60
+
+LIVE_STATUSES = ('active', 'scheduled')
+
+_cache: Dict[int, Tuple[float, Tuple['CompiledCashbackCampaign', ...]]] = {}
+_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CompiledCashbackCampaign:
+    """Immutable view of a CashbackCampaign's rules (counters stay in the database)."""
+    id: int
+    name: str
+    cashback_rate: Decimal
+    min_purchase: Optional[Decimal]
+    max_cashback: Optional[Decimal]
+    max_total_cashback: Optional[Decimal]
+    max_uses_total: Optional[int]
+    max_uses_per_customer: Optional[int]
+    start_date: datetime
+    end_date: datetime
+    applies_to_new_customers: bool
+    applies_to_existing_customers: bool
+    tier_restriction: Optional[FrozenSet[str]]
+
+    @classmethod
+    def from_model(cls, campaign: CashbackCampaign) -> 'CompiledCashbackCampaign':
+        tiers = None
+        if campaign.tier_restriction:
+            try:
+                tiers = frozenset(str(t).upper() for t in json.loads(campaign.tier_restriction))
+            except (json.JSONDecodeError, TypeError):
+                tiers = None  # Unparseable restriction applies to all tiers (as the model does)
+        return cls(
+            id=campaign.id,
+            name=campaign.name,
+            cashback_rate=campaign.cashback_rate,
+            min_purchase=campaign.min_purchase,
+            max_cashback=campaign.max_cashback,
+            max_total_cashback=campaign.max_total_cashback,
+            max_uses_total=campaign.max_uses_total,
+            max_uses_per_customer=campaign.max_uses_per_customer,
+            start_date=campaign.start_date,
+            end_date=campaign.end_date,
+            applies_to_new_customers=bool(campaign.applies_to_new_customers),
+            applies_to_existing_customers=bool(campaign.applies_to_existing_customers),
+            tier_restriction=tiers,
+        )
+
+    def is_eligible(self, now: datetime, is_new: bool, tier_name: Optional[str]) -> bool:
+        """Time window and customer targeting (mirrors check_customer_eligibility)."""
+        if not self.start_date <= now <= self.end_date:
+            return False
+        if is_new and not self.applies_to_new_customers:
+            return False
+        if not is_new and not self.applies_to_existing_customers:
+            return False
+        if self.tier_restriction is not None and (tier_name or '').upper() not in self.tier_restriction:
+            return False
+        return True
+
+    def calculate_cashback(self, order_total: Decimal) -> Decimal:
+        """Cashback before the budget check: rate, minimum purchase and per-order cap."""
+        if self.min_purchase and order_total < self.min_purchase:
+            return Decimal('0')
+        cashback = order_total * (self.cashback_rate / Decimal('100'))
+        if self.max_cashback and cashback > self.max_cashback:
+            cashback = self.max_cashback
+        return cashback.quantize(Decimal('0.01'))
+
+
+def _compile_tenant_campaigns(tenant_id: int) -> Tuple[CompiledCashbackCampaign, ...]:
+    """Load live campaigns that still have budget and uses left."""
+    campaigns = CashbackCampaign.query.filter(
+        CashbackCampaign.tenant_id == tenant_id,
+        CashbackCampaign.status.in_(LIVE_STATUSES),
+        CashbackCampaign.end_date >= datetime.utcnow(),
+        or_(CashbackCampaign.max_uses_total.is_(None),
+            func.coalesce(CashbackCampaign.current_uses, 0) < CashbackCampaign.max_uses_total),
+        or_(CashbackCampaign.max_total_cashback.is_(None),
+            func.coalesce(CashbackCampaign.total_cashback_issued, 0) < CashbackCampaign.max_total_cashback),
+    ).order_by(CashbackCampaign.id).all()
+    return tuple(CompiledCashbackCampaign.from_model(c) for c in campaigns)
+
+
+def get_live_campaigns(tenant_id: int, now: Optional[datetime] = None) -> List[CompiledCashbackCampaign]:
+    """Compiled campaigns of a tenant running at `now` (defaults to utcnow)."""
+    entry = _cache.get(tenant_id)
+    if entry is None or entry[0] < time.monotonic():
+        logger.debug('Compiled cashback campaigns MISS: tenant=%d', tenant_id)
+        campaigns = _compile_tenant_campaigns(tenant_id)
+        with _cache_lock:
+            _cache[tenant_id] = (time.monotonic() + CASHBACK_CAMPAIGN_CACHE_TTL, campaigns)
+    else:
+        campaigns = entry[1]
+
+    now = now or datetime.utcnow()
+    return [c for c in campaigns if c.start_date <= now <= c.end_date]
+
+
+def invalidate_cashback_campaign_cache(tenant_id: Optional[int] = None) -> None:
+    """
+    Drop compiled campaigns for a tenant (or all tenants).
+
+    Call this after creating, updating, activating, pausing or ending campaigns.
+    """
+    with _cache_lock:
+        if tenant_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(tenant_id, None)
+    logger.debug('Invalidated compiled cashback campaigns: tenant=%s', tenant_id)
+
+
+class CashbackAccounting:
+    """
+    Atomic budget, total-use and per-member reservations for one tenant.
+
+    All methods run in the caller's transaction and never commit.
+    """
+
+    def __init__(self, tenant_id: int):
+        self.tenant_id = tenant_id
+
+    def reserve_budget(self, campaign: CompiledCashbackCampaign, amount: Decimal) -> Decimal:
+        """
+        Reserve one use and up to `amount` of the campaign budget.
+
+        Returns:
+            Amount reserved; 0 if the campaign is no longer live, out of uses
+            or out of budget
+        """
+        if amount <= 0:
+            return Decimal('0')
+
+        issued = func.coalesce(CashbackCampaign.total_cashback_issued, 0)
+        uses = func.coalesce(CashbackCampaign.current_uses, 0)
+        live = (
+            CashbackCampaign.id == campaign.id,
+            CashbackCampaign.tenant_id == self.tenant_id,
+            CashbackCampaign.status.in_(LIVE_STATUSES),
+            or_(CashbackCampaign.max_uses_total.is_(None), uses < CashbackCampaign.max_uses_total),
+        )
+
+        reserved = db.session.execute(
+            update(CashbackCampaign)
+            .where(*live, or_(CashbackCampaign.max_total_cashback.is_(None),
+                              issued + amount <= CashbackCampaign.max_total_cashback))
+            .values(current_uses=uses + 1, total_cashback_issued=issued + amount)
+            .returning(CashbackCampaign.total_cashback_issued),
+            execution_options={'synchronize_session': False}
+        ).first()
+        if reserved:
+            return amount
+        if campaign.max_total_cashback is None:
+            self._exhausted(campaign)
+            return Decimal('0')
+
+        # The full amount no longer fits: take what is left under a row lock
+        row = db.session.query(issued).filter(*live).with_for_update().first()
+        remaining = (campaign.max_total_cashback - Decimal(str(row[0]))) if row else Decimal('0')
+        remaining = min(amount, remaining).quantize(Decimal('0.01'))
+        if remaining <= 0:
+            self._exhausted(campaign)
+            return Decimal('0')
+
+        db.session.execute(
+            update(CashbackCampaign)
+            .where(CashbackCampaign.id == campaign.id)
+            .values(current_uses=uses + 1, total_cashback_issued=issued + remaining),
+            execution_options={'synchronize_session': False}
+        )
+        self._exhausted(campaign)
+        return remaining
+
+    def claim_member_use(self, campaign: CompiledCashbackCampaign, member_id: int) -> bool:
+        """
+        Count one use of `campaign` by a member, if under max_uses_per_customer.
+
+        Returns:
+            True if the use was counted
+        """
+        limit = campaign.max_uses_per_customer
+        now = datetime.utcnow()
+
+        increment = update(CashbackMemberUsage).where(
+            CashbackMemberUsage.campaign_id == campaign.id,
+            CashbackMemberUsage.member_id == member_id,
+        )
+        if limit:
+            increment = increment.where(CashbackMemberUsage.uses < limit)
+        increment = increment.values(uses=CashbackMemberUsage.uses + 1, last_used_at=now).returning(
+            CashbackMemberUsage.uses
+        )
+
+        if db.session.execute(increment, execution_options={'synchronize_session': False}).first():
+            return True
+
+        # No counter yet (or already at the limit): create it with this use
+        insert = pg_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+        created = db.session.execute(
+            insert(CashbackMemberUsage).values(
+                tenant_id=self.tenant_id, campaign_id=campaign.id, member_id=member_id,
+                uses=1, last_used_at=now
+            ).on_conflict_do_nothing(index_elements=['campaign_id', 'member_id']).returning(
+                CashbackMemberUsage.id
+            )
+        ).first()
+        if created:
+            return True
+
+        # A concurrent order created the counter first
+        return bool(db.session.execute(increment, execution_options={'synchronize_session': False}).first())
+
+    def release_member_use(self, campaign: CompiledCashbackCampaign, member_id: int) -> None:
+        """Give back a claimed use (when the campaign budget turns out to be spent)."""
+        db.session.execute(
+            update(CashbackMemberUsage).where(
+                CashbackMemberUsage.campaign_id == campaign.id,
+                CashbackMemberUsage.member_id == member_id,
+            ).values(uses=CashbackMemberUsage.uses - 1),
+            execution_options={'synchronize_session': False}
+        )
+
+    def _exhausted(self, campaign: CompiledCashbackCampaign) -> None:
+        """Stop offering a spent campaign from this process's cache."""
+        logger.info(f'[Cashback] Campaign {campaign.id} is no longer live, or out of budget or uses')
+        invalidate_cashback_campaign_cache(self.tenant_id)
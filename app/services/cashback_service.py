@@ -8,12 +8,18 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Dict, Any, List, Optional
 from flask import current_app
+from sqlalchemy.exc import IntegrityError
 
 from ..extensions import db
 from ..models.member import Member
 from ..models.tenant import Tenant
 from ..models.cashback_campaign import CashbackCampaign, CashbackRedemption
 from ..models.promotions import CreditEventType
+from .cashback_accounting import (
+    CashbackAccounting,
+    get_live_campaigns,
+    invalidate_cashback_campaign_cache,
+)
 
 
 class CashbackService:
@@ -80,6 +86,7 @@ class CashbackService:
 
             db.session.add(campaign)
             db.session.commit()
+            invalidate_cashback_campaign_cache(self.tenant_id)
 
             return {
                 'success': True,
@@ -136,6 +143,7 @@ class CashbackService:
                 campaign.tier_restriction = json.dumps(data['tier_restriction']) if data['tier_restriction'] else None
 
             db.session.commit()
+            invalidate_cashback_campaign_cache(self.tenant_id)
 
             return {
                 'success': True,
@@ -162,6 +170,7 @@ class CashbackService:
         campaign.status = 'active'
         campaign.activated_at = datetime.utcnow()
         db.session.commit()
+        invalidate_cashback_campaign_cache(self.tenant_id)
 
         return {
             'success': True,
@@ -184,6 +193,7 @@ class CashbackService:
 
         campaign.status = 'paused'
         db.session.commit()
+        invalidate_cashback_campaign_cache(self.tenant_id)
 
         return {
             'success': True,
@@ -204,6 +214,7 @@ class CashbackService:
         campaign.status = 'ended'
         campaign.ended_at = datetime.utcnow()
         db.session.commit()
+        invalidate_cashback_campaign_cache(self.tenant_id)
 
         return {
             'success': True,
@@ -226,6 +237,7 @@ class CashbackService:
 
         db.session.delete(campaign)
         db.session.commit()
+        invalidate_cashback_campaign_cache(self.tenant_id)
 
         return {'success': True, 'message': 'Campaign deleted'}
 
@@ -286,6 +298,16 @@ class CashbackService:
 
     # ==================== ORDER PROCESSING ====================
 
+    @staticmethod
+    def _already_processed(order_id) -> Dict[str, Any]:
+        """Result for a redelivered order that already has its redemptions."""
+        return {
+            'success': True,
+            'order_id': order_id,
+            'cashback': Decimal('0'),
+            'message': 'Cashback already processed for this order'
+        }
+
     def process_order_cashback(
         self,
         order_data: Dict[str, Any],
@@ -309,8 +331,9 @@ class CashbackService:
         order_id = order_data.get('id') or order_data.get('shopify_order_id')
         order_number = order_data.get('order_number') or order_data.get('name')
 
-        # Get active campaigns
-        active_campaigns = self.get_active_campaigns()
+        # Compiled live campaigns (cached per process)
+        now = datetime.utcnow()
+        active_campaigns = get_live_campaigns(self.tenant_id, now)
 
         if not active_campaigns:
             return {
@@ -331,31 +354,24 @@ class CashbackService:
             'total_cashback': Decimal('0')
         }
 
-        for campaign in active_campaigns:
-            # Check eligibility
-            eligible, reason = campaign.check_customer_eligibility(
-                customer_id=email,
-                is_new=is_new,
-                tier_name=tier_name
-            )
+        accounting = CashbackAccounting(self.tenant_id)
+        redemptions = []
 
-            if not eligible:
+        for campaign in active_campaigns:
+            if not campaign.is_eligible(now, is_new, tier_name):
                 continue
 
-            # Check per-customer limit
-            if member and campaign.max_uses_per_customer:
-                existing_redemptions = CashbackRedemption.query.filter_by(
-                    campaign_id=campaign.id,
-                    member_id=member.id
-                ).count()
-
-                if existing_redemptions >= campaign.max_uses_per_customer:
-                    continue
-
-            # Calculate cashback
             cashback = campaign.calculate_cashback(order_total)
+            if cashback <= 0:
+                continue
 
+            # Per-customer limit, then budget and total uses, all atomic
+            if member and not accounting.claim_member_use(campaign, member.id):
+                continue
+            cashback = accounting.reserve_budget(campaign, cashback)
             if cashback <= 0:
+                if member:
+                    accounting.release_member_use(campaign, member.id)
                 continue
 
             # Record redemption
@@ -372,9 +388,14 @@ class CashbackService:
                 customer_tier=tier_name
             )
             db.session.add(redemption)
-
-            # Update campaign usage
-            campaign.record_usage(cashback)
+            try:
+                # Insert now rather than on the next campaign's autoflush, so a
+                # redelivered order is caught here and not raised from accounting
+                db.session.flush()
+            except IntegrityError:
+                db.session.rollback()
+                return self._already_processed(order_id)
+            redemptions.append(redemption)
 
             results['campaigns_applied'].append({
                 'campaign_id': campaign.id,
@@ -386,6 +407,15 @@ class CashbackService:
             results['total_cashback'] += cashback
 
         if results['total_cashback'] > 0:
+            # Commit reservations before calling Shopify so campaign rows aren't
+            # locked for the duration of the credit call
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Redelivered webhook: this order already has its redemptions
+                db.session.rollback()
+                return self._already_processed(order_id)
+
             # Issue the store credit
             from .store_credit_service import store_credit_service
 
@@ -403,9 +433,7 @@ class CashbackService:
                     )
 
                     # Update redemption records
-                    for redemption in CashbackRedemption.query.filter_by(
-                        shopify_order_id=str(order_id)
-                    ).all():
+                    for redemption in redemptions:
                         redemption.credit_issued = True
                         redemption.credit_entry_id = entry.id if entry else None
                         redemption.issued_at = datetime.utcnow()
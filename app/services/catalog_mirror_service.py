@@ -0,0 +1,318 @@
+"""
+Catalog Mirror Service.
+
+Maintains a local product -> collections/tags/vendor/type mirror so that
+collection- and tag-scoped promotions and credit events can be resolved
+from the database instead of calling Shopify per order or paging through
+every product of every collection on each event preview.
+
+The mirror is updated by product webhooks and fully reconciled on a
+schedule with a Shopify Bulk Operation (collection membership changes,
+especially for smart collections, do not fire product webhooks). Products
+missing from the mirror fall back to a live collection lookup.
+
+Usage:
+    from app.services.catalog_mirror_service import CatalogMirrorService
+
+    service = CatalogMirrorService(tenant_id)
+    service.upsert_from_webhook(product_payload)     # products/create, products/update
+    service.delete_product(product_id)               # products/delete
+    service.reconcile()                              # nightly full sync
+
+    products = service.resolve_products(['123', '456'])
+    product_ids = service.product_ids_in_collections(['gid://shopify/Collection/1'])
+"""
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Set, Iterable, Tuple
+
+from ..extensions import db
+from ..models import Tenant
+from ..models.catalog_product import CatalogProduct
+
+logger = logging.getLogger(__name__)
+
+# Rows are flushed in chunks during a full reconcile
+RECONCILE_FLUSH_SIZE = 1000
+
+CATALOG_BULK_QUERY = """
+{
+    products {
+        edges {
+            node {
+                id
+                tags
+                vendor
+                productType
+                updatedAt
+                collections {
+                    edges {
+                        node { id }
+                    }
+                }
+            }
+        }
+    }
+}
+"""
+
+
+def normalize_product_id(product_id) -> Optional[int]:
+    """Convert a numeric, string or GID product ID to its numeric form."""
+    if product_id is None or product_id == '':
+        return None
+    try:
+        return int(str(product_id).rsplit('/', 1)[-1])
+    except ValueError:
+        return None
+
+
+def normalize_collection_id(collection_id) -> str:
+    """Convert a numeric collection ID to GID form (GIDs pass through)."""
+    collection_id = str(collection_id)
+    if collection_id.startswith('gid://'):
+        return collection_id
+    return f'gid://shopify/Collection/{collection_id}'
+
+
+def parse_tags(tags) -> List[str]:
+    """Parse REST comma-separated or GraphQL list tags into sorted lower-case tags."""
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return sorted({str(t).strip().lower() for t in tags if str(t).strip()})
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+class CatalogMirrorService:
+    """Local mirror of Shopify product filter attributes for one tenant."""
+
+    def __init__(self, tenant_id: int, client=None):
+        self.tenant_id = tenant_id
+        self._client = client
+        self._index: Optional[List[Tuple[int, Set[str], Set[str]]]] = None
+
+    @property
+    def client(self):
+        """ShopifyClient, created on first live lookup."""
+        if self._client is None:
+            from .shopify_client import ShopifyClient
+            self._client = ShopifyClient(self.tenant_id)
+        return self._client
+
+    # ==================== Webhook Maintenance ====================
+
+    def _get_row(self, product_id: int) -> Optional[CatalogProduct]:
+        return CatalogProduct.query.filter_by(tenant_id=self.tenant_id, product_id=product_id).first()
+
+    def upsert_from_webhook(self, payload: Dict[str, Any]) -> Optional[CatalogProduct]:
+        """
+        Apply a products/create or products/update webhook payload.
+
+        Product webhooks do not include collections, so the product's collections
+        are fetched once here (off the order path). If that lookup fails, the
+        previously mirrored collections are kept until the next reconcile.
+
+        Args:
+            payload: REST product payload from the webhook
+
+        Returns:
+            The mirrored row, or None if the payload had no product ID
+        """
+        product_id = normalize_product_id(payload.get('id'))
+        if product_id is None:
+            return None
+
+        row = self._get_row(product_id)
+        if row is None:
+            row = CatalogProduct(tenant_id=self.tenant_id, product_id=product_id, collection_ids=[])
+            db.session.add(row)
+
+        row.tags = parse_tags(payload.get('tags'))
+        row.vendor = payload.get('vendor')
+        row.product_type = payload.get('product_type')
+        row.shopify_updated_at = _parse_timestamp(payload.get('updated_at'))
+        row.synced_at = datetime.utcnow()
+
+        try:
+            collections = self.client.get_product_collections([str(product_id)])
+            row.collection_ids = sorted(collections.get(str(product_id), []))
+        except Exception as e:
+            logger.warning(f'[CatalogMirror] Collection lookup failed for product {product_id}: {e}')
+
+        db.session.commit()
+        self._index = None
+        return row
+
+    def delete_product(self, product_id) -> bool:
+        """Remove a product from the mirror (products/delete webhook)."""
+        product_id = normalize_product_id(product_id)
+        if product_id is None:
+            return False
+        deleted = CatalogProduct.query.filter_by(
+            tenant_id=self.tenant_id, product_id=product_id
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        self._index = None
+        return bool(deleted)
+
+    # ==================== Full Reconcile ====================
+
+    def _fetch_catalog(self) -> Dict[int, Dict[str, Any]]:
+        """Export every product with its collections via a Shopify Bulk Operation."""
+        from .store_credit_events import StoreCreditEventsService
+
+        tenant = Tenant.query.get(self.tenant_id)
+        bulk = StoreCreditEventsService(tenant.shopify_domain, tenant.shopify_access_token)
+
+        products: Dict[int, Dict[str, Any]] = {}
+        gid_to_id: Dict[str, int] = {}
+        for obj in bulk.run_bulk_query(CATALOG_BULK_QUERY):
+            parent = obj.get('__parentId')
+            if parent:
+                product_id = gid_to_id.get(parent)
+                if product_id is not None and obj.get('id'):
+                    products[product_id]['collection_ids'].append(obj['id'])
+                continue
+
+            product_id = normalize_product_id(obj.get('id'))
+            if product_id is None:
+                continue
+            gid_to_id[obj['id']] = product_id
+            products[product_id] = {
+                'collection_ids': [],
+                'tags': parse_tags(obj.get('tags')),
+                'vendor': obj.get('vendor'),
+                'product_type': obj.get('productType'),
+                'shopify_updated_at': _parse_timestamp(obj.get('updatedAt')),
+            }
+        return products
+
+    def reconcile(self, products: Optional[Dict[int, Dict[str, Any]]] = None) -> Dict[str, int]:
+        """
+        Bring the mirror in line with the full Shopify catalog.
+
+        Args:
+            products: Pre-fetched catalog (product_id -> attributes); fetched
+                with a bulk operation when omitted
+
+        Returns:
+            Counts of created, updated, unchanged and deleted rows
+        """
+        if products is None:
+            products = self._fetch_catalog()
+
+        existing = {row.product_id: row for row in CatalogProduct.query.filter_by(tenant_id=self.tenant_id)}
+        now = datetime.utcnow()
+        stats = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+
+        for i, (product_id, attrs) in enumerate(products.items(), start=1):
+            attrs = {**attrs, 'collection_ids': sorted(attrs.get('collection_ids') or [])}
+            row = existing.pop(product_id, None)
+            if row is None:
+                db.session.add(CatalogProduct(tenant_id=self.tenant_id, product_id=product_id, synced_at=now, **attrs))
+                stats['created'] += 1
+            elif any(getattr(row, key) != value for key, value in attrs.items()):
+                for key, value in attrs.items():
+                    setattr(row, key, value)
+                row.synced_at = now
+                stats['updated'] += 1
+            else:
+                stats['unchanged'] += 1
+
+            if i % RECONCILE_FLUSH_SIZE == 0:
+                db.session.flush()
+
+        if existing:
+            CatalogProduct.query.filter(
+                CatalogProduct.tenant_id == self.tenant_id,
+                CatalogProduct.product_id.in_(list(existing))
+            ).delete(synchronize_session=False)
+            stats['deleted'] = len(existing)
+
+        db.session.commit()
+        self._index = None
+        logger.info(f'[CatalogMirror] Reconciled tenant {self.tenant_id}: {stats}')
+        return stats
+
+    # ==================== Lookups ====================
+
+    def resolve_products(self, product_ids: Iterable) -> Dict[str, Dict[str, Any]]:
+        """
+        Filter attributes for the products on an order.
+
+        Mirrored products resolve from one query; products not yet mirrored
+        fall back to a live collection lookup (tags/vendor/type unknown).
+
+        Args:
+            product_ids: Shopify product IDs (numeric, string or GID)
+
+        Returns:
+            Dict of numeric product ID string -> {'collection_ids', 'tags', 'vendor', 'product_type'}
+        """
+        ids = {pid for pid in (normalize_product_id(p) for p in product_ids) if pid is not None}
+        if not ids:
+            return {}
+
+        rows = CatalogProduct.query.filter(
+            CatalogProduct.tenant_id == self.tenant_id,
+            CatalogProduct.product_id.in_(ids)
+        ).all()
+        resolved = {
+            str(row.product_id): {
+                'collection_ids': list(row.collection_ids or []),
+                'tags': list(row.tags or []),
+                'vendor': row.vendor,
+                'product_type': row.product_type,
+            }
+            for row in rows
+        }
+
+        missing = [str(pid) for pid in ids if str(pid) not in resolved]
+        if missing:
+            logger.debug(f'[CatalogMirror] {len(missing)} products not mirrored for tenant {self.tenant_id}, fetching live')
+            try:
+                live = self.client.get_product_collections(missing)
+                for pid in missing:
+                    if pid in live:
+                        resolved[pid] = {'collection_ids': live[pid], 'tags': [], 'vendor': None, 'product_type': None}
+            except Exception as e:
+                logger.warning(f'[CatalogMirror] Live collection lookup failed: {e}')
+
+        return resolved
+
+    def is_populated(self) -> bool:
+        """Whether the mirror holds any products for this tenant (i.e. has been reconciled)."""
+        return CatalogProduct.query.filter_by(tenant_id=self.tenant_id).with_entities(CatalogProduct.id).first() is not None
+
+    def _load_index(self) -> List[Tuple[int, Set[str], Set[str]]]:
+        """(product_id, collections, tags) for the whole tenant catalog, loaded once per service."""
+        if self._index is None:
+            rows = db.session.query(
+                CatalogProduct.product_id, CatalogProduct.collection_ids, CatalogProduct.tags
+            ).filter(CatalogProduct.tenant_id == self.tenant_id).all()
+            self._index = [(pid, set(collections or []), set(tags or [])) for pid, collections, tags in rows]
+        return self._index
+
+    def product_ids_in_collections(self, collection_ids: Iterable) -> Set[int]:
+        """Numeric IDs of mirrored products in any of the given collections."""
+        wanted = {normalize_collection_id(c) for c in collection_ids}
+        if not wanted:
+            return set()
+        return {pid for pid, collections, _ in self._load_index() if not wanted.isdisjoint(collections)}
+
+    def product_ids_with_tags(self, tags: Iterable[str]) -> Set[int]:
+        """Numeric IDs of mirrored products carrying any of the given tags (case-insensitive)."""
+        wanted = set(parse_tags(list(tags)))
+        if not wanted:
+            return set()
+        return {pid for pid, _, product_tags in self._load_index() if not wanted.isdisjoint(product_tags)}
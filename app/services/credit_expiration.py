@@ -0,0 +1,273 @@
+"""
+Set-based store credit expiration.
+
+Finds expired, not-yet-expired-out credit lots with a single anti-join
+against their 'expired:<id>' expiration entries, then works through them
+in keyset-paged chunks: one bulk INSERT of expiration entries and one
+UPDATE of the affected members' MemberCreditBalance rows per chunk. The
+preview (dry run) uses the same candidate query, aggregated in SQL, so
+the nightly run and its preview agree; a real run sums totals from its
+chunks and reads per-member figures back from the entries it inserted,
+instead of running the preview aggregates first.
+
+Usage:
+    from app.services.credit_expiration import CreditExpirationEngine
+
+    engine = CreditExpirationEngine(tenant_id)
+    engine.run(dry_run=True)                    # preview
+    engine.run()                                # expire everything due
+    engine.expire_batch(cursor=None, batch_size=100)   # one page (Trigger.dev)
+"""
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, Dict, Any
+
+from sqlalchemy import and_, func, literal, cast, String
+from sqlalchemy.orm import aliased
+
+from ..extensions import db
+from ..models.member import Member
+from ..models.promotions import StoreCreditLedger, MemberCreditBalance
+
+logger = logging.getLogger(__name__)
+
+# Lots expired per chunk (one INSERT + one balance UPDATE each)
+EXPIRATION_CHUNK_SIZE = 1000
+
+# Per-member rows returned in results; totals always cover every member
+DETAILS_LIMIT = 500
+
+
+class CreditExpirationEngine:
+    """Expires past-due store credit lots for one tenant."""
+
+    def __init__(self, tenant_id: int, now: Optional[datetime] = None):
+        self.tenant_id = tenant_id
+        self.now = now or datetime.utcnow()
+
+    def _candidates(self, *columns):
+        """Positive lots past expires_at with no matching expiration entry (anti-join)."""
+        lot = StoreCreditLedger
+        expiration = aliased(StoreCreditLedger)
+        return db.session.query(*columns).select_from(lot).join(
+            Member, lot.member_id == Member.id
+        ).outerjoin(
+            expiration,
+            and_(
+                expiration.member_id == lot.member_id,
+                expiration.event_type == 'expiration',
+                expiration.source_id == literal('expired:') + cast(lot.id, String)
+            )
+        ).filter(
+            Member.tenant_id == self.tenant_id,
+            lot.expires_at.isnot(None),
+            lot.expires_at < self.now,
+            lot.amount > 0,
+            lot.event_type != 'expiration',
+            expiration.id.is_(None)
+        )
+
+    def preview(self) -> Dict[str, Any]:
+        """Totals and largest per-member amounts of what a run would expire."""
+        lot = StoreCreditLedger
+        count, amount, members = self._candidates(
+            func.count(lot.id), func.sum(lot.amount), func.count(func.distinct(lot.member_id))
+        ).one()
+
+        member_total = func.sum(lot.amount)
+        rows = self._candidates(
+            lot.member_id, Member.member_number, func.count(lot.id), member_total
+        ).group_by(lot.member_id, Member.member_number).order_by(
+            member_total.desc(), lot.member_id
+        ).limit(DETAILS_LIMIT).all()
+
+        return {
+            'entries': count or 0,
+            'amount': Decimal(amount or 0),
+            'members': members or 0,
+            'details': [{
+                'member_id': member_id,
+                'member_number': member_number,
+                'expired_amount': float(total or 0),
+                'entries_expired': entries
+            } for member_id, member_number, entries, total in rows],
+        }
+
+    def _expire_chunk(self, cursor: int, limit: int, created_by: str) -> Dict[str, Any]:
+        """Expire up to `limit` lots with id > cursor; commits once."""
+        lot = StoreCreditLedger
+        rows = self._candidates(
+            lot.id, lot.member_id, lot.amount, lot.created_at, lot.source_reference
+        ).filter(lot.id > cursor).order_by(lot.id).limit(limit).all()
+        if not rows:
+            return {'count': 0, 'amount': Decimal('0'), 'last_id': cursor}
+
+        db.session.bulk_insert_mappings(StoreCreditLedger, [{
+            'member_id': member_id,
+            'event_type': 'expiration',
+            'amount': -amount,
+            'balance_after': Decimal('0'),  # Recomputed with the balance below
+            'description': f'Credit expired (issued {created_at.strftime("%Y-%m-%d")})' if created_at else 'Credit expired',
+            'source_type': 'expiration',
+            'source_id': f'expired:{lot_id}',
+            'source_reference': source_reference,
+            'created_by': created_by,
+            'synced_to_shopify': False,
+        } for lot_id, member_id, amount, created_at, source_reference in rows])
+
+        self._recompute_balances({row.member_id for row in rows})
+        db.session.commit()
+
+        return {
+            'count': len(rows),
+            'amount': sum((row.amount for row in rows), Decimal('0')),
+            'last_id': rows[-1].id,
+        }
+
+    def _expired_since(self, after_id: int) -> Dict[str, Any]:
+        """Members affected and largest per-member amounts of expiration entries with id > after_id."""
+        entry = StoreCreditLedger
+        scope = db.session.query(entry).join(Member, entry.member_id == Member.id).filter(
+            Member.tenant_id == self.tenant_id,
+            entry.event_type == 'expiration',
+            entry.id > after_id
+        )
+        members = scope.with_entities(func.count(func.distinct(entry.member_id))).scalar()
+
+        member_total = -func.sum(entry.amount)
+        rows = scope.with_entities(
+            entry.member_id, Member.member_number, func.count(entry.id), member_total
+        ).group_by(entry.member_id, Member.member_number).order_by(
+            member_total.desc(), entry.member_id
+        ).limit(DETAILS_LIMIT).all()
+
+        return {
+            'members': members or 0,
+            'details': [{
+                'member_id': member_id,
+                'member_number': member_number,
+                'expired_amount': float(total or 0),
+                'entries_expired': entries
+            } for member_id, member_number, entries, total in rows],
+        }
+
+    def _recompute_balances(self, member_ids) -> None:
+        """Create missing balance rows, then set balances from the ledger in one UPDATE."""
+        member_ids = list(member_ids)
+        existing = {mid for (mid,) in db.session.query(MemberCreditBalance.member_id).filter(
+            MemberCreditBalance.member_id.in_(member_ids)
+        )}
+        missing = [mid for mid in member_ids if mid not in existing]
+        if missing:
+            db.session.bulk_insert_mappings(MemberCreditBalance, [{
+                'member_id': mid, 'total_balance': 0, 'available_balance': 0, 'total_expired': 0
+            } for mid in missing])
+
+        ledger_sum = db.session.query(func.coalesce(func.sum(StoreCreditLedger.amount), 0)).filter(
+            StoreCreditLedger.member_id == MemberCreditBalance.member_id
+        ).scalar_subquery()
+        expired_sum = db.session.query(func.coalesce(-func.sum(StoreCreditLedger.amount), 0)).filter(
+            StoreCreditLedger.member_id == MemberCreditBalance.member_id,
+            StoreCreditLedger.event_type == 'expiration'
+        ).scalar_subquery()
+
+        MemberCreditBalance.query.filter(MemberCreditBalance.member_id.in_(member_ids)).update({
+            MemberCreditBalance.total_balance: ledger_sum,
+            MemberCreditBalance.available_balance: ledger_sum,
+            MemberCreditBalance.total_expired: expired_sum,
+            MemberCreditBalance.updated_at: self.now,
+        }, synchronize_session=False)
+
+    def run(self, dry_run: bool = False, created_by: str = 'system:scheduler',
+            chunk_size: int = EXPIRATION_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Expire every due lot for the tenant.
+
+        Args:
+            dry_run: Only report what would expire
+            created_by: Recorded on the expiration entries
+            chunk_size: Lots per INSERT/UPDATE round trip
+
+        Returns:
+            Result dict (processed, expired_entries, members_affected,
+            total_expired, details, errors, dry_run, run_date)
+        """
+        results = {'errors': [], 'dry_run': dry_run, 'run_date': self.now.isoformat()}
+        if dry_run:
+            preview = self.preview()
+            results.update({
+                'processed': preview['entries'],
+                'expired_entries': preview['entries'],
+                'members_affected': preview['members'],
+                'total_expired': float(preview['amount']),
+                'details': preview['details'],
+                'details_truncated': preview['members'] > len(preview['details']),
+            })
+            return results
+
+        # Entries this run inserts all get ids above the current maximum
+        start_id = db.session.query(func.coalesce(func.max(StoreCreditLedger.id), 0)).scalar()
+        cursor, expired, amount = 0, 0, Decimal('0')
+        while True:
+            try:
+                chunk = self._expire_chunk(cursor, chunk_size, created_by)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f'[CreditExpiration] Tenant {self.tenant_id} chunk after lot {cursor} failed: {e}')
+                results['errors'].append({'after_lot_id': cursor, 'error': str(e)})
+                break
+            if not chunk['count']:
+                break
+            cursor = chunk['last_id']
+            expired += chunk['count']
+            amount += chunk['amount']
+
+        # Per-member figures come from the committed entries in SQL, so the
+        # run holds no per-member state however many members it touches
+        summary = self._expired_since(start_id) if expired else {'members': 0, 'details': []}
+        results.update({
+            'processed': expired,
+            'expired_entries': expired,
+            'members_affected': summary['members'],
+            'total_expired': float(amount),
+            'details': summary['details'],
+            'details_truncated': summary['members'] > len(summary['details']),
+        })
+        return results
+
+    def expire_batch(self, cursor: Optional[int] = None, batch_size: int = 100,
+                     created_by: str = 'system:trigger-dev') -> Dict[str, Any]:
+        """
+        Expire one keyset page of due lots (paginated callers such as Trigger.dev).
+
+        Returns:
+            Dict with expired count, amount, errors, next cursor and whether
+            more remain. A failed page is rolled back and reported with
+            has_more False, so the caller stops and the next run retries it.
+        """
+        try:
+            chunk = self._expire_chunk(cursor or 0, batch_size, created_by)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'[CreditExpiration] Tenant {self.tenant_id} page after lot {cursor or 0} failed: {e}')
+            return {
+                'processed': 0,
+                'expired': 0,
+                'expired_amount': 0.0,
+                'errors': 1,
+                'error': str(e),
+                'next_cursor': cursor,
+                'has_more': False,
+            }
+        has_more = chunk['count'] == batch_size and self._candidates(StoreCreditLedger.id).filter(
+            StoreCreditLedger.id > chunk['last_id']
+        ).first() is not None
+        return {
+            'processed': chunk['count'],
+            'expired': chunk['count'],
+            'expired_amount': float(chunk['amount']),
+            'errors': 0,
+            'next_cursor': chunk['last_id'] if chunk['count'] else None,
+            'has_more': has_more,
+        }
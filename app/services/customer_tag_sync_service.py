@@ -0,0 +1,307 @@
+"""
+Customer Tag Sync Service.
+
+Keeps the TradeUp segment tags on Shopify customers in step with member state
+(tier, points, engagement) by diffing against a local mirror of what was last
+pushed. Only customers whose managed tags actually changed are sent to Shopify,
+using batched tagsAdd/tagsRemove mutations.
+
+Usage:
+    from app.services.customer_tag_sync_service import CustomerTagSyncService
+
+    service = CustomerTagSyncService(tenant_id)
+    result = service.sync()                      # full diff sync
+    result = service.sync(member_ids=[1, 2, 3])  # targeted sync
+    result = service.sync(refresh=True)          # re-read tags from Shopify first
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Set
+
+from sqlalchemy import func
+
+from ..extensions import db
+from ..models import Member, MembershipTier
+from ..models.customer_tag_mirror import CustomerTagMirror
+from ..models.loyalty_points import PointsLedger, Reward
+from .shopify_client import ShopifyClient
+
+logger = logging.getLogger(__name__)
+
+# Tags owned by the sync engine regardless of tenant configuration.
+# Tier tags (tradeup-{tier-slug}) are added per tenant at runtime.
+STATIC_MANAGED_TAGS = frozenset({
+    'tradeup-member',
+    'tradeup-points-500plus',
+    'tradeup-points-1000plus',
+    'tradeup-reward-available',
+    'tradeup-at-risk',
+    'tradeup-new-member',
+})
+
+# Shopify nodes() accepts at most 250 IDs per request
+TAG_READ_BATCH_SIZE = 250
+
+
+def tier_tag(tier_name: str) -> str:
+    """Build the customer tag for a tier name (e.g. 'Gold' -> 'tradeup-gold')."""
+    return f"tradeup-{tier_name.lower().replace(' ', '-')}"
+
+
+class CustomerTagSyncService:
+    """
+    Diff-based sync of TradeUp-managed customer tags to Shopify.
+
+    Tags applied:
+    - tradeup-member (all members)
+    - tradeup-{tier-slug} (tier membership)
+    - tradeup-points-500plus (points >= 500)
+    - tradeup-points-1000plus (points >= 1000)
+    - tradeup-reward-available (can redeem a reward)
+    - tradeup-at-risk (no activity 30 days)
+    - tradeup-new-member (joined last 30 days)
+    """
+
+    def __init__(self, tenant_id: int, client: Optional[ShopifyClient] = None):
+        self.tenant_id = tenant_id
+        self.client = client or ShopifyClient(tenant_id)
+        self._tier_names = None
+
+    # ==================== Desired State ====================
+
+    def _get_tier_names(self) -> Dict[int, str]:
+        """Map tier_id -> tier name for every tier of the tenant (active or not)."""
+        if self._tier_names is None:
+            rows = db.session.query(MembershipTier.id, MembershipTier.name).filter(
+                MembershipTier.tenant_id == self.tenant_id
+            ).all()
+            self._tier_names = {row.id: row.name for row in rows}
+        return self._tier_names
+
+    def get_managed_tags(self) -> Set[str]:
+        """Every tag the sync engine may add or remove for this tenant."""
+        managed = set(STATIC_MANAGED_TAGS)
+        managed.update(tier_tag(name) for name in self._get_tier_names().values() if name)
+        return managed
+
+    def compute_desired_tags(self, members: List[Member]) -> Dict[int, List[str]]:
+        """
+        Compute the managed tags each member should carry.
+
+        Args:
+            members: Members to evaluate
+
+        Returns:
+            Dict of member_id -> sorted list of tags
+        """
+        if not members:
+            return {}
+
+        points_query = db.session.query(
+            PointsLedger.member_id,
+            func.sum(PointsLedger.points).label('balance')
+        ).filter(
+            PointsLedger.tenant_id == self.tenant_id,
+            PointsLedger.reversed_at.is_(None)
+        ).group_by(PointsLedger.member_id)
+
+        points_map = {row.member_id: int(row.balance or 0) for row in points_query.all()}
+
+        min_reward_points = db.session.query(func.min(Reward.points_cost)).filter(
+            Reward.tenant_id == self.tenant_id,
+            Reward.is_active == True
+        ).scalar()
+        if min_reward_points is None:
+            min_reward_points = 9999999
+
+        tier_names = self._get_tier_names()
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+
+        desired = {}
+        for member in members:
+            tags = {'tradeup-member'}
+
+            tier_name = tier_names.get(member.tier_id)
+            if tier_name:
+                tags.add(tier_tag(tier_name))
+
+            points_balance = points_map.get(member.id, 0)
+            if points_balance >= 500:
+                tags.add('tradeup-points-500plus')
+            if points_balance >= 1000:
+                tags.add('tradeup-points-1000plus')
+            if points_balance >= min_reward_points:
+                tags.add('tradeup-reward-available')
+
+            last_activity = member.updated_at or member.created_at
+            if last_activity and last_activity < thirty_days_ago:
+                tags.add('tradeup-at-risk')
+
+            if member.created_at and member.created_at >= thirty_days_ago:
+                tags.add('tradeup-new-member')
+
+            desired[member.id] = sorted(tags)
+
+        return desired
+
+    # ==================== Mirror ====================
+
+    def _seed_mirrors(
+        self,
+        members: List[Member],
+        mirrors: Dict[int, CustomerTagMirror],
+        managed: Set[str],
+        result: Dict[str, Any]
+    ) -> None:
+        """
+        Read current tags from Shopify for members with no usable mirror row.
+
+        Only managed tags are recorded, so tags added by merchants or other
+        apps are never touched by the diff.
+        """
+        for start in range(0, len(members), TAG_READ_BATCH_SIZE):
+            chunk = members[start:start + TAG_READ_BATCH_SIZE]
+            try:
+                current = self.client.get_customers_tags([m.shopify_customer_id for m in chunk])
+                result['api_calls'] += 1
+            except Exception as e:
+                # Fall back to add-only for this chunk; stale tags are cleaned on a later refresh
+                logger.warning('Could not read customer tags for tenant %s: %s', self.tenant_id, e)
+                current = None
+
+            for member in chunk:
+                tags = sorted(t for t in (current or {}).get(member.shopify_customer_id, []) if t in managed)
+                mirror = mirrors.get(member.id)
+                if mirror is None:
+                    mirror = CustomerTagMirror(
+                        tenant_id=self.tenant_id,
+                        member_id=member.id,
+                        shopify_customer_id=member.shopify_customer_id,
+                        tags=tags
+                    )
+                    db.session.add(mirror)
+                    mirrors[member.id] = mirror
+                elif current is not None:
+                    mirror.shopify_customer_id = member.shopify_customer_id
+                    mirror.tags = tags
+
+    # ==================== Sync ====================
+
+    def sync(
+        self,
+        member_ids: Optional[List[int]] = None,
+        batch_size: int = 50,
+        refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Push tag changes for members whose managed tags differ from the mirror.
+
+        Args:
+            member_ids: Optional list of member IDs to limit the sync to
+            batch_size: Customers per aliased Shopify mutation
+            refresh: Re-read current tags from Shopify instead of trusting the mirror
+
+        Returns:
+            Dict with synced/unchanged/failed counts, api_calls and errors
+        """
+        result = {
+            'synced': 0,
+            'unchanged': 0,
+            'failed': 0,
+            'removed': 0,
+            'api_calls': 0,
+            'errors': []
+        }
+        batch_size = max(1, min(int(batch_size or 50), 100))
+
+        query = Member.query.filter(
+            Member.tenant_id == self.tenant_id,
+            Member.status == 'active',
+            Member.shopify_customer_id.isnot(None)
+        )
+        if member_ids:
+            query = query.filter(Member.id.in_(member_ids))
+        members = query.all()
+
+        mirror_query = CustomerTagMirror.query.filter_by(tenant_id=self.tenant_id)
+        if member_ids:
+            mirror_query = mirror_query.filter(CustomerTagMirror.member_id.in_(member_ids))
+        mirrors = {m.member_id: m for m in mirror_query.all()}
+
+        managed = self.get_managed_tags()
+        desired = self.compute_desired_tags(members)
+
+        to_seed = [
+            m for m in members
+            if refresh
+            or m.id not in mirrors
+            or mirrors[m.id].shopify_customer_id != m.shopify_customer_id
+        ]
+        if to_seed:
+            self._seed_mirrors(to_seed, mirrors, managed, result)
+
+        # Build diffs: (mirror, target tags, change)
+        pending = []
+        for member in members:
+            mirror = mirrors[member.id]
+            current = set(mirror.tags or [])
+            target = set(desired[member.id])
+            if current == target:
+                result['unchanged'] += 1
+                continue
+            pending.append((mirror, sorted(target), {
+                'customer_id': member.shopify_customer_id,
+                'add': sorted(target - current),
+                'remove': sorted(current - target),
+            }))
+
+        # Members that left the program (cancelled, deleted) keep a mirror row
+        # until their managed tags are stripped. Only on full syncs.
+        if not member_ids:
+            active_ids = {m.id for m in members}
+            for member_id, mirror in mirrors.items():
+                if member_id in active_ids:
+                    continue
+                if not mirror.tags:
+                    db.session.delete(mirror)
+                    continue
+                pending.append((mirror, None, {
+                    'customer_id': mirror.shopify_customer_id,
+                    'add': [],
+                    'remove': sorted(mirror.tags),
+                }))
+
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            try:
+                response = self.client.update_customer_tags_bulk([change for _, _, change in chunk])
+                result['api_calls'] += 1
+                failed = response.get('failed', {})
+            except Exception as e:
+                logger.error('Customer tag batch failed for tenant %s: %s', self.tenant_id, e)
+                failed = {change['customer_id']: str(e) for _, _, change in chunk}
+
+            now = datetime.utcnow()
+            for mirror, target, change in chunk:
+                if change['customer_id'] in failed:
+                    result['failed'] += 1
+                    result['errors'].append({
+                        'member_id': mirror.member_id,
+                        'error': failed[change['customer_id']]
+                    })
+                elif target is None:
+                    db.session.delete(mirror)
+                    result['removed'] += 1
+                else:
+                    mirror.tags = target
+                    mirror.synced_at = now
+                    result['synced'] += 1
+
+        db.session.commit()
+
+        logger.info(
+            'Customer tag sync for tenant %s: %d pushed, %d unchanged, %d removed, %d failed, %d API calls',
+            self.tenant_id, result['synced'], result['unchanged'], result['removed'],
+            result['failed'], result['api_calls']
+        )
+        return result
@@ -0,0 +1,227 @@
+"""
+Compiled earning rule cache.
+
+Earning rules are evaluated on every order webhook. Instead of querying and
+re-serialising EarningRule rows per call, each tenant's active rules are
+compiled once into immutable objects (JSON filters parsed into sets, numerics
+converted) and kept in process memory for a short TTL.
+
+The cache is per process, so invalidation after admin edits is local to the
+worker that handled the edit; other workers pick up changes within the TTL.
+
+Usage:
+    from app.services.earning_rule_cache import (
+        get_compiled_rules,
+        invalidate_earning_rules_cache
+    )
+
+    # Rules for a trigger, highest priority first
+    rules = get_compiled_rules(tenant_id, 'purchase')
+
+    # After creating/updating/deleting a rule
+    invalidate_earning_rules_cache(tenant_id)
+"""
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Dict, Any, List, FrozenSet
+
+from ..models.loyalty_points import EarningRule
+
+logger = logging.getLogger(__name__)
+
+# Cache TTL: 60 seconds (bounds staleness across workers)
+EARNING_RULE_CACHE_TTL = 60
+
+_cache: Dict[int, Any] = {}
+_cache_lock = threading.Lock()
+
+
+def parse_json_list(value: Optional[str]) -> Optional[list]:
+    """Parse a JSON list column; unparseable or empty values mean 'no filter'."""
+    if not value:
+        return None
+    try:
+        parsed = json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return parsed if isinstance(parsed, list) else None
+
+
+def lower_set(values: Optional[list]) -> Optional[FrozenSet[str]]:
+    """Case-folded set of filter values (None = no filter)."""
+    if values is None:
+        return None
+    return frozenset(str(v).lower() for v in values)
+
+
+@dataclass(frozen=True)
+class CompiledEarningRule:
+    """Immutable, pre-parsed view of an EarningRule for fast evaluation."""
+    id: int
+    name: str
+    trigger: Optional[str]
+    rule_type: str
+    description: Optional[str]
+    bonus_points: int
+    points_per_dollar: Optional[int]
+    multiplier: Optional[float]
+    priority: int
+    min_order_value: Optional[float]
+    max_order_value: Optional[float]
+    max_points_per_order: Optional[int]
+    starts_at: Optional[datetime]
+    ends_at: Optional[datetime]
+    max_uses_total: Optional[int]
+    current_uses: int
+    max_uses_per_member: Optional[int]
+    new_member_only: bool
+    member_join_days: Optional[int]
+    tier_restriction: Optional[FrozenSet[str]]
+    excluded_product_ids: Optional[FrozenSet[Any]]
+    collection_ids: Optional[FrozenSet[Any]]
+    vendors: Optional[FrozenSet[str]]
+    product_types: Optional[FrozenSet[str]]
+    product_tags: Optional[FrozenSet[str]]
+    percentage: Optional[float] = None
+
+    @classmethod
+    def from_model(cls, rule: EarningRule) -> 'CompiledEarningRule':
+        tiers = parse_json_list(rule.tier_restriction)
+        excluded = parse_json_list(rule.excluded_product_ids)
+        collections = parse_json_list(rule.collection_ids)
+        return cls(
+            id=rule.id,
+            name=rule.name,
+            trigger=rule.trigger_source,
+            rule_type=rule.rule_type,
+            description=rule.description,
+            bonus_points=rule.bonus_points or 0,
+            points_per_dollar=rule.points_per_dollar,
+            multiplier=float(rule.multiplier) if rule.multiplier else None,
+            priority=rule.priority or 0,
+            min_order_value=float(rule.min_order_value) if rule.min_order_value else None,
+            max_order_value=float(rule.max_order_value) if rule.max_order_value else None,
+            max_points_per_order=rule.max_points_per_order,
+            starts_at=rule.starts_at,
+            ends_at=rule.ends_at,
+            max_uses_total=rule.max_uses_total,
+            current_uses=rule.current_uses or 0,
+            max_uses_per_member=rule.max_uses_per_member,
+            new_member_only=bool(rule.new_member_only),
+            member_join_days=rule.member_join_days,
+            tier_restriction=frozenset(str(t).upper() for t in tiers) if rule.tier_restriction and tiers is not None else None,
+            excluded_product_ids=frozenset(excluded) if excluded is not None else None,
+            collection_ids=frozenset(collections) if collections is not None else None,
+            vendors=lower_set(parse_json_list(rule.vendor_filter)),
+            product_types=lower_set(parse_json_list(rule.product_type_filter)),
+            product_tags=lower_set(parse_json_list(rule.product_tags_filter)),
+            percentage=float(rule.percentage) if rule.percentage else None,
+        )
+
+    @property
+    def has_product_filters(self) -> bool:
+        return any(f is not None for f in (self.collection_ids, self.vendors, self.product_types, self.product_tags))
+
+    def is_active_at(self, now: datetime) -> bool:
+        """Time window and total usage check (mirrors EarningRule.is_active_now)."""
+        if self.starts_at and now < self.starts_at:
+            return False
+        if self.ends_at and now > self.ends_at:
+            return False
+        if self.max_uses_total and self.current_uses >= self.max_uses_total:
+            return False
+        return True
+
+    def applies_to_tier(self, tier_name: str) -> bool:
+        if self.tier_restriction is None:
+            return True
+        return (tier_name or '').upper() in self.tier_restriction
+
+    def applies_to_product(self, product: Dict[str, Any]) -> bool:
+        """Product filter check (mirrors EarningRule.applies_to_product)."""
+        if self.excluded_product_ids and product.get('id') in self.excluded_product_ids:
+            return False
+        if self.collection_ids is not None:
+            if not any(c in self.collection_ids for c in product.get('collection_ids', [])):
+                return False
+        if self.vendors is not None and (product.get('vendor') or '').lower() not in self.vendors:
+            return False
+        if self.product_types is not None and (product.get('product_type') or '').lower() not in self.product_types:
+            return False
+        if self.product_tags is not None:
+            if self.product_tags.isdisjoint(t.lower() for t in product.get('tags', [])):
+                return False
+        return True
+
+    def to_rule_dict(self) -> Dict[str, Any]:
+        """Rule dict shape consumed by PointsService.evaluate_earning_rules."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'trigger': self.trigger,
+            'points': self.bonus_points,
+            'points_per_dollar': self.points_per_dollar,
+            'multiplier': self.multiplier,
+            'rule_type': self.rule_type,
+            'description': self.description,
+            'min_order_value': self.min_order_value,
+            'max_points_per_order': self.max_points_per_order,
+            'compiled': self,
+        }
+
+
+def _compile_tenant_rules(tenant_id: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Load and compile every enabled rule of a tenant, grouped by trigger."""
+    rules = EarningRule.query.filter(
+        EarningRule.tenant_id == tenant_id,
+        EarningRule.is_active == True
+    ).order_by(EarningRule.priority.desc(), EarningRule.id).all()
+
+    by_trigger: Dict[str, List[Dict[str, Any]]] = {}
+    for rule in rules:
+        compiled = CompiledEarningRule.from_model(rule)
+        by_trigger.setdefault(compiled.trigger, []).append(compiled.to_rule_dict())
+    return by_trigger
+
+
+def get_compiled_rules(tenant_id: int, trigger_type: str, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Get compiled earning rules for a trigger, highest priority first.
+
+    Args:
+        tenant_id: Tenant ID
+        trigger_type: Trigger source (purchase, signup, referral, etc.)
+        now: Evaluation time for the time-window check (defaults to utcnow)
+
+    Returns:
+        List of rule dicts, each carrying its CompiledEarningRule under 'compiled'
+    """
+    entry = _cache.get(tenant_id)
+    if entry is None or entry[0] < time.monotonic():
+        logger.debug('Compiled earning rules MISS: tenant=%d', tenant_id)
+        by_trigger = _compile_tenant_rules(tenant_id)
+        with _cache_lock:
+            _cache[tenant_id] = (time.monotonic() + EARNING_RULE_CACHE_TTL, by_trigger)
+    else:
+        by_trigger = entry[1]
+
+    now = now or datetime.utcnow()
+    return [r for r in by_trigger.get(trigger_type, []) if r['compiled'].is_active_at(now)]
+
+
+def invalidate_earning_rules_cache(tenant_id: Optional[int] = None) -> None:
+    """
+    Drop compiled rules for a tenant (or all tenants).
+
+    Call this after creating, updating, deleting or toggling earning rules.
+    """
+    with _cache_lock:
+        if tenant_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(tenant_id, None)
+    logger.debug('Invalidated compiled earning rules: tenant=%s', tenant_id)
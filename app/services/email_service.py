@@ -14,8 +14,8 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 from pathlib import Path
 from flask import current_app, render_template_string
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content
+
+from ..middleware.telemetry import outbound_timer
 
 
 class EmailService:
@@ -729,6 +729,10 @@ P.S. Not sure what your cards are worth? Stop by and we'll give you a free evalu
             return {'success': False, 'error': 'SendGrid not configured'}
 
         try:
+            # Imported on first send: importing this module (from most views) stays cheap
+            from sendgrid import SendGridAPIClient
+            from sendgrid.helpers.mail import Mail, Email, To
+
             sg = SendGridAPIClient(self.sendgrid_api_key)
 
             sender = Email(
@@ -748,7 +752,8 @@ P.S. Not sure what your cards are worth? Stop by and we'll give you a free evalu
                 html_content=html_body
             )
 
-            response = sg.send(message)
+            with outbound_timer('sendgrid'):
+                response = sg.send(message)
 
             return {
                 'success': True,
@@ -913,6 +918,10 @@ P.S. Not sure what your cards are worth? Stop by and we'll give you a free evalu
             return {'success': False, 'error': 'SendGrid not configured'}
 
         try:
+            # Imported on first send, as above
+            from sendgrid import SendGridAPIClient
+            from sendgrid.helpers.mail import Mail, Email, To
+
             sg = SendGridAPIClient(self.sendgrid_api_key)
 
             sender = Email(
@@ -929,7 +938,8 @@ P.S. Not sure what your cards are worth? Stop by and we'll give you a free evalu
                 html_content=html_body
             )
 
-            response = sg.send(message)
+            with outbound_timer('sendgrid'):
+                response = sg.send(message)
 
             return {
                 'success': True,
@@ -0,0 +1,476 @@
+"""
+Install Provisioning Pipeline.
+
+Runs the post-install setup for a shop (shop settings, webhooks, default
+tiers, customer segments, membership products, member metafields) off
+the OAuth request. Each step is idempotent, declares the steps it depends
+on, and has its state persisted in ProvisioningStep:
+
+- independent steps run concurrently on a small worker pool, sharing the
+  pooled Shopify HTTP connections
+- a step that fails leaves its dependents pending; resuming the pipeline
+  only runs steps that are not done
+- the admin UI polls the progress endpoint instead of waiting on the
+  OAuth redirect
+
+Usage:
+    from app.services.install_provisioning import start_provisioning, ProvisioningPipeline
+
+    start_provisioning(tenant_id, reset=True)          # OAuth callback
+    ProvisioningPipeline(tenant_id).progress()         # progress endpoint
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+
+from ..extensions import db
+from ..middleware.telemetry import instrument_session
+from ..models import Tenant, Member, MembershipTier
+from ..models.provisioning_step import ProvisioningStep
+
+logger = logging.getLogger(__name__)
+
+SHOPIFY_REST_VERSION = '2024-01'
+
+# (connect, read) timeout for REST setup calls
+REQUEST_TIMEOUT = (5, 20)
+
+PROVISIONING_WORKERS = 4
+
+# A 'running' step not updated for this long belongs to a dead worker and may be re-run
+STALE_STEP_SECONDS = 600
+
+# Members synced per commit in the metafield backfill
+METAFIELD_BATCH_SIZE = 100
+
+_http_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Pooled session for Shopify REST setup calls."""
+    global _http_session
+    with _session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = instrument_session(session, 'shopify')
+        return _http_session
+
+
+def webhook_subscriptions(app_url: str) -> List[Dict[str, str]]:
+    """Webhooks every installed shop needs."""
+    return [
+        {'topic': 'orders/paid', 'address': f"{app_url}/webhook/shopify/orders/paid", 'format': 'json'},
+        {'topic': 'orders/fulfilled', 'address': f"{app_url}/webhook/shopify/orders/fulfilled", 'format': 'json'},
+        {'topic': 'customers/create', 'address': f"{app_url}/webhook/shopify/customers/create", 'format': 'json'},
+        {'topic': 'app/uninstalled', 'address': f"{app_url}/webhook/shopify/app/uninstalled", 'format': 'json'},
+        {'topic': 'app_subscriptions/update', 'address': f"{app_url}/webhook/shopify-billing/subscriptions", 'format': 'json'},
+    ]
+
+
+def _rest_headers(tenant: Tenant) -> Dict[str, str]:
+    return {
+        'X-Shopify-Access-Token': tenant.shopify_access_token,
+        'Content-Type': 'application/json',
+    }
+
+
+def _tier_slug(name: str) -> str:
+    return name.lower().replace(' ', '-')
+
+
+# ==================== Steps ====================
+
+def _step_shop_info(tenant: Tenant, step: ProvisioningStep) -> Dict[str, Any]:
+    """Store the shop's name, timezone and currency on the tenant."""
+    response = get_http_session().get(
+        f"https://{tenant.shopify_domain}/admin/api/{SHOPIFY_REST_VERSION}/shop.json",
+        headers=_rest_headers(tenant),
+        timeout=REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    shop = response.json().get('shop', {})
+
+    settings = dict(tenant.settings or {})
+    general = dict(settings.get('general') or {})
+    general['timezone'] = shop.get('iana_timezone') or general.get('timezone', 'America/Los_Angeles')
+    general['currency'] = shop.get('currency') or general.get('currency', 'USD')
+    settings['general'] = general
+    tenant.settings = settings
+
+    # New tenants are created with the domain as a placeholder name
+    if shop.get('name') and tenant.shop_name == tenant.shopify_domain.replace('.myshopify.com', ''):
+        tenant.shop_name = shop['name']
+
+    db.session.commit()
+    return {'timezone': general['timezone'], 'currency': general['currency']}
+
+
+def _step_webhooks(tenant: Tenant, step: ProvisioningStep) -> Dict[str, Any]:
+    """Register webhook subscriptions; already-registered topics count as done."""
+    from ..api.shopify_oauth import APP_URL
+
+    session = get_http_session()
+    url = f"https://{tenant.shopify_domain}/admin/api/{SHOPIFY_REST_VERSION}/webhooks.json"
+    registered, existing, errors = [], [], []
+
+    for webhook in webhook_subscriptions(APP_URL):
+        response = session.post(url, headers=_rest_headers(tenant), json={'webhook': webhook}, timeout=REQUEST_TIMEOUT)
+        if response.status_code in (200, 201):
+            registered.append(webhook['topic'])
+        elif response.status_code == 422 and 'already been taken' in response.text:
+            existing.append(webhook['topic'])
+        else:
+            errors.append(f"{webhook['topic']}: HTTP {response.status_code}")
+
+    if errors:
+        raise RuntimeError(f'Webhook registration failed: {"; ".join(errors)}')
+    return {'registered': registered, 'existing': existing}
+
+
+def _step_default_tiers(tenant: Tenant, step: ProvisioningStep) -> Dict[str, Any]:
+    """
+    Seed the default tiers for a shop that finished onboarding without any.
+
+    A shop still onboarding gets its tiers from the template it picks
+    (which replaces existing tiers), so seeding here would only leave
+    segments behind for tiers the template deletes.
+    """
+    from .membership_service import MembershipService
+
+    if MembershipTier.query.filter_by(tenant_id=tenant.id).first():
+        return {'created': False}
+    if not (tenant.settings or {}).get('onboarding_complete'):
+        return {'created': False, 'skipped': 'tiers come from the onboarding template'}
+    MembershipService(tenant.id).setup_default_tiers()
+    return {'created': True}
+
+
+def _active_tiers(tenant: Tenant) -> List[MembershipTier]:
+    return MembershipTier.query.filter_by(tenant_id=tenant.id, is_active=True).order_by(
+        MembershipTier.display_order
+    ).all()
+
+
+def _step_segments(tenant: Tenant, step: ProvisioningStep) -> Dict[str, Any]:
+    """Create or update the TradeUp customer segments."""
+    from .shopify_client import ShopifyClient
+
+    tier_data = [{'name': t.name, 'slug': _tier_slug(t.name)} for t in _active_tiers(tenant)]
+    if not tier_data:
+        return {'segments': 0, 'skipped': 'no tiers yet'}
+    result = ShopifyClient(tenant.id).create_tradeup_segments(tier_data)
+    if result.get('errors'):
+        raise RuntimeError(f'Segment setup failed: {result["errors"]}')
+    return {'segments': len(result.get('segments', []))}
+
+
+def _step_membership_products(tenant: Tenant, step: ProvisioningStep) -> Dict[str, Any]:
+    """
+    Refresh existing membership products to match the current tiers.
+
+    Products are published to the storefront, so they are only created
+    when the merchant opts in from settings; on a reinstall, products from
+    the earlier install are brought up to date here.
+    """
+    from .shopify_client import ShopifyClient
+
+    client = ShopifyClient(tenant.id)
+    if not client.get_products_by_tag('tradeup-membership'):
+        return {'skipped': 'no existing membership products'}
+
+    tier_data = [{
+        'name': t.name,
+        'slug': _tier_slug(t.name),
+        'price': float(t.monthly_price) if t.monthly_price else 0,
+        'yearly_price': float(t.yearly_price) if t.yearly_price else None,
+        'description': f'{t.name} Membership',
+        'trade_in_bonus_percent': float(t.bonus_rate * 100) if t.bonus_rate else 0,
+        'cashback_percent': float(t.purchase_cashback_pct) if t.purchase_cashback_pct else 0
+    } for t in _active_tiers(tenant)]
+
+    result = client.create_tradeup_membership_products(tier_data, shop_name=tenant.shop_name or 'TradeUp')
+    if result.get('errors'):
+        raise RuntimeError(f'Membership product sync failed: {result["errors"]}')
+    return {'products': len(result.get('products', []))}
+
+
+def _step_member_metafields(tenant: Tenant, step: ProvisioningStep) -> Dict[str, Any]:
+    """
+    Re-sync metafields for existing members (reinstalls).
+
+    Progress is committed per batch in step.result, so a resumed run
+    continues after the last synced member.
+    """
+    from .membership_service import MembershipService
+    from .shopify_client import ShopifyClient
+
+    progress = dict(step.result or {})
+    last_id = progress.get('last_member_id', 0)
+    progress.setdefault('synced', 0)
+    progress.setdefault('failed', 0)
+    service = None
+
+    while True:
+        members = Member.query.filter(
+            Member.tenant_id == tenant.id,
+            Member.shopify_customer_id.isnot(None),
+            Member.status == 'active',
+            Member.id > last_id
+        ).order_by(Member.id).limit(METAFIELD_BATCH_SIZE).all()
+        if not members:
+            break
+
+        if service is None:
+            service = MembershipService(tenant.id, ShopifyClient(tenant.id))
+        for member in members:
+            try:
+                service.sync_member_metafields_to_shopify(member)
+                progress['synced'] += 1
+            except Exception as e:
+                progress['failed'] += 1
+                logger.warning(f'[Provisioning] Metafield sync failed for member {member.id}: {e}')
+            last_id = member.id
+
+        progress['last_member_id'] = last_id
+        step.result = dict(progress)
+        db.session.commit()
+
+    return progress
+
+
+@dataclass(frozen=True)
+class StepSpec:
+    name: str
+    label: str
+    run: Callable[[Tenant, ProvisioningStep], Dict[str, Any]]
+    depends_on: Tuple[str, ...] = ()
+
+
+STEPS: List[StepSpec] = [
+    StepSpec('shop_info', 'Store details', _step_shop_info),
+    StepSpec('webhooks', 'Order and customer webhooks', _step_webhooks),
+    StepSpec('default_tiers', 'Membership tiers', _step_default_tiers),
+    StepSpec('segments', 'Customer segments', _step_segments, ('default_tiers',)),
+    StepSpec('membership_products', 'Membership products', _step_membership_products, ('default_tiers', 'shop_info')),
+    StepSpec('member_metafields', 'Member metafields', _step_member_metafields, ('default_tiers',)),
+]
+STEPS_BY_NAME = {spec.name: spec for spec in STEPS}
+
+
+# ==================== Pipeline ====================
+
+def _is_stale(row: ProvisioningStep, stale_before: datetime) -> bool:
+    """A 'running' step whose worker died (not updated since stale_before)."""
+    return row.status == 'running' and row.updated_at is not None and row.updated_at < stale_before
+
+
+class ProvisioningPipeline:
+    """Dependency-ordered, resumable install setup for one tenant."""
+
+    def __init__(self, tenant_id: int):
+        self.tenant_id = tenant_id
+
+    def _rows(self) -> Dict[str, ProvisioningStep]:
+        return {row.step: row for row in ProvisioningStep.query.filter_by(tenant_id=self.tenant_id)}
+
+    def ensure_steps(self, reset: bool = False) -> None:
+        """
+        Create missing step rows.
+
+        Args:
+            reset: Mark every step pending again (fresh OAuth install, since
+                uninstalling removes webhooks and may have changed the shop)
+        """
+        rows = self._rows()
+        stale_before = datetime.utcnow() - timedelta(seconds=STALE_STEP_SECONDS)
+        for spec in STEPS:
+            row = rows.get(spec.name)
+            if row is None:
+                db.session.add(ProvisioningStep(tenant_id=self.tenant_id, step=spec.name, status='pending', attempts=0))
+            elif reset and (row.status != 'running' or _is_stale(row, stale_before)):
+                row.status = 'pending'
+                row.error = None
+                row.result = None
+        db.session.commit()
+
+    def _claim(self, name: str) -> bool:
+        # Conditional update so two runners never execute the same step
+        now = datetime.utcnow()
+        claimed = ProvisioningStep.query.filter(
+            ProvisioningStep.tenant_id == self.tenant_id,
+            ProvisioningStep.step == name,
+            db.or_(
+                ProvisioningStep.status.in_(['pending', 'failed']),
+                db.and_(ProvisioningStep.status == 'running',
+                        ProvisioningStep.updated_at < now - timedelta(seconds=STALE_STEP_SECONDS))
+            )
+        ).update({
+            'status': 'running',
+            'attempts': ProvisioningStep.attempts + 1,
+            'started_at': now,
+            'updated_at': now,
+            'error': None
+        }, synchronize_session=False)
+        db.session.commit()
+        return bool(claimed)
+
+    def run_step(self, name: str) -> str:
+        """Claim and run one step; returns its resulting status."""
+        if not self._claim(name):
+            return 'skipped'
+
+        step = ProvisioningStep.query.filter_by(tenant_id=self.tenant_id, step=name).first()
+        tenant = Tenant.query.get(self.tenant_id)
+        try:
+            result = STEPS_BY_NAME[name].run(tenant, step)
+        except Exception as e:
+            db.session.rollback()
+            step = ProvisioningStep.query.filter_by(tenant_id=self.tenant_id, step=name).first()
+            step.status = 'failed'
+            step.error = str(e)[:2000]
+            step.finished_at = datetime.utcnow()
+            db.session.commit()
+            logger.warning(f'[Provisioning] Tenant {self.tenant_id} step {name} failed: {e}')
+            return 'failed'
+
+        step.status = 'done'
+        step.result = result
+        step.finished_at = datetime.utcnow()
+        db.session.commit()
+        return 'done'
+
+    def _ready(self, attempted: set) -> List[str]:
+        rows = self._rows()
+        stale_before = datetime.utcnow() - timedelta(seconds=STALE_STEP_SECONDS)
+        return [
+            spec.name for spec in STEPS
+            if spec.name not in attempted
+            and rows.get(spec.name) is not None
+            and (rows[spec.name].status in ('pending', 'failed') or _is_stale(rows[spec.name], stale_before))
+            and all(rows.get(dep) is not None and rows[dep].status == 'done' for dep in spec.depends_on)
+        ]
+
+    def run(self, app=None, max_workers: int = PROVISIONING_WORKERS) -> Dict[str, Any]:
+        """
+        Run every step that is not done, each at most once per call.
+
+        Steps whose dependencies are done run concurrently; a step whose
+        dependency failed stays pending for the next run.
+
+        Args:
+            app: Flask app for worker threads; steps run on the calling
+                thread when omitted (and always under TESTING)
+            max_workers: Concurrent steps
+
+        Returns:
+            progress()
+        """
+        attempted: set = set()
+
+        if app is None or app.config.get('TESTING'):
+            while True:
+                ready = self._ready(attempted)
+                if not ready:
+                    break
+                for name in ready:
+                    attempted.add(name)
+                    self.run_step(name)
+            return self.progress()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='provisioning') as executor:
+            running = {}
+            while True:
+                for name in self._ready(attempted):
+                    attempted.add(name)
+                    running[executor.submit(self._run_step_in_context, app, name)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                # End the read transaction so the workers' commits are visible
+                db.session.commit()
+
+        return self.progress()
+
+    def _run_step_in_context(self, app, name: str) -> str:
+        with app.app_context():
+            try:
+                return self.run_step(name)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f'[Provisioning] Tenant {self.tenant_id} step {name} crashed: {e}')
+                return 'failed'
+            finally:
+                db.session.remove()
+
+    def progress(self) -> Dict[str, Any]:
+        """Step states and overall status for the admin UI."""
+        db.session.expire_all()
+        rows = self._rows()
+        steps = []
+        for spec in STEPS:
+            row = rows.get(spec.name)
+            entry = row.to_dict() if row else {'step': spec.name, 'status': 'pending'}
+            entry['label'] = spec.label
+            entry['depends_on'] = list(spec.depends_on)
+            steps.append(entry)
+
+        statuses = [s['status'] for s in steps]
+        done = statuses.count('done')
+        if done == len(steps):
+            status = 'complete'
+        elif 'running' in statuses:
+            status = 'running'
+        elif 'failed' in statuses:
+            status = 'failed'
+        else:
+            status = 'pending'
+
+        return {
+            'tenant_id': self.tenant_id,
+            'status': status,
+            'completed': done,
+            'total': len(steps),
+            'percent': round(100 * done / len(steps)),
+            'steps': steps
+        }
+
+
+def start_provisioning(tenant_id: int, reset: bool = False) -> Dict[str, Any]:
+    """
+    Create the tenant's step rows and run the pipeline in the background.
+
+    Returns the initial progress immediately (under TESTING the pipeline
+    runs inline and the final progress is returned).
+    """
+    app = current_app._get_current_object()
+    pipeline = ProvisioningPipeline(tenant_id)
+    pipeline.ensure_steps(reset=reset)
+
+    if app.config.get('TESTING'):
+        return pipeline.run(app)
+
+    def _run():
+        with app.app_context():
+            try:
+                pipeline.run(app)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f'[Provisioning] Pipeline failed for tenant {tenant_id}: {e}')
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=_run, name=f'provisioning-{tenant_id}', daemon=True).start()
+    return pipeline.progress()
@@ -3,20 +3,241 @@ Klaviyo Integration Service for TradeUp.
 
 Syncs member data and loyalty events to Klaviyo for email marketing automation.
 
+All requests share one pooled HTTP session per process. Full member syncs
+use bulk profile import jobs (up to 10,000 profiles per job) built from a
+streaming member query, and only send members whose synced attributes
+changed since the last accepted job. Loyalty events from the track_*
+helpers are buffered per tenant and sent as bulk event jobs.
+
 API Documentation: https://developers.klaviyo.com/en/reference/api_overview
 API Revision: 2024-10-15
 """
 
+import atexit
+import hashlib
+import json
+import threading
+import time
 import requests
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator, Tuple
 from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from ..extensions import db
-from ..models.member import Member
+from ..middleware.telemetry import instrument_session
+from ..models.member import Member, MembershipTier
+from ..models.klaviyo_profile_sync import KlaviyoProfileSync
+from ..models.promotions import MemberCreditBalance
 from ..models.tenant import Tenant
 
+# Klaviyo bulk import limits: 10,000 profiles and 5 MB per job
+BULK_IMPORT_MAX_PROFILES = 10000
+BULK_IMPORT_MAX_BYTES = 4_500_000
+
+# Bulk event jobs accept up to 1,000 profiles (each with its events) per job
+EVENT_BULK_MAX_PROFILES = 1000
+
+# Buffered events flush at this many events or this age (seconds), whichever comes first
+EVENT_BUFFER_FLUSH_SIZE = 100
+EVENT_BUFFER_MAX_AGE = 30
+
+# Oldest events are dropped beyond this many unsent events per tenant
+EVENT_BUFFER_MAX_PENDING = 5000
+
+# Connection pool shared by every KlaviyoService in the process
+HTTP_POOL_SIZE = 10
+
+# Standard Klaviyo profile attributes; everything else goes under 'properties'
+STANDARD_PROFILE_ATTRIBUTES = ('email', 'first_name', 'last_name', 'phone_number')
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+class KlaviyoRetry(Retry):
+    """
+    Retries GET and PATCH on rate limits and gateway errors, POST only on 429.
+
+    A 429 means Klaviyo rejected the request unprocessed; after a 5xx or a
+    dropped connection a POST (job or event create) may already have been
+    applied, so it is not resent.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method == 'POST' and status_code == 429:
+            return bool(self.total)
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def get_http_session() -> requests.Session:
+    """Pooled session with retries on rate limits and gateway errors."""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                retry = KlaviyoRetry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 502, 503, 504),
+                    allowed_methods=frozenset({'GET', 'PATCH'}),
+                    respect_retry_after_header=True,
+                )
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+                session.mount('https://', adapter)
+                _http_session = instrument_session(session, 'klaviyo')
+    return _http_session
+
+
+def member_profile_properties(source, store_credit: Optional[Decimal] = None) -> Dict[str, Any]:
+    """
+    Flat profile properties for a member.
+
+    Works on a Member instance or a column-projected row with the same
+    attribute names plus tier_name (and store_credit when not passed).
+    """
+    name_parts = (source.name or '').split()
+    tier_name = getattr(source, 'tier_name', None)
+    if tier_name is None and isinstance(source, Member) and source.tier:
+        tier_name = source.tier.name
+    if store_credit is None:
+        store_credit = getattr(source, 'store_credit', None)
+
+    properties = {
+        'email': source.email,
+        'first_name': name_parts[0] if name_parts else None,
+        'last_name': ' '.join(name_parts[1:]) if len(name_parts) > 1 else None,
+        'phone_number': source.phone,
+        # Custom properties
+        'tradeup_member_number': source.member_number,
+        'tradeup_tier': tier_name,
+        'tradeup_status': source.status,
+        'tradeup_points_balance': source.points_balance or 0,
+        'tradeup_store_credit': float(store_credit or 0),
+        'tradeup_trade_in_count': source.total_trade_ins or 0,
+        'tradeup_referral_code': source.referral_code,
+        'tradeup_member_since': source.created_at.isoformat() if source.created_at else None,
+    }
+    return {k: v for k, v in properties.items() if v is not None}
+
+
+def profile_attributes(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """Split flat properties into Klaviyo standard attributes and custom 'properties'."""
+    attributes = {k: properties[k] for k in STANDARD_PROFILE_ATTRIBUTES if k in properties}
+    custom = {k: v for k, v in properties.items() if k not in STANDARD_PROFILE_ATTRIBUTES}
+    if custom:
+        attributes['properties'] = custom
+    return attributes
+
+
+def _attributes_hash(attributes: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(attributes, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class KlaviyoEventBuffer:
+    """
+    Per-tenant, in-process buffer of loyalty events awaiting a bulk send.
+
+    Bounded: beyond EVENT_BUFFER_MAX_PENDING unsent events per tenant the
+    oldest are dropped (with a warning) so an unreachable Klaviyo account
+    cannot grow worker memory without limit.
+
+    Each worker process holds its own buffer, so each also runs its own
+    daemon thread that flushes every EVENT_BUFFER_MAX_AGE seconds, and
+    flushes once more when the worker exits. Events still buffered when a
+    worker is killed outright (SIGKILL, OOM) are lost.
+    """
+
+    def __init__(self):
+        self._events: Dict[int, List[Dict[str, Any]]] = {}
+        self._oldest: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def start_flusher(self, app) -> None:
+        """Start this process's background flush thread (once; not under TESTING)."""
+        if self._flusher is not None or app.config.get('TESTING'):
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, args=(app,), name='klaviyo-event-flusher', daemon=True
+                )
+                self._flusher.start()
+                atexit.register(self._flush_at_exit, app)
+
+    def _flush_loop(self, app) -> None:
+        while True:
+            time.sleep(EVENT_BUFFER_MAX_AGE)
+            try:
+                with app.app_context():
+                    flush_klaviyo_events()
+            except Exception as e:
+                app.logger.error(f"Klaviyo event flush failed: {e}")
+
+    def _flush_at_exit(self, app) -> None:
+        """Send what is left when the worker shuts down gracefully."""
+        if not self.tenants():
+            return
+        try:
+            with app.app_context():
+                flush_klaviyo_events()
+        except Exception as e:
+            app.logger.error(f"Klaviyo event flush at exit failed: {e}")
+
+    def add(self, tenant_id: int, event: Dict[str, Any]) -> bool:
+        """Queue an event; returns True when the tenant's buffer is due for a flush."""
+        with self._lock:
+            events = self._events.setdefault(tenant_id, [])
+            if not events:
+                self._oldest[tenant_id] = time.monotonic()
+            events.append(event)
+            self._trim(tenant_id)
+            return (
+                len(events) >= EVENT_BUFFER_FLUSH_SIZE
+                or time.monotonic() - self._oldest[tenant_id] >= EVENT_BUFFER_MAX_AGE
+            )
+
+    def drain(self, tenant_id: int) -> List[Dict[str, Any]]:
+        """Take every queued event for a tenant."""
+        with self._lock:
+            self._oldest.pop(tenant_id, None)
+            return self._events.pop(tenant_id, [])
+
+    def requeue(self, tenant_id: int, events: List[Dict[str, Any]]) -> None:
+        """Put unsent events back at the front of the queue."""
+        with self._lock:
+            self._events[tenant_id] = events + self._events.get(tenant_id, [])
+            self._oldest.setdefault(tenant_id, time.monotonic())
+            self._trim(tenant_id)
+
+    def _trim(self, tenant_id: int) -> None:
+        events = self._events[tenant_id]
+        overflow = len(events) - EVENT_BUFFER_MAX_PENDING
+        if overflow > 0:
+            del events[:overflow]
+            current_app.logger.warning(f"Klaviyo event buffer full for tenant {tenant_id}, dropped {overflow} events")
+
+    def tenants(self) -> List[int]:
+        """Tenants with queued events."""
+        with self._lock:
+            return [tenant_id for tenant_id, events in self._events.items() if events]
+
+    def pending(self, tenant_id: int) -> int:
+        with self._lock:
+            return len(self._events.get(tenant_id, []))
+
+
+_event_buffer = KlaviyoEventBuffer()
+
+
+def get_event_buffer() -> KlaviyoEventBuffer:
+    """Process-wide Klaviyo event buffer."""
+    return _event_buffer
+
 
 class KlaviyoService:
     """
@@ -82,6 +303,11 @@ class KlaviyoService:
         """Check if Klaviyo integration is enabled."""
         return bool(self.api_key) and self.settings.get('enabled', False)
 
+    @property
+    def session(self) -> requests.Session:
+        """Pooled HTTP session shared across services."""
+        return get_http_session()
+
     # ==================== CONNECTION TEST ====================
 
     def test_connection(self) -> Dict[str, Any]:
@@ -99,7 +325,7 @@ class KlaviyoService:
 
         try:
             # Try to get account info
-            response = requests.get(
+            response = self.session.get(
                 f"{self.BASE_URL}/accounts/",
                 headers=self._get_headers(),
                 timeout=10
@@ -141,39 +367,21 @@ class KlaviyoService:
         if not self.is_enabled():
             return {'success': False, 'error': 'Klaviyo not enabled'}
 
-        properties = {
-            'email': member.email,
-            'first_name': member.name.split()[0] if member.name else None,
-            'last_name': ' '.join(member.name.split()[1:]) if member.name and len(member.name.split()) > 1 else None,
-            'phone_number': member.phone,
-            # Custom properties
-            'tradeup_member_number': member.member_number,
-            'tradeup_tier': member.tier.name if member.tier else None,
-            'tradeup_status': member.status,
-            'tradeup_points_balance': member.points_balance or 0,
-            'tradeup_store_credit': float(member.store_credit_balance or 0),
-            'tradeup_total_spent': float(member.total_spent or 0),
-            'tradeup_order_count': member.order_count or 0,
-            'tradeup_referral_code': member.referral_code,
-            'tradeup_member_since': member.created_at.isoformat() if member.created_at else None,
-        }
+        properties = member_profile_properties(member, store_credit=self._store_credit(member))
 
         # Add extra properties if provided
         if extra_properties:
-            properties.update(extra_properties)
-
-        # Remove None values
-        properties = {k: v for k, v in properties.items() if v is not None}
+            properties.update({k: v for k, v in extra_properties.items() if v is not None})
 
         payload = {
             "data": {
                 "type": "profile",
-                "attributes": properties
+                "attributes": profile_attributes(properties)
             }
         }
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.BASE_URL}/profiles/",
                 headers=self._get_headers(),
                 json=payload,
@@ -202,11 +410,16 @@ class KlaviyoService:
             current_app.logger.error(f"Klaviyo profile sync failed: {e}")
             return {'success': False, 'error': str(e)}
 
+    def _store_credit(self, member: Member) -> Decimal:
+        """Member's available store credit from the cached balance row."""
+        balance = MemberCreditBalance.query.filter_by(member_id=member.id).first()
+        return balance.available_balance if balance else Decimal('0')
+
     def _update_profile_by_email(self, email: str, properties: Dict) -> Dict[str, Any]:
         """Update profile by email lookup."""
         # First, find profile by email
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.BASE_URL}/profiles/",
                 headers=self._get_headers(),
                 params={'filter': f'equals(email,"{email}")'},
@@ -231,12 +444,12 @@ class KlaviyoService:
             "data": {
                 "type": "profile",
                 "id": profile_id,
-                "attributes": properties
+                "attributes": profile_attributes(properties)
             }
         }
 
         try:
-            response = requests.patch(
+            response = self.session.patch(
                 f"{self.BASE_URL}/profiles/{profile_id}/",
                 headers=self._get_headers(),
                 json=payload,
@@ -282,43 +495,27 @@ class KlaviyoService:
         if not self.is_enabled():
             return {'success': False, 'error': 'Klaviyo not enabled'}
 
-        # Check if this event type should be synced
-        sync_events = self.settings.get('sync_on_events', [])
-        event_key = event_name.replace('tradeup_', '')
-        if sync_events and event_key not in sync_events:
+        if not self._should_sync_event(event_name):
             return {'success': True, 'message': 'Event type not configured for sync', 'skipped': True}
 
-        payload = {
+        attributes = self._event_attributes(event_name, properties, unique_id)
+        attributes['profile'] = {
             "data": {
-                "type": "event",
+                "type": "profile",
                 "attributes": {
-                    "metric": {
-                        "data": {
-                            "type": "metric",
-                            "attributes": {
-                                "name": event_name
-                            }
-                        }
-                    },
-                    "profile": {
-                        "data": {
-                            "type": "profile",
-                            "attributes": {
-                                "email": email
-                            }
-                        }
-                    },
-                    "properties": properties,
-                    "time": datetime.utcnow().isoformat() + "Z"
+                    "email": email
                 }
             }
         }
-
-        if unique_id:
-            payload['data']['attributes']['unique_id'] = unique_id
+        payload = {
+            "data": {
+                "type": "event",
+                "attributes": attributes
+            }
+        }
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.BASE_URL}/events/",
                 headers=self._get_headers(),
                 json=payload,
@@ -342,11 +539,142 @@ class KlaviyoService:
             current_app.logger.error(f"Klaviyo event tracking failed: {e}")
             return {'success': False, 'error': str(e)}
 
+    def _should_sync_event(self, event_name: str) -> bool:
+        """Whether the tenant's sync_on_events setting includes this event."""
+        sync_events = self.settings.get('sync_on_events', [])
+        return not sync_events or event_name.replace('tradeup_', '') in sync_events
+
+    @staticmethod
+    def _event_attributes(event_name: str, properties: Dict[str, Any], unique_id: str = None) -> Dict[str, Any]:
+        """Event attributes (metric, properties, time, unique_id) without the profile."""
+        attributes = {
+            "metric": {
+                "data": {
+                    "type": "metric",
+                    "attributes": {
+                        "name": event_name
+                    }
+                }
+            },
+            "properties": properties,
+            "time": datetime.utcnow().isoformat() + "Z"
+        }
+        if unique_id:
+            attributes['unique_id'] = unique_id
+        return attributes
+
+    def queue_event(
+        self,
+        event_name: str,
+        email: str,
+        properties: Dict[str, Any],
+        unique_id: str = None
+    ) -> Dict[str, Any]:
+        """
+        Buffer an event for the next bulk send.
+
+        The tenant's buffer is flushed inline once it reaches
+        EVENT_BUFFER_FLUSH_SIZE events or its oldest event is
+        EVENT_BUFFER_MAX_AGE seconds old; the background flusher sends
+        whatever is left over.
+
+        Returns:
+            Dict with queue status
+        """
+        if not self.is_enabled():
+            return {'success': False, 'error': 'Klaviyo not enabled'}
+
+        if not self._should_sync_event(event_name):
+            return {'success': True, 'message': 'Event type not configured for sync', 'skipped': True}
+
+        event = {'email': email, 'attributes': self._event_attributes(event_name, properties, unique_id)}
+        buffer = get_event_buffer()
+        buffer.start_flusher(current_app._get_current_object())
+        if buffer.add(self.tenant_id, event):
+            self.flush_events()
+
+        return {'success': True, 'event': event_name, 'queued': True}
+
+    def flush_events(self) -> Dict[str, Any]:
+        """
+        Send every buffered event for this tenant as bulk event jobs.
+
+        Events are grouped per profile; jobs that fail are put back in the
+        buffer for the next flush.
+
+        Returns:
+            Dict with sent/failed event counts
+        """
+        buffer = get_event_buffer()
+        events = buffer.drain(self.tenant_id)
+        if not events:
+            return {'success': True, 'sent': 0, 'failed': 0}
+
+        if not self.is_enabled():
+            # Integration was disconnected after the events were queued
+            return {'success': False, 'sent': 0, 'failed': 0, 'dropped': len(events)}
+
+        by_email: Dict[str, List[Dict[str, Any]]] = {}
+        for event in events:
+            by_email.setdefault(event['email'], []).append(event)
+        emails = list(by_email)
+
+        sent, failed = 0, []
+        for start in range(0, len(emails), EVENT_BULK_MAX_PROFILES):
+            chunk = emails[start:start + EVENT_BULK_MAX_PROFILES]
+            chunk_events = [event for email in chunk for event in by_email[email]]
+            payload = {
+                "data": {
+                    "type": "event-bulk-create-job",
+                    "attributes": {
+                        "events-bulk-create": {
+                            "data": [
+                                {
+                                    "type": "event-bulk-create",
+                                    "attributes": {
+                                        "profile": {
+                                            "data": {"type": "profile", "attributes": {"email": email}}
+                                        },
+                                        "events": {
+                                            "data": [
+                                                {"type": "event", "attributes": event['attributes']}
+                                                for event in by_email[email]
+                                            ]
+                                        }
+                                    }
+                                }
+                                for email in chunk
+                            ]
+                        }
+                    }
+                }
+            }
+
+            try:
+                response = self.session.post(
+                    f"{self.BASE_URL}/event-bulk-create-jobs/",
+                    headers=self._get_headers(),
+                    json=payload,
+                    timeout=30
+                )
+                if response.status_code in [200, 201, 202]:
+                    sent += len(chunk_events)
+                    continue
+                current_app.logger.error(f"Klaviyo bulk event job failed: {response.status_code} {response.text}")
+            except (requests.exceptions.RequestException, ValueError) as e:
+                current_app.logger.error(f"Klaviyo bulk event job failed: {e}")
+            failed.extend(chunk_events)
+
+        if failed:
+            buffer.requeue(self.tenant_id, failed)
+
+        return {'success': not failed, 'sent': sent, 'failed': len(failed)}
+
     # ==================== LOYALTY EVENTS ====================
 
     def track_member_enrolled(self, member: Member) -> Dict[str, Any]:
         """Track member enrollment event."""
-        return self.track_event(
+        return self.queue_event(
             event_name='tradeup_member_enrolled',
             email=member.email,
             properties={
@@ -366,7 +694,7 @@ class KlaviyoService:
         reason: str = None
     ) -> Dict[str, Any]:
         """Track tier upgrade/change event."""
-        return self.track_event(
+        return self.queue_event(
             event_name='tradeup_tier_upgraded',
             email=member.email,
             properties={
@@ -375,7 +703,7 @@ class KlaviyoService:
                 'new_tier': new_tier,
                 'reason': reason,
                 'points_balance': member.points_balance or 0,
-                'store_credit': float(member.store_credit_balance or 0)
+                'store_credit': float(self._store_credit(member))
             },
             unique_id=f'tier_{member.member_number}_{datetime.utcnow().strftime("%Y%m%d%H%M%S")}'
         )
@@ -388,7 +716,7 @@ class KlaviyoService:
         item_count: int
     ) -> Dict[str, Any]:
         """Track trade-in completion event."""
-        return self.track_event(
+        return self.queue_event(
             event_name='tradeup_trade_in_completed',
             email=member.email,
             properties={
@@ -397,7 +725,7 @@ class KlaviyoService:
                 'credit_amount': float(credit_amount),
                 'item_count': item_count,
                 'tier': member.tier.name if member.tier else 'none',
-                'total_credit': float(member.store_credit_balance or 0)
+                'total_credit': float(self._store_credit(member))
             },
             unique_id=f'tradein_{trade_in_id}'
         )
@@ -410,7 +738,7 @@ class KlaviyoService:
         description: str = None
     ) -> Dict[str, Any]:
         """Track store credit issued event."""
-        return self.track_event(
+        return self.queue_event(
             event_name='tradeup_credit_issued',
             email=member.email,
             properties={
@@ -418,7 +746,7 @@ class KlaviyoService:
                 'amount': float(amount),
                 'event_type': event_type,
                 'description': description,
-                'new_balance': float(member.store_credit_balance or 0),
+                'new_balance': float(self._store_credit(member)),
                 'tier': member.tier.name if member.tier else 'none'
             }
         )
@@ -431,7 +759,7 @@ class KlaviyoService:
         new_balance: int
     ) -> Dict[str, Any]:
         """Track points earned event."""
-        return self.track_event(
+        return self.queue_event(
             event_name='tradeup_points_earned',
             email=member.email,
             properties={
@@ -450,7 +778,7 @@ class KlaviyoService:
         reward_amount: Decimal
     ) -> Dict[str, Any]:
         """Track successful referral event."""
-        return self.track_event(
+        return self.queue_event(
             event_name='tradeup_referral_success',
             email=referrer.email,
             properties={
@@ -469,7 +797,7 @@ class KlaviyoService:
         days_until_expiry: int
     ) -> Dict[str, Any]:
         """Track points expiring warning event."""
-        return self.track_event(
+        return self.queue_event(
             event_name='tradeup_points_expiring',
             email=member.email,
             properties={
@@ -489,7 +817,7 @@ class KlaviyoService:
             return {'success': False, 'error': 'Klaviyo not enabled'}
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.BASE_URL}/lists/",
                 headers=self._get_headers(),
                 timeout=10
@@ -535,7 +863,7 @@ class KlaviyoService:
         }
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.BASE_URL}/lists/{list_id}/relationships/profiles/",
                 headers=self._get_headers(),
                 json=payload,
@@ -558,54 +886,201 @@ class KlaviyoService:
 
     # ==================== BULK OPERATIONS ====================
 
-    def sync_all_members(self, batch_size: int = 100) -> Dict[str, Any]:
+    def _iter_member_rows(self, batch_size: int) -> Iterator[List[Any]]:
+        """Stream active members in id order, batch_size column-projected rows at a time."""
+        last_id = 0
+        while True:
+            rows = db.session.query(
+                Member.id, Member.email, Member.name, Member.phone, Member.member_number,
+                Member.status, Member.points_balance, Member.total_trade_ins,
+                Member.referral_code, Member.created_at,
+                MembershipTier.name.label('tier_name'),
+                MemberCreditBalance.available_balance.label('store_credit'),
+            ).outerjoin(
+                MembershipTier, MembershipTier.id == Member.tier_id
+            ).outerjoin(
+                MemberCreditBalance, MemberCreditBalance.member_id == Member.id
+            ).filter(
+                Member.tenant_id == self.tenant_id,
+                Member.status == 'active',
+                Member.id > last_id
+            ).order_by(Member.id).limit(batch_size).all()
+
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1].id
+
+    def sync_all_members(self, batch_size: int = 1000, force: bool = False) -> Dict[str, Any]:
         """
-        Sync all members to Klaviyo.
+        Sync all active members to Klaviyo with bulk profile import jobs.
+
+        Members are read batch_size at a time and compared with the hash of
+        what was last sent; only changed members are queued. Each job holds
+        up to BULK_IMPORT_MAX_PROFILES profiles (and stays under the 5 MB
+        payload limit). Hashes are recorded once Klaviyo accepts the job.
 
         Args:
-            batch_size: Number of members to process at a time
+            batch_size: Members read from the database per query
+            force: Send every member, ignoring change detection
 
         Returns:
-            Sync results summary
+            Sync results summary with the submitted job IDs
         """
         if not self.is_enabled():
             return {'success': False, 'error': 'Klaviyo not enabled'}
 
         results = {
             'total': 0,
+            'changed': 0,
+            'unchanged': 0,
             'synced': 0,
+            'jobs': [],
             'errors': []
         }
 
-        members = Member.query.filter_by(
-            tenant_id=self.tenant_id,
-            status='active'
-        ).all()
-
-        results['total'] = len(members)
-
-        for member in members:
-            try:
-                result = self.upsert_profile(member)
-                if result.get('success'):
-                    results['synced'] += 1
-                else:
-                    results['errors'].append({
-                        'member_id': member.id,
-                        'error': result.get('error')
-                    })
-            except Exception as e:
-                results['errors'].append({
-                    'member_id': member.id,
-                    'error': str(e)
-                })
+        pending: List[Tuple[int, str, Dict[str, Any]]] = []
+        pending_bytes = 0
+
+        for rows in self._iter_member_rows(max(1, batch_size)):
+            hashes = dict(db.session.query(
+                KlaviyoProfileSync.member_id, KlaviyoProfileSync.properties_hash
+            ).filter(
+                KlaviyoProfileSync.tenant_id == self.tenant_id,
+                KlaviyoProfileSync.member_id.in_([row.id for row in rows])
+            ).all())
+
+            for row in rows:
+                results['total'] += 1
+                attributes = profile_attributes(member_profile_properties(row))
+                digest = _attributes_hash(attributes)
+                if not force and hashes.get(row.id) == digest:
+                    results['unchanged'] += 1
+                    continue
+
+                results['changed'] += 1
+                profile = {'type': 'profile', 'attributes': attributes}
+                size = len(json.dumps(profile, default=str))
+                if pending and (len(pending) >= BULK_IMPORT_MAX_PROFILES or pending_bytes + size > BULK_IMPORT_MAX_BYTES):
+                    self._submit_import_job(pending, results)
+                    pending, pending_bytes = [], 0
+                pending.append((row.id, digest, profile))
+                pending_bytes += size
+
+        if pending:
+            self._submit_import_job(pending, results)
 
         return {
             'success': len(results['errors']) == 0,
             **results
         }
 
+    def _submit_import_job(self, pending: List[Tuple[int, str, Dict[str, Any]]], results: Dict[str, Any]) -> None:
+        """Submit one bulk profile import job and record the hashes it carried."""
+        payload = {
+            "data": {
+                "type": "profile-bulk-import-job",
+                "attributes": {
+                    "profiles": {
+                        "data": [profile for _, _, profile in pending]
+                    }
+                }
+            }
+        }
+        list_id = self.settings.get('list_id')
+        if list_id:
+            payload['data']['relationships'] = {
+                "lists": {"data": [{"type": "list", "id": list_id}]}
+            }
+
+        try:
+            response = self.session.post(
+                f"{self.BASE_URL}/profile-bulk-import-jobs/",
+                headers=self._get_headers(),
+                json=payload,
+                timeout=60
+            )
+        except requests.exceptions.RequestException as e:
+            current_app.logger.error(f"Klaviyo bulk import failed: {e}")
+            results['errors'].append({'members': len(pending), 'error': str(e)})
+            return
+
+        if response.status_code not in [200, 201, 202]:
+            results['errors'].append({
+                'members': len(pending),
+                'error': f'API error: {response.status_code}',
+                'details': response.text
+            })
+            return
+
+        job_id = response.json().get('data', {}).get('id')
+        self._record_synced(pending, job_id)
+        results['jobs'].append(job_id)
+        results['synced'] += len(pending)
+
+    def _record_synced(self, pending: List[Tuple[int, str, Dict[str, Any]]], job_id: Optional[str]) -> None:
+        """Upsert the last synced hash for every member in an accepted job."""
+        now = datetime.utcnow()
+        existing = {
+            state.member_id: state
+            for state in KlaviyoProfileSync.query.filter(
+                KlaviyoProfileSync.tenant_id == self.tenant_id,
+                KlaviyoProfileSync.member_id.in_([member_id for member_id, _, _ in pending])
+            )
+        }
+        for member_id, digest, _ in pending:
+            state = existing.get(member_id)
+            if state is None:
+                db.session.add(KlaviyoProfileSync(
+                    tenant_id=self.tenant_id, member_id=member_id,
+                    properties_hash=digest, job_id=job_id, synced_at=now
+                ))
+            else:
+                state.properties_hash = digest
+                state.job_id = job_id
+                state.synced_at = now
+        db.session.commit()
+
+    def get_import_job(self, job_id: str) -> Dict[str, Any]:
+        """Status and counts of a bulk profile import job."""
+        if not self.is_enabled():
+            return {'success': False, 'error': 'Klaviyo not enabled'}
+
+        try:
+            response = self.session.get(
+                f"{self.BASE_URL}/profile-bulk-import-jobs/{job_id}/",
+                headers=self._get_headers(),
+                timeout=10
+            )
+
+            if response.status_code == 200:
+                attributes = response.json().get('data', {}).get('attributes', {})
+                return {
+                    'success': True,
+                    'job_id': job_id,
+                    'status': attributes.get('status'),
+                    'total_count': attributes.get('total_count'),
+                    'completed_count': attributes.get('completed_count'),
+                    'failed_count': attributes.get('failed_count'),
+                }
+            else:
+                return {
+                    'success': False,
+                    'error': f'API error: {response.status_code}'
+                }
+
+        except requests.exceptions.RequestException as e:
+            return {'success': False, 'error': str(e)}
+
 
 def get_klaviyo_service(tenant_id: int) -> KlaviyoService:
     """Get Klaviyo service for a tenant."""
     return KlaviyoService(tenant_id)
+
+
+def flush_klaviyo_events() -> Dict[int, Dict[str, Any]]:
+    """Flush this process's buffered events for every tenant."""
+    return {
+        tenant_id: KlaviyoService(tenant_id).flush_events()
+        for tenant_id in get_event_buffer().tenants()
+    }
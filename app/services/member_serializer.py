@@ -0,0 +1,108 @@
+"""
+Bulk member serialization.
+
+Renders a page of members from a single column-projected query instead of
+loading full Member models. Tier payloads come from the cached tier map, so
+a list page costs the page query (plus the pagination count) and nothing
+per member.
+
+Usage:
+    from app.services.member_serializer import project_member_columns, serialize_members
+
+    rows = project_member_columns(query).order_by(Member.created_at.desc()).all()
+    members = serialize_members(tenant_id, rows, include_stats=True)
+"""
+import logging
+from typing import Optional, Dict, Any, List, Iterable
+
+from ..models import Member, MembershipTier
+from .tier_cache_service import get_cached_tier_map, invalidate_tier_cache
+
+logger = logging.getLogger(__name__)
+
+# Columns read by Member.serialize_columns
+MEMBER_LIST_COLUMNS = (
+    Member.id,
+    Member.tier_id,
+    Member.member_number,
+    Member.shopify_customer_id,
+    Member.shopify_customer_gid,
+    Member.partner_customer_id,
+    Member.email,
+    Member.name,
+    Member.phone,
+    Member.status,
+    Member.membership_start_date,
+    Member.created_at,
+    Member.total_trade_ins,
+    Member.total_trade_value,
+    Member.total_bonus_earned,
+    Member.last_trade_in_at,
+    Member.points_balance,
+    Member.lifetime_points_earned,
+    Member.lifetime_points_spent,
+    Member.birthday,
+)
+
+
+def project_member_columns(query):
+    """
+    Restrict a Member query to the columns needed for list serialization.
+
+    Args:
+        query: Member query with filters applied
+
+    Returns:
+        Query yielding lightweight rows instead of Member instances
+    """
+    return query.with_entities(*MEMBER_LIST_COLUMNS)
+
+
+def _resolve_tiers(tenant_id: int, tier_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Tier dicts for the given IDs, reloading once if the cache is stale."""
+    tier_map = get_cached_tier_map(tenant_id)
+    missing = {tid for tid in tier_ids if tid is not None and tid not in tier_map}
+    if missing:
+        # Tier created since the cache was filled - refresh and fall back to a direct read
+        logger.debug('Tier cache missing %s for tenant=%d, refreshing', sorted(missing), tenant_id)
+        invalidate_tier_cache(tenant_id)
+        tier_map = get_cached_tier_map(tenant_id)
+        still_missing = missing - tier_map.keys()
+        if still_missing:
+            for tier in MembershipTier.query.filter(MembershipTier.id.in_(still_missing)).all():
+                tier_map[tier.id] = tier.to_dict()
+    return tier_map
+
+
+def serialize_members(
+    tenant_id: int,
+    rows: List[Any],
+    include_stats: bool = False,
+    tier_map: Optional[Dict[int, Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Serialize member rows into the same shape as Member.to_dict().
+
+    Args:
+        tenant_id: Tenant the rows belong to
+        rows: Rows from project_member_columns() (Member instances also work)
+        include_stats: Include the nested stats block
+        tier_map: Optional pre-resolved tier_id -> tier dict
+
+    Returns:
+        List of member dicts
+    """
+    if not rows:
+        return []
+
+    if tier_map is None:
+        tier_map = _resolve_tiers(tenant_id, {row.tier_id for row in rows})
+
+    return [
+        Member.serialize_columns(
+            row,
+            tier_data=tier_map.get(row.tier_id) if row.tier_id is not None else None,
+            include_stats=include_stats
+        )
+        for row in rows
+    ]
@@ -22,18 +22,16 @@ Configuration:
 - SENDGRID_API_KEY: SendGrid API key
 - Tenant settings.notifications for per-tenant customization
 """
+import importlib.util
 import os
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from flask import current_app
 
-# SendGrid import with fallback
-try:
-    from sendgrid import SendGridAPIClient
-    from sendgrid.helpers.mail import Mail, Email, To, Content, Personalization
-    SENDGRID_AVAILABLE = True
-except ImportError:
-    SENDGRID_AVAILABLE = False
+# SendGrid is optional and imported on first send; only check it is installed here
+SENDGRID_AVAILABLE = importlib.util.find_spec('sendgrid') is not None
+
+from ..middleware.telemetry import outbound_timer
 
 
 class NotificationService:
@@ -478,7 +476,7 @@ The {shop_name} Team
         self.default_from_email = os.getenv('SENDGRID_FROM_EMAIL', 'noreply@tradeup.app')
         self.default_from_name = os.getenv('SENDGRID_FROM_NAME', 'TradeUp')
 
-    def _get_client(self) -> Optional['SendGridAPIClient']:
+    def _get_client(self) -> Optional[Any]:
         """Get SendGrid client if available."""
         if not SENDGRID_AVAILABLE:
             current_app.logger.warning("SendGrid not installed. Run: pip install sendgrid")
@@ -488,6 +486,7 @@ The {shop_name} Team
             current_app.logger.warning("SENDGRID_API_KEY not configured")
             return None
 
+        from sendgrid import SendGridAPIClient
         return SendGridAPIClient(api_key=self.api_key)
 
     def _get_tenant_settings(self, tenant_id: int) -> Dict[str, Any]:
@@ -581,6 +580,8 @@ The {shop_name} Team
             return {'success': False, 'error': 'SendGrid not configured'}
 
         try:
+            from sendgrid.helpers.mail import Mail, Email, To, Content
+
             message = Mail(
                 from_email=Email(from_email, from_name),
                 to_emails=To(to_email, to_name),
@@ -589,7 +590,8 @@ The {shop_name} Team
                 html_content=Content("text/html", html_content)
             )
 
-            response = client.send(message)
+            with outbound_timer('sendgrid'):
+                response = client.send(message)
 
             if response.status_code in [200, 202]:
                 current_app.logger.info(f"Email sent to {to_email}: {subject}")
@@ -1,14 +1,252 @@
 """
 Partner Sync Service.
 Handles synchronization of data with external partner systems.
+
+Deliveries are queued rather than sent inline: each sync is written to
+PartnerSyncLog with a due time and handed to a small worker pool, so a
+slow or unreachable partner never holds up trade-in completion. Failed
+attempts are rescheduled with exponential backoff and dead-lettered after
+MAX_DELIVERY_ATTEMPTS (or immediately on a non-retryable 4xx). Rows past
+their due time (including ones whose worker died mid-send) are picked up
+by the scheduler's partner delivery job.
+
+Each integration gets its own pooled HTTP session and a cap on in-flight
+requests, and every attempt records its latency on the log row for the
+per-endpoint stats.
 """
 import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Iterable
+
 import requests
-from datetime import datetime
-from typing import Optional, Dict, Any, List
+from requests.adapters import HTTPAdapter
+from flask import current_app
+
 from ..extensions import db
+from ..middleware.telemetry import instrument_session
 from ..models import PartnerIntegration, PartnerSyncLog, TradeInBatch, Member
 
+logger = logging.getLogger(__name__)
+
+# Worker pool shared by all integrations, and in-flight cap per integration
+DELIVERY_WORKERS = 8
+MAX_IN_FLIGHT_PER_PARTNER = 2
+
+# (connect, read) timeout for partner requests
+DELIVERY_TIMEOUT = (5, 15)
+
+# Retry schedule: 30s, 1m, 2m, 4m ... capped at 1h, dead-lettered after the last attempt
+MAX_DELIVERY_ATTEMPTS = 8
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 3600
+
+# A 'sending' row whose lease has expired is assumed abandoned and re-queued
+SEND_LEASE_SECONDS = 300
+
+# Client errors worth retrying; any other 4xx is dead-lettered straight away
+RETRYABLE_CLIENT_ERRORS = {408, 409, 425, 429}
+
+QUEUED_STATUSES = ('pending', 'failed', 'sending')
+
+_sessions: Dict[int, requests.Session] = {}
+_partner_slots: Dict[int, threading.BoundedSemaphore] = {}
+_pool_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_partner_session(integration_id: int) -> requests.Session:
+    """Pooled HTTP session for one partner integration (keep-alive across deliveries)."""
+    with _pool_lock:
+        session = _sessions.get(integration_id)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_IN_FLIGHT_PER_PARTNER)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[integration_id] = instrument_session(session, 'partner')
+        return session
+
+
+def _partner_slot(integration_id: int) -> threading.BoundedSemaphore:
+    with _pool_lock:
+        slot = _partner_slots.get(integration_id)
+        if slot is None:
+            slot = _partner_slots[integration_id] = threading.BoundedSemaphore(MAX_IN_FLIGHT_PER_PARTNER)
+        return slot
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DELIVERY_WORKERS, thread_name_prefix='partner-delivery')
+        return _executor
+
+
+def retry_delay(attempt: int) -> float:
+    """Seconds to wait before retry number `attempt` (1-based), with +/-20% jitter."""
+    delay = min(RETRY_BASE_DELAY * (2 ** (attempt - 1)), RETRY_MAX_DELAY)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _claim(log_id: int) -> bool:
+    """
+    Move a due log to 'sending' under a lease.
+
+    The conditional UPDATE makes the claim atomic, so a log dispatched by a
+    web worker and picked up by the scheduler sweep is only sent once.
+    """
+    now = datetime.utcnow()
+    claimed = PartnerSyncLog.query.filter(
+        PartnerSyncLog.id == log_id,
+        PartnerSyncLog.status.in_(QUEUED_STATUSES),
+        PartnerSyncLog.next_attempt_at <= now
+    ).update({
+        'status': 'sending',
+        'next_attempt_at': now + timedelta(seconds=SEND_LEASE_SECONDS),
+        'last_attempt_at': now
+    }, synchronize_session=False)
+    db.session.commit()
+    return bool(claimed)
+
+
+def deliver_sync_log(log_id: int) -> Dict[str, Any]:
+    """
+    Attempt one queued delivery and record the outcome.
+
+    Returns immediately without sending if the log is not due, is already
+    being sent elsewhere, or the partner is at its in-flight limit (the log
+    stays queued for the next sweep).
+
+    Args:
+        log_id: PartnerSyncLog ID
+
+    Returns:
+        Result dict with log_id, status and (when sent) success/status_code/error
+    """
+    log = PartnerSyncLog.query.get(log_id)
+    if log is None:
+        return {'log_id': log_id, 'status': 'missing'}
+
+    integration = log.integration
+    if integration is None or not integration.enabled or not log.endpoint:
+        log.status = 'dead'
+        log.next_attempt_at = None
+        log.error_message = 'Integration disabled or endpoint missing'
+        db.session.commit()
+        return {'log_id': log_id, 'status': 'dead'}
+
+    slot = _partner_slot(integration.id)
+    if not slot.acquire(blocking=False):
+        return {'log_id': log_id, 'status': log.status, 'deferred': True}
+
+    try:
+        if not _claim(log_id):
+            return {'log_id': log_id, 'status': 'skipped'}
+        db.session.refresh(log)
+
+        service = PartnerSyncService(integration.tenant_id)
+        response = service._send_to_partner(integration, log.endpoint, log.request_payload or {})
+    finally:
+        slot.release()
+
+    now = datetime.utcnow()
+    log.response_status = response.get('status_code')
+    log.response_body = response.get('body')
+    log.duration_ms = response.get('duration_ms')
+    integration.last_sync_at = now
+
+    if response.get('success'):
+        log.status = 'success'
+        log.error_message = None
+        log.next_attempt_at = None
+        integration.last_sync_status = 'success'
+        integration.sync_count = (integration.sync_count or 0) + 1
+    else:
+        log.retry_count = (log.retry_count or 0) + 1
+        log.error_message = response.get('error')
+        status_code = response.get('status_code') or 0
+        permanent = 400 <= status_code < 500 and status_code not in RETRYABLE_CLIENT_ERRORS
+        if permanent or log.retry_count >= MAX_DELIVERY_ATTEMPTS:
+            log.status = 'dead'
+            log.next_attempt_at = None
+            logger.warning(
+                f'[PartnerSync] Dead-lettered {log.sync_type} {log.record_reference} for '
+                f'{integration.name} after {log.retry_count} attempts: {log.error_message}'
+            )
+        else:
+            log.status = 'failed'
+            log.next_attempt_at = now + timedelta(seconds=retry_delay(log.retry_count))
+        integration.last_sync_status = 'failed'
+        integration.last_sync_error = response.get('error')
+
+    db.session.commit()
+    return {
+        'log_id': log_id,
+        'integration': integration.name,
+        'status': log.status,
+        'success': response.get('success', False),
+        'status_code': response.get('status_code'),
+        'error': response.get('error')
+    }
+
+
+def _run_delivery(app, log_id: int) -> None:
+    with app.app_context():
+        try:
+            deliver_sync_log(log_id)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'[PartnerSync] Delivery of log {log_id} failed: {e}')
+        finally:
+            db.session.remove()
+
+
+def dispatch_deliveries(log_ids: Iterable[int]) -> None:
+    """
+    Hand queued logs to the delivery pool without waiting for them.
+
+    Under TESTING deliveries run inline (the in-memory test database is not
+    shared across threads). Anything not delivered here stays queued and is
+    retried by process_due_deliveries.
+    """
+    app = current_app._get_current_object()
+    for log_id in log_ids:
+        if app.config.get('TESTING'):
+            deliver_sync_log(log_id)
+        else:
+            _get_executor().submit(_run_delivery, app, log_id)
+
+
+def process_due_deliveries(limit: int = 500) -> int:
+    """
+    Dispatch every queued delivery whose due time (or lease) has passed.
+
+    Called by the scheduler for all tenants.
+
+    Returns:
+        Number of logs dispatched
+    """
+    rows = db.session.query(PartnerSyncLog.id).filter(
+        PartnerSyncLog.status.in_(QUEUED_STATUSES),
+        PartnerSyncLog.next_attempt_at <= datetime.utcnow()
+    ).order_by(PartnerSyncLog.next_attempt_at).limit(limit).all()
+    log_ids = [row.id for row in rows]
+    dispatch_deliveries(log_ids)
+    return len(log_ids)
+
+
+def _percentile(sorted_values: List[int], pct: float) -> Optional[int]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
 
 class PartnerSyncService:
     """
@@ -32,102 +270,72 @@ class PartnerSyncService:
 
     def sync_trade_in(self, batch: TradeInBatch) -> List[Dict[str, Any]]:
         """
-        Sync a trade-in batch to all enabled partner integrations.
+        Queue a trade-in batch for delivery to all enabled partner integrations.
+
+        Delivery happens in the background; the returned results only say
+        which integrations the batch was queued for.
 
         Args:
             batch: TradeInBatch to sync
 
         Returns:
-            List of sync results
+            List of queued delivery results
         """
-        results = []
         integrations = PartnerIntegration.query.filter_by(
             tenant_id=self.tenant_id,
             enabled=True,
             sync_trade_ins=True
         ).all()
 
-        for integration in integrations:
-            result = self._sync_trade_in_to_partner(integration, batch)
-            results.append(result)
+        logs = [self._queue_trade_in(integration, batch) for integration in integrations]
+        db.session.commit()
+
+        dispatch_deliveries([log.id for log in logs])
+        return [
+            {'integration': integration.name, 'log_id': log.id, 'queued': True}
+            for integration, log in zip(integrations, logs)
+        ]
 
-        return results
+    def _trade_in_endpoint(self, integration: PartnerIntegration) -> str:
+        if integration.partner_type == 'wordpress':
+            return f"{integration.api_url}/tradeup/trade-in"
+        return f"{integration.api_url}/trade-in"
 
-    def _sync_trade_in_to_partner(
+    def _queue_trade_in(
         self,
         integration: PartnerIntegration,
         batch: TradeInBatch
-    ) -> Dict[str, Any]:
+    ) -> PartnerSyncLog:
         """
-        Sync a single trade-in batch to a specific partner.
+        Create the queued sync log for a single trade-in batch and partner.
 
         Args:
             integration: Partner integration config
             batch: TradeInBatch to sync
 
         Returns:
-            Sync result dict
+            Pending PartnerSyncLog, due immediately
         """
         # Build the payload based on partner type
         if integration.partner_type == 'wordpress':
             payload = self._build_wordpress_trade_in_payload(integration, batch)
-            endpoint = f"{integration.api_url}/tradeup/trade-in"
         else:
             payload = self._build_generic_trade_in_payload(integration, batch)
-            endpoint = f"{integration.api_url}/trade-in"
 
-        # Create sync log
         sync_log = PartnerSyncLog(
             integration_id=integration.id,
             sync_type='trade_in',
             record_id=batch.id,
             record_reference=batch.batch_reference,
+            endpoint=self._trade_in_endpoint(integration),
             request_payload=payload,
-            status='pending'
+            status='pending',
+            retry_count=0,
+            next_attempt_at=datetime.utcnow()
         )
         db.session.add(sync_log)
-        db.session.commit()
-
-        # Send to partner
-        try:
-            response = self._send_to_partner(integration, endpoint, payload)
-
-            sync_log.response_status = response.get('status_code')
-            sync_log.response_body = response.get('body')
-
-            if response.get('success'):
-                sync_log.status = 'success'
-                integration.last_sync_status = 'success'
-                integration.sync_count += 1
-            else:
-                sync_log.status = 'failed'
-                sync_log.error_message = response.get('error')
-                integration.last_sync_status = 'failed'
-                integration.last_sync_error = response.get('error')
-
-            integration.last_sync_at = datetime.utcnow()
-            db.session.commit()
-
-            return {
-                'integration': integration.name,
-                'success': response.get('success', False),
-                'status_code': response.get('status_code'),
-                'error': response.get('error')
-            }
-
-        except Exception as e:
-            sync_log.status = 'failed'
-            sync_log.error_message = str(e)
-            integration.last_sync_status = 'failed'
-            integration.last_sync_error = str(e)
-            integration.last_sync_at = datetime.utcnow()
-            db.session.commit()
-
-            return {
-                'integration': integration.name,
-                'success': False,
-                'error': str(e)
-            }
+        db.session.flush()
+        return sync_log
 
     def _build_wordpress_trade_in_payload(
         self,
@@ -220,7 +428,7 @@ class PartnerSyncService:
             payload: Data to send
 
         Returns:
-            Response dict with success, status_code, body, error
+            Response dict with success, status_code, body, error, duration_ms
         """
         headers = {
             'Content-Type': 'application/json',
@@ -232,13 +440,15 @@ class PartnerSyncService:
         if integration.api_token:
             headers['Authorization'] = f'Bearer {integration.api_token}'
 
+        started = time.monotonic()
         try:
-            response = requests.post(
+            response = get_partner_session(integration.id).post(
                 endpoint,
                 json=payload,
                 headers=headers,
-                timeout=30
+                timeout=DELIVERY_TIMEOUT
             )
+            duration_ms = int((time.monotonic() - started) * 1000)
 
             # Parse JSON response, handling UTF-8 BOM if present
             body = None
@@ -256,7 +466,8 @@ class PartnerSyncService:
                 'success': response.status_code in [200, 201],
                 'status_code': response.status_code,
                 'body': body,
-                'error': None if response.status_code in [200, 201] else f'HTTP {response.status_code}'
+                'error': None if response.status_code in [200, 201] else f'HTTP {response.status_code}',
+                'duration_ms': duration_ms
             }
 
         except requests.Timeout:
@@ -264,14 +475,16 @@ class PartnerSyncService:
                 'success': False,
                 'status_code': None,
                 'body': None,
-                'error': 'Request timeout'
+                'error': 'Request timeout',
+                'duration_ms': int((time.monotonic() - started) * 1000)
             }
         except Exception as e:
             return {
                 'success': False,
                 'status_code': None,
                 'body': None,
-                'error': str(e)
+                'error': str(e),
+                'duration_ms': int((time.monotonic() - started) * 1000)
             }
 
     def get_sync_logs(
@@ -296,27 +509,97 @@ class PartnerSyncService:
         return query.order_by(PartnerSyncLog.created_at.desc()).limit(limit).all()
 
     def retry_failed_syncs(self, integration_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Retry all failed syncs for the tenant."""
+        """
+        Re-queue failed and dead-lettered syncs for immediate delivery.
+
+        Dead-lettered logs get a fresh set of attempts. Delivery runs in the
+        background, so results only report what was queued.
+        """
         query = PartnerSyncLog.query.join(PartnerIntegration).filter(
             PartnerIntegration.tenant_id == self.tenant_id,
-            PartnerSyncLog.status == 'failed',
-            PartnerSyncLog.retry_count < 3
+            PartnerSyncLog.status.in_(['failed', 'dead'])
         )
 
         if integration_id:
             query = query.filter(PartnerSyncLog.integration_id == integration_id)
 
-        failed_logs = query.all()
-        results = []
+        now = datetime.utcnow()
+        queued = []
+        for log in query.all():
+            if not log.endpoint:
+                # Logs written before queued delivery did not store the endpoint
+                if log.sync_type != 'trade_in':
+                    continue  # Legacy bonus sync_type logs are skipped
+                log.endpoint = self._trade_in_endpoint(log.integration)
+            if log.status == 'dead':
+                log.retry_count = 0
+            log.status = 'pending'
+            log.next_attempt_at = now
+            queued.append(log)
+
+        db.session.commit()
+        dispatch_deliveries([log.id for log in queued])
+
+        return [
+            {'integration': log.integration.name, 'log_id': log.id, 'queued': True}
+            for log in queued
+        ]
 
-        for log in failed_logs:
-            log.retry_count += 1
+    def get_endpoint_stats(self, hours: int = 24) -> List[Dict[str, Any]]:
+        """
+        Per-endpoint delivery latency and error stats over a recent window.
+
+        Args:
+            hours: Look-back window in hours
 
-            if log.sync_type == 'trade_in':
-                batch = TradeInBatch.query.get(log.record_id)
-                if batch:
-                    result = self._sync_trade_in_to_partner(log.integration, batch)
-                    results.append(result)
-            # Note: bonus sync_type logs are legacy and will be skipped
+        Returns:
+            One dict per (integration, endpoint) with attempt/error counts,
+            latency percentiles and queue depth
+        """
+        since = datetime.utcnow() - timedelta(hours=hours)
+        rows = db.session.query(
+            PartnerSyncLog.integration_id,
+            PartnerSyncLog.endpoint,
+            PartnerSyncLog.status,
+            PartnerSyncLog.duration_ms
+        ).join(PartnerIntegration).filter(
+            PartnerIntegration.tenant_id == self.tenant_id,
+            db.or_(PartnerSyncLog.last_attempt_at >= since, PartnerSyncLog.status.in_(QUEUED_STATUSES))
+        ).all()
+
+        stats: Dict[tuple, Dict[str, Any]] = {}
+        for integration_id, endpoint, status, duration_ms in rows:
+            entry = stats.setdefault((integration_id, endpoint), {
+                'integration_id': integration_id,
+                'endpoint': endpoint,
+                'delivered': 0,
+                'failed': 0,
+                'dead': 0,
+                'queued': 0,
+                'latencies': []
+            })
+            if status == 'success':
+                entry['delivered'] += 1
+            elif status == 'dead':
+                entry['dead'] += 1
+            if status == 'failed':
+                entry['failed'] += 1
+            if status in QUEUED_STATUSES:
+                entry['queued'] += 1
+            if duration_ms is not None:
+                entry['latencies'].append(duration_ms)
+
+        results = []
+        for entry in stats.values():
+            latencies = sorted(entry.pop('latencies'))
+            attempted = entry['delivered'] + entry['failed'] + entry['dead']
+            entry['error_rate'] = round((entry['failed'] + entry['dead']) / attempted, 4) if attempted else 0.0
+            entry['latency_ms'] = {
+                'avg': int(sum(latencies) / len(latencies)) if latencies else None,
+                'p50': _percentile(latencies, 50),
+                'p95': _percentile(latencies, 95),
+                'max': latencies[-1] if latencies else None
+            }
+            results.append(entry)
 
-        return results
+        return sorted(results, key=lambda e: (e['integration_id'], e['endpoint'] or ''))
@@ -25,6 +25,8 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Optional, List, Dict, Any, Tuple
 from flask import current_app
+from sqlalchemy import update, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import json
 
 from ..extensions import db
@@ -35,6 +37,7 @@ from ..models.loyalty_points import (
     PointsBalance,
     PointsLedger,
     EarningRule,
+    EarningRuleUsage,
     Reward,
     RewardRedemption,
     PointsProgramConfig,
@@ -43,6 +46,8 @@ from ..models.loyalty_points import (
     RewardRedemptionStatus,
 )
 from ..models.promotions import Promotion, CreditEventType
+from .earning_rule_cache import get_compiled_rules, invalidate_earning_rules_cache
+from .tier_cache_service import get_tier_for_member
 
 
 # ==================== Configuration ====================
@@ -64,6 +69,9 @@ TRIGGER_TYPES = {
     'bonus': 'Bonus/promotional points',
 }
 
+# Open points lots read per round trip when consuming points FIFO
+POINTS_LOT_BATCH_SIZE = 50
+
 # Transaction types
 TRANSACTION_TYPES = {
     'earn': 'Points earned',
@@ -113,7 +121,8 @@ class PointsService:
         description: str = None,
         apply_multipliers: bool = True,
         multiplier_context: Dict[str, Any] = None,
-        created_by: str = 'system'
+        created_by: str = 'system',
+        earning_rule_ids: Optional[List[int]] = None
     ) -> Dict[str, Any]:
         """
         Award points to a member.
@@ -130,6 +139,7 @@ class PointsService:
             apply_multipliers: Whether to apply tier/promo multipliers
             multiplier_context: Additional context for multiplier calculation
             created_by: Who/what initiated this action
+            earning_rule_ids: Earning rules this award counts against (usage counters)
 
         Returns:
             Dict with transaction details and final points awarded
@@ -192,8 +202,12 @@ class PointsService:
         # Update member's cached points balance
         member.points_balance = (member.points_balance or 0) + total_points
         member.lifetime_points_earned = (member.lifetime_points_earned or 0) + total_points
+        if source_type == 'purchase':
+            member.record_purchase(transaction.created_at)
 
         try:
+            if earning_rule_ids:
+                self._record_rule_usage(member_id, earning_rule_ids)
             db.session.commit()
 
             current_app.logger.info(
@@ -493,9 +507,15 @@ class PointsService:
         # Get rules for this trigger type
         rules = self._get_earning_rules(trigger_type)
 
+        # One keyed lookup for every per-member limit instead of a COUNT per rule
+        usage = self._get_rule_usage(member.id, [
+            r['id'] for r in rules
+            if r.get('compiled') is not None and r['compiled'].max_uses_per_member
+        ])
+
         for rule in rules:
             # Check rule conditions
-            is_applicable, reason = self._check_rule_conditions(rule, member, context)
+            is_applicable, reason = self._check_rule_conditions(rule, member, context, usage=usage)
 
             if is_applicable:
                 # Calculate points for this rule
@@ -825,6 +845,7 @@ class PointsService:
             created_at=datetime.utcnow()
         )
         db.session.add(transaction)
+        member.points_balance = (member.points_balance or 0) + amount
 
         try:
             db.session.commit()
@@ -899,6 +920,10 @@ class PointsService:
         original.reversed_at = datetime.utcnow()
         original.reversed_reason = reason
 
+        member = Member.query.get(original.member_id)
+        if member:
+            member.points_balance = (member.points_balance or 0) - original.points
+
         try:
             db.session.commit()
 
@@ -1415,35 +1440,82 @@ class PointsService:
             }
 
     def _get_earning_rules(self, trigger_type: str) -> List[Dict]:
-        """Get earning rules for a trigger type from database."""
-        rules = EarningRule.query.filter(
-            EarningRule.tenant_id == self.tenant_id,
-            EarningRule.is_active == True,
-            EarningRule.trigger_source == trigger_type
-        ).order_by(EarningRule.priority.desc()).all()
+        """Get compiled earning rules for a trigger type (cached per tenant)."""
+        return get_compiled_rules(self.tenant_id, trigger_type)
+
+    def _get_rule_usage(self, member_id: int, rule_ids: List[int]) -> Dict[int, int]:
+        """Map rule_id -> times the member has been awarded by that rule."""
+        if not rule_ids:
+            return {}
+        rows = db.session.query(EarningRuleUsage.rule_id, EarningRuleUsage.uses).filter(
+            EarningRuleUsage.member_id == member_id,
+            EarningRuleUsage.rule_id.in_(rule_ids)
+        ).all()
+        return {row.rule_id: row.uses for row in rows}
 
-        return [
-            {
-                'id': rule.id,
-                'name': rule.name,
-                'trigger': rule.trigger_source,
-                'points': rule.bonus_points or 0,
-                'points_per_dollar': rule.points_per_dollar,
-                'multiplier': float(rule.multiplier) if rule.multiplier else None,
-                'rule_type': rule.rule_type,
-                'description': rule.description,
-                'min_order_value': float(rule.min_order_value) if rule.min_order_value else None,
-                'max_points_per_order': rule.max_points_per_order,
-                'rule_object': rule
-            }
-            for rule in rules if rule.is_active_now()
-        ]
+    def _record_rule_usage(self, member_id: int, rule_ids: List[int]) -> None:
+        """
+        Increment per-member and total usage counters for awarded rules.
+
+        Runs inside the caller's transaction so counters commit with the award.
+        The total counter is bumped with a conditional UPDATE, so a rule at
+        max_uses_total fails the award even when the cached rule said it had
+        uses left.
+
+        Raises:
+            ValueError: If any rule has reached max_uses_total
+        """
+        now = datetime.utcnow()
+        rule_ids = sorted(set(rule_ids))
+        for rule_id in rule_ids:
+            if db.engine.dialect.name == 'postgresql':
+                stmt = pg_insert(EarningRuleUsage).values(
+                    tenant_id=self.tenant_id, member_id=member_id, rule_id=rule_id,
+                    uses=1, last_used_at=now
+                )
+                db.session.execute(stmt.on_conflict_do_update(
+                    constraint='uq_earning_rule_usage_member_rule',
+                    set_={'uses': EarningRuleUsage.uses + 1, 'last_used_at': now}
+                ))
+            else:
+                updated = EarningRuleUsage.query.filter_by(
+                    member_id=member_id, rule_id=rule_id
+                ).update({
+                    EarningRuleUsage.uses: EarningRuleUsage.uses + 1,
+                    EarningRuleUsage.last_used_at: now
+                }, synchronize_session=False)
+                if not updated:
+                    db.session.add(EarningRuleUsage(
+                        tenant_id=self.tenant_id, member_id=member_id, rule_id=rule_id,
+                        uses=1, last_used_at=now
+                    ))
+
+        current_uses = db.func.coalesce(EarningRule.current_uses, 0)
+        updated = EarningRule.query.filter(
+            EarningRule.tenant_id == self.tenant_id,
+            EarningRule.id.in_(rule_ids),
+            db.or_(EarningRule.max_uses_total.is_(None), current_uses < EarningRule.max_uses_total)
+        ).update({
+            EarningRule.current_uses: current_uses + 1
+        }, synchronize_session=False)
+        if updated < len(rule_ids):
+            invalidate_earning_rules_cache(self.tenant_id)
+            raise ValueError('Earning rule has reached its maximum uses')
+
+        # Compiled rules carry current_uses for the max_uses_total check
+        capped = db.session.query(EarningRule.id).filter(
+            EarningRule.id.in_(rule_ids),
+            EarningRule.max_uses_total.isnot(None)
+        ).first()
+        if capped:
+            invalidate_earning_rules_cache(self.tenant_id)
 
     def _check_rule_conditions(
         self,
         rule: Dict,
         member: Member,
-        context: Dict
+        context: Dict,
+        usage: Optional[Dict[int, int]] = None
     ) -> Tuple[bool, str]:
         """
         Check if earning rule conditions are met.
@@ -1457,76 +1529,60 @@ class PointsService:
         - Product/collection filters
 
         Args:
-            rule: Rule configuration dict (includes 'rule_object' with EarningRule model)
+            rule: Rule configuration dict (includes 'compiled' CompiledEarningRule)
             member: Member to check conditions for
             context: Context dict with order details, products, etc.
+            usage: Optional pre-fetched rule_id -> member uses map
 
         Returns:
             Tuple of (is_applicable: bool, reason: str)
         """
-        rule_obj = rule.get('rule_object')
-        if not rule_obj:
-            return True, 'OK'  # No rule object = can't check, allow
+        compiled = rule.get('compiled')
+        if not compiled:
+            return True, 'OK'  # No compiled rule = can't check, allow
 
         # 1. Check if rule is active (time window + total usage)
-        if not rule_obj.is_active_now():
+        if not compiled.is_active_at(datetime.utcnow()):
             return False, 'Rule is not active or has expired'
 
         # 2. Check tier restriction
-        if rule_obj.tier_restriction:
-            member_tier = member.tier.name if member.tier else ''
-            if not rule_obj.applies_to_tier(member_tier):
+        if compiled.tier_restriction is not None:
+            tier = get_tier_for_member(self.tenant_id, member.tier_id)
+            member_tier = tier['name'] if tier else ''
+            if not compiled.applies_to_tier(member_tier):
                 return False, f'Rule does not apply to tier: {member_tier}'
 
-        # 3. Check new member restriction
-        if rule_obj.new_member_only:
-            # Check if this is member's first purchase
-            first_purchase_count = PointsTransaction.query.filter_by(
-                tenant_id=self.tenant_id,
-                member_id=member.id,
-                transaction_type='earn',
-                source='purchase'
-            ).count()
-            if first_purchase_count > 0:
-                return False, 'Rule only applies to first purchase'
+        # 3. Check new member restriction (first purchase flag on member)
+        if compiled.new_member_only and member.first_purchase_at is not None:
+            return False, 'Rule only applies to first purchase'
 
         # 4. Check member join days restriction
-        if rule_obj.member_join_days:
+        if compiled.member_join_days:
             member_age_days = (datetime.utcnow() - (member.created_at or datetime.utcnow())).days
-            if member_age_days > rule_obj.member_join_days:
-                return False, f'Rule only applies to members joined within {rule_obj.member_join_days} days'
+            if member_age_days > compiled.member_join_days:
+                return False, f'Rule only applies to members joined within {compiled.member_join_days} days'
 
         # 5. Check minimum order value
         order_value = context.get('order_value', 0)
-        if rule_obj.min_order_value and order_value < float(rule_obj.min_order_value):
-            return False, f'Order value ${order_value} below minimum ${rule_obj.min_order_value}'
+        if compiled.min_order_value and order_value < compiled.min_order_value:
+            return False, f'Order value ${order_value} below minimum ${compiled.min_order_value}'
 
         # 6. Check maximum order value
-        if rule_obj.max_order_value and order_value > float(rule_obj.max_order_value):
-            return False, f'Order value ${order_value} above maximum ${rule_obj.max_order_value}'
+        if compiled.max_order_value and order_value > compiled.max_order_value:
+            return False, f'Order value ${order_value} above maximum ${compiled.max_order_value}'
 
         # 7. Check per-member usage limit
-        if rule_obj.max_uses_per_member:
-            member_uses = PointsTransaction.query.filter_by(
-                tenant_id=self.tenant_id,
-                member_id=member.id,
-                reference_type='earning_rule',
-                reference_id=str(rule_obj.id)
-            ).count()
-            if member_uses >= rule_obj.max_uses_per_member:
-                return False, f'Member has reached max uses ({rule_obj.max_uses_per_member}) for this rule'
+        if compiled.max_uses_per_member:
+            if usage is None:
+                usage = self._get_rule_usage(member.id, [compiled.id])
+            if usage.get(compiled.id, 0) >= compiled.max_uses_per_member:
+                return False, f'Member has reached max uses ({compiled.max_uses_per_member}) for this rule'
 
         # 8. Check product filters (if products provided in context)
         products = context.get('products', [])
-        if products and (rule_obj.collection_ids or rule_obj.vendor_filter or
-                         rule_obj.product_type_filter or rule_obj.product_tags_filter):
+        if products and compiled.has_product_filters:
             # Check if at least one product matches
-            any_product_matches = False
-            for product in products:
-                if rule_obj.applies_to_product(product):
-                    any_product_matches = True
-                    break
-            if not any_product_matches:
+            if not any(compiled.applies_to_product(product) for product in products):
                 return False, 'No products match rule filters'
 
         # All conditions passed
@@ -1573,11 +1629,22 @@ class PointsService:
 
         return None  # Points don't expire by default
 
+    def _open_lots_filter(self, member_id: int) -> List[Any]:
+        """Predicate for a member's open points lots (matches ix_points_transactions_open_lots)."""
+        return [
+            PointsTransaction.member_id == member_id,
+            PointsTransaction.tenant_id == self.tenant_id,
+            PointsTransaction.transaction_type == 'earn',
+            PointsTransaction.remaining_points > 0,
+            PointsTransaction.reversed_at.is_(None),
+        ]
+
     def _consume_points_fifo(self, member_id: int, points_to_consume: int) -> int:
-        """Consume points from oldest earn transactions first (FIFO).
+        """Consume points from open lots, soonest-expiring first (FIFO).
 
-        Updates remaining_points on earn transactions to track which points
-        have been spent. Uses FIFO order based on created_at date.
+        Reads open lots in index order a batch at a time, stopping as soon as
+        enough points are covered, then drains them with a single UPDATE.
+        Long-tenured members only pay for the lots a redemption touches.
 
         Args:
             member_id: Member whose points to consume
@@ -1589,38 +1656,45 @@ class PointsService:
         if points_to_consume <= 0:
             return 0
 
-        # Get earn transactions with remaining points, oldest first
-        earn_transactions = PointsTransaction.query.filter(
-            PointsTransaction.tenant_id == self.tenant_id,
-            PointsTransaction.member_id == member_id,
-            PointsTransaction.transaction_type == 'earn',
-            PointsTransaction.reversed_at.is_(None),
-            PointsTransaction.remaining_points > 0
+        lots_query = db.session.query(
+            PointsTransaction.id,
+            PointsTransaction.remaining_points
+        ).filter(
+            *self._open_lots_filter(member_id)
         ).order_by(
             # Prioritize points that expire soonest (FIFO by expiration, then by creation)
             PointsTransaction.expires_at.asc().nullslast(),
-            PointsTransaction.created_at.asc()
-        ).all()
+            PointsTransaction.created_at.asc(),
+            PointsTransaction.id.asc()
+        ).with_for_update()
 
+        # lot id -> points taken from it
+        drain: Dict[int, int] = {}
         remaining_to_consume = points_to_consume
-        total_consumed = 0
-
-        for txn in earn_transactions:
-            if remaining_to_consume <= 0:
+        offset = 0
+        while remaining_to_consume > 0:
+            lots = lots_query.offset(offset).limit(POINTS_LOT_BATCH_SIZE).all()
+            for lot in lots:
+                take = min(lot.remaining_points, remaining_to_consume)
+                drain[lot.id] = take
+                remaining_to_consume -= take
+                if remaining_to_consume <= 0:
+                    break
+            if len(lots) < POINTS_LOT_BATCH_SIZE:
                 break
+            offset += len(lots)
 
-            available = txn.remaining_points or 0
-            if available <= 0:
-                continue
-
-            # Consume from this transaction
-            consume_from_txn = min(available, remaining_to_consume)
-            txn.remaining_points = available - consume_from_txn
+        if not drain:
+            return 0
 
-            remaining_to_consume -= consume_from_txn
-            total_consumed += consume_from_txn
+        db.session.execute(
+            update(PointsTransaction)
+            .where(PointsTransaction.id.in_(list(drain)))
+            .values(remaining_points=PointsTransaction.remaining_points - case(drain, value=PointsTransaction.id, else_=0)),
+            execution_options={'synchronize_session': 'fetch'}
+        )
 
-        return total_consumed
+        return points_to_consume - remaining_to_consume
 
     def _expire_member_points(self, member_id: int, cutoff_date: datetime) -> int:
         """Expire old points for a member using FIFO logic.
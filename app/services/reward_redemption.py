@@ -0,0 +1,295 @@
+"""
+Contention-safe reward redemption.
+
+A limited reward can be redeemed by many members at once, so stock and
+balances are never checked in Python and written back:
+
+- The member's points_balance is debited with one guarded UPDATE
+  (balance >= cost). That row lock also serializes a member's own
+  concurrent redemptions, so the per-member limit is counted safely.
+- Stock is taken with a conditional increment of redeemed_quantity
+  (below available_quantity), issued last so the hot reward row is locked
+  only until commit.
+- An idempotency key makes a retried request return the original
+  redemption instead of redeeming twice.
+
+A redemption is a fixed number of single-row statements, whatever the
+member's ledger size. The response balance comes from the debit's
+RETURNING, not a SUM over the points ledger.
+
+Usage:
+    from app.services.reward_redemption import RewardRedemptionEngine, RedemptionError
+
+    engine = RewardRedemptionEngine(tenant_id)
+    try:
+        result = engine.redeem(reward_id, member_id, created_by='staff', idempotency_key=key)
+    except RedemptionError as e:
+        return jsonify({'error': e.message, **e.details}), e.status
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..models.loyalty_points import Reward, RewardRedemption
+from ..models.member import Member
+from ..models.points import PointsTransaction
+from ..utils.exceptions import TradeUpError
+
+logger = logging.getLogger(__name__)
+
+# Reward types delivered as a single-use discount code
+VOUCHER_REWARD_TYPES = ('discount', 'discount_code', 'store_credit', 'free_shipping')
+
+# Reward types a merchant fulfils by hand (redemption stays pending)
+FULFILLED_REWARD_TYPES = ('product', 'free_product')
+
+# Longest idempotency key the redemptions column holds
+MAX_IDEMPOTENCY_KEY_LENGTH = RewardRedemption.__table__.c.idempotency_key.type.length
+
+
+class RedemptionError(TradeUpError):
+    """A redemption was refused; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, code: str, status: int = 400, **details):
+        self.status = status
+        self.details = details
+        super().__init__(message, code)
+
+
+@dataclass
+class RedemptionResult:
+    redemption: RewardRedemption
+    reward: Reward
+    new_balance: int
+    replayed: bool = False  # Returned for a retried idempotency key
+
+
+class RewardRedemptionEngine:
+    """Redeems rewards for one tenant's members."""
+
+    def __init__(self, tenant_id: int):
+        self.tenant_id = tenant_id
+
+    def redeem(
+        self,
+        reward_id: int,
+        member_id: int,
+        created_by: str,
+        notes: Optional[str] = None,
+        idempotency_key: Optional[str] = None
+    ) -> RedemptionResult:
+        """
+        Redeem a reward for a member and commit.
+
+        Raises:
+            RedemptionError: Idempotency key too long, reward or member not
+                found, reward not available, out of stock, member limit
+                reached or insufficient points
+        """
+        if idempotency_key and len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            raise RedemptionError(
+                f'idempotency_key must be at most {MAX_IDEMPOTENCY_KEY_LENGTH} characters',
+                'INVALID_IDEMPOTENCY_KEY'
+            )
+        if idempotency_key:
+            replay = self._replay(idempotency_key, reward_id, member_id)
+            if replay:
+                return replay
+
+        reward = Reward.query.filter_by(id=reward_id, tenant_id=self.tenant_id).first()
+        if not reward:
+            raise RedemptionError('Reward not found', 'REWARD_NOT_FOUND', 404)
+
+        member = Member.query.filter_by(id=member_id, tenant_id=self.tenant_id).first()
+        if not member:
+            raise RedemptionError('Member not found', 'MEMBER_NOT_FOUND', 404)
+
+        self._check_available(reward, member)
+        cost = reward.points_cost
+
+        # 1. Debit the balance (locks the member row until commit)
+        new_balance = db.session.execute(
+            update(Member)
+            .where(Member.id == member.id, Member.tenant_id == self.tenant_id,
+                   func.coalesce(Member.points_balance, 0) >= cost)
+            .values(points_balance=func.coalesce(Member.points_balance, 0) - cost,
+                    lifetime_points_spent=func.coalesce(Member.lifetime_points_spent, 0) + cost)
+            .returning(Member.points_balance),
+            execution_options={'synchronize_session': False}
+        ).scalar()
+        if new_balance is None:
+            db.session.rollback()
+            raise RedemptionError(
+                'Insufficient points', 'INSUFFICIENT_POINTS',
+                points_balance=int(member.points_balance or 0), points_needed=cost
+            )
+
+        # 2. Per-member limit, counted under the member row lock
+        if reward.max_redemptions_per_member:
+            redeemed = RewardRedemption.query.filter(
+                RewardRedemption.reward_id == reward.id,
+                RewardRedemption.member_id == member.id,
+                RewardRedemption.status != 'cancelled'
+            ).count()
+            if redeemed >= reward.max_redemptions_per_member:
+                db.session.rollback()
+                raise RedemptionError(
+                    'You have reached the maximum redemptions for this reward', 'MEMBER_LIMIT_REACHED'
+                )
+
+        # 3. Ledger entry and redemption record
+        now = datetime.utcnow()
+        db.session.add(PointsTransaction(
+            tenant_id=self.tenant_id,
+            member_id=member.id,
+            points=-cost,
+            transaction_type='redeem',
+            source='reward',
+            reference_id=str(reward.id),
+            reference_type='reward_redemption',
+            description=f"Redeemed: {reward.name}"
+        ))
+        voucher = reward.reward_type in VOUCHER_REWARD_TYPES
+        redemption = RewardRedemption(
+            tenant_id=self.tenant_id,
+            member_id=member.id,
+            reward_id=reward.id,
+            redemption_code=RewardRedemption.generate_redemption_code(),
+            idempotency_key=idempotency_key,
+            points_spent=cost,
+            status='pending' if reward.reward_type in FULFILLED_REWARD_TYPES else 'completed',
+            reward_type=reward.reward_type,
+            reward_name=reward.name,
+            reward_value=reward.credit_value or reward.discount_amount,
+            voucher_code=RewardRedemption.generate_voucher_code('REWARD') if voucher else None,
+            voucher_expires_at=now + timedelta(days=reward.voucher_valid_days or 30) if voucher else None,
+            notes=notes,
+            created_by=created_by,
+            completed_at=None if reward.reward_type in FULFILLED_REWARD_TYPES else now
+        )
+        db.session.add(redemption)
+
+        try:
+            # Insert the records now rather than on the autoflush below, so a
+            # racing request with the same idempotency key fails inside this try
+            db.session.flush()
+
+            # 4. Take one unit of stock, last, so the contended reward row is
+            # locked only until the commit below
+            taken = db.session.execute(
+                update(Reward)
+                .where(Reward.id == reward.id, Reward.tenant_id == self.tenant_id, Reward.is_active == True,
+                       or_(Reward.available_quantity.is_(None),
+                           func.coalesce(Reward.redeemed_quantity, 0) < Reward.available_quantity))
+                .values(redeemed_quantity=func.coalesce(Reward.redeemed_quantity, 0) + 1)
+                .returning(Reward.redeemed_quantity),
+                execution_options={'synchronize_session': False}
+            ).scalar()
+            if taken is None:
+                db.session.rollback()
+                raise RedemptionError('This reward is out of stock', 'OUT_OF_STOCK')
+
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            replay = self._replay(idempotency_key, reward_id, member_id) if idempotency_key else None
+            if replay:
+                return replay
+            raise
+
+        logger.info(
+            f'[Rewards] Member {member.id} redeemed reward {reward.id} for {cost} pts '
+            f'({taken}/{reward.available_quantity if reward.available_quantity is not None else "unlimited"})'
+        )
+        return RedemptionResult(redemption=redemption, reward=reward, new_balance=int(new_balance))
+
+    def _check_available(self, reward: Reward, member: Member) -> None:
+        """Availability checks that need no lock (stock is re-checked atomically)."""
+        now = datetime.utcnow()
+        if not reward.is_active:
+            raise RedemptionError('This reward is no longer available', 'REWARD_INACTIVE')
+        if reward.starts_at and reward.starts_at > now:
+            raise RedemptionError('This reward is not yet available', 'REWARD_NOT_STARTED')
+        if reward.ends_at and reward.ends_at < now:
+            raise RedemptionError('This reward has expired', 'REWARD_EXPIRED')
+        if member.tier and not reward.applies_to_tier(member.tier.name):
+            raise RedemptionError(
+                'This reward is not available for your membership tier', 'TIER_RESTRICTED', 403
+            )
+
+        remaining = reward.remaining_quantity()
+        if remaining is not None and remaining <= 0:
+            raise RedemptionError('This reward is out of stock', 'OUT_OF_STOCK')
+
+    def _replay(self, idempotency_key: str, reward_id: int, member_id: int) -> Optional[RedemptionResult]:
+        """The redemption already made with this key, if any."""
+        redemption = RewardRedemption.query.filter_by(
+            tenant_id=self.tenant_id, idempotency_key=idempotency_key
+        ).first()
+        if not redemption:
+            return None
+        if redemption.reward_id != reward_id or redemption.member_id != int(member_id):
+            raise RedemptionError(
+                'Idempotency key was already used for a different redemption', 'IDEMPOTENCY_KEY_REUSED', 422
+            )
+
+        balance = db.session.query(Member.points_balance).filter_by(id=redemption.member_id).scalar()
+        return RedemptionResult(
+            redemption=redemption, reward=redemption.reward, new_balance=int(balance or 0), replayed=True
+        )
+
+    def create_shopify_discount(self, result: RedemptionResult, member: Member) -> Dict[str, Any]:
+        """
+        Create the redemption's single-use discount code in Shopify and commit.
+
+        Runs after the redemption is committed, so no row is locked during the
+        Shopify call. Failures are recorded on the redemption; the member keeps
+        the code and the merchant can create it manually.
+        """
+        redemption, reward = result.redemption, result.reward
+        if not redemption.voucher_code or redemption.synced_to_shopify:
+            return {'success': True, 'skipped': True}
+
+        try:
+            from .shopify_client import ShopifyClient
+            shopify_client = ShopifyClient(self.tenant_id)
+
+            if reward.reward_type == 'free_shipping':
+                shopify_result = shopify_client.create_reward_discount_code(
+                    code=redemption.voucher_code,
+                    title=f"Reward: {reward.name}",
+                    discount_type='free_shipping',
+                    usage_limit=1,
+                    customer_id=member.shopify_customer_id,
+                    expires_days=reward.voucher_valid_days or 30
+                )
+            else:
+                percentage = bool(reward.discount_percent) and reward.reward_type != 'store_credit'
+                value = reward.discount_percent if percentage else (reward.discount_amount or reward.credit_value)
+                shopify_result = shopify_client.create_reward_discount_code(
+                    code=redemption.voucher_code,
+                    title=f"Reward: {reward.name}",
+                    discount_type='percentage' if percentage else 'fixed',
+                    discount_value=float(value or 0),
+                    usage_limit=1,
+                    customer_id=member.shopify_customer_id,
+                    expires_days=reward.voucher_valid_days or 30
+                )
+        except Exception as e:
+            shopify_result = {'success': False, 'error': str(e)}
+
+        if shopify_result.get('success'):
+            redemption.shopify_discount_id = shopify_result.get('discount_id')
+            redemption.synced_to_shopify = True
+            logger.info(f'[Rewards] Created Shopify discount code {redemption.voucher_code} for reward {reward.name}')
+        else:
+            redemption.sync_error = str(shopify_result.get('error'))[:500]
+            logger.warning(f"[Rewards] Failed to create Shopify discount: {shopify_result.get('error')}")
+
+        db.session.commit()
+        return shopify_result
@@ -0,0 +1,894 @@
+"""
+Rule Simulator.
+
+Answers "what would this earning rule / promotion / cashback campaign have
+cost over a period?" without replaying orders one at a time through
+PointsService or the store credit services.
+
+A tenant's historical orders are exported once (Shopify Bulk Operation) and
+packed into columnar NumPy arrays: one row per order, one row per line item,
+one row per customer. Each candidate configuration is then evaluated as a
+handful of vectorised masks (tier, channel, first order, join age, minimum
+value, product filters) and rate/cap arithmetic over the whole history, so a
+million orders simulate in well under a second once loaded. Loaded histories
+are cached per process for HISTORY_CACHE_TTL so several candidates can be
+compared against the same data; at most HISTORY_CACHE_SIZE are kept, least
+recently used first out. The export itself can take minutes, so the API
+runs a simulation whose history is not cached as a background
+SimulationRun and the client polls for its results.
+
+Simulation semantics follow the live models:
+    - EarningRule.calculate_points (min/max order value, rate, multiplier of
+      tier base points, flat bonus, percentage, per-order cap) with the
+      conditions of PointsService._check_rule_conditions
+    - Promotion.calculate_bonus with min_value, tier, channel, audience and
+      daily time window / active day restrictions
+    - CashbackCampaign.calculate_cashback with customer eligibility, per
+      order cap and campaign budget
+
+Deliberate differences from live processing:
+    - Member tiers are today's tiers (tier history is not replayed)
+    - Join age is measured at order time, not at simulation time
+    - Product filters restrict the base amount to qualifying line items
+      (resolved from the catalog mirror)
+    - Usage limits and budgets start from zero for the simulated period
+    - starts_at/ends_at are ignored unless respect_schedule is set, so a
+      draft can be costed against any past period
+
+Usage:
+    from app.services.rule_simulator import RuleSimulator
+
+    simulator = RuleSimulator.for_period(tenant_id, '2026-07-01', '2026-09-30')
+    result = simulator.simulate_earning_rule(rule)
+    result.total, result.by_tier, result.distribution
+
+    run = request_simulation(tenant_id, start, end, candidates)   # API
+    start_simulation_run(run.id)
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, time as dt_time, timezone
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+import numpy as np
+
+from flask import current_app
+
+from ..extensions import db
+from ..models import Tenant, Member, MembershipTier
+from ..models.simulation_run import SimulationRun
+from ..models.catalog_product import CatalogProduct
+from ..models.cashback_campaign import CashbackCampaign
+from ..models.loyalty_points import EarningRule, EarningRuleType
+from ..models.promotions import Promotion, PromotionType
+from ..utils.exceptions import ValidationError
+from .catalog_mirror_service import normalize_product_id
+from .earning_rule_cache import CompiledEarningRule, parse_json_list, lower_set
+
+logger = logging.getLogger(__name__)
+
+# Loaded histories are reused for 15 minutes (per process)
+HISTORY_CACHE_TTL = 900
+
+# Histories kept per process; each holds a tenant's whole period in memory
+HISTORY_CACHE_SIZE = 8
+
+# Customers listed in the distribution's top_customers
+TOP_CUSTOMERS = 10
+
+# Sentinel for "no timestamp" in int64 epoch columns
+NO_TIMESTAMP = np.iinfo(np.int64).max
+
+# Points per dollar when a tier has no custom rate (PointsService default)
+DEFAULT_POINTS_PER_DOLLAR = 1.0
+
+# (tenant_id, start, end) -> (expires at, history), least recently used first
+_history_cache: 'OrderedDict[Tuple[int, str, str], Tuple[float, OrderHistory]]' = OrderedDict()
+_history_cache_lock = threading.Lock()
+
+
+def _to_epoch(value) -> int:
+    """ISO string or naive-UTC datetime to epoch seconds (NO_TIMESTAMP for None)."""
+    if value is None or value == '':
+        return NO_TIMESTAMP
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+@dataclass
+class OrderHistory:
+    """
+    Columnar view of a tenant's orders over a period.
+
+    Orders reference customers by index; customers reference members and
+    tiers by index (-1 when absent). Line items reference orders by index.
+    """
+    # Per order
+    order_total: np.ndarray         # float64
+    created_at: np.ndarray          # int64 epoch seconds
+    customer_idx: np.ndarray        # int32, -1 for guest checkouts
+    in_store: np.ndarray            # bool, POS orders
+
+    # Per line item
+    item_order: np.ndarray          # int32 index into orders
+    item_product: np.ndarray        # int64 Shopify product ID (0 if unknown)
+    item_amount: np.ndarray         # float64 price * quantity
+
+    # Per customer
+    customer_ids: np.ndarray        # int64 Shopify customer ID
+    customer_member_id: np.ndarray  # int64 member ID, 0 when not an active member
+    customer_tier: np.ndarray       # int32 index into tier_names, -1 for none
+    member_created_at: np.ndarray   # int64 epoch, NO_TIMESTAMP for non-members
+    first_purchase_at: np.ndarray   # int64 epoch, NO_TIMESTAMP when never purchased
+
+    # Per tier
+    tier_names: List[str] = field(default_factory=list)
+    tier_points_rate: np.ndarray = field(default_factory=lambda: np.zeros(0))
+
+    loaded_at: datetime = field(default_factory=datetime.utcnow)
+
+    _first_order: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+
+    @property
+    def n_orders(self) -> int:
+        return len(self.order_total)
+
+    @property
+    def n_customers(self) -> int:
+        return len(self.customer_ids)
+
+    @classmethod
+    def build(
+        cls,
+        raw_orders: Iterable[Dict[str, Any]],
+        members: Iterable[Any],
+        tiers: Iterable[Any]
+    ) -> 'OrderHistory':
+        """
+        Pack orders.json-shaped dicts into columns.
+
+        Args:
+            raw_orders: Orders with id, created_at, source_name, total_price,
+                customer {'id'} and line_items [{product_id, price, quantity}]
+            members: Member rows (id, shopify_customer_id, tier_id, status,
+                created_at, first_purchase_at)
+            tiers: MembershipTier rows (id, name, benefits)
+
+        Returns:
+            OrderHistory
+        """
+        tiers = list(tiers)
+        tier_index = {t.id: i for i, t in enumerate(tiers)}
+        tier_points_rate = np.array([
+            float((t.benefits or {}).get('points_per_dollar') or DEFAULT_POINTS_PER_DOLLAR) for t in tiers
+        ], dtype=np.float64)
+
+        members_by_customer = {}
+        for m in members:
+            if m.status == 'active' and m.shopify_customer_id:
+                try:
+                    members_by_customer[int(str(m.shopify_customer_id).rsplit('/', 1)[-1])] = m
+                except ValueError:
+                    continue
+
+        customer_index: Dict[int, int] = {}
+        totals, created, customers, in_store = [], [], [], []
+        item_order, item_product, item_amount = [], [], []
+
+        for o in raw_orders:
+            idx = len(totals)
+            totals.append(float(o.get('total_price') or 0))
+            created.append(_to_epoch(o.get('created_at')))
+            in_store.append((o.get('source_name') or '').lower() == 'pos')
+
+            customer = o.get('customer') or {}
+            customer_id = customer.get('id')
+            if customer_id:
+                customer_id = int(str(customer_id).rsplit('/', 1)[-1])
+                customers.append(customer_index.setdefault(customer_id, len(customer_index)))
+            else:
+                customers.append(-1)
+
+            for item in o.get('line_items') or []:
+                item_order.append(idx)
+                item_product.append(int(item.get('product_id') or 0))
+                item_amount.append(float(item.get('price') or 0) * int(item.get('quantity') or 1))
+
+        n_customers = len(customer_index)
+        customer_ids = np.zeros(n_customers, dtype=np.int64)
+        member_ids = np.zeros(n_customers, dtype=np.int64)
+        customer_tier = np.full(n_customers, -1, dtype=np.int32)
+        member_created = np.full(n_customers, NO_TIMESTAMP, dtype=np.int64)
+        first_purchase = np.full(n_customers, NO_TIMESTAMP, dtype=np.int64)
+        for customer_id, i in customer_index.items():
+            customer_ids[i] = customer_id
+            member = members_by_customer.get(customer_id)
+            if member is not None:
+                member_ids[i] = member.id
+                customer_tier[i] = tier_index.get(member.tier_id, -1)
+                member_created[i] = _to_epoch(member.created_at)
+                first_purchase[i] = _to_epoch(member.first_purchase_at)
+
+        return cls(
+            order_total=np.array(totals, dtype=np.float64),
+            created_at=np.array(created, dtype=np.int64),
+            customer_idx=np.array(customers, dtype=np.int32),
+            in_store=np.array(in_store, dtype=bool),
+            item_order=np.array(item_order, dtype=np.int32),
+            item_product=np.array(item_product, dtype=np.int64),
+            item_amount=np.array(item_amount, dtype=np.float64),
+            customer_ids=customer_ids,
+            customer_member_id=member_ids,
+            customer_tier=customer_tier,
+            member_created_at=member_created,
+            first_purchase_at=first_purchase,
+            tier_names=[t.name for t in tiers],
+            tier_points_rate=tier_points_rate,
+        )
+
+    # ==================== Derived Columns ====================
+
+    def order_tier(self) -> np.ndarray:
+        """Tier index per order (-1 for guests and untiered customers)."""
+        return np.where(self.customer_idx >= 0, self.customer_tier[self.customer_idx], -1)
+
+    def order_is_member(self) -> np.ndarray:
+        """Whether each order was placed by an active member."""
+        return (self.customer_idx >= 0) & (self.customer_member_id[self.customer_idx] > 0)
+
+    def first_order(self) -> np.ndarray:
+        """
+        Whether each order is its customer's first purchase.
+
+        True for a customer's earliest order in the period, unless the member
+        record shows an earlier first purchase.
+        """
+        if self._first_order is None:
+            mask = np.zeros(self.n_orders, dtype=bool)
+            idx = np.flatnonzero(self.customer_idx >= 0)
+            if len(idx):
+                ordered = idx[np.lexsort((self.created_at[idx], self.customer_idx[idx]))]
+                customers = self.customer_idx[ordered]
+                firsts = ordered[np.r_[True, customers[1:] != customers[:-1]]]
+                known_first = self.first_purchase_at[self.customer_idx[firsts]]
+                mask[firsts[known_first >= self.created_at[firsts]]] = True
+            self._first_order = mask
+        return self._first_order
+
+    def item_amount_per_order(self, item_mask: np.ndarray) -> np.ndarray:
+        """Sum of masked line item amounts per order."""
+        return np.bincount(
+            self.item_order,
+            weights=np.where(item_mask, self.item_amount, 0.0),
+            minlength=self.n_orders
+        )
+
+
+@dataclass
+class SimulationResult:
+    """Liability of one candidate configuration over an order history."""
+    candidate: str
+    unit: str  # 'points' or 'credit'
+    awards: np.ndarray = field(repr=False)
+    total: float = 0.0
+    orders_considered: int = 0
+    orders_rewarded: int = 0
+    by_tier: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    distribution: Dict[str, Any] = field(default_factory=dict)
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'candidate': self.candidate,
+            'unit': self.unit,
+            'total': self.total,
+            'orders_considered': self.orders_considered,
+            'orders_rewarded': self.orders_rewarded,
+            'by_tier': self.by_tier,
+            'distribution': self.distribution,
+            'elapsed_ms': self.elapsed_ms,
+        }
+
+
+class RuleSimulator:
+    """Vectorised liability simulation of candidate reward configurations."""
+
+    def __init__(self, tenant_id: int, history: OrderHistory):
+        self.tenant_id = tenant_id
+        self.history = history
+        self._catalog: Optional[List[Tuple[int, set, set, str, str]]] = None
+
+    @classmethod
+    def for_period(cls, tenant_id: int, start_date: str, end_date: str, refresh: bool = False) -> 'RuleSimulator':
+        """Simulator over a tenant's orders between two dates (cached history)."""
+        return cls(tenant_id, load_order_history(tenant_id, start_date, end_date, refresh=refresh))
+
+    # ==================== Product Filters ====================
+
+    def _load_catalog(self) -> List[Tuple[int, set, set, str, str]]:
+        """(product_id, collections, tags, vendor, product_type) from the catalog mirror."""
+        if self._catalog is None:
+            rows = db.session.query(
+                CatalogProduct.product_id, CatalogProduct.collection_ids, CatalogProduct.tags,
+                CatalogProduct.vendor, CatalogProduct.product_type
+            ).filter(CatalogProduct.tenant_id == self.tenant_id).all()
+            self._catalog = [
+                (pid, set(collections or []), set(tags or []), (vendor or '').lower(), (ptype or '').lower())
+                for pid, collections, tags, vendor, ptype in rows
+            ]
+        return self._catalog
+
+    def _matching_products(self, collections=None, vendors=None, product_types=None, tags=None) -> np.ndarray:
+        """Product IDs passing every given filter (None = no filter), AND across filters."""
+        matched = [
+            pid for pid, product_collections, product_tags, vendor, ptype in self._load_catalog()
+            if (collections is None or not product_collections.isdisjoint(collections))
+            and (vendors is None or vendor in vendors)
+            and (product_types is None or ptype in product_types)
+            and (tags is None or not product_tags.isdisjoint(tags))
+        ]
+        return np.array(matched, dtype=np.int64)
+
+    def _base_amount(self, filters: Dict[str, Any], excluded_products=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Amount each order contributes under a candidate's product filters.
+
+        Returns:
+            (amount per order, mask of orders with qualifying products)
+        """
+        h = self.history
+        has_filters = any(v is not None for v in filters.values())
+        if not has_filters and not excluded_products:
+            return h.order_total, np.ones(h.n_orders, dtype=bool)
+
+        excluded_items = np.zeros(len(h.item_product), dtype=bool)
+        if excluded_products:
+            excluded = [normalize_product_id(p) for p in excluded_products]
+            excluded_items = np.isin(h.item_product, np.array([p for p in excluded if p is not None], dtype=np.int64))
+
+        if has_filters:
+            item_mask = np.isin(h.item_product, self._matching_products(**filters)) & ~excluded_items
+            amount = h.item_amount_per_order(item_mask)
+        else:
+            # Exclusions only: everything but the excluded items still counts
+            amount = np.maximum(h.order_total - h.item_amount_per_order(excluded_items), 0.0)
+        return amount, amount > 0
+
+    # ==================== Masks and Caps ====================
+
+    def _tier_mask(self, allowed: Optional[Iterable[str]], case_insensitive: bool = True) -> np.ndarray:
+        """Orders whose customer's tier is in allowed (all orders when allowed is None)."""
+        h = self.history
+        if allowed is None:
+            return np.ones(h.n_orders, dtype=bool)
+        allowed = {a.upper() for a in allowed} if case_insensitive else set(allowed)
+        names = [n.upper() for n in h.tier_names] if case_insensitive else h.tier_names
+        tier_ok = np.array([n in allowed for n in names] + [False], dtype=bool)
+        # Index -1 (no tier) reads the trailing False
+        return tier_ok[h.order_tier()]
+
+    def _schedule_mask(self, starts_at: Optional[datetime], ends_at: Optional[datetime]) -> np.ndarray:
+        h = self.history
+        mask = np.ones(h.n_orders, dtype=bool)
+        if starts_at:
+            mask &= h.created_at >= _to_epoch(starts_at)
+        if ends_at:
+            mask &= h.created_at <= _to_epoch(ends_at)
+        return mask
+
+    def _cap_per_customer(self, mask: np.ndarray, limit: int) -> np.ndarray:
+        """Keep each customer's first `limit` qualifying orders (in time order)."""
+        h = self.history
+        idx = np.flatnonzero(mask & (h.customer_idx >= 0))
+        capped = np.zeros(h.n_orders, dtype=bool)
+        if not len(idx):
+            return capped
+        ordered = idx[np.lexsort((h.created_at[idx], h.customer_idx[idx]))]
+        customers = h.customer_idx[ordered]
+        starts = np.flatnonzero(np.r_[True, customers[1:] != customers[:-1]])
+        rank = np.arange(len(ordered)) - np.repeat(starts, np.diff(np.r_[starts, len(ordered)]))
+        capped[ordered[rank < limit]] = True
+        return capped
+
+    def _cap_total(self, mask: np.ndarray, limit: int) -> np.ndarray:
+        """Keep the first `limit` qualifying orders across all customers."""
+        idx = np.flatnonzero(mask)
+        ordered = idx[np.argsort(self.history.created_at[idx], kind='stable')]
+        capped = np.zeros(self.history.n_orders, dtype=bool)
+        capped[ordered[:limit]] = True
+        return capped
+
+    def _apply_budget(self, awards: np.ndarray, budget: float) -> np.ndarray:
+        """Pay awards in time order until the budget runs out (the last one partially)."""
+        ordered = np.argsort(self.history.created_at, kind='stable')
+        paid_before = np.cumsum(awards[ordered]) - awards[ordered]
+        capped = np.empty_like(awards)
+        capped[ordered] = np.clip(budget - paid_before, 0.0, awards[ordered])
+        return capped
+
+    # ==================== Candidates ====================
+
+    def simulate_earning_rule(self, rule: EarningRule, respect_schedule: bool = False) -> SimulationResult:
+        """
+        Points an earning rule would have awarded over the history.
+
+        Args:
+            rule: Saved or unsaved EarningRule
+            respect_schedule: Only count orders inside the rule's starts_at/ends_at
+
+        Returns:
+            SimulationResult in points
+        """
+        started = time.perf_counter()
+        h = self.history
+        compiled = CompiledEarningRule.from_model(rule)
+
+        amount, mask = self._base_amount({
+            'collections': compiled.collection_ids,
+            'vendors': compiled.vendors,
+            'product_types': compiled.product_types,
+            'tags': compiled.product_tags,
+        }, excluded_products=compiled.excluded_product_ids)
+
+        mask = mask & h.order_is_member() & self._tier_mask(compiled.tier_restriction)
+        if respect_schedule:
+            mask &= self._schedule_mask(compiled.starts_at, compiled.ends_at)
+        if compiled.new_member_only:
+            mask &= h.first_order()
+        if compiled.member_join_days:
+            joined = h.member_created_at[np.maximum(h.customer_idx, 0)]
+            mask &= (h.created_at - joined) // 86400 <= compiled.member_join_days
+        if compiled.min_order_value:
+            mask &= amount >= compiled.min_order_value
+
+        effective = amount
+        if compiled.max_order_value:
+            effective = np.minimum(amount, compiled.max_order_value)
+
+        if compiled.rule_type == EarningRuleType.BASE_RATE.value:
+            points = np.floor(effective * (compiled.points_per_dollar or 0))
+        elif compiled.rule_type == EarningRuleType.MULTIPLIER.value:
+            rates = np.r_[h.tier_points_rate, DEFAULT_POINTS_PER_DOLLAR][h.order_tier()]
+            base_points = np.floor(h.order_total * rates)
+            points = np.floor(base_points * ((compiled.multiplier or 1) - 1))
+        elif compiled.rule_type == EarningRuleType.BONUS_POINTS.value:
+            points = np.full(h.n_orders, float(compiled.bonus_points or 0))
+        elif compiled.rule_type == EarningRuleType.PERCENTAGE.value:
+            points = np.floor(effective * (compiled.percentage or 0) / 100)
+        else:
+            raise ValidationError(f'Unsupported rule type: {compiled.rule_type}', field='rule_type')
+
+        if compiled.max_points_per_order:
+            points = np.minimum(points, compiled.max_points_per_order)
+
+        mask &= points > 0
+        if compiled.max_uses_per_member:
+            mask &= self._cap_per_customer(mask, compiled.max_uses_per_member)
+        if compiled.max_uses_total:
+            mask &= self._cap_total(mask, compiled.max_uses_total)
+
+        return self._summarize(rule.name or 'Earning rule', 'points', np.where(mask, points, 0.0), started)
+
+    def simulate_promotion(self, promo: Promotion, respect_schedule: bool = False) -> SimulationResult:
+        """
+        Store credit a purchase promotion would have issued over the history.
+
+        Args:
+            promo: Saved or unsaved Promotion (purchase_cashback, flat_bonus or multiplier)
+            respect_schedule: Only count orders inside the promotion's starts_at/ends_at
+
+        Returns:
+            SimulationResult in store credit
+        """
+        started = time.perf_counter()
+        h = self.history
+        if promo.promo_type == PromotionType.TRADE_IN_BONUS.value:
+            raise ValidationError('Trade-in promotions cannot be simulated against orders', field='promo_type')
+
+        collections = parse_json_list(promo.collection_ids)
+        amount, mask = self._base_amount({
+            'collections': set(collections) if collections is not None else None,
+            'vendors': lower_set(parse_json_list(promo.vendor_filter)),
+            'product_types': lower_set(parse_json_list(promo.product_type_filter)),
+            'tags': lower_set(parse_json_list(promo.product_tags_filter)),
+        })
+
+        if (promo.audience or 'members_only') == 'members_only':
+            mask &= h.order_is_member()
+        tiers = parse_json_list(promo.tier_restriction)
+        if tiers is not None:
+            mask &= self._tier_mask(tiers, case_insensitive=False)
+        if promo.channel == 'in_store':
+            mask &= h.in_store
+        elif promo.channel == 'online':
+            mask &= ~h.in_store
+        if respect_schedule:
+            mask &= self._schedule_mask(promo.starts_at, promo.ends_at)
+        if promo.min_value:
+            mask &= amount >= float(promo.min_value)
+        mask &= self._local_time_mask(promo)
+
+        if promo.promo_type == PromotionType.PURCHASE_CASHBACK.value:
+            awards = amount * float(promo.bonus_percent or 0) / 100
+        elif promo.promo_type == PromotionType.FLAT_BONUS.value:
+            awards = np.full(h.n_orders, float(promo.bonus_flat or 0))
+        elif promo.promo_type == PromotionType.MULTIPLIER.value:
+            awards = amount * (float(promo.multiplier or 1) - 1)
+        else:
+            raise ValidationError(f'Unsupported promotion type: {promo.promo_type}', field='promo_type')
+
+        mask &= awards > 0
+        if promo.max_uses_per_member:
+            mask &= self._cap_per_customer(mask, promo.max_uses_per_member)
+        if promo.max_uses:
+            mask &= self._cap_total(mask, promo.max_uses)
+
+        return self._summarize(promo.name or 'Promotion', 'credit', np.where(mask, awards, 0.0), started)
+
+    def _local_time_mask(self, promo: Promotion) -> np.ndarray:
+        """Daily time window and active days, evaluated in the tenant's timezone."""
+        h = self.history
+        mask = np.ones(h.n_orders, dtype=bool)
+        windowed = promo.daily_start_time and promo.daily_end_time
+        if not windowed and not promo.active_days:
+            return mask
+
+        # One UTC offset lookup per calendar day keeps DST correct without per-order calls
+        tz = promo._get_timezone()
+        days, inverse = np.unique(h.created_at // 86400, return_inverse=True)
+        offsets = np.array([
+            datetime.fromtimestamp(int(day) * 86400 + 43200, tz).utcoffset().total_seconds() for day in days
+        ], dtype=np.int64)
+        local = h.created_at + offsets[inverse]
+
+        if windowed:
+            seconds = local % 86400
+            start = promo.daily_start_time.hour * 3600 + promo.daily_start_time.minute * 60 + promo.daily_start_time.second
+            end = promo.daily_end_time.hour * 3600 + promo.daily_end_time.minute * 60 + promo.daily_end_time.second
+            if start <= end:
+                mask &= (seconds >= start) & (seconds <= end)
+            else:
+                mask &= (seconds >= start) | (seconds <= end)
+
+        if promo.active_days:
+            # 1970-01-01 was a Thursday (weekday 3, Monday = 0)
+            weekday = (local // 86400 + 3) % 7
+            mask &= np.isin(weekday, [int(d) for d in promo.active_days.split(',')])
+        return mask
+
+    def simulate_cashback_campaign(self, campaign: CashbackCampaign, respect_schedule: bool = False) -> SimulationResult:
+        """
+        Store credit a cashback campaign would have issued over the history.
+
+        Args:
+            campaign: Saved or unsaved CashbackCampaign
+            respect_schedule: Only count orders inside start_date/end_date
+
+        Returns:
+            SimulationResult in store credit
+        """
+        started = time.perf_counter()
+        h = self.history
+        mask = np.ones(h.n_orders, dtype=bool)
+
+        first_order = h.first_order()
+        if campaign.applies_to_new_customers is False:
+            mask &= ~first_order
+        if campaign.applies_to_existing_customers is False:
+            mask &= first_order
+        tiers = parse_json_list(campaign.tier_restriction)
+        if tiers is not None:
+            mask &= self._tier_mask(tiers)
+        if respect_schedule:
+            mask &= self._schedule_mask(campaign.start_date, campaign.end_date)
+        if campaign.min_purchase:
+            mask &= h.order_total >= float(campaign.min_purchase)
+
+        awards = h.order_total * float(campaign.cashback_rate or 0) / 100
+        if campaign.max_cashback:
+            awards = np.minimum(awards, float(campaign.max_cashback))
+
+        mask &= awards > 0
+        if campaign.max_uses_per_customer:
+            mask &= self._cap_per_customer(mask, campaign.max_uses_per_customer)
+        if campaign.max_uses_total:
+            mask &= self._cap_total(mask, campaign.max_uses_total)
+
+        awards = np.where(mask, np.round(awards, 2), 0.0)
+        if campaign.max_total_cashback:
+            awards = self._apply_budget(awards, float(campaign.max_total_cashback))
+
+        return self._summarize(campaign.name or 'Cashback campaign', 'credit', awards, started)
+
+    # ==================== Aggregation ====================
+
+    def _summarize(self, candidate: str, unit: str, awards: np.ndarray, started: float) -> SimulationResult:
+        """Total, per-tier breakdown and per-customer distribution of per-order awards."""
+        h = self.history
+        rewarded = awards > 0
+        as_number = (lambda v: int(v)) if unit == 'points' else (lambda v: round(float(v), 2))
+
+        # Per tier (slot 0 holds guests and untiered customers)
+        tier_slot = h.order_tier() + 1
+        tier_totals = np.bincount(tier_slot, weights=awards, minlength=len(h.tier_names) + 1)
+        tier_orders = np.bincount(tier_slot[rewarded], minlength=len(h.tier_names) + 1)
+        by_tier = {}
+        for slot, name in enumerate(['No tier'] + h.tier_names):
+            if tier_orders[slot]:
+                by_tier[name] = {'total': as_number(tier_totals[slot]), 'orders_rewarded': int(tier_orders[slot])}
+
+        # Per customer
+        customer_mask = rewarded & (h.customer_idx >= 0)
+        per_customer = np.bincount(
+            h.customer_idx[customer_mask], weights=awards[customer_mask], minlength=h.n_customers
+        )
+        orders_per_customer = np.bincount(h.customer_idx[customer_mask], minlength=h.n_customers)
+        earners = per_customer[per_customer > 0]
+        distribution: Dict[str, Any] = {'customers_rewarded': int(len(earners))}
+        if len(earners):
+            p50, p90, p99 = np.percentile(earners, [50, 90, 99])
+            top = np.argsort(per_customer)[::-1][:TOP_CUSTOMERS]
+            distribution.update({
+                'mean': round(float(earners.mean()), 2),
+                'p50': round(float(p50), 2),
+                'p90': round(float(p90), 2),
+                'p99': round(float(p99), 2),
+                'max': as_number(earners.max()),
+                'top_customers': [
+                    {
+                        'shopify_customer_id': str(h.customer_ids[i]),
+                        'member_id': int(h.customer_member_id[i]) or None,
+                        'total': as_number(per_customer[i]),
+                        'orders_rewarded': int(orders_per_customer[i]),
+                    }
+                    for i in top if per_customer[i] > 0
+                ],
+            })
+
+        return SimulationResult(
+            candidate=candidate,
+            unit=unit,
+            awards=awards,
+            total=as_number(awards.sum()),
+            orders_considered=h.n_orders,
+            orders_rewarded=int(rewarded.sum()),
+            by_tier=by_tier,
+            distribution=distribution,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+
+
+# ==================== Loading ====================
+
+def _fetch_raw_orders(tenant: Tenant, start_date: str, end_date: str) -> Iterable[Dict[str, Any]]:
+    """Stream paid/authorized orders with line items through a Shopify Bulk Operation."""
+    from .store_credit_events import StoreCreditEventsService
+
+    service = StoreCreditEventsService(tenant.shopify_domain, tenant.shopify_access_token, tenant_id=tenant.id)
+    return service.stream_orders(start_date, end_date, include_line_items=True)
+
+
+def load_order_history(tenant_id: int, start_date: str, end_date: str, refresh: bool = False) -> OrderHistory:
+    """
+    Load (or reuse) a tenant's columnar order history for a period.
+
+    Args:
+        tenant_id: Tenant ID
+        start_date: ISO start date/datetime
+        end_date: ISO end date/datetime
+        refresh: Re-export from Shopify even if a cached history exists
+
+    Returns:
+        OrderHistory
+    """
+    if not refresh:
+        history = cached_order_history(tenant_id, start_date, end_date)
+        if history is not None:
+            return history
+
+    tenant = Tenant.query.get(tenant_id)
+    if not tenant:
+        raise ValidationError('Tenant not found')
+
+    started = time.perf_counter()
+    members = db.session.query(
+        Member.id, Member.shopify_customer_id, Member.tier_id, Member.status,
+        Member.created_at, Member.first_purchase_at
+    ).filter(Member.tenant_id == tenant_id).all()
+    tiers = MembershipTier.query.filter_by(tenant_id=tenant_id).order_by(MembershipTier.display_order).all()
+
+    history = OrderHistory.build(_fetch_raw_orders(tenant, start_date, end_date), members, tiers)
+    logger.info(
+        f'[RuleSimulator] Loaded {history.n_orders} orders / {len(history.item_order)} line items '
+        f'for tenant {tenant_id} in {time.perf_counter() - started:.1f}s'
+    )
+
+    now = time.monotonic()
+    with _history_cache_lock:
+        for expired in [k for k, (expires, _) in _history_cache.items() if expires < now]:
+            del _history_cache[expired]
+        _history_cache[(tenant_id, start_date, end_date)] = (now + HISTORY_CACHE_TTL, history)
+        _history_cache.move_to_end((tenant_id, start_date, end_date))
+        while len(_history_cache) > HISTORY_CACHE_SIZE:
+            _history_cache.popitem(last=False)
+    return history
+
+
+def cached_order_history(tenant_id: int, start_date: str, end_date: str) -> Optional[OrderHistory]:
+    """The period's history if this process has it loaded and unexpired, else None."""
+    key = (tenant_id, start_date, end_date)
+    with _history_cache_lock:
+        entry = _history_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _history_cache[key]
+            return None
+        _history_cache.move_to_end(key)
+        return entry[1]
+
+
+def invalidate_order_history_cache(tenant_id: Optional[int] = None) -> None:
+    """Drop cached histories for a tenant (or all tenants)."""
+    with _history_cache_lock:
+        for key in [k for k in _history_cache if tenant_id is None or k[0] == tenant_id]:
+            _history_cache.pop(key, None)
+
+
+# ==================== Candidates from API Input ====================
+
+CANDIDATE_MODELS = {
+    'earning_rule': EarningRule,
+    'promotion': Promotion,
+    'cashback_campaign': CashbackCampaign,
+}
+
+
+def build_candidate(tenant_id: int, candidate_type: str, candidate_id: Optional[int] = None,
+                    config: Optional[Dict[str, Any]] = None):
+    """
+    Resolve a saved configuration, optionally overridden by draft fields.
+
+    The returned model is never added to the session. JSON filter fields
+    accept lists; datetime fields accept ISO strings.
+
+    Raises:
+        ValidationError: On an unknown type, missing record or bad field value
+    """
+    model = CANDIDATE_MODELS.get(candidate_type)
+    if model is None:
+        raise ValidationError(f"type must be one of {', '.join(CANDIDATE_MODELS)}", field='type')
+
+    saved = None
+    if candidate_id is not None:
+        saved = model.query.filter_by(id=candidate_id, tenant_id=tenant_id).first()
+        if not saved:
+            raise ValidationError(f'{candidate_type} {candidate_id} not found', field='id')
+        if not config:
+            return saved
+
+    columns = model.__table__.columns
+    values = {c.key: getattr(saved, c.key) for c in columns} if saved is not None else {}
+    for key, value in (config or {}).items():
+        if key in ('id', 'tenant_id') or key not in columns:
+            continue
+        try:
+            column_type = columns[key].type.python_type
+        except NotImplementedError:
+            column_type = None
+        if isinstance(value, (list, dict)) and column_type is str:
+            value = json.dumps(value)
+        elif isinstance(value, str) and column_type in (datetime, dt_time):
+            try:
+                if column_type is datetime:
+                    value = datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+                else:
+                    value = dt_time.fromisoformat(value)
+            except ValueError:
+                raise ValidationError(f'Invalid value for {key}', field=key)
+        values[key] = value
+
+    values.pop('id', None)
+    values['tenant_id'] = tenant_id
+    return model(**values)
+
+
+def simulate_candidate(simulator: RuleSimulator, candidate, respect_schedule: bool = False) -> SimulationResult:
+    """Dispatch a candidate model to the matching simulate_* method."""
+    if isinstance(candidate, EarningRule):
+        return simulator.simulate_earning_rule(candidate, respect_schedule=respect_schedule)
+    if isinstance(candidate, Promotion):
+        return simulator.simulate_promotion(candidate, respect_schedule=respect_schedule)
+    if isinstance(candidate, CashbackCampaign):
+        return simulator.simulate_cashback_campaign(candidate, respect_schedule=respect_schedule)
+    raise ValidationError(f'Cannot simulate {type(candidate).__name__}')
+
+
+def simulate_candidates(simulator: RuleSimulator, candidates: List[Dict[str, Any]],
+                        respect_schedule: bool = False) -> List[Dict[str, Any]]:
+    """Build each API candidate ({type, id, config}) and simulate it."""
+    models = [
+        build_candidate(simulator.tenant_id, c.get('type'), c.get('id'), c.get('config'))
+        for c in candidates
+    ]
+    return [simulate_candidate(simulator, model, respect_schedule=respect_schedule).to_dict() for model in models]
+
+
+# ==================== Background Runs ====================
+
+def request_simulation(tenant_id: int, start_date: str, end_date: str, candidates: List[Dict[str, Any]],
+                       respect_schedule: bool = False, refresh: bool = False) -> SimulationRun:
+    """Record a simulation to run in the background and commit."""
+    run = SimulationRun(
+        tenant_id=tenant_id, status='pending', start_date=start_date, end_date=end_date,
+        request={'candidates': candidates, 'respect_schedule': respect_schedule, 'refresh': refresh}
+    )
+    db.session.add(run)
+    db.session.commit()
+    return run
+
+
+def run_simulation(run_id: int) -> str:
+    """
+    Load the run's order history (exporting it if needed) and simulate its candidates.
+
+    Returns:
+        Resulting status: done or failed
+    """
+    run = db.session.get(SimulationRun, run_id)
+    run.status = 'running'
+    run.started_at = datetime.utcnow()
+    db.session.commit()
+
+    options = run.request or {}
+    try:
+        simulator = RuleSimulator.for_period(
+            run.tenant_id, run.start_date, run.end_date, refresh=bool(options.get('refresh'))
+        )
+        results = simulate_candidates(
+            simulator, options.get('candidates') or [], respect_schedule=bool(options.get('respect_schedule'))
+        )
+    except Exception as e:
+        db.session.rollback()
+        run = db.session.get(SimulationRun, run_id)
+        run.status = 'failed'
+        run.error = e.message if isinstance(e, ValidationError) else str(e)[:2000]
+        run.finished_at = datetime.utcnow()
+        db.session.commit()
+        logger.error(f'[RuleSimulator] Run {run_id} failed: {e}')
+        return 'failed'
+
+    run.status = 'done'
+    run.orders = simulator.history.n_orders
+    run.history_loaded_at = simulator.history.loaded_at
+    run.results = results
+    run.finished_at = datetime.utcnow()
+    db.session.commit()
+    return 'done'
+
+
+def start_simulation_run(run_id: int) -> None:
+    """Run a simulation in the background (inline under TESTING)."""
+    app = current_app._get_current_object()
+    if app.config.get('TESTING'):
+        run_simulation(run_id)
+        return
+
+    def _run():
+        with app.app_context():
+            try:
+                run_simulation(run_id)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f'[RuleSimulator] Run {run_id} crashed: {e}')
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=_run, name=f'rule-simulation-{run_id}', daemon=True).start()
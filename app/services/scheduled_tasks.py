@@ -20,7 +20,7 @@ from flask import current_app
 from sqlalchemy import and_, or_
 from ..extensions import db
 from ..models.member import Member, MembershipTier
-from ..models.promotions import StoreCreditLedger, CreditEventType, MemberCreditBalance
+from ..models.promotions import StoreCreditLedger, CreditEventType
 from ..models.tenant import Tenant
 from .store_credit_service import StoreCreditService
 
@@ -165,7 +165,9 @@ class ScheduledTasksService:
         Expire credits that have passed their expiration date.
 
         This creates negative ledger entries to zero out expired credits
-        and updates the member's balance accordingly.
+        and updates the member's balance accordingly. Runs set-based in
+        keyset-paged chunks (see CreditExpirationEngine); the dry run
+        previews from the same query.
 
         Args:
             tenant_id: The tenant to process
@@ -174,104 +176,9 @@ class ScheduledTasksService:
         Returns:
             Summary of credits expired
         """
-        now = datetime.utcnow()
-
-        # Find all unexpired credits with expiration dates in the past
-        # that haven't been marked as expired yet
-        expired_credits = db.session.query(StoreCreditLedger).join(
-            Member, StoreCreditLedger.member_id == Member.id
-        ).filter(
-            Member.tenant_id == tenant_id,
-            StoreCreditLedger.expires_at.isnot(None),
-            StoreCreditLedger.expires_at < now,
-            StoreCreditLedger.amount > 0,  # Only positive (credit) entries
-            StoreCreditLedger.event_type != 'expiration'  # Not already an expiration entry
-        ).all()
+        from .credit_expiration import CreditExpirationEngine
 
-        # Group by member to process expirations
-        member_expirations: Dict[int, List[StoreCreditLedger]] = {}
-        for credit in expired_credits:
-            if credit.member_id not in member_expirations:
-                member_expirations[credit.member_id] = []
-            member_expirations[credit.member_id].append(credit)
-
-        results = {
-            'processed': 0,
-            'expired_entries': 0,
-            'members_affected': 0,
-            'total_expired': Decimal('0'),
-            'errors': [],
-            'details': [],
-            'dry_run': dry_run,
-            'run_date': now.isoformat()
-        }
-
-        for member_id, credits in member_expirations.items():
-            member = Member.query.get(member_id)
-            if not member:
-                continue
-
-            results['members_affected'] += 1
-            member_total = Decimal('0')
-
-            for credit in credits:
-                results['processed'] += 1
-
-                # Check if this specific credit was already expired
-                already_expired = StoreCreditLedger.query.filter(
-                    StoreCreditLedger.member_id == member_id,
-                    StoreCreditLedger.event_type == 'expiration',
-                    StoreCreditLedger.source_id == f'expired:{credit.id}'
-                ).first()
-
-                if already_expired:
-                    continue
-
-                if not dry_run:
-                    try:
-                        # Create expiration entry (negative amount)
-                        expiration_entry = StoreCreditLedger(
-                            member_id=member_id,
-                            event_type='expiration',
-                            amount=-credit.amount,
-                            balance_after=Decimal('0'),  # Will be recalculated
-                            description=f'Credit expired (issued {credit.created_at.strftime("%Y-%m-%d")})',
-                            source_type='expiration',
-                            source_id=f'expired:{credit.id}',
-                            source_reference=credit.source_reference,
-                            created_by='system:scheduler'
-                        )
-                        db.session.add(expiration_entry)
-
-                        member_total += credit.amount
-                        results['expired_entries'] += 1
-
-                    except Exception as e:
-                        results['errors'].append({
-                            'credit_id': credit.id,
-                            'member_id': member_id,
-                            'error': str(e)
-                        })
-                else:
-                    member_total += credit.amount
-                    results['expired_entries'] += 1
-
-            results['total_expired'] += member_total
-            results['details'].append({
-                'member_id': member_id,
-                'member_number': member.member_number,
-                'expired_amount': float(member_total),
-                'entries_expired': len([c for c in credits])
-            })
-
-        if not dry_run and results['expired_entries'] > 0:
-            db.session.commit()
-
-            # Recalculate balances for affected members
-            for member_id in member_expirations.keys():
-                self._recalculate_member_balance(member_id)
-
-        results['total_expired'] = float(results['total_expired'])
+        results = CreditExpirationEngine(tenant_id).run(dry_run=dry_run)
 
         if not dry_run:
             self._log_scheduled_task('credit_expiration', tenant_id, results)
@@ -405,27 +312,6 @@ class ScheduledTasksService:
 
     # ==================== HELPER METHODS ====================
 
-    def _recalculate_member_balance(self, member_id: int):
-        """Recalculate a member's credit balance from ledger entries."""
-        from sqlalchemy import func
-
-        # Sum all ledger entries
-        total = db.session.query(func.sum(StoreCreditLedger.amount)).filter(
-            StoreCreditLedger.member_id == member_id
-        ).scalar() or Decimal('0')
-
-        # Update or create balance record
-        balance = MemberCreditBalance.query.filter_by(member_id=member_id).first()
-        if not balance:
-            balance = MemberCreditBalance(member_id=member_id)
-            db.session.add(balance)
-
-        balance.total_balance = total
-        balance.available_balance = total
-        balance.updated_at = datetime.utcnow()
-
-        db.session.commit()
-
     def _log_scheduled_task(self, task_name: str, tenant_id: int, results: Dict):
         """Log a scheduled task execution for audit purposes."""
         # Could store in a ScheduledTaskLog model
@@ -0,0 +1,206 @@
+"""
+Search Service.
+
+Indexed search over members and the trade-in ledger.
+
+On Postgres, substring matches run against a single concatenated search
+expression covered by a pg_trgm GIN index, ledger notes also match through
+a tsvector index, and results are ranked by trigram similarity. Member
+numbers and emails get prefix-optimised lookups backed by text_pattern_ops
+btree indexes. On SQLite (tests, local dev) the same predicates run unindexed
+and ranking falls back to match class only.
+
+The search expressions below must stay identical to the index expressions
+created in migration n9f0a1b2c3d4, otherwise Postgres will not use the indexes.
+
+Usage:
+    from app.services.search_service import member_search_clause, search_members
+
+    query = query.filter(member_search_clause(term))       # filter only
+    members = search_members(tenant_id, term, limit=20)    # ranked
+"""
+import re
+from typing import Optional, List, Any
+
+from sqlalchemy import case, func, literal_column, or_
+
+from ..extensions import db
+from ..models import Member, TradeInLedger
+
+# Concatenated, lower-cased search documents (mirror the trigram index expressions)
+MEMBER_SEARCH_EXPR = literal_column(
+    "lower(coalesce(members.name, '') || ' ' || coalesce(members.email, '') || ' ' || "
+    "coalesce(members.member_number, '') || ' ' || coalesce(members.partner_customer_id, ''))"
+)
+LEDGER_SEARCH_EXPR = literal_column(
+    "lower(coalesce(trade_in_ledger.reference, '') || ' ' || coalesce(trade_in_ledger.guest_name, '') || ' ' || "
+    "coalesce(trade_in_ledger.category, '') || ' ' || coalesce(trade_in_ledger.notes, ''))"
+)
+LEDGER_NOTES_TSVECTOR = literal_column(
+    "to_tsvector('simple', coalesce(trade_in_ledger.notes, ''))"
+)
+
+# Member numbers: TU1001, legacy QF1001, or bare digits
+MEMBER_NUMBER_PATTERN = re.compile(r'^(TU|QF)?\d+$', re.IGNORECASE)
+
+MAX_SEARCH_RESULTS = 50
+
+
+def _is_postgres() -> bool:
+    return db.engine.dialect.name == 'postgresql'
+
+
+def _escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input matches literally."""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def normalize_term(term: Optional[str]) -> str:
+    """Trim and lower-case a search term."""
+    return (term or '').strip().lower()
+
+
+def _member_prefix_clauses(term: str) -> List[Any]:
+    """Prefix lookups that hit the member_number / email btree indexes."""
+    clauses = []
+    if MEMBER_NUMBER_PATTERN.match(term):
+        number = term.upper()
+        if number.isdigit():
+            number = f'TU{number}'
+        clauses.append(Member.member_number.like(f'{_escape_like(number)}%', escape='\\'))
+    if '@' in term or '.' in term:
+        clauses.append(func.lower(Member.email).like(f'{_escape_like(term)}%', escape='\\'))
+    return clauses
+
+
+def member_search_clause(term: str):
+    """
+    Filter matching members whose name, email, member number or partner ID contains term.
+
+    Args:
+        term: Raw search term
+
+    Returns:
+        SQLAlchemy boolean clause
+    """
+    term = normalize_term(term)
+    contains = MEMBER_SEARCH_EXPR.like(f'%{_escape_like(term)}%', escape='\\')
+    return or_(contains, *_member_prefix_clauses(term))
+
+
+def member_rank(term: str):
+    """Relevance: exact member number > prefix match > substring, plus similarity on Postgres."""
+    term = normalize_term(term)
+    prefix = _member_prefix_clauses(term)
+    whens = [(func.upper(Member.member_number) == term.upper(), 3.0)]
+    if prefix:
+        whens.append((or_(*prefix), 2.0))
+    rank = case(*whens, else_=1.0)
+    if _is_postgres():
+        rank = rank + func.similarity(MEMBER_SEARCH_EXPR, term)
+    return rank
+
+
+def search_members(
+    tenant_id: int,
+    term: str,
+    limit: int = 20,
+    status: Optional[str] = None,
+    prefix_only: bool = False
+) -> List[Any]:
+    """
+    Ranked member search.
+
+    Args:
+        tenant_id: Tenant to search in
+        term: Search term (name, email, member number, partner ID)
+        limit: Maximum results (capped at MAX_SEARCH_RESULTS)
+        status: Optional member status filter
+        prefix_only: Only use member number / email prefix lookups (POS scans)
+
+    Returns:
+        Column-projected member rows, best match first
+    """
+    from .member_serializer import project_member_columns
+
+    term = normalize_term(term)
+    if not term:
+        return []
+
+    if prefix_only:
+        clauses = _member_prefix_clauses(term)
+        if not clauses:
+            return []
+        clause = or_(*clauses)
+    else:
+        clause = member_search_clause(term)
+
+    query = Member.query.filter(Member.tenant_id == tenant_id, clause)
+    if status:
+        query = query.filter(Member.status == status)
+
+    return project_member_columns(query).order_by(
+        member_rank(term).desc(),
+        Member.created_at.desc()
+    ).limit(max(1, min(limit, MAX_SEARCH_RESULTS))).all()
+
+
+def ledger_search_clause(term: str):
+    """
+    Filter matching ledger entries by reference, guest name, category or notes.
+
+    Args:
+        term: Raw search term
+
+    Returns:
+        SQLAlchemy boolean clause
+    """
+    term = normalize_term(term)
+    clauses = [
+        LEDGER_SEARCH_EXPR.like(f'%{_escape_like(term)}%', escape='\\'),
+        func.lower(TradeInLedger.reference).like(f'{_escape_like(term)}%', escape='\\'),
+    ]
+    if _is_postgres():
+        clauses.append(LEDGER_NOTES_TSVECTOR.op('@@')(func.plainto_tsquery('simple', term)))
+    return or_(*clauses)
+
+
+def ledger_rank(term: str):
+    """Relevance: reference prefix > substring, plus similarity and note rank on Postgres."""
+    term = normalize_term(term)
+    rank = case(
+        (func.lower(TradeInLedger.reference).like(f'{_escape_like(term)}%', escape='\\'), 2.0),
+        else_=1.0
+    )
+    if _is_postgres():
+        rank = (
+            rank
+            + func.similarity(LEDGER_SEARCH_EXPR, term)
+            + func.ts_rank(LEDGER_NOTES_TSVECTOR, func.plainto_tsquery('simple', term))
+        )
+    return rank
+
+
+def search_ledger(tenant_id: int, term: str, limit: int = 20) -> List[TradeInLedger]:
+    """
+    Ranked trade-in ledger search.
+
+    Args:
+        tenant_id: Tenant to search in
+        term: Search term
+        limit: Maximum results (capped at MAX_SEARCH_RESULTS)
+
+    Returns:
+        Ledger entries, best match first
+    """
+    term = normalize_term(term)
+    if not term:
+        return []
+
+    return TradeInLedger.query.filter(
+        TradeInLedger.tenant_id == tenant_id,
+        ledger_search_clause(term)
+    ).order_by(
+        ledger_rank(term).desc(),
+        TradeInLedger.trade_date.desc()
+    ).limit(max(1, min(limit, MAX_SEARCH_RESULTS))).all()
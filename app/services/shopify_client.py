@@ -3,17 +3,38 @@ Shopify Admin API client.
 Handles store credit operations and customer management.
 """
 import logging
+import threading
 import time
 import httpx
 from typing import Optional, Dict, Any, List
 from flask import current_app
 
+from ..middleware.telemetry import httpx_event_hooks
+from ..utils.cooperative import http_transport
+
 logger = logging.getLogger(__name__)
 
 # Rate limit configuration
 MAX_RETRIES = 3
 INITIAL_BACKOFF_SECONDS = 1.0
 
+# Shared keep-alive connection pool (httpx.Client is thread-safe)
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Process-wide pooled HTTP client for Admin API calls."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                transport=http_transport(HTTP_POOL_LIMITS), event_hooks=httpx_event_hooks('shopify')
+            )
+        return _http_client
+
 # Valid Shopify metafield types (as of 2025-01 API)
 # https://shopify.dev/docs/apps/custom-data/metafields/types
 VALID_METAFIELD_TYPES = {
@@ -154,40 +175,40 @@ class ShopifyClient:
 
         for attempt in range(MAX_RETRIES):
             try:
-                with httpx.Client() as client:
-                    response = client.post(
-                        self.graphql_url,
-                        headers=headers,
-                        json=payload,
-                        timeout=30.0
-                    )
+                client = get_http_client()
+                response = client.post(
+                    self.graphql_url,
+                    headers=headers,
+                    json=payload,
+                    timeout=30.0
+                )
+
+                # Handle HTTP 429 Too Many Requests
+                if response.status_code == 429:
+                    retry_after = float(response.headers.get('Retry-After', backoff))
+                    logger.warning(f'Rate limited (HTTP 429), retrying in {retry_after}s (attempt {attempt + 1}/{MAX_RETRIES})')
+                    time.sleep(retry_after)
+                    backoff *= 2  # Exponential backoff
+                    continue
+
+                response.raise_for_status()
+                result = response.json()
 
-                    # Handle HTTP 429 Too Many Requests
-                    if response.status_code == 429:
-                        retry_after = float(response.headers.get('Retry-After', backoff))
-                        logger.warning(f'Rate limited (HTTP 429), retrying in {retry_after}s (attempt {attempt + 1}/{MAX_RETRIES})')
-                        time.sleep(retry_after)
-                        backoff *= 2  # Exponential backoff
+                # Check for GraphQL THROTTLED errors
+                if 'errors' in result:
+                    is_throttled = any(
+                        error.get('extensions', {}).get('code') == 'THROTTLED'
+                        for error in result['errors']
+                    )
+                    if is_throttled and attempt < MAX_RETRIES - 1:
+                        logger.warning(f'Rate limited (THROTTLED), retrying in {backoff}s (attempt {attempt + 1}/{MAX_RETRIES})')
+                        time.sleep(backoff)
+                        backoff *= 2
                         continue
+                    # Non-throttle error or final attempt
+                    raise Exception(f"GraphQL errors: {result['errors']}")
 
-                    response.raise_for_status()
-                    result = response.json()
-
-                    # Check for GraphQL THROTTLED errors
-                    if 'errors' in result:
-                        is_throttled = any(
-                            error.get('extensions', {}).get('code') == 'THROTTLED'
-                            for error in result['errors']
-                        )
-                        if is_throttled and attempt < MAX_RETRIES - 1:
-                            logger.warning(f'Rate limited (THROTTLED), retrying in {backoff}s (attempt {attempt + 1}/{MAX_RETRIES})')
-                            time.sleep(backoff)
-                            backoff *= 2
-                            continue
-                        # Non-throttle error or final attempt
-                        raise Exception(f"GraphQL errors: {result['errors']}")
-
-                    return result.get('data', {})
+                return result.get('data', {})
 
             except httpx.HTTPStatusError as e:
                 last_exception = e
@@ -566,6 +587,115 @@ class ShopifyClient:
             'tags': mutation_result.get('customer', {}).get('tags', [])
         }
 
+    def get_customers_tags(self, customer_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        Get current tags for several customers in a single request.
+
+        Args:
+            customer_ids: Shopify customer IDs (numeric or GID), max 250
+
+        Returns:
+            Dict mapping the ID as passed in to its list of tags.
+            Customers that no longer exist are omitted.
+        """
+        if not customer_ids:
+            return {}
+
+        gid_map = {
+            cid if cid.startswith('gid://') else f'gid://shopify/Customer/{cid}': cid
+            for cid in customer_ids
+        }
+
+        query = """
+        query getCustomersTags($ids: [ID!]!) {
+            nodes(ids: $ids) {
+                ... on Customer {
+                    id
+                    tags
+                }
+            }
+        }
+        """
+
+        result = self._execute_query(query, {'ids': list(gid_map.keys())})
+
+        tags_by_customer = {}
+        for node in result.get('nodes', []) or []:
+            if node and node.get('id') in gid_map:
+                tags_by_customer[gid_map[node['id']]] = node.get('tags', [])
+        return tags_by_customer
+
+    def update_customer_tags_bulk(self, changes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Add and remove tags on many customers in one aliased mutation.
+
+        Each change becomes a tagsAdd and/or tagsRemove field, so a batch of
+        N customers costs one HTTP request instead of a read-then-write pair
+        per tag.
+
+        Args:
+            changes: List of dicts with keys:
+                - customer_id: Shopify customer ID (numeric or GID)
+                - add: Tags to add (optional)
+                - remove: Tags to remove (optional)
+
+        Returns:
+            Dict with 'succeeded' (list of customer IDs as passed in) and
+            'failed' (dict of customer ID -> error message)
+        """
+        if not changes:
+            return {'succeeded': [], 'failed': {}}
+
+        declarations = []
+        fields = []
+        variables = {}
+        aliases = {}
+
+        for i, change in enumerate(changes):
+            customer_id = change['customer_id']
+            gid = customer_id if customer_id.startswith('gid://') else f'gid://shopify/Customer/{customer_id}'
+            add = list(change.get('add') or [])
+            remove = list(change.get('remove') or [])
+            if not add and not remove:
+                continue
+
+            declarations.append(f'$id{i}: ID!')
+            variables[f'id{i}'] = gid
+
+            if add:
+                declarations.append(f'$add{i}: [String!]!')
+                variables[f'add{i}'] = add
+                fields.append(f'add{i}: tagsAdd(id: $id{i}, tags: $add{i}) {{ userErrors {{ field message }} }}')
+                aliases[f'add{i}'] = customer_id
+            if remove:
+                declarations.append(f'$remove{i}: [String!]!')
+                variables[f'remove{i}'] = remove
+                fields.append(f'remove{i}: tagsRemove(id: $id{i}, tags: $remove{i}) {{ userErrors {{ field message }} }}')
+                aliases[f'remove{i}'] = customer_id
+
+        if not fields:
+            return {'succeeded': [], 'failed': {}}
+
+        mutation = 'mutation bulkCustomerTags({}) {{\n{}\n}}'.format(
+            ', '.join(declarations),
+            '\n'.join(fields)
+        )
+
+        result = self._execute_query(mutation, variables)
+
+        failed = {}
+        for alias, customer_id in aliases.items():
+            user_errors = (result.get(alias) or {}).get('userErrors', [])
+            if user_errors:
+                failed[customer_id] = str(user_errors)
+
+        succeeded = []
+        for customer_id in aliases.values():
+            if customer_id not in failed and customer_id not in succeeded:
+                succeeded.append(customer_id)
+
+        return {'succeeded': succeeded, 'failed': failed}
+
     def search_customers(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """
         Search for customers by name, email, or phone.
@@ -5,15 +5,32 @@ Enhanced for TradeUp Admin Dashboard with filter-based event builder.
 """
 import os
 import re
+import json
+import time
 import uuid
+import logging
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Iterable, Iterator
 from dataclasses import dataclass, field, asdict
 import httpx
 from flask import current_app
 
 
+logger = logging.getLogger(__name__)
+
+# Order fetch modes for bulk credit events
+FETCH_MODE_REST = 'rest'    # Paginated orders.json, 250 per request
+FETCH_MODE_BULK = 'bulk'    # Shopify Bulk Operations, streamed JSONL
+FETCH_MODES = (FETCH_MODE_REST, FETCH_MODE_BULK)
+
+# Bulk operation polling
+BULK_POLL_INTERVAL_SECONDS = 2.0
+BULK_TIMEOUT_SECONDS = 1800
+
+# Aggregated preview credits are reused by a following run for this long
+PREVIEW_CACHE_TTL = 600
+
 # Strict datetime pattern for GraphQL injection prevention
 # Accepts: 2024-01-15, 2024-01-15T14:30:00, 2024-01-15T14:30:00Z, 2024-01-15T14:30:00+00:00
 DATETIME_PATTERN = re.compile(
@@ -54,6 +71,16 @@ def validate_datetime_string(value: str, field_name: str) -> str:
     return value
 
 
+def _get_cache():
+    """Get cache instance, returns None if unavailable (e.g. outside app context)."""
+    try:
+        from flask import has_app_context
+        from ..utils.cache import cache
+        return cache if has_app_context() else None
+    except ImportError:
+        return None
+
+
 @dataclass
 class OrderData:
     """Represents a Shopify order for credit calculation."""
@@ -120,10 +147,18 @@ class StoreCreditEventsService:
         'google': ['google', 'google & youtube', 'youtube'],
     }
 
-    def __init__(self, shop_domain: str, access_token: str, api_version: str = '2024-01'):
+    def __init__(
+        self,
+        shop_domain: str,
+        access_token: str,
+        api_version: str = '2024-01',
+        tenant_id: Optional[int] = None
+    ):
         self.shop_domain = shop_domain.replace('https://', '').replace('http://', '').rstrip('/')
         self.access_token = access_token
         self.api_version = api_version
+        # When set, collection/tag filters resolve against the local catalog mirror
+        self.tenant_id = tenant_id
         self.graphql_url = f'https://{self.shop_domain}/admin/api/{api_version}/graphql.json'
 
     @classmethod
@@ -237,16 +272,16 @@ class StoreCreditEventsService:
         start_datetime: str,
         end_datetime: str,
         include_authorized: bool = True
-    ) -> List[Dict[str, Any]]:
+    ) -> Iterator[Dict[str, Any]]:
         """
         Fetch orders using REST API with status:any to get ALL orders.
         This is more reliable than GraphQL for getting all order statuses.
+
+        Yields orders page by page, so at most one page (250 orders) is held
+        in memory at a time.
         """
-        import logging
         from urllib.parse import urlencode
 
-        logger = logging.getLogger(__name__)
-
         # Normalize datetime format
         start_iso = start_datetime if 'T' in start_datetime else f"{start_datetime}T00:00:00Z"
         end_iso = end_datetime if 'T' in end_datetime else f"{end_datetime}T23:59:59Z"
@@ -261,7 +296,7 @@ class StoreCreditEventsService:
             params['financial_status'] = 'paid'
 
         path = f'/admin/api/{self.api_version}/orders.json?{urlencode(params)}'
-        collected = []
+        total = 0
 
         logger.info(f"[REST] Fetching orders: {start_iso} to {end_iso}")
 
@@ -269,8 +304,9 @@ class StoreCreditEventsService:
             while path:
                 data, headers = self._execute_rest(path)
                 orders = data.get('orders', [])
-                collected.extend(orders)
-                logger.info(f"[REST] Fetched {len(orders)} orders, total: {len(collected)}")
+                total += len(orders)
+                logger.info(f"[REST] Fetched {len(orders)} orders, total: {total}")
+                yield from orders
 
                 # Parse Link header for pagination
                 link_header = headers.get('link', '')
@@ -287,65 +323,255 @@ class StoreCreditEventsService:
                 else:
                     path = None
 
-            logger.info(f"[REST] Total orders fetched: {len(collected)}")
-            return collected
+            logger.info(f"[REST] Total orders fetched: {total}")
 
         except Exception as e:
             logger.error(f"[REST] Error fetching orders: {str(e)}")
             raise
 
-    def fetch_orders(
+    def _start_bulk_query(self, query: str) -> str:
+        """
+        Submit a bulkOperationRunQuery and return the bulk operation ID.
+
+        Raises:
+            Exception: If Shopify rejects the query (e.g. another bulk query is running)
+        """
+        mutation = """
+        mutation bulkOperationRunQuery($query: String!) {
+            bulkOperationRunQuery(query: $query) {
+                bulkOperation { id status }
+                userErrors { field message }
+            }
+        }
+        """
+
+        result = self._execute_graphql(mutation, {'query': query})
+        payload = result.get('bulkOperationRunQuery', {})
+        user_errors = payload.get('userErrors', [])
+        if user_errors:
+            raise Exception(f"Bulk operation rejected: {user_errors}")
+
+        operation = payload.get('bulkOperation') or {}
+        if not operation.get('id'):
+            raise Exception('Bulk operation did not return an ID')
+        return operation['id']
+
+    def _wait_for_bulk_operation(
+        self,
+        operation_id: str,
+        timeout: float = BULK_TIMEOUT_SECONDS,
+        poll_interval: float = BULK_POLL_INTERVAL_SECONDS
+    ) -> Optional[str]:
+        """
+        Poll a bulk operation until it finishes.
+
+        Returns:
+            URL of the JSONL result file, or None if the query matched nothing
+
+        Raises:
+            TimeoutError: If the operation does not finish within timeout
+            Exception: If the operation failed, was canceled or expired
+        """
+        query = """
+        query bulkOperation($id: ID!) {
+            node(id: $id) {
+                ... on BulkOperation {
+                    id
+                    status
+                    errorCode
+                    objectCount
+                    url
+                }
+            }
+        }
+        """
+
+        deadline = time.monotonic() + timeout
+        while True:
+            result = self._execute_graphql(query, {'id': operation_id})
+            operation = result.get('node') or {}
+            status = operation.get('status')
+
+            if status == 'COMPLETED':
+                logger.info(f"[Bulk] Operation {operation_id} completed with {operation.get('objectCount')} objects")
+                return operation.get('url')
+            if status in ('FAILED', 'CANCELED', 'EXPIRED'):
+                raise Exception(f"Bulk operation {operation_id} {status.lower()}: {operation.get('errorCode')}")
+
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Bulk operation {operation_id} did not finish within {timeout}s")
+            time.sleep(poll_interval)
+
+    def run_bulk_query(self, query: str) -> Iterator[Dict[str, Any]]:
+        """
+        Run a bulk query to completion and stream its JSONL result objects.
+
+        Nested connection rows carry a __parentId pointing at their parent object.
+        """
+        operation_id = self._start_bulk_query(query)
+        url = self._wait_for_bulk_operation(operation_id)
+        if url:
+            yield from self._stream_jsonl(url)
+
+    def stream_orders(
         self,
         start_datetime: str,
         end_datetime: str,
-        sources: List[str],
         include_authorized: bool = True,
-        collection_ids: Optional[List[str]] = None,
-        product_tags: Optional[List[str]] = None
-    ) -> List[OrderData]:
+        include_line_items: bool = False
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Fetch orders in a date range using REST API (more reliable for getting ALL orders).
+        Stream unfiltered orders (orders.json shape) for a period via a Bulk Operation.
 
-        Args:
-            start_datetime: ISO format start datetime
-            end_datetime: ISO format end datetime
-            sources: List of source names to include (e.g., ['pos', 'web'])
-            include_authorized: Include authorized (not just paid) orders
-            collection_ids: Optional list of collection GIDs to filter by
-            product_tags: Optional list of product tags to filter by
+        Used where every order is needed as raw data, e.g. rule simulation.
+        """
+        return self._fetch_orders_bulk(
+            start_datetime, end_datetime,
+            include_authorized=include_authorized,
+            include_line_items=include_line_items
+        )
 
-        Returns:
-            List of OrderData objects
+    def _stream_jsonl(self, url: str) -> Iterator[Dict[str, Any]]:
+        """Stream a bulk operation result file one JSON object per line."""
+        with httpx.Client() as client:
+            with client.stream('GET', url, timeout=60.0) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line.strip():
+                        yield json.loads(line)
+
+    @staticmethod
+    def _gid_to_int(gid: Optional[str]) -> Optional[int]:
+        """Convert gid://shopify/Type/123 to 123."""
+        if not gid:
+            return None
+        try:
+            return int(str(gid).rsplit('/', 1)[-1])
+        except ValueError:
+            return None
 
-        Raises:
-            ValueError: If datetime parameters have invalid format
+    def _bulk_order_to_rest(self, node: Dict[str, Any], line_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Reshape a bulk operation order node into the orders.json shape used by the filter stage."""
+        customer = node.get('customer')
+        if customer:
+            customer = {
+                'id': self._gid_to_int(customer.get('id')),
+                'email': customer.get('email'),
+                'first_name': customer.get('firstName') or '',
+                'last_name': customer.get('lastName') or '',
+                'tags': ', '.join(customer.get('tags') or []),
+            }
+
+        return {
+            'id': self._gid_to_int(node.get('id')),
+            'name': node.get('name', ''),
+            'created_at': node.get('createdAt', ''),
+            'source_name': node.get('sourceName'),
+            'financial_status': (node.get('displayFinancialStatus') or '').lower(),
+            'total_price': ((node.get('totalPriceSet') or {}).get('shopMoney') or {}).get('amount', '0'),
+            'customer': customer,
+            'line_items': [
+                {
+                    'product_id': self._gid_to_int((item.get('product') or {}).get('id')),
+                    'price': ((item.get('originalUnitPriceSet') or {}).get('shopMoney') or {}).get('amount', '0'),
+                    'quantity': item.get('quantity', 1),
+                }
+                for item in line_items
+            ],
+        }
+
+    def _fetch_orders_bulk(
+        self,
+        start_datetime: str,
+        end_datetime: str,
+        include_authorized: bool = True,
+        include_line_items: bool = False
+    ) -> Iterator[Dict[str, Any]]:
         """
-        import logging
-        logger = logging.getLogger(__name__)
+        Fetch orders with a Shopify Bulk Operation and yield them one at a time.
 
-        # Validate datetime parameters
-        start_datetime = validate_datetime_string(start_datetime, 'start_datetime')
-        end_datetime = validate_datetime_string(end_datetime, 'end_datetime')
+        The JSONL result lists each order followed by its line items (linked by
+        __parentId), so only the order currently being assembled is held in memory.
+        Yields dicts in the same shape as orders.json for the filter stage.
+        """
+        start_iso = start_datetime if 'T' in start_datetime else f"{start_datetime}T00:00:00Z"
+        end_iso = end_datetime if 'T' in end_datetime else f"{end_datetime}T23:59:59Z"
 
-        # If collection filtering is needed, fetch product IDs in those collections
-        collection_product_ids: Set[int] = set()
-        if collection_ids:
-            logger.info(f"[fetch_orders] Collection filter active: {collection_ids}")
-            collection_product_ids = self._get_collection_product_ids(collection_ids)
-            logger.info(f"[fetch_orders] Found {len(collection_product_ids)} products in filtered collections")
+        search = f"created_at:>='{start_iso}' AND created_at:<='{end_iso}'"
+        if include_authorized:
+            search += ' AND (financial_status:paid OR financial_status:authorized)'
+        else:
+            search += ' AND financial_status:paid'
+
+        line_items_fragment = """
+                    lineItems {
+                        edges {
+                            node {
+                                id
+                                quantity
+                                product { id }
+                                originalUnitPriceSet { shopMoney { amount } }
+                            }
+                        }
+                    }""" if include_line_items else ''
 
-        # Normalize product tags for case-insensitive matching
-        product_tags_lower: Set[str] = set()
-        if product_tags:
-            product_tags_lower = {t.lower() for t in product_tags}
-            logger.info(f"[fetch_orders] Product tag filter active: {product_tags}")
+        bulk_query = """
+        {
+            orders(query: "%s") {
+                edges {
+                    node {
+                        id
+                        name
+                        createdAt
+                        sourceName
+                        displayFinancialStatus
+                        totalPriceSet { shopMoney { amount } }
+                        customer { id email firstName lastName tags }%s
+                    }
+                }
+            }
+        }
+        """ % (search.replace('"', '\\"'), line_items_fragment)
+
+        logger.info(f"[Bulk] Submitting order export: {start_iso} to {end_iso}")
+        operation_id = self._start_bulk_query(bulk_query)
+        url = self._wait_for_bulk_operation(operation_id)
+        if not url:
+            return
+
+        current = None
+        current_items: List[Dict[str, Any]] = []
+        count = 0
+
+        for obj in self._stream_jsonl(url):
+            if '__parentId' in obj:
+                if current is not None and obj['__parentId'] == current.get('id'):
+                    current_items.append(obj)
+                continue
 
-        has_filters = bool(collection_product_ids) or bool(product_tags_lower)
+            if current is not None:
+                count += 1
+                yield self._bulk_order_to_rest(current, current_items)
+            current = obj
+            current_items = []
 
-        # Use REST API - it properly supports status:any to get ALL orders
-        raw_orders = self._fetch_orders_rest(start_datetime, end_datetime, include_authorized)
+        if current is not None:
+            count += 1
+            yield self._bulk_order_to_rest(current, current_items)
 
-        orders = []
+        logger.info(f"[Bulk] Streamed {count} orders")
+
+    def _filter_orders(
+        self,
+        raw_orders: Iterable[Dict[str, Any]],
+        sources: List[str],
+        include_authorized: bool,
+        collection_product_ids: Set[int],
+        product_tags_lower: Set[str],
+        tag_product_ids: Optional[Set[int]] = None
+    ) -> Iterator[OrderData]:
+        """Apply status, source and line-item filters to raw orders, one at a time."""
+        has_filters = bool(collection_product_ids) or bool(product_tags_lower)
 
         # Normalize and expand selected sources for filtering
         selected_lower = [s.lower() for s in sources] if sources else []
@@ -396,13 +622,11 @@ class StoreCreditEventsService:
                         if product_id and product_id in collection_product_ids:
                             item_qualifies = True
 
-                    # Check product tag filter (line items can have variant properties but not product tags directly)
-                    # We need to match against any tags in the line item properties
-                    if product_tags_lower and not item_qualifies:
-                        # Shopify line items don't include product tags directly
-                        # We'd need to fetch product data separately - for now, skip tag filtering on line items
-                        # or use the variant title / properties if available
-                        pass
+                    # Check product tag filter (line items don't carry product tags,
+                    # so tagged products are resolved from the catalog mirror)
+                    if product_tags_lower and not item_qualifies and tag_product_ids:
+                        if product_id and product_id in tag_product_ids:
+                            item_qualifies = True
 
                     if item_qualifies:
                         qualifying_total += item_total
@@ -414,7 +638,7 @@ class StoreCreditEventsService:
                     logger.debug(f"[fetch_orders] Order {o.get('name')} skipped - no qualifying items")
                     continue
 
-            orders.append(OrderData(
+            yield OrderData(
                 id=f"gid://shopify/Order/{o['id']}",
                 order_number=o.get('name', ''),
                 customer_id=f"gid://shopify/Customer/{customer['id']}" if customer else None,
@@ -428,22 +652,246 @@ class StoreCreditEventsService:
                 transactions=[],
                 qualifying_subtotal=qualifying_subtotal,
                 line_items=line_items if has_filters else []
-            ))
+            )
+
+    def fetch_orders(
+        self,
+        start_datetime: str,
+        end_datetime: str,
+        sources: List[str],
+        include_authorized: bool = True,
+        collection_ids: Optional[List[str]] = None,
+        product_tags: Optional[List[str]] = None,
+        fetch_mode: str = FETCH_MODE_REST
+    ) -> Iterator[OrderData]:
+        """
+        Lazily fetch filtered orders in a date range.
+
+        Arguments are validated immediately; orders are fetched from Shopify
+        and filtered one page (or bulk JSONL line) at a time as the returned
+        iterator is consumed. Wrap in list() if you need random access.
+
+        Args:
+            start_datetime: ISO format start datetime
+            end_datetime: ISO format end datetime
+            sources: List of source names to include (e.g., ['pos', 'web'])
+            include_authorized: Include authorized (not just paid) orders
+            collection_ids: Optional list of collection GIDs to filter by
+            product_tags: Optional list of product tags to filter by
+            fetch_mode: 'rest' (paginated orders.json, default) or 'bulk' (Bulk Operations export)
+
+        Returns:
+            Iterator of OrderData objects
+
+        Raises:
+            ValueError: If datetime parameters or fetch_mode are invalid
+        """
+        # Validate datetime parameters
+        start_datetime = validate_datetime_string(start_datetime, 'start_datetime')
+        end_datetime = validate_datetime_string(end_datetime, 'end_datetime')
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f'fetch_mode must be one of {FETCH_MODES}')
+
+        return self._iter_orders(
+            start_datetime, end_datetime, sources, include_authorized,
+            collection_ids, product_tags, fetch_mode
+        )
+
+    def _iter_orders(
+        self,
+        start_datetime: str,
+        end_datetime: str,
+        sources: List[str],
+        include_authorized: bool,
+        collection_ids: Optional[List[str]],
+        product_tags: Optional[List[str]],
+        fetch_mode: str
+    ) -> Iterator[OrderData]:
+        """Generator behind fetch_orders: resolve filters, pick a source, filter lazily."""
+        catalog = self._get_catalog_mirror() if (collection_ids or product_tags) else None
 
-        logger.info(f"[fetch_orders] Returning {len(orders)} orders (filters active: {has_filters})")
-        return orders
+        # If collection filtering is needed, resolve product IDs in those collections
+        collection_product_ids: Set[int] = set()
+        if collection_ids:
+            logger.info(f"[fetch_orders] Collection filter active: {collection_ids}")
+            if catalog:
+                collection_product_ids = catalog.product_ids_in_collections(collection_ids)
+            else:
+                collection_product_ids = self._get_collection_product_ids(collection_ids)
+            logger.info(f"[fetch_orders] Found {len(collection_product_ids)} products in filtered collections")
+
+        # Normalize product tags for case-insensitive matching
+        product_tags_lower: Set[str] = set()
+        tag_product_ids: Set[int] = set()
+        if product_tags:
+            product_tags_lower = {t.lower() for t in product_tags}
+            logger.info(f"[fetch_orders] Product tag filter active: {product_tags}")
+            if catalog:
+                tag_product_ids = catalog.product_ids_with_tags(product_tags)
+                logger.info(f"[fetch_orders] Found {len(tag_product_ids)} products with filtered tags")
+            else:
+                logger.warning("[fetch_orders] Product tag filter requires the catalog mirror; no items will qualify by tag")
+
+        has_filters = bool(collection_product_ids) or bool(product_tags_lower)
+
+        if fetch_mode == FETCH_MODE_BULK:
+            raw_orders = self._fetch_orders_bulk(
+                start_datetime, end_datetime, include_authorized,
+                include_line_items=has_filters
+            )
+        else:
+            # REST API properly supports status:any to get ALL orders
+            raw_orders = self._fetch_orders_rest(start_datetime, end_datetime, include_authorized)
+
+        yield from self._filter_orders(
+            raw_orders, sources, include_authorized,
+            collection_product_ids, product_tags_lower, tag_product_ids
+        )
+
+    def _get_catalog_mirror(self):
+        """Catalog mirror for this tenant, or None if unavailable or never reconciled."""
+        if not self.tenant_id:
+            return None
+        from .catalog_mirror_service import CatalogMirrorService
+        catalog = CatalogMirrorService(self.tenant_id)
+        if not catalog.is_populated():
+            logger.info(f"[fetch_orders] Catalog mirror empty for tenant {self.tenant_id}, using live collection lookup")
+            return None
+        return catalog
+
+    @staticmethod
+    def _tally_orders(orders: Iterable[OrderData], stats: Dict[str, Any]) -> Iterator[OrderData]:
+        """Pass orders through while counting totals and sources into stats."""
+        stats.setdefault('total_orders', 0)
+        stats.setdefault('orders_without_customer', 0)
+        stats.setdefault('by_source', {})
+        for order in orders:
+            stats['total_orders'] += 1
+            if not order.customer_id:
+                stats['orders_without_customer'] += 1
+            source = order.source_name or 'unknown'
+            stats['by_source'][source] = stats['by_source'].get(source, 0) + 1
+            yield order
+
+    def _preview_cache_key(
+        self,
+        start_datetime: str,
+        end_datetime: str,
+        sources: List[str],
+        credit_percent: float,
+        include_authorized: bool,
+        collection_ids: Optional[List[str]],
+        product_tags: Optional[List[str]]
+    ) -> str:
+        """Cache key for aggregated credits of one shop, date range and filter set."""
+        import hashlib
+
+        params = json.dumps({
+            'start': start_datetime,
+            'end': end_datetime,
+            'sources': sorted(s.lower() for s in (sources or [])),
+            'credit_percent': float(credit_percent),
+            'include_authorized': bool(include_authorized),
+            'collection_ids': sorted(collection_ids or []),
+            'product_tags': sorted(t.lower() for t in (product_tags or [])),
+        }, sort_keys=True)
+        digest = hashlib.sha1(params.encode('utf-8')).hexdigest()
+        return f'credit_event_preview:{self.shop_domain}:{digest}'
+
+    def _aggregate_credits(
+        self,
+        start_datetime: str,
+        end_datetime: str,
+        sources: List[str],
+        credit_percent: float,
+        include_authorized: bool,
+        collection_ids: Optional[List[str]],
+        product_tags: Optional[List[str]],
+        fetch_mode: str,
+        store_preview: bool = False,
+        reuse_preview: bool = False
+    ) -> tuple:
+        """
+        Stream orders into per-customer credits, using the preview cache when allowed.
+
+        A preview stores its aggregate; a run with reuse_preview takes (and
+        removes) it, so each preview saves at most one Shopify order scan.
+        The cached customers' tags are re-read from Shopify before the run
+        uses them, so the idempotency check never sees pre-run tags; if that
+        read fails the orders are fetched again.
+
+        Returns:
+            (credits dict keyed by customer ID, order stats dict)
+        """
+        cache = _get_cache() if (store_preview or reuse_preview) else None
+        key = None
+        if cache:
+            key = self._preview_cache_key(
+                start_datetime, end_datetime, sources, credit_percent,
+                include_authorized, collection_ids, product_tags
+            )
+
+        if cache and reuse_preview:
+            cached = cache.get(key)
+            if cached is not None:
+                cache.delete(key)
+                try:
+                    tags = self._fetch_customer_tags(list(cached['credits']))
+                except Exception as e:
+                    logger.warning(f"[StoreCreditEvents] Could not re-read tags for cached preview, re-fetching: {e}")
+                else:
+                    for customer_id, credit in cached['credits'].items():
+                        credit.existing_tags = tags.get(customer_id, [])
+                    logger.info(f"[StoreCreditEvents] Reusing preview credits for {len(cached['credits'])} customers")
+                    return cached['credits'], cached['stats']
+
+        orders = self.fetch_orders(
+            start_datetime, end_datetime, sources, include_authorized,
+            collection_ids=collection_ids, product_tags=product_tags,
+            fetch_mode=fetch_mode
+        )
+        stats: Dict[str, Any] = {}
+        credits = self.calculate_credits(self._tally_orders(orders, stats), credit_percent)
+
+        if cache and store_preview:
+            cache.set(key, {'credits': credits, 'stats': stats}, timeout=PREVIEW_CACHE_TTL)
+
+        return credits, stats
+
+    def _fetch_customer_tags(self, customer_ids: List[str]) -> Dict[str, List[str]]:
+        """Current tags of each customer, read live from Shopify in pages of 250."""
+        query = """
+        query getCustomersTags($ids: [ID!]!) {
+            nodes(ids: $ids) {
+                ... on Customer {
+                    id
+                    tags
+                }
+            }
+        }
+        """
+        tags: Dict[str, List[str]] = {}
+        for i in range(0, len(customer_ids), 250):
+            result = self._execute_graphql(query, {'ids': customer_ids[i:i + 250]})
+            for node in result.get('nodes') or []:
+                if node and node.get('id'):
+                    tags[node['id']] = node.get('tags') or []
+        return tags
 
     def calculate_credits(
         self,
-        orders: List[OrderData],
+        orders: Iterable[OrderData],
         credit_percent: float = 10.0,
         exclude_store_credit_payments: bool = True
     ) -> Dict[str, CustomerCredit]:
         """
         Calculate store credits for each customer.
 
+        Consumes orders in a single pass, so a streaming iterator keeps only
+        the per-customer totals in memory.
+
         Args:
-            orders: List of orders
+            orders: Orders (list or iterator)
             credit_percent: Percentage of order total to credit
             exclude_store_credit_payments: Subtract store credit/gift card payments from total
 
@@ -513,32 +961,30 @@ class StoreCreditEventsService:
         include_authorized: bool = True,
         collection_ids: Optional[List[str]] = None,
         product_tags: Optional[List[str]] = None,
-        audience: str = 'all_customers'
+        audience: str = 'all_customers',
+        fetch_mode: str = FETCH_MODE_REST
     ) -> Dict[str, Any]:
         """
         Preview a store credit event without applying credits.
 
         Args:
             audience: 'all_customers' (default) or 'members_only'
+            fetch_mode: 'rest' (default) or 'bulk' to stream a Bulk Operations export
 
         Returns:
             Preview data including order counts, customer counts, and totals
         """
-        orders = self.fetch_orders(
-            start_datetime, end_datetime, sources, include_authorized,
-            collection_ids=collection_ids, product_tags=product_tags
+        credits, stats = self._aggregate_credits(
+            start_datetime, end_datetime, sources, credit_percent, include_authorized,
+            collection_ids, product_tags, fetch_mode, store_preview=True
         )
-        credits = self.calculate_credits(orders, credit_percent)
 
         # Filter by audience if members_only
         if audience == 'members_only':
             credits = self._filter_members_only(credits)
 
         # Orders by source
-        by_source: Dict[str, int] = {}
-        for order in orders:
-            source = order.source_name or 'unknown'
-            by_source[source] = by_source.get(source, 0) + 1
+        by_source: Dict[str, int] = stats.get('by_source', {})
 
         # All customers sorted by credit amount (descending)
         top_customers = sorted(
@@ -548,7 +994,8 @@ class StoreCreditEventsService:
         )
 
         # Orders without customers
-        orders_without_customer = len([o for o in orders if not o.customer_id])
+        total_orders = stats.get('total_orders', 0)
+        orders_without_customer = stats.get('orders_without_customer', 0)
 
         # Calculate total order value from all credits (not just top 10)
         total_order_value = float(sum(c.total_spent for c in credits.values()))
@@ -558,8 +1005,8 @@ class StoreCreditEventsService:
             'end_datetime': end_datetime,
             'sources': sources,
             'credit_percent': credit_percent,
-            'total_orders': len(orders),
-            'orders_with_customer': len(orders) - orders_without_customer,
+            'total_orders': total_orders,
+            'orders_with_customer': total_orders - orders_without_customer,
             'orders_without_customer': orders_without_customer,
             'unique_customers': len(credits),
             'total_order_value': total_order_value,
@@ -836,7 +1283,9 @@ class StoreCreditEventsService:
         delay_ms: int = 1000,
         collection_ids: Optional[List[str]] = None,
         product_tags: Optional[List[str]] = None,
-        audience: str = 'all_customers'
+        audience: str = 'all_customers',
+        fetch_mode: str = FETCH_MODE_REST,
+        reuse_preview: bool = False
     ) -> Dict[str, Any]:
         """
         Run a store credit event (apply credits to all eligible customers).
@@ -854,17 +1303,18 @@ class StoreCreditEventsService:
             collection_ids: Optional list of collection GIDs to filter by
             product_tags: Optional list of product tags to filter by
             audience: 'all_customers' (default) or 'members_only'
+            fetch_mode: 'rest' (default) or 'bulk' to stream a Bulk Operations export
+            reuse_preview: Use credits from a matching preview made in the last
+                PREVIEW_CACHE_TTL seconds instead of re-fetching orders (tags
+                are still re-read live for the idempotency check)
 
         Returns:
             Event results including success/failure counts
         """
-        import time
-
-        orders = self.fetch_orders(
-            start_datetime, end_datetime, sources, include_authorized,
-            collection_ids=collection_ids, product_tags=product_tags
+        credits, _ = self._aggregate_credits(
+            start_datetime, end_datetime, sources, credit_percent, include_authorized,
+            collection_ids, product_tags, fetch_mode, reuse_preview=reuse_preview
         )
-        credits = self.calculate_credits(orders, credit_percent)
 
         # Filter by audience if members_only
         if audience == 'members_only':
@@ -0,0 +1,341 @@
+"""
+Tenant Purge (shop redaction).
+
+Deletes every row a shop owns after SHOP_REDACT without holding one long
+transaction. The webhook records a TenantPurge and returns; the purge
+then walks a table registry in dependency order (children before
+parents) and deletes each table's rows in small id-ordered chunks:
+
+- each chunk is a keyset SELECT of at most PURGE_BATCH_SIZE ids followed
+  by a DELETE of those ids, committed together with the checkpoint, so
+  locks are short and other tenants' writes are never queued behind the
+  purge
+- rows that reference rows of the same table (refunds, reversals,
+  referrers) are detached first, so deleting in id order never trips a
+  foreign key
+- an interrupted purge resumes from its checkpoint on the next scheduler
+  tick; the tenant row is deleted last
+- a failed purge is retried with exponential backoff; after
+  MAX_PURGE_FAILURES it is marked abandoned and reported at error level,
+  so a purge that cannot finish is raised with an operator instead of
+  being retried forever
+
+The registry is derived from the model metadata: any table with a
+tenant_id column, or a foreign key to a table that is purged, is
+included, so new tables are covered without touching this module.
+
+Usage:
+    from app.services.tenant_purge import request_tenant_purge, start_tenant_purge
+
+    purge = request_tenant_purge(tenant)     # SHOP_REDACT webhook
+    start_tenant_purge(purge.id)
+    resume_tenant_purges(max_seconds=240)    # scheduler
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import Column, Table, delete, or_, select, update
+
+from ..extensions import db
+from ..models import Tenant
+from ..models.tenant_purge import TenantPurge
+
+logger = logging.getLogger(__name__)
+
+# Rows deleted per chunk (one short transaction each)
+PURGE_BATCH_SIZE = 1000
+
+# A 'running' purge not checkpointed for this long belongs to a dead worker and may be resumed
+STALE_PURGE_SECONDS = 600
+
+# Tables never purged by tenant: the purge records themselves and cross-tenant job state
+EXCLUDED_TABLES = frozenset({'tenant_purges', 'scheduler_job_runs', 'scheduler_job_leases'})
+
+# Failed runs before a purge is abandoned, and the first retry delay (doubled per failure)
+MAX_PURGE_FAILURES = 5
+PURGE_RETRY_SECONDS = 300
+
+ACTIVE_STATUSES = ('pending', 'running', 'failed')
+
+
+@dataclass(frozen=True)
+class PurgeTable:
+    """A purged table and how its rows are tied to a tenant."""
+    table: Table
+    via: Optional[Tuple[Column, 'PurgeTable']] = None  # (FK column, parent) when there is no tenant_id
+    self_refs: Tuple[Column, ...] = ()  # Columns referencing the same table
+
+    @property
+    def name(self) -> str:
+        return self.table.name
+
+    def scope(self, tenant_id: int):
+        """WHERE clause selecting the tenant's rows."""
+        if self.via is None:
+            return self.table.c.tenant_id == tenant_id
+        column, parent = self.via
+        return column.in_(select(parent.table.c.id).where(parent.scope(tenant_id)))
+
+
+def purge_registry() -> List[PurgeTable]:
+    """Purged tables in deletion order (children before parents)."""
+    entries: Dict[str, PurgeTable] = {}
+    ordered = []
+
+    # sorted_tables lists parents before children
+    for table in db.metadata.sorted_tables:
+        if table.name in EXCLUDED_TABLES or table.name == Tenant.__tablename__ or 'id' not in table.c:
+            continue
+
+        self_refs = tuple(sorted(
+            (fk.parent for fk in table.foreign_keys if fk.column.table is table), key=lambda c: c.name
+        ))
+        if 'tenant_id' in table.c:
+            entry = PurgeTable(table, self_refs=self_refs)
+        else:
+            parents = sorted(
+                (fk for fk in table.foreign_keys
+                 if fk.column.table.name in entries and fk.column.name == 'id'),
+                key=lambda fk: fk.parent.name
+            )
+            if not parents:
+                continue
+            entry = PurgeTable(table, (parents[0].parent, entries[parents[0].column.table.name]), self_refs)
+
+        entries[table.name] = entry
+        ordered.append(entry)
+
+    return list(reversed(ordered))
+
+
+def request_tenant_purge(tenant: Tenant) -> TenantPurge:
+    """
+    Record a purge for a tenant (or return the one in progress) and commit.
+
+    The tenant is deactivated and its credentials cleared at once, so
+    scheduled jobs and API calls stop touching it while rows are deleted.
+    """
+    purge = TenantPurge.query.filter(
+        TenantPurge.tenant_id == tenant.id,
+        TenantPurge.status.in_(ACTIVE_STATUSES)
+    ).first()
+    if purge is None:
+        purge = TenantPurge(
+            tenant_id=tenant.id, shop_domain=tenant.shopify_domain,
+            status='pending', attempts=0, failures=0, last_id=0, rows_deleted=0, table_counts={}
+        )
+        db.session.add(purge)
+
+    tenant.is_active = False
+    tenant.subscription_active = False
+    tenant.shopify_access_token = None
+    tenant.webhook_secret = None
+    db.session.commit()
+    return purge
+
+
+class TenantPurger:
+    """Resumable, chunked deletion of one tenant's data."""
+
+    def __init__(self, purge_id: int, batch_size: int = PURGE_BATCH_SIZE):
+        self.purge_id = purge_id
+        self.batch_size = batch_size
+
+    def _claim(self) -> bool:
+        # Conditional update so two workers never purge the same tenant
+        now = datetime.utcnow()
+        claimed = TenantPurge.query.filter(
+            TenantPurge.id == self.purge_id,
+            db.or_(
+                TenantPurge.status == 'pending',
+                db.and_(TenantPurge.status == 'failed',
+                        db.or_(TenantPurge.next_attempt_at.is_(None), TenantPurge.next_attempt_at <= now)),
+                db.and_(TenantPurge.status == 'running',
+                        TenantPurge.updated_at < now - timedelta(seconds=STALE_PURGE_SECONDS))
+            )
+        ).update({
+            'status': 'running',
+            'attempts': TenantPurge.attempts + 1,
+            'started_at': now,
+            'updated_at': now,
+            'error': None
+        }, synchronize_session=False)
+        db.session.commit()
+        return bool(claimed)
+
+    def run(self, max_seconds: Optional[float] = None) -> str:
+        """
+        Claim the purge and delete chunks until done or out of time.
+
+        Args:
+            max_seconds: Stop after the chunk that passes this budget and
+                leave the purge pending for the next run (None = until done)
+
+        Returns:
+            Resulting status: done, pending (out of time), failed, abandoned
+            or skipped
+        """
+        if not self._claim():
+            return 'skipped'
+
+        deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+        purge = db.session.get(TenantPurge, self.purge_id)
+        try:
+            status = self._purge(purge, deadline)
+        except Exception as e:
+            db.session.rollback()
+            return self._fail(e)
+
+        return status
+
+    def _fail(self, error: Exception) -> str:
+        """Schedule a retry with backoff, or abandon after MAX_PURGE_FAILURES."""
+        purge = db.session.get(TenantPurge, self.purge_id)
+        purge.failures = (purge.failures or 0) + 1
+        purge.error = str(error)[:2000]
+        if purge.failures >= MAX_PURGE_FAILURES:
+            purge.status = 'abandoned'
+            purge.next_attempt_at = None
+        else:
+            purge.status = 'failed'
+            delay = PURGE_RETRY_SECONDS * 2 ** (purge.failures - 1)
+            purge.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        db.session.commit()
+
+        if purge.status == 'abandoned':
+            message = (f'[TenantPurge] Purge of {purge.shop_domain} abandoned after {purge.failures} '
+                       f'failures at {purge.current_table}: {error}')
+            logger.error(message)
+            from ..utils.sentry import capture_message
+            capture_message(message, level='error', extra={'purge_id': purge.id, 'tenant_id': purge.tenant_id})
+        else:
+            logger.error(f'[TenantPurge] Tenant {purge.tenant_id} failed at {purge.current_table} '
+                         f'(failure {purge.failures}, retry at {purge.next_attempt_at}): {error}')
+        return purge.status
+
+    def _purge(self, purge: TenantPurge, deadline: Optional[float]) -> str:
+        registry = purge_registry()
+        names = [entry.name for entry in registry]
+        start = names.index(purge.current_table) if purge.current_table in names else 0
+
+        for entry in registry[start:]:
+            if purge.current_table != entry.name:
+                purge.current_table = entry.name
+                purge.phase = 'detach' if entry.self_refs else 'delete'
+                purge.last_id = 0
+
+            while True:
+                if deadline is not None and time.monotonic() >= deadline:
+                    purge.status = 'pending'
+                    db.session.commit()
+                    return 'pending'
+
+                ids = self._next_ids(entry, purge)
+                if not ids:
+                    if purge.phase == 'detach':
+                        purge.phase = 'delete'
+                        purge.last_id = 0
+                        continue
+                    break
+
+                self._apply(entry, purge, ids)
+                purge.last_id = ids[-1]
+                purge.updated_at = datetime.utcnow()  # Heartbeat for stale-claim detection
+                db.session.commit()
+
+        db.session.execute(delete(Tenant.__table__).where(Tenant.__table__.c.id == purge.tenant_id))
+        tenant = db.session.identity_map.get(db.session.identity_key(Tenant, purge.tenant_id))
+        if tenant is not None:
+            db.session.expunge(tenant)  # Loaded by the webhook; the row is gone
+        purge.status = 'done'
+        purge.current_table = None
+        purge.phase = None
+        purge.next_attempt_at = None
+        purge.finished_at = datetime.utcnow()
+        db.session.commit()
+
+        logger.info(
+            f'[TenantPurge] All data for {purge.shop_domain} deleted '
+            f'({purge.rows_deleted} rows, {purge.attempts} runs)'
+        )
+        return 'done'
+
+    def _next_ids(self, entry: PurgeTable, purge: TenantPurge) -> List[int]:
+        """Next chunk of ids after the checkpoint, in id order."""
+        pk = entry.table.c.id
+        query = select(pk).where(entry.scope(purge.tenant_id), pk > purge.last_id)
+        if purge.phase == 'detach':
+            query = query.where(or_(*(column.isnot(None) for column in entry.self_refs)))
+        return [row[0] for row in db.session.execute(query.order_by(pk).limit(self.batch_size))]
+
+    def _apply(self, entry: PurgeTable, purge: TenantPurge, ids: List[int]) -> None:
+        pk = entry.table.c.id
+        if purge.phase == 'detach':
+            db.session.execute(
+                update(entry.table).where(pk.in_(ids)).values({column.name: None for column in entry.self_refs})
+            )
+            return
+
+        deleted = db.session.execute(delete(entry.table).where(pk.in_(ids))).rowcount
+        counts = dict(purge.table_counts or {})
+        counts[entry.name] = counts.get(entry.name, 0) + deleted
+        purge.table_counts = counts
+        purge.rows_deleted = (purge.rows_deleted or 0) + deleted
+
+
+def start_tenant_purge(purge_id: int) -> None:
+    """
+    Run a purge in the background (inline under TESTING).
+
+    A purge cut short by a restart is resumed by the scheduler.
+    """
+    app = current_app._get_current_object()
+    if app.config.get('TESTING'):
+        TenantPurger(purge_id).run()
+        return
+
+    def _run():
+        with app.app_context():
+            try:
+                TenantPurger(purge_id).run()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f'[TenantPurge] Purge {purge_id} crashed: {e}')
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=_run, name=f'tenant-purge-{purge_id}', daemon=True).start()
+
+
+def resume_tenant_purges(max_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Continue every unfinished purge, oldest first, within a time budget.
+
+    Failed purges are only picked up once their retry time has passed.
+
+    Returns:
+        Dict of purge counts by resulting status
+    """
+    started = time.monotonic()
+    summary: Dict[str, Any] = {'done': 0, 'pending': 0, 'failed': 0, 'abandoned': 0, 'skipped': 0}
+
+    purge_ids = [pid for (pid,) in db.session.query(TenantPurge.id).filter(
+        TenantPurge.status.in_(ACTIVE_STATUSES),
+        or_(TenantPurge.next_attempt_at.is_(None), TenantPurge.next_attempt_at <= datetime.utcnow())
+    ).order_by(TenantPurge.requested_at, TenantPurge.id)]
+
+    for purge_id in purge_ids:
+        remaining = None
+        if max_seconds is not None:
+            remaining = max_seconds - (time.monotonic() - started)
+            if remaining <= 0:
+                summary['pending'] += 1
+                continue
+        summary[TenantPurger(purge_id).run(max_seconds=remaining)] += 1
+
+    return summary
@@ -8,6 +8,7 @@ Usage:
     from app.services.tier_cache_service import (
         get_cached_tiers,
         get_cached_tier_by_id,
+        get_cached_tier_map,
         invalidate_tier_cache
     )
 
@@ -17,6 +18,9 @@ Usage:
     # Get specific tier (uses cached tier list)
     tier = get_cached_tier_by_id(tenant_id, tier_id)
 
+    # Map tier_id -> tier dict for bulk serialization
+    tier_map = get_cached_tier_map(tenant_id)
+
     # After creating/updating/deleting tier, invalidate cache
     invalidate_tier_cache(tenant_id)
 """
@@ -62,29 +66,42 @@ def get_cached_tiers(tenant_id: int, active_only: bool = True) -> List[Dict[str,
     cache = _get_cache()
     cache_key = _make_cache_key(tenant_id)
 
-    # Only use cache for active_only=True (most common case)
-    if cache and active_only:
-        cached = cache.get(cache_key)
-        if cached is not None:
+    # All tiers are cached together; inactive ones are still referenced by members
+    tier_list = None
+    if cache:
+        tier_list = cache.get(cache_key)
+        if tier_list is not None:
             logger.debug('Cache HIT for tiers: tenant=%d', tenant_id)
-            return cached
 
-    # Cache miss - fetch from database
-    logger.debug('Cache MISS for tiers: tenant=%d', tenant_id)
+    if tier_list is None:
+        # Cache miss - fetch from database
+        logger.debug('Cache MISS for tiers: tenant=%d', tenant_id)
+
+        tiers = MembershipTier.query.filter_by(tenant_id=tenant_id).order_by(
+            MembershipTier.display_order
+        ).all()
+        tier_list = [t.to_dict() for t in tiers]
+
+        if cache:
+            cache.set(cache_key, tier_list, timeout=TIER_CACHE_TTL)
+            logger.debug('Cached tiers: tenant=%d count=%d (TTL=%d)', tenant_id, len(tier_list), TIER_CACHE_TTL)
 
-    query = MembershipTier.query.filter_by(tenant_id=tenant_id)
     if active_only:
-        query = query.filter_by(is_active=True)
+        return [t for t in tier_list if t.get('is_active')]
+    return list(tier_list)
 
-    tiers = query.order_by(MembershipTier.display_order).all()
-    tier_list = [t.to_dict() for t in tiers]
 
-    # Cache the result (only for active_only=True)
-    if cache and active_only:
-        cache.set(cache_key, tier_list, timeout=TIER_CACHE_TTL)
-        logger.debug('Cached tiers: tenant=%d count=%d (TTL=%d)', tenant_id, len(tier_list), TIER_CACHE_TTL)
+def get_cached_tier_map(tenant_id: int) -> Dict[int, Dict[str, Any]]:
+    """
+    Get every tier for a tenant keyed by ID, from the cached tier list.
 
-    return tier_list
+    Args:
+        tenant_id: Tenant ID
+
+    Returns:
+        Dict of tier_id -> tier dict (active and inactive tiers)
+    """
+    return {t['id']: t for t in get_cached_tiers(tenant_id, active_only=False)}
 
 
 def get_cached_tier_by_id(tenant_id: int, tier_id: int) -> Optional[Dict[str, Any]]:
@@ -98,11 +115,7 @@ def get_cached_tier_by_id(tenant_id: int, tier_id: int) -> Optional[Dict[str, An
     Returns:
         Tier dict or None if not found
     """
-    tiers = get_cached_tiers(tenant_id, active_only=False)
-    for tier in tiers:
-        if tier.get('id') == tier_id:
-            return tier
-    return None
+    return get_cached_tier_map(tenant_id).get(tier_id)
 
 
 def get_tier_for_member(tenant_id: int, tier_id: Optional[int]) -> Optional[Dict[str, Any]]:
@@ -489,6 +489,9 @@ class TradeInService:
         if not is_guest:
             member.total_trade_ins = (member.total_trade_ins or 0) + 1
             member.total_trade_value = (member.total_trade_value or Decimal('0')) + batch.total_trade_value
+            # Denormalized for serialization: created_at of the latest completed batch
+            if batch.created_at and (member.last_trade_in_at is None or batch.created_at > member.last_trade_in_at):
+                member.last_trade_in_at = batch.created_at
             if bonus_info['bonus_amount'] > 0:
                 member.total_bonus_earned = (member.total_bonus_earned or Decimal('0')) + Decimal(str(bonus_info['bonus_amount']))
 
@@ -675,6 +678,15 @@ class TradeInService:
         if reason and new_status in ['rejected', 'cancelled']:
             batch.notes = f"{batch.notes or ''}\n[{new_status.upper()}] {reason}".strip()
 
+        # Completing or un-completing a batch moves the member's latest trade-in
+        if batch.member and 'completed' in (old_status, new_status) and old_status != new_status:
+            batch.member.last_trade_in_at = db.session.query(
+                db.func.max(TradeInBatch.created_at)
+            ).filter(
+                TradeInBatch.member_id == batch.member_id,
+                TradeInBatch.status == 'completed'
+            ).scalar()
+
         db.session.commit()
 
         # Sync to Shopify customer metafields if member exists
@@ -0,0 +1,13 @@
+"""
+Startup package for TradeUp.
+
+Keeps worker boot cheap: blueprint registration is timed per blueprint,
+and the admin SPA shell is rendered from memory.
+"""
+from .blueprints import (
+    BLUEPRINTS,
+    BlueprintLoader,
+    BlueprintSpec,
+    init_blueprints,
+)
+from .spa_shell import SpaShell, init_spa_shell
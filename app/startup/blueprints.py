@@ -0,0 +1,183 @@
+"""
+Blueprint Registration.
+
+Blueprints are declared here with their URL prefix and all registered in
+create_app(), so the URL map is complete before the first request. With
+gunicorn's preload_app this happens once in the master, before workers fork.
+Heavy third-party clients (e.g. SendGrid) are imported by the services that
+use them on first use rather than when a view module is imported.
+
+Every load is timed. Import and registration cost is logged, kept on the
+loader (`loader.load_times`) and exported as tradeup_blueprint_load_seconds.
+`flask startup profile` prints the per-blueprint cost.
+"""
+import importlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BlueprintSpec:
+    """A blueprint object `attr` in `module` (relative to app), mounted at `url_prefix`."""
+    module: str
+    attr: str
+    url_prefix: str
+
+
+BLUEPRINTS: Tuple[BlueprintSpec, ...] = (
+    # Core API
+    BlueprintSpec('.api.members', 'members_bp', '/api/members'),
+    BlueprintSpec('.api.trade_ins', 'trade_ins_bp', '/api/trade-ins'),
+    BlueprintSpec('.api.trade_ledger', 'trade_ledger_bp', '/api/trade-ledger'),
+    BlueprintSpec('.api.dashboard', 'dashboard_bp', '/api/dashboard'),
+
+    # Auth and Membership
+    BlueprintSpec('.api.auth', 'auth_bp', '/api/auth'),
+    BlueprintSpec('.api.membership', 'membership_bp', '/api/membership'),
+
+    # Shopify OAuth
+    BlueprintSpec('.api.shopify_oauth', 'shopify_oauth_bp', '/api/shopify'),
+
+    # Store Credit Events
+    BlueprintSpec('.api.store_credit_events', 'store_credit_events_bp', '/api/store-credit-events'),
+
+    # Admin, Settings, Product Setup Wizard
+    BlueprintSpec('.api.admin', 'admin_bp', '/api/admin'),
+    BlueprintSpec('.api.settings', 'settings_bp', '/api/settings'),
+    BlueprintSpec('.api.product_wizard', 'product_wizard_bp', '/api/products/wizard'),
+
+    # Billing (Shopify Billing) and Partner Integrations
+    BlueprintSpec('.api.billing', 'billing_bp', '/api/billing'),
+    BlueprintSpec('.api.partners', 'partners_bp', '/api/partners'),
+
+    # Promotions, Bonuses, Tier Management
+    BlueprintSpec('.api.promotions', 'promotions_bp', '/api/promotions'),
+    BlueprintSpec('.api.bonuses', 'bonuses_bp', '/api/bonuses'),
+    BlueprintSpec('.api.tiers', 'tiers_bp', '/api/tiers'),
+
+    # Customer Account (public facing), Referrals
+    BlueprintSpec('.api.customer_account', 'customer_account_bp', '/api/customer'),
+    BlueprintSpec('.api.referrals', 'referrals_bp', '/api/referrals'),
+
+    # Onboarding and Setup Checklist
+    BlueprintSpec('.api.onboarding', 'onboarding_bp', '/api/onboarding'),
+    BlueprintSpec('.api.setup_checklist', 'setup_checklist_bp', '/api/setup'),
+
+    # Shopify Data (collections, vendors, etc.)
+    BlueprintSpec('.api.shopify_data', 'shopify_data_bp', '/api/shopify-data'),
+
+    # Scheduled Tasks and Pending Distributions (approval workflow)
+    BlueprintSpec('.api.scheduled_tasks', 'scheduled_tasks_bp', '/api/scheduled-tasks'),
+    BlueprintSpec('.api.pending_distributions', 'pending_distributions_bp', '/api/pending-distributions'),
+
+    # Analytics, Member Import, Email Notifications
+    BlueprintSpec('.api.analytics', 'analytics_bp', '/api/analytics'),
+    BlueprintSpec('.api.member_import', 'member_import_bp', '/api/members/import'),
+    BlueprintSpec('.api.email', 'email_bp', '/api/email'),
+
+    # Webhooks
+    BlueprintSpec('.webhooks.shopify', 'webhooks_bp', '/webhook'),
+    BlueprintSpec('.webhooks.shopify_billing', 'shopify_billing_webhook_bp', '/webhook/shopify-billing'),
+    BlueprintSpec('.webhooks.customer_lifecycle', 'customer_lifecycle_bp', '/webhook'),
+    BlueprintSpec('.webhooks.order_lifecycle', 'order_lifecycle_bp', '/webhook'),
+    BlueprintSpec('.webhooks.subscription_lifecycle', 'subscription_lifecycle_bp', '/webhook'),
+    BlueprintSpec('.webhooks.app_lifecycle', 'app_lifecycle_bp', '/webhook'),
+
+    # Shopify Flow integration
+    BlueprintSpec('.api.flow', 'flow_bp', '/flow'),
+
+    # Points and Rewards (Loyalty System)
+    BlueprintSpec('.api.points', 'points_bp', '/api/points'),
+    BlueprintSpec('.api.rewards', 'rewards_bp', '/api/rewards'),
+
+    # App Proxy (customer-facing rewards page at /apps/rewards)
+    BlueprintSpec('.api.proxy', 'proxy_bp', '/proxy'),
+
+    # Customer Segments, Cashback Campaigns
+    BlueprintSpec('.api.segments', 'segments_bp', '/api/segments'),
+    BlueprintSpec('.api.cashback', 'cashback_bp', '/api/cashback'),
+
+    # Third-Party Integrations (Klaviyo, SMS, etc.)
+    BlueprintSpec('.api.integrations.klaviyo', 'klaviyo_bp', '/api/integrations/klaviyo'),
+    BlueprintSpec('.api.integrations.sms', 'sms_bp', '/api/integrations/sms'),
+    BlueprintSpec('.api.integrations.thirdparty', 'thirdparty_bp', '/api/integrations'),
+
+    # Benchmark Reports, Gamification, Anniversary Rewards, Nudges
+    BlueprintSpec('.api.benchmarks', 'benchmarks_bp', '/api/benchmarks'),
+    BlueprintSpec('.api.gamification', 'gamification_bp', '/api/gamification'),
+    BlueprintSpec('.api.anniversary', 'anniversary_bp', '/api/anniversary'),
+    BlueprintSpec('.api.nudges', 'nudges_bp', '/api/nudges'),
+
+    # Loyalty Page Builder, draft/publish, Widget Visual Builder, images (LP-009)
+    BlueprintSpec('.api.page_builder', 'page_builder_bp', '/api/page-builder'),
+    BlueprintSpec('.api.loyalty_page', 'loyalty_page_bp', '/api/loyalty-page'),
+    BlueprintSpec('.api.widget_builder', 'widget_builder_bp', '/api/widget-builder'),
+    BlueprintSpec('.api.page_builder_images', 'page_builder_images_bp', '/api/page-builder/images'),
+
+    # Guest Checkout Points
+    BlueprintSpec('.api.guest_points', 'guest_points_bp', '/api/guest-points'),
+
+    # Reviews: in-app prompt, post-support prompt, aggregated dashboard
+    BlueprintSpec('.api.review_prompt', 'review_prompt_bp', '/api/review-prompt'),
+    BlueprintSpec('.api.support_review', 'support_review_bp', '/api/support-review'),
+    BlueprintSpec('.api.review_dashboard', 'review_dashboard_bp', '/api/review-dashboard'),
+
+    # Loyalty Page Analytics (LP-010), Widget Settings (WB-002)
+    BlueprintSpec('.api.loyalty_page_analytics', 'loyalty_page_analytics_bp', '/api/loyalty-page/analytics'),
+    BlueprintSpec('.api.widgets', 'widgets_bp', '/api/widgets'),
+)
+
+
+class BlueprintLoader:
+    """Imports and registers blueprints, recording what each one costs."""
+
+    def __init__(self, app, specs: Iterable[BlueprintSpec] = BLUEPRINTS):
+        self.app = app
+        self.specs: Tuple[BlueprintSpec, ...] = tuple(specs)
+        self.load_times: Dict[str, float] = {}
+
+    def load_all(self) -> None:
+        for spec in self.specs:
+            if spec.attr not in self.load_times:
+                self._load(spec)
+
+    def _load(self, spec: BlueprintSpec) -> None:
+        """Import and register one blueprint."""
+        start = time.perf_counter()
+        try:
+            module = importlib.import_module(spec.module, 'app')
+        except Exception:
+            logger.exception(f'[Startup] Failed to import {spec.module} for {spec.url_prefix}')
+            raise
+        imported = time.perf_counter()
+
+        self.app.register_blueprint(getattr(module, spec.attr), url_prefix=spec.url_prefix)
+
+        seconds = time.perf_counter() - start
+        self.load_times[spec.attr] = seconds
+        _observe_load(spec.attr, seconds)
+        logger.debug(f'[Startup] Loaded {spec.attr} for {spec.url_prefix} in {seconds * 1000:.1f}ms '
+                     f'(import {(imported - start) * 1000:.1f}ms)')
+
+
+def _observe_load(name: str, seconds: float) -> None:
+    from ..middleware.telemetry import registry
+    registry.observe('tradeup_blueprint_load_seconds', (('blueprint', name),), seconds)
+
+
+def init_blueprints(app) -> BlueprintLoader:
+    """
+    Register every API blueprint.
+
+    Call this in the app factory after middleware is initialized.
+    """
+    loader = BlueprintLoader(app)
+    app.extensions['blueprint_loader'] = loader
+    loader.load_all()
+    total = sum(loader.load_times.values())
+    logger.info(f'[Startup] Registered {len(loader.load_times)} blueprints in {total * 1000:.0f}ms')
+    return loader
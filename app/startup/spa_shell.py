@@ -0,0 +1,222 @@
+"""
+Pre-rendered Admin SPA Shell.
+
+frontend/dist/index.html is read once per process and split where the
+Shopify context script is injected (before </head>). Each distinct
+(shop, host, api_key, app_url) context is rendered once into a bounded LRU
+together with its ETag, so /app requests never touch the filesystem and
+revalidations get a 304. A gzip or brotli body is made the first time a
+client accepts that coding, at moderate levels, and kept with the context.
+
+/app is unauthenticated and shop/host come from the query string, so values
+that are not a myshopify.com domain or a base64url host are rejected before
+they can be rendered or cached.
+
+In debug mode the build is re-read whenever index.html changes on disk.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from flask import Response, request
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Rendered contexts kept per process (one per shop/host in practice)
+MAX_RENDERED = 512
+
+INJECTION_POINT = '</head>'
+
+# Compression levels for cached variants: close to max ratio on HTML, far cheaper
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+SHOP_RE = re.compile(r'[a-z0-9][a-z0-9-]*\.myshopify\.com')
+HOST_RE = re.compile(r'[A-Za-z0-9_-]{1,255}={0,2}')
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INDEX_PATH = os.path.join(os.path.dirname(APP_DIR), 'frontend', 'dist', 'index.html')
+
+BUILD_MISSING_HTML = '''<!DOCTYPE html>
+<html><head><title>TradeUp - Build Required</title></head>
+<body style="font-family: system-ui; padding: 40px; text-align: center;">
+<h1>Frontend Build Not Found</h1>
+<p>Run <code>cd frontend && npm run build</code> to build the React app.</p>
+<p>Looking for: {path}</p>
+</body></html>'''
+
+
+@dataclass
+class RenderedShell:
+    """One rendered context; `variants` maps content coding to (body, etag)."""
+    variants: Dict[str, Tuple[bytes, str]]
+
+    def variant(self, coding: str) -> Tuple[bytes, str]:
+        """(body, etag) for `coding`, compressing the identity body on first use."""
+        cached = self.variants.get(coding)
+        if cached is not None:
+            return cached
+        body, etag = self.variants['identity']
+        if coding == 'br':
+            compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+        else:
+            compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        # Racing renders produce identical bytes, so last write wins harmlessly
+        self.variants[coding] = (compressed, f'{etag}-{coding}')
+        return self.variants[coding]
+
+
+def is_valid_context(shop: str, host: str) -> bool:
+    """True when shop/host are empty or well formed."""
+    return ((not shop or SHOP_RE.fullmatch(shop) is not None)
+            and (not host or HOST_RE.fullmatch(host) is not None))
+
+
+def _js_string(value: Optional[str]) -> str:
+    """JSON string literal that cannot close the surrounding <script>."""
+    return 'null' if value is None else json.dumps(value).replace('</', '<\\/')
+
+
+class SpaShell:
+    """
+    Renders the SPA shell from an in-memory copy of index.html.
+
+    Args:
+        index_path: Built index.html
+        reload: Re-read the file when its mtime changes (development)
+    """
+
+    def __init__(self, index_path: str = INDEX_PATH, reload: bool = False):
+        self.index_path = index_path
+        self.reload = reload
+        self._template: Optional[Tuple[str, str]] = None
+        self._mtime: Optional[float] = None
+        self._rendered: 'OrderedDict[tuple, RenderedShell]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Read and split index.html; a missing build renders a notice page."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                html = f.read()
+            self._mtime = os.path.getmtime(self.index_path)
+        except FileNotFoundError:
+            logger.warning(f'[SPA] Frontend build not found at {self.index_path}')
+            html = BUILD_MISSING_HTML.format(path=self.index_path)
+            self._mtime = None
+        else:
+            if INJECTION_POINT not in html:
+                html = html + INJECTION_POINT  # keep the split below uniform
+                logger.warning(f'[SPA] No {INJECTION_POINT} in {self.index_path}, appending config script')
+
+        head, _, tail = html.partition(INJECTION_POINT)
+        with self._lock:
+            self._template = (head, INJECTION_POINT + tail)
+            self._rendered.clear()
+
+    def _stale(self) -> bool:
+        try:
+            return os.path.getmtime(self.index_path) != self._mtime
+        except OSError:
+            return self._mtime is not None
+
+    def html(self, shop: str, host: str, api_key: str, app_url: str) -> str:
+        """index.html with window.__TRADEUP_CONFIG__ injected before </head>."""
+        if self._template is None:
+            self.load()
+        head, tail = self._template
+        # Only inject shop/host if present (otherwise App Bridge provides them)
+        context_script = f'''
+    <script>
+      window.__TRADEUP_CONFIG__ = {{
+        shop: {_js_string(shop or None)},
+        host: {_js_string(host or None)},
+        apiKey: {_js_string(api_key)},
+        appUrl: {_js_string(app_url)}
+      }};
+    </script>
+  '''
+        return f'{head}{context_script}{tail}'
+
+    def render(self, shop: str, host: str, api_key: str, app_url: str) -> RenderedShell:
+        """
+        Rendered shell for this context (cached).
+
+        Raises:
+            ValueError: shop or host is malformed
+        """
+        if not is_valid_context(shop, host):
+            raise ValueError('Invalid shop or host')
+        key = (shop, host, api_key, app_url)
+        if self.reload and self._stale():
+            self.load()
+        with self._lock:
+            rendered = self._rendered.get(key)
+            if rendered is not None:
+                self._rendered.move_to_end(key)
+                return rendered
+
+        body = self.html(shop, host, api_key, app_url).encode('utf-8')
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        rendered = RenderedShell(variants={'identity': (body, etag)})
+
+        with self._lock:
+            self._rendered[key] = rendered
+            if len(self._rendered) > MAX_RENDERED:
+                self._rendered.popitem(last=False)
+        return rendered
+
+    def response(self, shop: str, host: str, api_key: str, app_url: str) -> Response:
+        """
+        Shell response for the current request.
+
+        Picks the best coding from Accept-Encoding and answers 304 when
+        If-None-Match carries that variant's ETag. Malformed shop/host
+        values get a 400.
+        """
+        try:
+            rendered = self.render(shop, host, api_key, app_url)
+        except ValueError as e:
+            return Response(str(e), status=400, mimetype='text/plain')
+        accepted = request.accept_encodings
+        codings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        coding = next((c for c in codings if accepted[c]), 'identity')
+        body, etag = rendered.variant(coding)
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='text/html')
+            if coding != 'identity':
+                response.headers['Content-Encoding'] = coding
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rendered.clear()
+
+
+def init_spa_shell(app) -> SpaShell:
+    """
+    Load the SPA shell once for this process.
+
+    Call this in the app factory; the shell is kept in app.extensions.
+    """
+    shell = SpaShell(reload=app.debug)
+    shell.load()
+    app.extensions['spa_shell'] = shell
+    return shell
@@ -0,0 +1,150 @@
+"""
+Cooperative (gevent) worker support.
+
+With GUNICORN_WORKER_CLASS=gevent each worker serves requests on greenlets,
+so requests blocked on Shopify, SendGrid or Klaviyo no longer hold a worker.
+gunicorn.conf.py monkey-patches the process before the app is imported;
+this module keeps the rest of the app correct in that mode:
+
+- psycopg2 waits on the gevent hub instead of blocking the process
+- The SQLAlchemy pool is sized for concurrent greenlets
+- httpx transports allow more connections, with a bounded wait for one
+- APScheduler runs as GeventScheduler instead of BackgroundScheduler
+- CPU-bound helpers (PBKDF2 key derivation) run on the hub's threadpool
+
+Flask's `g` and request context live in contextvars, which greenlet keeps
+per greenlet; patched threading.local is greenlet-local too, so telemetry and
+query profiler request state stays per request. `check_context_isolation`
+refuses to start if the installed greenlet lacks contextvar support.
+
+Environment Variables:
+    GUNICORN_WORKER_CLASS=gevent      Enable cooperative workers (default sync)
+    GUNICORN_WORKER_CONNECTIONS=200   Concurrent requests per worker
+    DB_POOL_SIZE=10                   Pooled connections per worker
+    DB_MAX_OVERFLOW=20                Extra connections under burst
+    DB_POOL_TIMEOUT=10                Seconds a greenlet waits for a connection
+    HTTP_MAX_CONNECTIONS=200          Outbound connections per httpx client
+"""
+import logging
+import os
+from typing import Any, Callable, Dict
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def is_cooperative() -> bool:
+    """True when this process has been monkey-patched by gevent."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('socket')
+
+
+def gevent_wait_callback(conn, timeout=None):
+    """psycopg2 wait callback yielding to the hub while the server responds."""
+    import psycopg2.extensions
+    from gevent.socket import wait_read, wait_write
+
+    while True:
+        state = conn.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            break
+        elif state == psycopg2.extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == psycopg2.extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(f'Bad result from poll: {state!r}')
+
+
+def patch_psycopg() -> None:
+    """Make psycopg2 cooperative (it talks to libpq, which gevent cannot patch)."""
+    try:
+        import psycopg2.extensions
+    except ImportError:
+        return
+    psycopg2.extensions.set_wait_callback(gevent_wait_callback)
+
+
+def check_context_isolation() -> None:
+    """
+    Ensure contextvars (and so Flask `g`) are per greenlet.
+
+    Raises:
+        RuntimeError: If greenlet shares one context across greenlets
+    """
+    import greenlet
+    if not getattr(greenlet, 'GREENLET_USE_CONTEXT_VARS', False):
+        raise RuntimeError('Cooperative workers need greenlet>=1.0 so request context is per greenlet')
+
+
+def engine_options(options: Dict[str, Any], database_uri: str) -> Dict[str, Any]:
+    """SQLAlchemy engine options with the pool sized for cooperative workers."""
+    if not is_cooperative() or not database_uri.startswith('postgresql'):
+        return options
+    return {
+        **options,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+    }
+
+
+def http_transport(limits: httpx.Limits) -> httpx.HTTPTransport:
+    """
+    httpx transport for a process-wide client.
+
+    Cooperative workers run many more requests at once than sync workers, so
+    the pool may open up to HTTP_MAX_CONNECTIONS connections.
+    """
+    if is_cooperative():
+        max_connections = int(os.getenv('HTTP_MAX_CONNECTIONS', '200'))
+        limits = httpx.Limits(
+            max_connections=max(max_connections, limits.max_connections or 0),
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+        )
+    return httpx.HTTPTransport(limits=limits)
+
+
+def scheduler_class():
+    """APScheduler class matching the worker mode."""
+    if is_cooperative():
+        from apscheduler.schedulers.gevent import GeventScheduler
+        return GeventScheduler
+    from apscheduler.schedulers.background import BackgroundScheduler
+    return BackgroundScheduler
+
+
+def run_blocking(fn: Callable, *args, **kwargs):
+    """
+    Run CPU-bound `fn` without stalling other greenlets.
+
+    Under gevent the call moves to the hub's native threadpool (OpenSSL
+    releases the GIL); otherwise it runs inline.
+    """
+    if is_cooperative():
+        import gevent
+        return gevent.get_hub().threadpool.apply(fn, args, kwargs)
+    return fn(*args, **kwargs)
+
+
+def init_cooperative(app) -> bool:
+    """
+    Apply cooperative-mode settings to the app.
+
+    Call this in the app factory before extensions are initialized.
+    """
+    if not is_cooperative():
+        return False
+
+    check_context_isolation()
+    patch_psycopg()
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+        app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}), app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    )
+    logger.info(f"[Cooperative] gevent workers - DB pool {app.config['SQLALCHEMY_ENGINE_OPTIONS'].get('pool_size', 'default')}")
+    return True
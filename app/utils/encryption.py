@@ -6,6 +6,7 @@ The encryption key should be set via ENCRYPTION_KEY environment variable.
 """
 import os
 import base64
+import threading
 from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -51,18 +52,23 @@ def get_encryption_key() -> bytes:
         salt=salt,
         iterations=100000,
     )
-    derived_key = base64.urlsafe_b64encode(kdf.derive(key.encode()))
+    # ~100ms of CPU; off the gevent hub under cooperative workers
+    from .cooperative import run_blocking
+    derived_key = base64.urlsafe_b64encode(run_blocking(kdf.derive, key.encode()))
     return derived_key
 
 
 _fernet_instance = None
+_fernet_lock = threading.Lock()
 
 
 def get_fernet() -> Fernet:
-    """Get a Fernet instance for encryption/decryption."""
+    """Get a Fernet instance for encryption/decryption (key derived once per process)."""
     global _fernet_instance
     if _fernet_instance is None:
-        _fernet_instance = Fernet(get_encryption_key())
+        with _fernet_lock:
+            if _fernet_instance is None:
+                _fernet_instance = Fernet(get_encryption_key())
     return _fernet_instance
 
 
@@ -0,0 +1,394 @@
+"""
+Lease-based job runner for the background scheduler.
+
+Every scheduler process may fire a job; only the one that acquires the
+job's DB lease runs it. The holder renews the lease from a heartbeat
+thread, so a crashed or redeployed process loses it after LEASE_TTL and
+another process takes over.
+
+Tenant-wide jobs are sharded into one work unit per tenant, stored per
+run (job_id + run_key, e.g. the date). Units run on a bounded thread pool
+with a per-unit timeout; a run picked up again after an interruption only
+executes the units that have not finished. Total runtime therefore scales
+with SCHEDULER_WORKERS rather than the number of tenants, and a slow
+tenant only occupies one worker. A timed-out unit's thread cannot be
+killed, so the lease stays held (and renewed) until it exits; a re-run
+therefore never executes a tenant whose previous attempt is still going.
+
+Usage:
+    from app.utils.job_runner import run_tenant_job, job_lease
+
+    summary = run_tenant_job(app, 'credit_expiration', '2026-10-18', tenant_ids, expire_tenant)
+
+    with job_lease(app, 'pending_expiration') as acquired:
+        if acquired:
+            ...
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Callable
+
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..models.scheduler_job import SchedulerJobLease, SchedulerJobRun, SchedulerWorkUnit
+
+logger = logging.getLogger(__name__)
+
+# Lease lifetime; the heartbeat renews it every LEASE_TTL / 3
+LEASE_TTL = 120
+
+# Worker pool size and per-tenant time limit
+DEFAULT_WORKERS = int(os.getenv('SCHEDULER_WORKERS', '4'))
+DEFAULT_UNIT_TIMEOUT = int(os.getenv('SCHEDULER_UNIT_TIMEOUT', '600'))
+
+# Attempts per unit across resumed runs before it is left failed
+MAX_UNIT_ATTEMPTS = 3
+
+RUNNABLE_STATUSES = ('pending', 'running', 'failed', 'timeout')
+
+# Identifies this process as a lease holder
+OWNER_ID = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+# ==================== Leases ====================
+
+def acquire_lease(job_id: str, ttl: int = LEASE_TTL) -> bool:
+    """
+    Take the job's lease if it is free, expired or already ours.
+
+    The conditional UPDATE (or the unique job_id on first insert) makes the
+    claim atomic across processes.
+    """
+    now = datetime.utcnow()
+    values = {'owner': OWNER_ID, 'acquired_at': now, 'heartbeat_at': now,
+              'expires_at': now + timedelta(seconds=ttl)}
+
+    claimed = SchedulerJobLease.query.filter(
+        SchedulerJobLease.job_id == job_id,
+        db.or_(SchedulerJobLease.expires_at < now, SchedulerJobLease.owner == OWNER_ID)
+    ).update(values, synchronize_session=False)
+    db.session.commit()
+    if claimed:
+        return True
+
+    try:
+        db.session.add(SchedulerJobLease(job_id=job_id, **values))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+
+def renew_lease(job_id: str, ttl: int = LEASE_TTL) -> bool:
+    """Extend our lease; False if it has been lost to another process."""
+    now = datetime.utcnow()
+    renewed = SchedulerJobLease.query.filter_by(job_id=job_id, owner=OWNER_ID).update(
+        {'heartbeat_at': now, 'expires_at': now + timedelta(seconds=ttl)},
+        synchronize_session=False
+    )
+    db.session.commit()
+    return bool(renewed)
+
+
+def release_lease(job_id: str) -> None:
+    """Expire our lease immediately so the next trigger need not wait for the TTL."""
+    SchedulerJobLease.query.filter_by(job_id=job_id, owner=OWNER_ID).update(
+        {'expires_at': datetime.utcnow()}, synchronize_session=False
+    )
+    db.session.commit()
+
+
+class LeaseHeartbeat(threading.Thread):
+    """
+    Renews a job lease in the background until stopped; flags `lost` if renewal fails.
+
+    Futures passed to hold_for keep the lease renewed after the job's block exits.
+    """
+
+    def __init__(self, app, job_id: str, ttl: int = LEASE_TTL):
+        super().__init__(name=f'lease-heartbeat-{job_id}', daemon=True)
+        self.app = app
+        self.job_id = job_id
+        self.ttl = ttl
+        self.lost = threading.Event()
+        self.stragglers: List[Future] = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.ttl / 3):
+            with self.app.app_context():
+                try:
+                    if not renew_lease(self.job_id, self.ttl):
+                        logger.warning(f'[JobRunner] Lease lost for {self.job_id}')
+                        self.lost.set()
+                        return
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f'[JobRunner] Heartbeat failed for {self.job_id}: {e}')
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def hold_for(self, futures: List[Future]) -> None:
+        """Keep the lease after the job returns, until these abandoned units finish."""
+        self.stragglers.extend(futures)
+
+
+def _release_after_stragglers(app, job_id: str, heartbeat: LeaseHeartbeat) -> None:
+    wait(heartbeat.stragglers)
+    heartbeat.stop()
+    with app.app_context():
+        try:
+            release_lease(job_id)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'[JobRunner] Failed to release lease {job_id}: {e}')
+        finally:
+            db.session.remove()
+    logger.info(f'[JobRunner] Timed-out units of {job_id} exited, lease released')
+
+
+def _inline(app) -> bool:
+    # The in-memory test database is per connection, so tests run units on the calling thread
+    return bool(app.config.get('TESTING'))
+
+
+@contextmanager
+def job_lease(app, job_id: str, ttl: int = LEASE_TTL):
+    """
+    Hold a job's lease (with heartbeat) for the duration of the block.
+
+    Yields True if acquired; False means another process is running the job.
+    """
+    if not acquire_lease(job_id, ttl):
+        yield False
+        return
+
+    heartbeat = None
+    if not _inline(app):
+        heartbeat = LeaseHeartbeat(app, job_id, ttl)
+        heartbeat.start()
+    try:
+        yield heartbeat or True
+    finally:
+        if heartbeat and not all(future.done() for future in heartbeat.stragglers):
+            # Units still running past their timeout: keep renewing until they exit
+            threading.Thread(
+                target=_release_after_stragglers, args=(app, job_id, heartbeat),
+                name=f'lease-release-{job_id}', daemon=True
+            ).start()
+        else:
+            if heartbeat:
+                heartbeat.stop()
+            try:
+                release_lease(job_id)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f'[JobRunner] Failed to release lease {job_id}: {e}')
+
+
+# ==================== Sharded Runs ====================
+
+def _get_or_create_run(job_id: str, run_key: str) -> SchedulerJobRun:
+    run = SchedulerJobRun.query.filter_by(job_id=job_id, run_key=run_key).first()
+    if run is None:
+        run = SchedulerJobRun(job_id=job_id, run_key=run_key, status='running')
+        db.session.add(run)
+        db.session.commit()
+    return run
+
+
+def _ensure_units(run: SchedulerJobRun, tenant_ids: List[int]) -> None:
+    existing = {tid for (tid,) in db.session.query(SchedulerWorkUnit.tenant_id).filter_by(run_id=run.id)}
+    new_units = [
+        {'run_id': run.id, 'tenant_id': tid, 'status': 'pending', 'attempts': 0}
+        for tid in tenant_ids if tid not in existing
+    ]
+    if new_units:
+        db.session.bulk_insert_mappings(SchedulerWorkUnit, new_units)
+        db.session.commit()
+
+
+def _finish_unit(unit_id: int, status: str, result: Optional[Dict[str, Any]] = None,
+                 error: Optional[str] = None) -> None:
+    # Only a unit still marked running is updated, so a late finish after a timeout is discarded
+    SchedulerWorkUnit.query.filter_by(id=unit_id, status='running').update({
+        'status': status, 'result': result, 'error': error, 'finished_at': datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+
+
+def _execute_unit(unit_id: int, tenant_id: int, unit_fn: Callable[[int], Optional[Dict[str, Any]]],
+                  started: Dict[int, float]) -> None:
+    started[unit_id] = time.monotonic()
+    SchedulerWorkUnit.query.filter_by(id=unit_id).update({
+        'status': 'running',
+        'attempts': SchedulerWorkUnit.attempts + 1,
+        'started_at': datetime.utcnow(),
+        'error': None
+    }, synchronize_session=False)
+    db.session.commit()
+
+    try:
+        result = unit_fn(tenant_id) or {}
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f'[JobRunner] Unit for tenant {tenant_id} failed: {e}')
+        _finish_unit(unit_id, 'failed', error=str(e))
+        return
+    _finish_unit(unit_id, 'done', result=result)
+
+
+def _run_unit_in_context(app, unit_id, tenant_id, unit_fn, started) -> None:
+    with app.app_context():
+        try:
+            _execute_unit(unit_id, tenant_id, unit_fn, started)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'[JobRunner] Unit {unit_id} crashed: {e}')
+        finally:
+            db.session.remove()
+
+
+def summarize_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum numeric fields (recursing into nested dicts) across unit results."""
+    summary: Dict[str, Any] = {}
+    for result in results:
+        for key, value in (result or {}).items():
+            if isinstance(value, bool):
+                summary[key] = summary.get(key, 0) + int(value)
+            elif isinstance(value, (int, float)):
+                summary[key] = summary.get(key, 0) + value
+            elif isinstance(value, dict):
+                summary[key] = summarize_results([summary.get(key, {}), value])
+    return summary
+
+
+def run_tenant_job(
+    app,
+    job_id: str,
+    run_key: str,
+    tenant_ids: List[int],
+    unit_fn: Callable[[int], Optional[Dict[str, Any]]],
+    max_workers: int = DEFAULT_WORKERS,
+    unit_timeout: int = DEFAULT_UNIT_TIMEOUT
+) -> Optional[Dict[str, Any]]:
+    """
+    Run `unit_fn(tenant_id)` for every tenant under the job's lease.
+
+    Units already done for this run_key are skipped, so re-triggering a
+    job (manual rerun, second process, resume after a crash) only runs the
+    remaining tenants. A unit that raises or exceeds unit_timeout is
+    retried on the next pass of the same run, up to MAX_UNIT_ATTEMPTS.
+
+    Args:
+        app: Flask app (each worker pushes its own app context)
+        job_id: Scheduler job ID
+        run_key: Period this run covers, e.g. '2026-10-18' or '2026-10'
+        tenant_ids: Tenants to shard the job over
+        unit_fn: Per-tenant work; returns a dict of counters for the summary
+        max_workers: Worker pool size
+        unit_timeout: Seconds a single tenant may run before it is marked timed out
+
+    Returns:
+        Run dict with summary and unit status counts, or None if another
+        process holds the lease
+    """
+    with job_lease(app, job_id) as lease:
+        if not lease:
+            logger.info(f'[JobRunner] {job_id} is running elsewhere, skipping')
+            return None
+        heartbeat = lease if isinstance(lease, LeaseHeartbeat) else None
+
+        run = _get_or_create_run(job_id, run_key)
+        if run.status != 'completed':
+            _ensure_units(run, tenant_ids)
+            units = db.session.query(SchedulerWorkUnit.id, SchedulerWorkUnit.tenant_id).filter(
+                SchedulerWorkUnit.run_id == run.id,
+                SchedulerWorkUnit.status.in_(RUNNABLE_STATUSES),
+                SchedulerWorkUnit.attempts < MAX_UNIT_ATTEMPTS
+            ).order_by(SchedulerWorkUnit.tenant_id).all()
+
+            if _inline(app):
+                for unit_id, tenant_id in units:
+                    _execute_unit(unit_id, tenant_id, unit_fn, {})
+            else:
+                _run_pool(app, units, unit_fn, max_workers, unit_timeout, heartbeat)
+
+            _complete_run(run)
+
+        return _run_report(run)
+
+
+def _run_pool(app, units, unit_fn, max_workers, unit_timeout, heartbeat) -> None:
+    started: Dict[int, float] = {}
+    timed_out: List[Future] = []
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scheduler-unit')
+    try:
+        pending = {
+            executor.submit(_run_unit_in_context, app, unit_id, tenant_id, unit_fn, started): unit_id
+            for unit_id, tenant_id in units
+        }
+        while pending:
+            done, _ = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+
+            if heartbeat and heartbeat.lost.is_set():
+                # Another process owns the job now; stop starting units
+                for future in pending:
+                    future.cancel()
+                break
+
+            now = time.monotonic()
+            for future, unit_id in list(pending.items()):
+                if unit_id in started and now - started[unit_id] > unit_timeout:
+                    # The worker thread cannot be killed; its eventual result is discarded
+                    _finish_unit(unit_id, 'timeout', error=f'Exceeded {unit_timeout}s')
+                    logger.warning(f'[JobRunner] Unit {unit_id} timed out after {unit_timeout}s')
+                    timed_out.append(future)
+                    pending.pop(future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if heartbeat:
+            heartbeat.hold_for(timed_out + list(pending))
+
+
+def _complete_run(run: SchedulerJobRun) -> None:
+    remaining = SchedulerWorkUnit.query.filter(
+        SchedulerWorkUnit.run_id == run.id,
+        SchedulerWorkUnit.status.in_(RUNNABLE_STATUSES),
+        SchedulerWorkUnit.attempts < MAX_UNIT_ATTEMPTS
+    ).count()
+    if remaining:
+        return
+
+    results = [r for (r,) in db.session.query(SchedulerWorkUnit.result).filter_by(run_id=run.id, status='done')]
+    run.status = 'completed'
+    run.summary = summarize_results(results)
+    run.completed_at = datetime.utcnow()
+    db.session.commit()
+
+
+def _run_report(run: SchedulerJobRun) -> Dict[str, Any]:
+    db.session.refresh(run)
+    counts = dict(
+        db.session.query(SchedulerWorkUnit.status, db.func.count(SchedulerWorkUnit.id))
+        .filter_by(run_id=run.id).group_by(SchedulerWorkUnit.status).all()
+    )
+    summary = run.summary
+    if summary is None:
+        results = [r for (r,) in db.session.query(SchedulerWorkUnit.result).filter_by(run_id=run.id, status='done')]
+        summary = summarize_results(results)
+    return {**run.to_dict(), 'summary': summary, 'units': counts}
@@ -0,0 +1,180 @@
+"""
+Keyset (cursor) pagination.
+
+OFFSET pagination re-reads every skipped row and needs an exact COUNT(*) per
+page, so deep pages on large tenants get linearly slower. Keyset pagination
+seeks straight to the last row of the previous page using a composite
+(sort column, id) comparison that the (tenant, sort column) indexes serve
+directly, so every page costs the same.
+
+Totals are optional: 'approx' reads the planner's row estimate on Postgres
+(exact COUNT elsewhere, or when the estimate is small enough that counting
+is cheap), 'exact' always counts.
+
+Usage:
+    from app.utils.pagination import keyset_paginate, wants_cursor_pagination
+
+    if wants_cursor_pagination(request.args):
+        page = keyset_paginate(
+            query,
+            sort_column=Member.created_at,
+            id_column=Member.id,
+            cursor=request.args.get('cursor'),
+            limit=per_page,
+            total_mode=request.args.get('total'),
+        )
+        return jsonify({'members': [...page.items], **page.to_dict()})
+"""
+import base64
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, List, Any, Tuple, Dict
+
+from sqlalchemy import tuple_, text
+
+from ..extensions import db
+from .exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Below this planner estimate an exact COUNT is cheap enough to run instead
+EXACT_COUNT_THRESHOLD = 10000
+
+TOTAL_MODES = ('none', 'approx', 'exact')
+
+
+def wants_cursor_pagination(args) -> bool:
+    """Cursor mode is opt-in: ?cursor= (empty for the first page) or ?pagination=cursor."""
+    return 'cursor' in args or args.get('pagination') == 'cursor'
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode the last row's sort key as an opaque URL-safe token."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(sort_value) if sort_value else None), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValidationError('Invalid pagination cursor', field='cursor') from e
+
+
+def estimate_count(query) -> int:
+    """
+    Planner row estimate for a query (Postgres), exact count elsewhere.
+
+    Args:
+        query: Filtered (unordered) query
+
+    Returns:
+        Estimated number of matching rows
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return query.order_by(None).count()
+
+    statement = query.order_by(None).statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}
+    )
+    plan = db.session.execute(text(f'EXPLAIN (FORMAT JSON) {statement}')).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+@dataclass
+class KeysetPage:
+    """One page of keyset pagination results."""
+    items: List[Any]
+    per_page: int
+    next_cursor: Optional[str]
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'per_page': self.per_page,
+            'next_cursor': self.next_cursor,
+            'has_more': self.has_more,
+            'total': self.total,
+            'total_is_estimate': self.total_is_estimate,
+        }
+
+
+def keyset_paginate(
+    query,
+    sort_column,
+    id_column,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    total_mode: Optional[str] = None
+) -> KeysetPage:
+    """
+    Fetch one page ordered by (sort_column DESC, id DESC).
+
+    Args:
+        query: Filtered query (any existing ORDER BY is replaced)
+        sort_column: Timestamp column to order by (e.g. Model.created_at)
+        id_column: Primary key column used as the tie-breaker
+        cursor: Cursor from the previous page's next_cursor (None/'' for the first page)
+        limit: Page size
+        total_mode: 'none' (default), 'approx' or 'exact'
+
+    Returns:
+        KeysetPage
+
+    Raises:
+        ValidationError: On a malformed cursor or unknown total_mode
+    """
+    total_mode = total_mode or 'none'
+    if total_mode not in TOTAL_MODES:
+        raise ValidationError(f"total must be one of {', '.join(TOTAL_MODES)}", field='total')
+
+    total = None
+    total_is_estimate = False
+    if total_mode == 'exact':
+        total = query.order_by(None).count()
+    elif total_mode == 'approx':
+        total = estimate_count(query)
+        if total < EXACT_COUNT_THRESHOLD and db.engine.dialect.name == 'postgresql':
+            total = query.order_by(None).count()
+        else:
+            total_is_estimate = db.engine.dialect.name == 'postgresql'
+
+    page_query = query.order_by(None)
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        page_query = page_query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+
+    rows = page_query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+    return KeysetPage(
+        items=rows,
+        per_page=limit,
+        next_cursor=next_cursor,
+        total=total,
+        total_is_estimate=total_is_estimate,
+    )
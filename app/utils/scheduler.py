@@ -2,14 +2,28 @@
 Background scheduler for automated tasks.
 
 Handles:
+- Partner sync deliveries (every minute)
+- Shop redaction purges (every 5 minutes, resuming unfinished purges)
 - Monthly store credit distribution (1st of each month at 6 AM UTC)
 - Credit expiration processing (daily at midnight UTC)
+- Pending distribution expiration (daily at 1 AM UTC)
+- Cross-tenant benchmark snapshot (daily at 2 AM UTC)
+- Product catalog mirror reconcile (daily at 3 AM UTC)
+- Anniversary reminders (daily at 7 AM UTC)
+- Anniversary rewards (daily at 8 AM UTC)
 - Expiration warnings (daily at 9 AM UTC)
+- Member nudges (daily at 10 AM UTC)
+
+Jobs run under DB leases (see job_runner), so several processes may run
+the scheduler and each job still executes once. Tenant-wide jobs are
+sharded into per-tenant work units run on a bounded worker pool.
 """
 import os
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
+
+from .job_runner import run_tenant_job, job_lease
 
 logger = logging.getLogger(__name__)
 
@@ -42,17 +56,18 @@ def init_scheduler(app):
         print('[Scheduler] Disabled (set FLASK_ENV=production or ENABLE_SCHEDULER=true)')
         return
 
-    # Prevent multiple scheduler instances (important for gunicorn workers)
-    # Only run scheduler if this is the main/first worker
+    # Avoid a second scheduler in the same process tree; duplicate runs across
+    # hosts and redeploys are prevented by the per-job DB leases
     if os.getenv('SCHEDULER_RUNNING') == 'true':
         print('[Scheduler] Already running in another process')
         return
 
     try:
-        from apscheduler.schedulers.background import BackgroundScheduler
         from apscheduler.triggers.cron import CronTrigger
+        from .cooperative import scheduler_class
 
-        _scheduler = BackgroundScheduler(
+        # BackgroundScheduler, or GeventScheduler under cooperative workers
+        _scheduler = scheduler_class()(
             timezone='UTC',
             job_defaults={
                 'coalesce': True,  # Combine missed runs
@@ -124,14 +139,56 @@ def init_scheduler(app):
             replace_existing=True
         )
 
+        # Benchmark snapshot - Daily at 2 AM UTC (one cross-tenant pass)
+        _scheduler.add_job(
+            run_benchmark_snapshot,
+            trigger=CronTrigger(hour=2, minute=0),
+            id='benchmark_snapshot',
+            name='Precompute cross-tenant benchmarks',
+            replace_existing=True
+        )
+
+        # Catalog mirror reconcile - Daily at 3 AM UTC (low order volume)
+        _scheduler.add_job(
+            run_catalog_reconcile,
+            trigger=CronTrigger(hour=3, minute=0),
+            id='catalog_reconcile',
+            name='Reconcile product catalog mirror',
+            replace_existing=True
+        )
+
+        # Partner delivery retries - Every minute
+        _scheduler.add_job(
+            run_partner_deliveries,
+            trigger=CronTrigger(minute='*'),
+            id='partner_deliveries',
+            name='Deliver queued partner syncs',
+            replace_existing=True,
+            misfire_grace_time=60
+        )
+
+        # Shop redaction purges - Every 5 minutes (resumes interrupted purges)
+        _scheduler.add_job(
+            run_tenant_purges,
+            trigger=CronTrigger(minute='*/5'),
+            id='tenant_purges',
+            name='Resume shop redaction purges',
+            replace_existing=True,
+            misfire_grace_time=300
+        )
+
         _scheduler.start()
         os.environ['SCHEDULER_RUNNING'] = 'true'
 
         # Use print during init to avoid app context issues
-        print('[Scheduler] Started with 7 scheduled jobs:')
+        print('[Scheduler] Started with 11 scheduled jobs:')
+        print('  - Partner deliveries: Every minute')
+        print('  - Shop redaction purges: Every 5 minutes')
         print('  - Monthly credits: 1st of month at 6:00 UTC (creates pending for approval)')
         print('  - Credit expiration: Daily at 0:00 UTC')
         print('  - Pending expiration: Daily at 1:00 UTC')
+        print('  - Benchmark snapshot: Daily at 2:00 UTC')
+        print('  - Catalog reconcile: Daily at 3:00 UTC')
         print('  - Anniversary reminders: Daily at 7:00 UTC')
         print('  - Anniversary rewards: Daily at 8:00 UTC')
         print('  - Expiration warnings: Daily at 9:00 UTC')
@@ -155,6 +212,62 @@ def shutdown_scheduler():
         logger.info('[Scheduler] Shutdown complete')
 
 
+def _run_key(period: str = 'day') -> str:
+    """Key identifying the period a run covers, so re-triggers resume the same run."""
+    now = datetime.utcnow()
+    return now.strftime('%Y-%m') if period == 'month' else now.date().isoformat()
+
+
+def _active_tenant_ids() -> List[int]:
+    from ..extensions import db
+    from ..models.tenant import Tenant
+
+    return [tid for (tid,) in db.session.query(Tenant.id).filter(
+        Tenant.subscription_active == True
+    ).order_by(Tenant.id)]
+
+
+def _monthly_credits_unit(tenant_id: int) -> dict:
+    from ..services.pending_distribution_service import PendingDistributionService
+
+    pending_service = PendingDistributionService()
+    try:
+        # Check if auto-approve is enabled and first distribution completed
+        if pending_service.should_auto_approve(tenant_id):
+            # Create and immediately approve
+            pending = pending_service.create_monthly_credit_pending(tenant_id)
+            result = pending_service.approve_distribution(
+                pending_id=pending.id,
+                tenant_id=tenant_id,
+                approved_by='system:auto-approve'
+            )
+            execution = result.get('execution_result', {})
+
+            logger.info(
+                f'[Scheduler] Tenant {tenant_id}: Auto-approved - '
+                f'{execution.get("credited", 0)} members credited '
+                f'${execution.get("total_amount", 0):.2f}'
+            )
+            return {'auto_approved': 1}
+
+        # Create pending distribution for merchant review
+        pending = pending_service.create_monthly_credit_pending(tenant_id)
+        pending_service.send_approval_notification(pending)
+
+        preview = pending.preview_data or {}
+        logger.info(
+            f'[Scheduler] Tenant {tenant_id}: Pending approval - '
+            f'{preview.get("total_members", 0)} members, '
+            f'${preview.get("total_amount", 0):.2f}'
+        )
+        return {'pending': 1}
+
+    except ValueError as e:
+        # Already exists for this month - skip
+        logger.info(f'[Scheduler] Tenant {tenant_id}: Skipped - {e}')
+        return {'skipped': 1}
+
+
 def run_monthly_credits():
     """
     Create pending distributions for monthly credits (with approval workflow).
@@ -174,69 +287,33 @@ def run_monthly_credits():
 
     with _flask_app.app_context():
         try:
-            from ..extensions import db
-            from ..models.tenant import Tenant
-            from ..services.pending_distribution_service import PendingDistributionService
-
-            # Get all active tenants
-            tenants = Tenant.query.filter_by(subscription_active=True).all()
-
-            pending_service = PendingDistributionService()
-
-            total_pending = 0
-            total_auto_approved = 0
-            total_skipped = 0
-
-            for tenant in tenants:
-                try:
-                    # Check if auto-approve is enabled and first distribution completed
-                    if pending_service.should_auto_approve(tenant.id):
-                        # Create and immediately approve
-                        pending = pending_service.create_monthly_credit_pending(tenant.id)
-                        result = pending_service.approve_distribution(
-                            pending_id=pending.id,
-                            tenant_id=tenant.id,
-                            approved_by='system:auto-approve'
-                        )
-                        execution = result.get('execution_result', {})
-                        total_auto_approved += 1
-
-                        logger.info(
-                            f'[Scheduler] Tenant {tenant.id}: Auto-approved - '
-                            f'{execution.get("credited", 0)} members credited '
-                            f'${execution.get("total_amount", 0):.2f}'
-                        )
-                    else:
-                        # Create pending distribution for merchant review
-                        pending = pending_service.create_monthly_credit_pending(tenant.id)
-                        pending_service.send_approval_notification(pending)
-                        total_pending += 1
-
-                        preview = pending.preview_data or {}
-                        logger.info(
-                            f'[Scheduler] Tenant {tenant.id}: Pending approval - '
-                            f'{preview.get("total_members", 0)} members, '
-                            f'${preview.get("total_amount", 0):.2f}'
-                        )
-
-                except ValueError as e:
-                    # Already exists for this month - skip
-                    total_skipped += 1
-                    logger.info(f'[Scheduler] Tenant {tenant.id}: Skipped - {e}')
-
-                except Exception as e:
-                    logger.error(f'[Scheduler] Failed for tenant {tenant.id}: {e}')
+            report = run_tenant_job(
+                _flask_app, 'monthly_credits', _run_key('month'), _active_tenant_ids(), _monthly_credits_unit
+            )
+            if report is None:
+                return
 
+            summary = report['summary']
             logger.info(
                 f'[Scheduler] Monthly credits complete: '
-                f'{total_pending} pending approval, {total_auto_approved} auto-approved, '
-                f'{total_skipped} skipped'
+                f'{summary.get("pending", 0)} pending approval, {summary.get("auto_approved", 0)} auto-approved, '
+                f'{summary.get("skipped", 0)} skipped, units {report["units"]}'
             )
 
         except Exception as e:
             logger.error(f'[Scheduler] Monthly credits failed: {e}')
 
 
+def _credit_expiration_unit(tenant_id: int) -> dict:
+    from ..services.scheduled_tasks import ScheduledTasksService
+
+    result = ScheduledTasksService().expire_old_credits(tenant_id, dry_run=False)
+    return {
+        'expired_count': result.get('expired_entries', 0),
+        'total_amount': float(result.get('total_expired', 0))
+    }
+
+
 def run_credit_expiration():
     """
     Process expired credits for all tenants.
@@ -252,36 +329,31 @@ def run_credit_expiration():
 
     with _flask_app.app_context():
         try:
-            from ..extensions import db
-            from ..models.tenant import Tenant
-            from ..services.scheduled_tasks import ScheduledTasksService
-
-            tenants = Tenant.query.filter_by(subscription_active=True).all()
-
-            total_expired = 0
-            total_amount = 0
-
-            service = ScheduledTasksService()
-
-            for tenant in tenants:
-                try:
-                    result = service.expire_old_credits(tenant.id, dry_run=False)
-
-                    total_expired += result.get('expired_count', 0)
-                    total_amount += float(result.get('total_amount', 0))
-
-                except Exception as e:
-                    logger.error(f'[Scheduler] Expiration failed for tenant {tenant.id}: {e}')
+            report = run_tenant_job(
+                _flask_app, 'credit_expiration', _run_key(), _active_tenant_ids(), _credit_expiration_unit
+            )
+            if report is None:
+                return
 
+            summary = report['summary']
             logger.info(
                 f'[Scheduler] Credit expiration complete: '
-                f'{total_expired} entries, ${total_amount:.2f} expired'
+                f'{summary.get("expired_count", 0)} entries, ${summary.get("total_amount", 0):.2f} expired, '
+                f'units {report["units"]}'
             )
 
         except Exception as e:
             logger.error(f'[Scheduler] Credit expiration failed: {e}')
 
 
+def _expiration_warnings_unit(tenant_id: int) -> dict:
+    from ..services.scheduled_tasks import ScheduledTasksService
+
+    # Send warnings for points expiring in 30 days
+    result = ScheduledTasksService().send_points_expiry_warnings(tenant_id, dry_run=False)
+    return {'warnings_sent': result.get('warnings_sent', 0)}
+
+
 def run_expiration_warnings():
     """
     Send expiration warning emails for points/credits expiring soon.
@@ -297,26 +369,16 @@ def run_expiration_warnings():
 
     with _flask_app.app_context():
         try:
-            from ..extensions import db
-            from ..models.tenant import Tenant
-            from ..services.scheduled_tasks import ScheduledTasksService
-
-            tenants = Tenant.query.filter_by(subscription_active=True).all()
-
-            total_warnings = 0
-
-            service = ScheduledTasksService()
-
-            for tenant in tenants:
-                try:
-                    # Send warnings for points expiring in 30 days
-                    result = service.send_points_expiry_warnings(tenant.id, dry_run=False)
-                    total_warnings += result.get('warnings_sent', 0)
-
-                except Exception as e:
-                    logger.error(f'[Scheduler] Warnings failed for tenant {tenant.id}: {e}')
+            report = run_tenant_job(
+                _flask_app, 'expiration_warnings', _run_key(), _active_tenant_ids(), _expiration_warnings_unit
+            )
+            if report is None:
+                return
 
-            logger.info(f'[Scheduler] Expiration warnings complete: {total_warnings} sent')
+            logger.info(
+                f'[Scheduler] Expiration warnings complete: '
+                f'{report["summary"].get("warnings_sent", 0)} sent, units {report["units"]}'
+            )
 
         except Exception as e:
             logger.error(f'[Scheduler] Expiration warnings failed: {e}')
@@ -339,8 +401,12 @@ def run_pending_expiration():
         try:
             from ..services.pending_distribution_service import PendingDistributionService
 
-            service = PendingDistributionService()
-            expired_count = service.expire_old_pending()
+            with job_lease(_flask_app, 'pending_expiration') as acquired:
+                if not acquired:
+                    return
+
+                service = PendingDistributionService()
+                expired_count = service.expire_old_pending()
 
             logger.info(f'[Scheduler] Pending expiration complete: {expired_count} expired')
 
@@ -348,6 +414,194 @@ def run_pending_expiration():
             logger.error(f'[Scheduler] Pending expiration failed: {e}')
 
 
+def run_benchmark_snapshot():
+    """
+    Recompute benchmark metrics and peer distributions for all tenants.
+    Runs daily at 2 AM.
+    """
+    global _flask_app
+
+    if not _flask_app:
+        logger.error('[Scheduler] Flask app not initialized')
+        return
+
+    logger.info('[Scheduler] Computing benchmark snapshot...')
+
+    with _flask_app.app_context():
+        try:
+            from ..services.benchmark_engine import BenchmarkEngine
+
+            # One set-based pass over every tenant, so a single lease rather
+            # than per-tenant work units
+            with job_lease(_flask_app, 'benchmark_snapshot') as acquired:
+                if not acquired:
+                    return
+
+                summary = BenchmarkEngine().run()
+
+            logger.info(
+                f'[Scheduler] Benchmark snapshot complete: '
+                f'{summary["stores"]} stores, {summary["distributions"]} distributions'
+            )
+
+        except Exception as e:
+            logger.error(f'[Scheduler] Benchmark snapshot failed: {e}')
+
+
+def run_tenant_purges():
+    """
+    Continue unfinished shop redaction purges in bounded chunks.
+    Runs every 5 minutes.
+    """
+    global _flask_app
+
+    if not _flask_app:
+        logger.error('[Scheduler] Flask app not initialized')
+        return
+
+    with _flask_app.app_context():
+        from ..extensions import db
+
+        try:
+            from ..services.tenant_purge import resume_tenant_purges
+
+            with job_lease(_flask_app, 'tenant_purges') as acquired:
+                if not acquired:
+                    return
+                # Stay inside the 5-minute tick so runs never overlap
+                summary = resume_tenant_purges(max_seconds=240)
+
+            if any(summary.values()):
+                logger.info(f'[Scheduler] Tenant purges: {summary}')
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'[Scheduler] Tenant purges failed: {e}')
+
+
+def _catalog_reconcile_unit(tenant_id: int) -> dict:
+    from ..models.tenant import Tenant
+    from ..services.catalog_mirror_service import CatalogMirrorService
+
+    tenant = Tenant.query.get(tenant_id)
+    if not tenant or not tenant.shopify_access_token:
+        return {'skipped': 1}
+
+    CatalogMirrorService(tenant_id).reconcile()
+    return {'reconciled': 1}
+
+
+def run_catalog_reconcile():
+    """
+    Reconcile the product catalog mirror with Shopify for all active tenants.
+    Runs daily at 3 AM.
+    """
+    global _flask_app
+
+    if not _flask_app:
+        logger.error('[Scheduler] Flask app not initialized')
+        return
+
+    logger.info('[Scheduler] Reconciling catalog mirrors...')
+
+    with _flask_app.app_context():
+        try:
+            report = run_tenant_job(
+                _flask_app, 'catalog_reconcile', _run_key(), _active_tenant_ids(), _catalog_reconcile_unit
+            )
+            if report is None:
+                return
+
+            logger.info(
+                f'[Scheduler] Catalog reconcile complete: '
+                f'{report["summary"].get("reconciled", 0)} tenants, units {report["units"]}'
+            )
+
+        except Exception as e:
+            logger.error(f'[Scheduler] Catalog reconcile failed: {e}')
+
+
+def run_partner_deliveries():
+    """
+    Dispatch queued partner syncs that are due (retries and abandoned sends).
+    Runs every minute across all tenants.
+    """
+    global _flask_app
+
+    if not _flask_app:
+        logger.error('[Scheduler] Flask app not initialized')
+        return
+
+    with _flask_app.app_context():
+        from ..extensions import db
+
+        try:
+            from ..services.partner_sync_service import process_due_deliveries
+
+            with job_lease(_flask_app, 'partner_deliveries') as acquired:
+                if not acquired:
+                    return
+                dispatched = process_due_deliveries()
+
+            if dispatched:
+                logger.info(f'[Scheduler] Partner deliveries dispatched: {dispatched}')
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'[Scheduler] Partner deliveries failed: {e}')
+
+
+def _anniversary_rewards_unit(tenant_id: int) -> dict:
+    from ..services.anniversary_service import AnniversaryService
+    from ..services.notification_service import notification_service
+
+    service = AnniversaryService(tenant_id)
+    settings = service.get_anniversary_settings()
+
+    # Skip if anniversary rewards are disabled
+    if not settings.get('enabled'):
+        return {}
+
+    # Process anniversary rewards for this tenant
+    result = service.process_anniversary_rewards()
+
+    if not result.get('success'):
+        if result.get('error') != 'Anniversary rewards not enabled':
+            logger.warning(f'[Scheduler] Tenant {tenant_id}: {result.get("error", "Unknown error")}')
+        return {}
+
+    successful = result.get('successful', 0)
+    emails_sent = 0
+
+    # Send anniversary emails for each successfully rewarded member
+    for detail in result.get('details', []):
+        if detail.get('success'):
+            try:
+                email_result = notification_service.send_anniversary_reward(
+                    tenant_id=tenant_id,
+                    member_id=detail.get('member_id'),
+                    anniversary_year=detail.get('anniversary_year', 1),
+                    reward_type=detail.get('reward_type', 'points'),
+                    reward_amount=detail.get('reward_amount', 0),
+                    custom_message=settings.get('message', '')
+                )
+                if email_result.get('success'):
+                    emails_sent += 1
+                elif not email_result.get('skipped'):
+                    logger.warning(
+                        f'[Scheduler] Anniversary email failed for member {detail.get("member_id")}: '
+                        f'{email_result.get("error", "Unknown error")}'
+                    )
+            except Exception as e:
+                logger.error(f'[Scheduler] Anniversary email error for member {detail.get("member_id")}: {e}')
+
+    logger.info(
+        f'[Scheduler] Tenant {tenant_id}: {successful} anniversary rewards issued, '
+        f'{result.get("already_rewarded", 0)} already rewarded'
+    )
+    return {'rewarded': successful, 'emails_sent': emails_sent}
+
+
 def run_anniversary_rewards():
     """
     Process anniversary rewards for all tenants.
@@ -365,77 +619,67 @@ def run_anniversary_rewards():
         try:
             from ..extensions import db
             from ..models.tenant import Tenant
-            from ..services.anniversary_service import AnniversaryService
-            from ..services.notification_service import notification_service
-
-            # Get all active tenants
-            tenants = Tenant.query.filter_by(subscription_active=True).all()
-
-            total_rewarded = 0
-            total_emails_sent = 0
-            total_failed = 0
-
-            for tenant in tenants:
-                try:
-                    # Create service instance for this tenant
-                    service = AnniversaryService(tenant.id)
-                    settings = service.get_anniversary_settings()
-
-                    # Skip if anniversary rewards are disabled
-                    if not settings.get('enabled'):
-                        continue
-
-                    # Process anniversary rewards for this tenant
-                    result = service.process_anniversary_rewards()
-
-                    if result.get('success'):
-                        successful = result.get('successful', 0)
-                        total_rewarded += successful
-
-                        # Send anniversary emails for each successfully rewarded member
-                        for detail in result.get('details', []):
-                            if detail.get('success'):
-                                try:
-                                    email_result = notification_service.send_anniversary_reward(
-                                        tenant_id=tenant.id,
-                                        member_id=detail.get('member_id'),
-                                        anniversary_year=detail.get('anniversary_year', 1),
-                                        reward_type=detail.get('reward_type', 'points'),
-                                        reward_amount=detail.get('reward_amount', 0),
-                                        custom_message=settings.get('message', '')
-                                    )
-                                    if email_result.get('success'):
-                                        total_emails_sent += 1
-                                    elif not email_result.get('skipped'):
-                                        logger.warning(
-                                            f'[Scheduler] Anniversary email failed for member {detail.get("member_id")}: '
-                                            f'{email_result.get("error", "Unknown error")}'
-                                        )
-                                except Exception as e:
-                                    logger.error(f'[Scheduler] Anniversary email error for member {detail.get("member_id")}: {e}')
-
-                        logger.info(
-                            f'[Scheduler] Tenant {tenant.id}: {successful} anniversary rewards issued, '
-                            f'{result.get("already_rewarded", 0)} already rewarded'
-                        )
-                    else:
-                        if result.get('error') != 'Anniversary rewards not enabled':
-                            logger.warning(f'[Scheduler] Tenant {tenant.id}: {result.get("error", "Unknown error")}')
-
-                except Exception as e:
-                    total_failed += 1
-                    logger.error(f'[Scheduler] Anniversary rewards failed for tenant {tenant.id}: {e}')
+            from ..services.anniversary_service import find_upcoming_anniversaries
+
+            # Only active tenants with at least one anniversary today (indexed lookup)
+            due = find_upcoming_anniversaries(days_ahead=0)
+            if not due:
+                logger.info('[Scheduler] Anniversary rewards complete: no anniversaries today')
+                return
+            tenant_ids = [tid for (tid,) in db.session.query(Tenant.id).filter(
+                Tenant.subscription_active == True,
+                Tenant.id.in_(list(due.keys()))
+            ).order_by(Tenant.id)]
+
+            report = run_tenant_job(
+                _flask_app, 'anniversary_rewards', _run_key(), tenant_ids, _anniversary_rewards_unit
+            )
+            if report is None:
+                return
 
+            summary = report['summary']
             logger.info(
                 f'[Scheduler] Anniversary rewards complete: '
-                f'{total_rewarded} rewards issued, {total_emails_sent} emails sent, '
-                f'{total_failed} tenant failures'
+                f'{summary.get("rewarded", 0)} rewards issued, {summary.get("emails_sent", 0)} emails sent, '
+                f'units {report["units"]}'
             )
 
         except Exception as e:
             logger.error(f'[Scheduler] Anniversary rewards failed: {e}')
 
 
+def _anniversary_reminders_unit(tenant_id: int) -> dict:
+    from ..services.anniversary_service import AnniversaryService
+
+    service = AnniversaryService(tenant_id)
+    settings = service.get_anniversary_settings()
+
+    # Skip if anniversary rewards are disabled
+    if not settings.get('enabled'):
+        return {}
+
+    # Skip if advance reminders not configured
+    email_days_before = settings.get('email_days_before', 0)
+    if email_days_before <= 0:
+        return {}
+
+    # Process anniversary reminders for this tenant
+    result = service.process_anniversary_reminders()
+
+    if not result.get('success'):
+        if result.get('error') not in ['Anniversary rewards not enabled', 'Advance reminders not configured']:
+            logger.warning(f'[Scheduler] Tenant {tenant_id}: {result.get("error", "Unknown error")}')
+        return {}
+
+    successful = result.get('successful', 0)
+    if successful > 0:
+        logger.info(
+            f'[Scheduler] Tenant {tenant_id}: {successful} anniversary reminders sent '
+            f'({email_days_before} days in advance)'
+        )
+    return {'reminders_sent': successful, 'tenants_with_reminders': int(successful > 0)}
+
+
 def run_anniversary_reminders():
     """
     Send anniversary advance reminder emails for all tenants.
@@ -456,62 +700,90 @@ def run_anniversary_reminders():
 
     with _flask_app.app_context():
         try:
-            from ..extensions import db
-            from ..models.tenant import Tenant
-            from ..services.anniversary_service import AnniversaryService
-
-            # Get all active tenants
-            tenants = Tenant.query.filter_by(subscription_active=True).all()
-
-            total_reminders_sent = 0
-            total_failed = 0
-            tenants_with_reminders = 0
-
-            for tenant in tenants:
-                try:
-                    # Create service instance for this tenant
-                    service = AnniversaryService(tenant.id)
-                    settings = service.get_anniversary_settings()
-
-                    # Skip if anniversary rewards are disabled
-                    if not settings.get('enabled'):
-                        continue
-
-                    # Skip if advance reminders not configured
-                    email_days_before = settings.get('email_days_before', 0)
-                    if email_days_before <= 0:
-                        continue
-
-                    # Process anniversary reminders for this tenant
-                    result = service.process_anniversary_reminders()
-
-                    if result.get('success'):
-                        successful = result.get('successful', 0)
-                        if successful > 0:
-                            total_reminders_sent += successful
-                            tenants_with_reminders += 1
-                            logger.info(
-                                f'[Scheduler] Tenant {tenant.id}: {successful} anniversary reminders sent '
-                                f'({email_days_before} days in advance)'
-                            )
-                    else:
-                        if result.get('error') not in ['Anniversary rewards not enabled', 'Advance reminders not configured']:
-                            logger.warning(f'[Scheduler] Tenant {tenant.id}: {result.get("error", "Unknown error")}')
-
-                except Exception as e:
-                    total_failed += 1
-                    logger.error(f'[Scheduler] Anniversary reminders failed for tenant {tenant.id}: {e}')
+            report = run_tenant_job(
+                _flask_app, 'anniversary_reminders', _run_key(), _active_tenant_ids(), _anniversary_reminders_unit
+            )
+            if report is None:
+                return
 
+            summary = report['summary']
             logger.info(
                 f'[Scheduler] Anniversary reminders complete: '
-                f'{total_reminders_sent} reminders sent across {tenants_with_reminders} tenants, '
-                f'{total_failed} tenant failures'
+                f'{summary.get("reminders_sent", 0)} reminders sent across '
+                f'{summary.get("tenants_with_reminders", 0)} tenants, units {report["units"]}'
             )
 
         except Exception as e:
             logger.error(f'[Scheduler] Anniversary reminders failed: {e}')
 
 
+# Rate limit: max emails per tenant per day
+MAX_NUDGE_EMAILS_PER_TENANT = 100
+MAX_NUDGE_EMAILS_PER_TYPE = 50
+
+# (stats key, nudge setting, service method, sent count field, passes max_emails)
+NUDGE_STEPS = [
+    ('points_expiring', 'points_expiring', 'process_points_expiring_reminders', 'reminders_sent', False),
+    ('tier_progress', 'tier_progress', 'process_tier_progress_reminders', 'reminders_sent', False),
+    ('inactive_reengagement', 'inactive_reminder', 'process_reengagement_emails', 'emails_sent', True),
+    ('trade_in_reminder', 'trade_in_reminder', 'process_trade_in_reminders', 'reminders_sent', True),
+]
+
+
+def _nudges_unit(tenant_id: int) -> dict:
+    from ..models.tenant import Tenant
+    from ..services.nudges_service import NudgesService
+
+    tenant = Tenant.query.get(tenant_id)
+    settings = (tenant.settings if tenant else None) or {}
+    nudge_service = NudgesService(tenant_id, settings)
+
+    # Check if nudges are globally enabled for this tenant
+    nudge_settings = nudge_service.get_nudge_settings()
+    if not nudge_settings.get('enabled', True):
+        logger.info(f'[Scheduler] Tenant {tenant_id}: Nudges disabled, skipping')
+        return {'tenants_skipped': 1}
+
+    stats = {'tenants_processed': 1}
+    tenant_emails_sent = 0
+    sent_by_type = {}
+
+    for key, setting, method, sent_field, limited in NUDGE_STEPS:
+        step_stats = stats.setdefault(key, {'sent': 0, 'skipped': 0, 'errors': 0})
+        try:
+            if not nudge_service.is_nudge_enabled(setting):
+                continue
+            remaining = min(MAX_NUDGE_EMAILS_PER_TYPE, MAX_NUDGE_EMAILS_PER_TENANT - tenant_emails_sent)
+            if remaining <= 0:
+                continue
+
+            process = getattr(nudge_service, method)
+            result = process(max_emails=remaining) if limited else process()
+            if result.get('success'):
+                sent = result.get(sent_field, 0)
+                tenant_emails_sent += sent
+                sent_by_type[key] = sent
+                step_stats['sent'] += sent
+                step_stats['skipped'] += result.get('skipped', 0)
+                if result.get('errors'):
+                    step_stats['errors'] += len(result['errors'])
+        except Exception as e:
+            logger.error(f'[Scheduler] Tenant {tenant_id}: {key} nudges failed: {e}')
+            step_stats['errors'] += 1
+
+    # Log tenant summary if any nudges were sent
+    if tenant_emails_sent > 0:
+        logger.info(
+            f'[Scheduler] Tenant {tenant_id}: {tenant_emails_sent} nudges sent - '
+            f'Points: {sent_by_type.get("points_expiring", 0)}, '
+            f'Tier: {sent_by_type.get("tier_progress", 0)}, '
+            f'Inactive: {sent_by_type.get("inactive_reengagement", 0)}, '
+            f'Trade-in: {sent_by_type.get("trade_in_reminder", 0)}'
+        )
+
+    return stats
+
+
 def run_nudges_processor():
     """
     Process and send all nudges for all tenants.
@@ -538,162 +810,29 @@ def run_nudges_processor():
 
     with _flask_app.app_context():
         try:
-            from ..models.tenant import Tenant
-            from ..services.nudges_service import NudgesService
-
-            # Get all active tenants
-            tenants = Tenant.query.filter_by(subscription_active=True).all()
-
-            # Aggregate stats across all tenants
-            total_stats = {
-                'tenants_processed': 0,
-                'tenants_skipped': 0,
-                'tenants_failed': 0,
-                'points_expiring': {'sent': 0, 'skipped': 0, 'errors': 0},
-                'tier_progress': {'sent': 0, 'skipped': 0, 'errors': 0},
-                'inactive_reengagement': {'sent': 0, 'skipped': 0, 'errors': 0},
-                'trade_in_reminder': {'sent': 0, 'skipped': 0, 'errors': 0},
-            }
+            report = run_tenant_job(
+                _flask_app, 'nudges_processor', _run_key(), _active_tenant_ids(), _nudges_unit
+            )
+            if report is None:
+                return
 
-            # Rate limit: max emails per tenant per day
-            MAX_EMAILS_PER_TENANT = 100
-            MAX_EMAILS_PER_NUDGE_TYPE = 50
-
-            for tenant in tenants:
-                try:
-                    # Get tenant settings
-                    settings = tenant.settings or {}
-                    nudge_service = NudgesService(tenant.id, settings)
-
-                    # Check if nudges are globally enabled for this tenant
-                    nudge_settings = nudge_service.get_nudge_settings()
-                    if not nudge_settings.get('enabled', True):
-                        total_stats['tenants_skipped'] += 1
-                        logger.info(f'[Scheduler] Tenant {tenant.id}: Nudges disabled, skipping')
-                        continue
-
-                    tenant_emails_sent = 0
-                    tenant_results = {
-                        'points_expiring': None,
-                        'tier_progress': None,
-                        'inactive_reengagement': None,
-                        'trade_in_reminder': None,
-                    }
-
-                    # 1. Process Points Expiring Reminders
-                    try:
-                        if nudge_service.is_nudge_enabled('points_expiring'):
-                            remaining = min(MAX_EMAILS_PER_NUDGE_TYPE, MAX_EMAILS_PER_TENANT - tenant_emails_sent)
-                            if remaining > 0:
-                                result = nudge_service.process_points_expiring_reminders()
-                                tenant_results['points_expiring'] = result
-                                if result.get('success'):
-                                    sent = result.get('reminders_sent', 0)
-                                    tenant_emails_sent += sent
-                                    total_stats['points_expiring']['sent'] += sent
-                                    total_stats['points_expiring']['skipped'] += result.get('skipped', 0)
-                                    if result.get('errors'):
-                                        total_stats['points_expiring']['errors'] += len(result['errors'])
-                    except Exception as e:
-                        logger.error(f'[Scheduler] Tenant {tenant.id}: Points expiring failed: {e}')
-                        total_stats['points_expiring']['errors'] += 1
-
-                    # 2. Process Tier Progress Reminders
-                    try:
-                        if nudge_service.is_nudge_enabled('tier_progress'):
-                            remaining = min(MAX_EMAILS_PER_NUDGE_TYPE, MAX_EMAILS_PER_TENANT - tenant_emails_sent)
-                            if remaining > 0:
-                                result = nudge_service.process_tier_progress_reminders()
-                                tenant_results['tier_progress'] = result
-                                if result.get('success'):
-                                    sent = result.get('reminders_sent', 0)
-                                    tenant_emails_sent += sent
-                                    total_stats['tier_progress']['sent'] += sent
-                                    total_stats['tier_progress']['skipped'] += result.get('skipped', 0)
-                                    if result.get('errors'):
-                                        total_stats['tier_progress']['errors'] += len(result['errors'])
-                    except Exception as e:
-                        logger.error(f'[Scheduler] Tenant {tenant.id}: Tier progress failed: {e}')
-                        total_stats['tier_progress']['errors'] += 1
-
-                    # 3. Process Inactive Member Re-engagement
-                    try:
-                        if nudge_service.is_nudge_enabled('inactive_reminder'):
-                            remaining = min(MAX_EMAILS_PER_NUDGE_TYPE, MAX_EMAILS_PER_TENANT - tenant_emails_sent)
-                            if remaining > 0:
-                                result = nudge_service.process_reengagement_emails(max_emails=remaining)
-                                tenant_results['inactive_reengagement'] = result
-                                if result.get('success'):
-                                    sent = result.get('emails_sent', 0)
-                                    tenant_emails_sent += sent
-                                    total_stats['inactive_reengagement']['sent'] += sent
-                                    total_stats['inactive_reengagement']['skipped'] += result.get('skipped', 0)
-                                    if result.get('errors'):
-                                        total_stats['inactive_reengagement']['errors'] += len(result['errors'])
-                    except Exception as e:
-                        logger.error(f'[Scheduler] Tenant {tenant.id}: Inactive reengagement failed: {e}')
-                        total_stats['inactive_reengagement']['errors'] += 1
-
-                    # 4. Process Trade-In Reminders
-                    try:
-                        if nudge_service.is_nudge_enabled('trade_in_reminder'):
-                            remaining = min(MAX_EMAILS_PER_NUDGE_TYPE, MAX_EMAILS_PER_TENANT - tenant_emails_sent)
-                            if remaining > 0:
-                                result = nudge_service.process_trade_in_reminders(max_emails=remaining)
-                                tenant_results['trade_in_reminder'] = result
-                                if result.get('success'):
-                                    sent = result.get('reminders_sent', 0)
-                                    tenant_emails_sent += sent
-                                    total_stats['trade_in_reminder']['sent'] += sent
-                                    total_stats['trade_in_reminder']['skipped'] += result.get('skipped', 0)
-                                    if result.get('errors'):
-                                        total_stats['trade_in_reminder']['errors'] += len(result['errors'])
-                    except Exception as e:
-                        logger.error(f'[Scheduler] Tenant {tenant.id}: Trade-in reminder failed: {e}')
-                        total_stats['trade_in_reminder']['errors'] += 1
-
-                    total_stats['tenants_processed'] += 1
-
-                    # Log tenant summary if any nudges were sent
-                    if tenant_emails_sent > 0:
-                        logger.info(
-                            f'[Scheduler] Tenant {tenant.id}: {tenant_emails_sent} nudges sent - '
-                            f'Points: {tenant_results["points_expiring"].get("reminders_sent", 0) if tenant_results["points_expiring"] else 0}, '
-                            f'Tier: {tenant_results["tier_progress"].get("reminders_sent", 0) if tenant_results["tier_progress"] else 0}, '
-                            f'Inactive: {tenant_results["inactive_reengagement"].get("emails_sent", 0) if tenant_results["inactive_reengagement"] else 0}, '
-                            f'Trade-in: {tenant_results["trade_in_reminder"].get("reminders_sent", 0) if tenant_results["trade_in_reminder"] else 0}'
-                        )
-
-                except Exception as e:
-                    total_stats['tenants_failed'] += 1
-                    logger.error(f'[Scheduler] Tenant {tenant.id}: Nudges processing failed: {e}')
+            total_stats = report['summary']
+            sent = {key: total_stats.get(key, {}).get('sent', 0) for key, *_ in NUDGE_STEPS}
+            total_errors = sum(total_stats.get(key, {}).get('errors', 0) for key, *_ in NUDGE_STEPS)
 
             # Log final summary
-            total_sent = (
-                total_stats['points_expiring']['sent'] +
-                total_stats['tier_progress']['sent'] +
-                total_stats['inactive_reengagement']['sent'] +
-                total_stats['trade_in_reminder']['sent']
-            )
-            total_errors = (
-                total_stats['points_expiring']['errors'] +
-                total_stats['tier_progress']['errors'] +
-                total_stats['inactive_reengagement']['errors'] +
-                total_stats['trade_in_reminder']['errors']
-            )
-
             logger.info(
                 f'[Scheduler] Nudges processing complete: '
-                f'{total_stats["tenants_processed"]} tenants processed, '
-                f'{total_stats["tenants_skipped"]} skipped, '
-                f'{total_stats["tenants_failed"]} failed'
+                f'{total_stats.get("tenants_processed", 0)} tenants processed, '
+                f'{total_stats.get("tenants_skipped", 0)} skipped, '
+                f'units {report["units"]}'
             )
             logger.info(
-                f'[Scheduler] Nudges sent: {total_sent} total - '
-                f'Points expiring: {total_stats["points_expiring"]["sent"]}, '
-                f'Tier progress: {total_stats["tier_progress"]["sent"]}, '
-                f'Inactive: {total_stats["inactive_reengagement"]["sent"]}, '
-                f'Trade-in: {total_stats["trade_in_reminder"]["sent"]}'
+                f'[Scheduler] Nudges sent: {sum(sent.values())} total - '
+                f'Points expiring: {sent["points_expiring"]}, '
+                f'Tier progress: {sent["tier_progress"]}, '
+                f'Inactive: {sent["inactive_reengagement"]}, '
+                f'Trade-in: {sent["trade_in_reminder"]}'
             )
             if total_errors > 0:
                 logger.warning(f'[Scheduler] Nudges errors: {total_errors} total')
@@ -146,6 +146,9 @@ def handle_shop_redact():
     GDPR mandatory webhook.
     Called 48 hours after app uninstall to request full data deletion.
     Must delete all shop data permanently.
+
+    The webhook is acknowledged once the purge is recorded; rows are then
+    deleted in small chunks off the request (see services.tenant_purge).
     """
     shop_domain = request.headers.get('X-Shopify-Shop-Domain', '')
 
@@ -159,37 +162,22 @@ def handle_shop_redact():
             return jsonify({'error': 'Invalid signature'}), 401
 
     try:
+        from ..services.tenant_purge import request_tenant_purge, start_tenant_purge
+
         tenant = Tenant.query.filter_by(shopify_domain=shop_domain).first()
 
         if not tenant:
             return jsonify({'success': True, 'message': 'No data to redact'})
 
-        # Delete all tenant data
-        from ..models import Member, TradeInBatch, TradeInItem, PointsTransaction, StoreCreditLedger
-
-        tenant_id = tenant.id
-
-        # Delete in order to respect foreign keys
-        PointsTransaction.query.filter_by(tenant_id=tenant_id).delete()
-        StoreCreditLedger.query.filter_by(tenant_id=tenant_id).delete()
-        TradeInItem.query.filter(
-            TradeInItem.batch_id.in_(
-                db.session.query(TradeInBatch.id).filter_by(tenant_id=tenant_id)
-            )
-        ).delete(synchronize_session=False)
-        TradeInBatch.query.filter_by(tenant_id=tenant_id).delete()
-        Member.query.filter_by(tenant_id=tenant_id).delete()
-
-        # Finally delete tenant
-        db.session.delete(tenant)
-        db.session.commit()
+        purge = request_tenant_purge(tenant)
+        start_tenant_purge(purge.id)
 
-        current_app.logger.info(f'All data for {shop_domain} permanently deleted')
+        current_app.logger.info(f'Data deletion for {shop_domain} scheduled (purge {purge.id})')
 
         return jsonify({
             'success': True,
             'shop': shop_domain,
-            'action': 'data_permanently_deleted'
+            'action': 'data_deletion_scheduled'
         })
 
     except Exception as e:
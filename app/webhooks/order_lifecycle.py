@@ -773,19 +773,18 @@ def handle_order_created():
                                 elif isinstance(item['tags'], list):
                                     product_tags.update(item['tags'])
 
-                        # Fetch collection IDs if any promo has collection filters
+                        # Resolve collections (and product tags) from the catalog mirror
                         collection_ids = set()
-                        needs_collections = any(promo.collection_ids for promo in all_customer_promos)
-                        if needs_collections and product_ids:
+                        needs_catalog = any(promo.collection_ids or promo.product_tags_filter for promo in all_customer_promos)
+                        if needs_catalog and product_ids:
                             try:
-                                from ..services.shopify_client import ShopifyClient
-                                shopify_client = ShopifyClient(tenant.id)
-                                product_collections = shopify_client.get_product_collections(product_ids)
-                                for pid in product_ids:
-                                    if pid in product_collections:
-                                        collection_ids.update(product_collections[pid])
+                                from ..services.catalog_mirror_service import CatalogMirrorService
+                                catalog = CatalogMirrorService(tenant.id).resolve_products(product_ids)
+                                for product in catalog.values():
+                                    collection_ids.update(product['collection_ids'])
+                                    product_tags.update(product['tags'])
                             except Exception as e:
-                                current_app.logger.warning(f"Failed to fetch collections for guest promo: {e}")
+                                current_app.logger.warning(f"Failed to resolve collections for guest promo: {e}")
 
                         # Find the best matching promotion
                         best_bonus = Decimal('0')
@@ -905,18 +904,18 @@ def handle_order_created():
                         elif isinstance(item['tags'], list):
                             product_tags.update(item['tags'])
 
-                # Fetch collection IDs for products (for collection-gated promotions)
+                # Resolve collections and product tags from the catalog mirror
+                # (for collection/tag-gated promotions)
                 collection_ids = set()
                 if product_ids:
                     try:
-                        from ..services.shopify_client import ShopifyClient
-                        shopify_client = ShopifyClient(tenant.id)
-                        product_collections = shopify_client.get_product_collections(product_ids)
-                        for pid in product_ids:
-                            if pid in product_collections:
-                                collection_ids.update(product_collections[pid])
+                        from ..services.catalog_mirror_service import CatalogMirrorService
+                        catalog = CatalogMirrorService(tenant.id).resolve_products(product_ids)
+                        for product in catalog.values():
+                            collection_ids.update(product['collection_ids'])
+                            product_tags.update(product['tags'])
                     except Exception as e:
-                        current_app.logger.warning(f"Failed to fetch collections for rewards: {e}")
+                        current_app.logger.warning(f"Failed to resolve collections for rewards: {e}")
                         # Continue without collection filtering rather than failing
 
                 # ==========================================
@@ -988,6 +987,7 @@ def handle_order_created():
                         member.points_balance = (member.points_balance or 0) + points_earned
                         member.lifetime_points_earned = (member.lifetime_points_earned or 0) + points_earned
                         member.last_activity_at = datetime.utcnow()
+                        member.record_purchase(transaction.created_at)
 
                         # Get points display name
                         points_name = loyalty_settings.get('points_name', 'points')
@@ -1498,7 +1498,8 @@ def handle_order_paid():
                     db.session.add(transaction)
 
                     member.points_balance = (member.points_balance or 0) + points_earned
-                    member.lifetime_points = (member.lifetime_points or 0) + points_earned
+                    member.lifetime_points_earned = (member.lifetime_points_earned or 0) + points_earned
+                    member.record_purchase(transaction.created_at)
                     db.session.commit()
 
                     result['points_earned'] = points_earned
@@ -1524,6 +1525,8 @@ def handle_product_created():
     - Product type = 'Membership'
     - Product tags containing 'membership' or 'tier'
     - Product metafield 'tradeup.tier_id'
+
+    Also records the product in the local catalog mirror.
     """
     shop_domain = request.headers.get('X-Shopify-Shop-Domain', '')
     tenant = get_tenant_from_domain(shop_domain)
@@ -1531,8 +1534,16 @@ def handle_product_created():
     if not tenant:
         return jsonify({'error': 'Unknown shop'}), 404
 
+    # Verify webhook in production
+    if current_app.config.get('ENV') != 'development':
+        hmac_header = request.headers.get('X-Shopify-Hmac-SHA256', '')
+        if not verify_shopify_webhook(request.data, hmac_header, tenant.webhook_secret):
+            return jsonify({'error': 'Invalid signature'}), 401
+
     try:
         product_data = request.json
+        mirror_catalog_product(tenant.id, product_data)
+
         product_id = str(product_data.get('id'))
         product_title = product_data.get('title', '')
         product_type = product_data.get('product_type', '')
@@ -1592,3 +1603,68 @@ def handle_product_created():
     except Exception as e:
         current_app.logger.error(f'Error processing product create webhook: {str(e)}')
         return jsonify({'error': str(e)}), 500
+
+
+def mirror_catalog_product(tenant_id: int, product_data: dict) -> None:
+    """Record a product in the catalog mirror without failing the webhook."""
+    from ..services.catalog_mirror_service import CatalogMirrorService
+    try:
+        CatalogMirrorService(tenant_id).upsert_from_webhook(product_data or {})
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning(f'Failed to mirror product {(product_data or {}).get("id")}: {e}')
+
+
+@order_lifecycle_bp.route('/products/update', methods=['POST'])
+def handle_product_updated():
+    """
+    Handle PRODUCTS_UPDATE webhook.
+
+    Refreshes the product's tags, vendor, type and collections in the
+    catalog mirror used by collection/tag-scoped promotions.
+    """
+    shop_domain = request.headers.get('X-Shopify-Shop-Domain', '')
+    tenant = get_tenant_from_domain(shop_domain)
+
+    if not tenant:
+        return jsonify({'error': 'Unknown shop'}), 404
+
+    # Verify webhook in production
+    if current_app.config.get('ENV') != 'development':
+        hmac_header = request.headers.get('X-Shopify-Hmac-SHA256', '')
+        if not verify_shopify_webhook(request.data, hmac_header, tenant.webhook_secret):
+            return jsonify({'error': 'Invalid signature'}), 401
+
+    product_data = request.json or {}
+    mirror_catalog_product(tenant.id, product_data)
+    return jsonify({'success': True, 'product_id': str(product_data.get('id'))})
+
+
+@order_lifecycle_bp.route('/products/delete', methods=['POST'])
+def handle_product_deleted():
+    """
+    Handle PRODUCTS_DELETE webhook.
+
+    Removes the product from the catalog mirror.
+    """
+    shop_domain = request.headers.get('X-Shopify-Shop-Domain', '')
+    tenant = get_tenant_from_domain(shop_domain)
+
+    if not tenant:
+        return jsonify({'error': 'Unknown shop'}), 404
+
+    # Verify webhook in production
+    if current_app.config.get('ENV') != 'development':
+        hmac_header = request.headers.get('X-Shopify-Hmac-SHA256', '')
+        if not verify_shopify_webhook(request.data, hmac_header, tenant.webhook_secret):
+            return jsonify({'error': 'Invalid signature'}), 401
+
+    try:
+        from ..services.catalog_mirror_service import CatalogMirrorService
+        product_id = (request.json or {}).get('id')
+        deleted = CatalogMirrorService(tenant.id).delete_product(product_id)
+        return jsonify({'success': True, 'product_id': str(product_id), 'deleted': deleted})
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'Error processing product delete webhook: {str(e)}')
+        return jsonify({'error': str(e)}), 500
@@ -1,16 +1,26 @@
 """
 Gunicorn configuration for Railway deployment.
+
+GUNICORN_WORKER_CLASS=gevent serves each worker's requests on greenlets
+(see app/utils/cooperative.py); the default is sync workers.
 """
 import os
 
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+
+if worker_class == 'gevent':
+    # Patch before preload_app imports ssl, psycopg2 and the app
+    from gevent import monkey
+    monkey.patch_all()
+
 # Bind to Railway's PORT or default
 bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
 
 # Worker configuration
 # Railway has limited memory, use fewer workers
 workers = int(os.getenv('GUNICORN_WORKERS', '2'))
-worker_class = 'sync'
-worker_connections = 1000
+# Concurrent requests per gevent worker (ignored by sync workers)
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '200'))
 timeout = 120  # Longer timeout for slow DB operations
 keepalive = 5
 
@@ -23,7 +33,8 @@ capture_output = True
 # Process naming
 proc_name = 'tradeup'
 
-# Preload app for better memory usage
+# Preload app for better memory usage. Every blueprint is imported and
+# registered here once, before forking, so workers start with the full URL map
 preload_app = True
 
 # Graceful restart
@@ -0,0 +1,28 @@
+"""Add failure count and retry time to tenant_purges
+
+Revision ID: a2b3c4d5e6f7
+Revises: z1f2a3b4c5d6
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2b3c4d5e6f7'
+down_revision = 'z1f2a3b4c5d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Track failed purge runs so retries back off and eventually stop."""
+    op.add_column('tenant_purges', sa.Column('failures', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('tenant_purges', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    """Drop the purge retry fields."""
+    op.drop_column('tenant_purges', 'next_attempt_at')
+    op.drop_column('tenant_purges', 'failures')
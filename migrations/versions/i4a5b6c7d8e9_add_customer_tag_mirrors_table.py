@@ -0,0 +1,41 @@
+"""Add customer_tag_mirrors table for diff-based customer tag sync
+
+Revision ID: i4a5b6c7d8e9
+Revises: h2a3b4c5d6e7
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'i4a5b6c7d8e9'
+down_revision = 'h2a3b4c5d6e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create customer_tag_mirrors table holding last-synced TradeUp tags per member."""
+    op.create_table(
+        'customer_tag_mirrors',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('member_id', sa.Integer(), nullable=False),
+        sa.Column('shopify_customer_id', sa.String(50), nullable=False),
+        sa.Column('tags', sa.JSON(), nullable=False),
+        sa.Column('synced_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], name='fk_customer_tag_mirrors_tenant'),
+        sa.ForeignKeyConstraint(['member_id'], ['members.id'], name='fk_customer_tag_mirrors_member', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', 'member_id', name='uq_customer_tag_mirror_member')
+    )
+
+    op.create_index('ix_customer_tag_mirrors_tenant_id', 'customer_tag_mirrors', ['tenant_id'])
+
+
+def downgrade():
+    """Remove customer_tag_mirrors table."""
+    op.drop_index('ix_customer_tag_mirrors_tenant_id', 'customer_tag_mirrors')
+    op.drop_table('customer_tag_mirrors')
@@ -0,0 +1,41 @@
+"""Add denormalized last_trade_in_at column to members
+
+Revision ID: j5b6c7d8e9f0
+Revises: i4a5b6c7d8e9
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'j5b6c7d8e9f0'
+down_revision = 'i4a5b6c7d8e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add members.last_trade_in_at and backfill it from completed trade-in batches."""
+    op.add_column('members', sa.Column('last_trade_in_at', sa.DateTime(), nullable=True))
+
+    op.execute("""
+        UPDATE members
+        SET last_trade_in_at = (
+            SELECT MAX(trade_in_batches.created_at)
+            FROM trade_in_batches
+            WHERE trade_in_batches.member_id = members.id
+              AND trade_in_batches.status = 'completed'
+        )
+        WHERE EXISTS (
+            SELECT 1 FROM trade_in_batches
+            WHERE trade_in_batches.member_id = members.id
+              AND trade_in_batches.status = 'completed'
+        )
+    """)
+
+
+def downgrade():
+    """Remove members.last_trade_in_at."""
+    op.drop_column('members', 'last_trade_in_at')
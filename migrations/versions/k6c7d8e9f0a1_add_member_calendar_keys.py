@@ -0,0 +1,39 @@
+"""Add an indexed anniversary calendar key to members
+
+Revision ID: k6c7d8e9f0a1
+Revises: j5b6c7d8e9f0
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'k6c7d8e9f0a1'
+down_revision = 'j5b6c7d8e9f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add a month-day key (month * 100 + day) for anniversary range queries."""
+    op.add_column('members', sa.Column('anniversary_key', sa.SmallInteger(), nullable=True))
+
+    # Enrollment date is membership_start_date, falling back to created_at
+    op.execute("""
+        UPDATE members
+        SET anniversary_key = (
+            EXTRACT(MONTH FROM COALESCE(membership_start_date, created_at::date)) * 100
+            + EXTRACT(DAY FROM COALESCE(membership_start_date, created_at::date))
+        )
+        WHERE COALESCE(membership_start_date, created_at::date) IS NOT NULL
+    """)
+
+    op.create_index('ix_members_anniversary_key_tenant', 'members', ['anniversary_key', 'tenant_id'])
+
+
+def downgrade():
+    """Remove the anniversary key from members."""
+    op.drop_index('ix_members_anniversary_key_tenant', 'members')
+    op.drop_column('members', 'anniversary_key')
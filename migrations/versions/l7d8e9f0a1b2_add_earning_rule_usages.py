@@ -0,0 +1,67 @@
+"""Add earning_rule_usages counters and members.first_purchase_at
+
+Revision ID: l7d8e9f0a1b2
+Revises: k6c7d8e9f0a1
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'l7d8e9f0a1b2'
+down_revision = 'k6c7d8e9f0a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create per-member earning rule usage counters and the first-purchase flag."""
+    op.create_table(
+        'earning_rule_usages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('member_id', sa.Integer(), nullable=False),
+        sa.Column('rule_id', sa.Integer(), nullable=False),
+        sa.Column('uses', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_used_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], name='fk_earning_rule_usages_tenant'),
+        sa.ForeignKeyConstraint(['member_id'], ['members.id'], name='fk_earning_rule_usages_member', ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['rule_id'], ['earning_rules.id'], name='fk_earning_rule_usages_rule', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('member_id', 'rule_id', name='uq_earning_rule_usage_member_rule')
+    )
+    op.create_index('ix_earning_rule_usages_tenant', 'earning_rule_usages', ['tenant_id'])
+
+    op.add_column('members', sa.Column('first_purchase_at', sa.DateTime(), nullable=True))
+
+    # Backfill counters from rule-tagged transactions
+    op.execute("""
+        INSERT INTO earning_rule_usages (tenant_id, member_id, rule_id, uses, last_used_at)
+        SELECT pt.tenant_id, pt.member_id, er.id, COUNT(*), MAX(pt.created_at)
+        FROM points_transactions pt
+        JOIN earning_rules er ON er.id::text = pt.reference_id
+        WHERE pt.reference_type = 'earning_rule'
+        GROUP BY pt.tenant_id, pt.member_id, er.id
+    """)
+
+    # Backfill first purchase from purchase earn transactions
+    op.execute("""
+        UPDATE members
+        SET first_purchase_at = first_purchase.created_at
+        FROM (
+            SELECT member_id, MIN(created_at) AS created_at
+            FROM points_transactions
+            WHERE transaction_type = 'earn' AND source = 'purchase'
+            GROUP BY member_id
+        ) AS first_purchase
+        WHERE first_purchase.member_id = members.id
+    """)
+
+
+def downgrade():
+    """Remove earning rule usage counters and the first-purchase flag."""
+    op.drop_column('members', 'first_purchase_at')
+    op.drop_index('ix_earning_rule_usages_tenant', 'earning_rule_usages')
+    op.drop_table('earning_rule_usages')
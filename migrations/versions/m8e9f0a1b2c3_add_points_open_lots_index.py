@@ -0,0 +1,31 @@
+"""Add partial index over open points lots for FIFO consumption and expiry
+
+Revision ID: m8e9f0a1b2c3
+Revises: l7d8e9f0a1b2
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'm8e9f0a1b2c3'
+down_revision = 'l7d8e9f0a1b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Index only earn rows with spendable points, in FIFO order per member."""
+    op.create_index(
+        'ix_points_transactions_open_lots',
+        'points_transactions',
+        ['member_id', 'expires_at', 'created_at'],
+        postgresql_where=sa.text("transaction_type = 'earn' AND remaining_points > 0 AND reversed_at IS NULL")
+    )
+
+
+def downgrade():
+    """Remove open points lots index."""
+    op.drop_index('ix_points_transactions_open_lots', 'points_transactions')
@@ -0,0 +1,69 @@
+"""Add trigram, prefix and full-text search indexes for members and trade ledger
+
+Revision ID: n9f0a1b2c3d4
+Revises: m8e9f0a1b2c3
+Create Date: 2026-10-18 14:00:00.000000
+
+The index expressions must match the search expressions in
+app/services/search_service.py exactly.
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'n9f0a1b2c3d4'
+down_revision = 'm8e9f0a1b2c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Enable pg_trgm and create search indexes."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Substring search over the concatenated member search document
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_members_search_trgm ON members
+        USING gin ((lower(coalesce(members.name, '') || ' ' || coalesce(members.email, '') || ' ' ||
+                    coalesce(members.member_number, '') || ' ' || coalesce(members.partner_customer_id, '')))
+                   gin_trgm_ops)
+    """)
+
+    # Prefix lookups (POS scans, email autocomplete)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_members_tenant_number_prefix
+        ON members (tenant_id, member_number text_pattern_ops)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_members_tenant_email_prefix
+        ON members (tenant_id, lower(email) text_pattern_ops)
+    """)
+
+    # Trade ledger substring search and reference prefix lookup
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_trade_ledger_search_trgm ON trade_in_ledger
+        USING gin ((lower(coalesce(trade_in_ledger.reference, '') || ' ' || coalesce(trade_in_ledger.guest_name, '') || ' ' ||
+                    coalesce(trade_in_ledger.category, '') || ' ' || coalesce(trade_in_ledger.notes, '')))
+                   gin_trgm_ops)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_trade_ledger_reference_prefix
+        ON trade_in_ledger (lower(reference) text_pattern_ops)
+    """)
+
+    # Word search over free-form notes
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_trade_ledger_notes_fts ON trade_in_ledger
+        USING gin (to_tsvector('simple', coalesce(trade_in_ledger.notes, '')))
+    """)
+
+
+def downgrade():
+    """Remove search indexes (pg_trgm extension is left installed)."""
+    op.execute("DROP INDEX IF EXISTS ix_trade_ledger_notes_fts")
+    op.execute("DROP INDEX IF EXISTS ix_trade_ledger_reference_prefix")
+    op.execute("DROP INDEX IF EXISTS ix_trade_ledger_search_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_members_tenant_email_prefix")
+    op.execute("DROP INDEX IF EXISTS ix_members_tenant_number_prefix")
+    op.execute("DROP INDEX IF EXISTS ix_members_search_trgm")
@@ -0,0 +1,29 @@
+"""Add created_at keyset indexes for cursor pagination
+
+Revision ID: o0a1b2c3d4e5
+Revises: n9f0a1b2c3d4
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'o0a1b2c3d4e5'
+down_revision = 'n9f0a1b2c3d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Index member, redemption and points history lists in cursor order."""
+    op.create_index('ix_members_tenant_created', 'members', ['tenant_id', 'created_at', 'id'])
+    op.create_index('ix_redemptions_tenant_created', 'reward_redemptions', ['tenant_id', 'created_at', 'id'])
+    op.create_index('ix_points_transactions_member_created', 'points_transactions', ['member_id', 'created_at', 'id'])
+
+
+def downgrade():
+    """Remove keyset pagination indexes."""
+    op.drop_index('ix_points_transactions_member_created', 'points_transactions')
+    op.drop_index('ix_redemptions_tenant_created', 'reward_redemptions')
+    op.drop_index('ix_members_tenant_created', 'members')
@@ -0,0 +1,43 @@
+"""Add catalog_products table mirroring product collections and tags
+
+Revision ID: p1b2c3d4e5f6
+Revises: o0a1b2c3d4e5
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'p1b2c3d4e5f6'
+down_revision = 'o0a1b2c3d4e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create catalog_products table holding product filter attributes per tenant."""
+    op.create_table(
+        'catalog_products',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.BigInteger(), nullable=False),
+        sa.Column('collection_ids', sa.JSON(), nullable=False),
+        sa.Column('tags', sa.JSON(), nullable=False),
+        sa.Column('vendor', sa.String(255), nullable=True),
+        sa.Column('product_type', sa.String(255), nullable=True),
+        sa.Column('shopify_updated_at', sa.DateTime(), nullable=True),
+        sa.Column('synced_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], name='fk_catalog_products_tenant'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', 'product_id', name='uq_catalog_product_tenant_product')
+    )
+
+    op.create_index('ix_catalog_products_tenant_id', 'catalog_products', ['tenant_id'])
+
+
+def downgrade():
+    """Remove catalog_products table."""
+    op.drop_index('ix_catalog_products_tenant_id', 'catalog_products')
+    op.drop_table('catalog_products')
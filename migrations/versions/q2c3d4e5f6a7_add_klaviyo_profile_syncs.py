@@ -0,0 +1,42 @@
+"""Add klaviyo_profile_syncs table for change-detected bulk profile sync
+
+Revision ID: q2c3d4e5f6a7
+Revises: p1b2c3d4e5f6
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'q2c3d4e5f6a7'
+down_revision = 'p1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create klaviyo_profile_syncs table holding the last synced profile hash per member."""
+    op.create_table(
+        'klaviyo_profile_syncs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('member_id', sa.Integer(), nullable=False),
+        sa.Column('properties_hash', sa.String(40), nullable=False),
+        sa.Column('job_id', sa.String(64), nullable=True),
+        sa.Column('synced_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], name='fk_klaviyo_profile_syncs_tenant'),
+        sa.ForeignKeyConstraint(['member_id'], ['members.id'], name='fk_klaviyo_profile_syncs_member',
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', 'member_id', name='uq_klaviyo_profile_sync_member')
+    )
+
+    op.create_index('ix_klaviyo_profile_syncs_tenant_id', 'klaviyo_profile_syncs', ['tenant_id'])
+
+
+def downgrade():
+    """Remove klaviyo_profile_syncs table."""
+    op.drop_index('ix_klaviyo_profile_syncs_tenant_id', 'klaviyo_profile_syncs')
+    op.drop_table('klaviyo_profile_syncs')
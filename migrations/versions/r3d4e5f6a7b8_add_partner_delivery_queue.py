@@ -0,0 +1,39 @@
+"""Add delivery queue and latency columns to partner_sync_logs
+
+Revision ID: r3d4e5f6a7b8
+Revises: q2c3d4e5f6a7
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'r3d4e5f6a7b8'
+down_revision = 'q2c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add endpoint, latency and retry scheduling columns for queued partner delivery."""
+    op.add_column('partner_sync_logs', sa.Column('endpoint', sa.String(500), nullable=True))
+    op.add_column('partner_sync_logs', sa.Column('duration_ms', sa.Integer(), nullable=True))
+    op.add_column('partner_sync_logs', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+    op.add_column('partner_sync_logs', sa.Column('last_attempt_at', sa.DateTime(), nullable=True))
+
+    op.create_index(
+        'ix_partner_sync_logs_status_next_attempt',
+        'partner_sync_logs',
+        ['status', 'next_attempt_at']
+    )
+
+
+def downgrade():
+    """Remove partner delivery queue columns."""
+    op.drop_index('ix_partner_sync_logs_status_next_attempt', 'partner_sync_logs')
+    op.drop_column('partner_sync_logs', 'last_attempt_at')
+    op.drop_column('partner_sync_logs', 'next_attempt_at')
+    op.drop_column('partner_sync_logs', 'duration_ms')
+    op.drop_column('partner_sync_logs', 'endpoint')
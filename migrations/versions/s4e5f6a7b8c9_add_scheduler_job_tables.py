@@ -0,0 +1,71 @@
+"""Add scheduler job lease, run and work unit tables
+
+Revision ID: s4e5f6a7b8c9
+Revises: r3d4e5f6a7b8
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 's4e5f6a7b8c9'
+down_revision = 'r3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create tables for DB-backed job leases and resumable per-tenant work units."""
+    op.create_table(
+        'scheduler_job_leases',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(100), nullable=False),
+        sa.Column('owner', sa.String(200), nullable=False),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id', name='uq_scheduler_job_leases_job_id')
+    )
+
+    op.create_table(
+        'scheduler_job_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(100), nullable=False),
+        sa.Column('run_key', sa.String(50), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('summary', sa.JSON(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id', 'run_key', name='uq_scheduler_job_run_key')
+    )
+
+    op.create_table(
+        'scheduler_work_units',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('run_id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['run_id'], ['scheduler_job_runs.id'], name='fk_scheduler_work_units_run',
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('run_id', 'tenant_id', name='uq_scheduler_work_unit_tenant')
+    )
+
+    op.create_index('ix_scheduler_work_units_run_status', 'scheduler_work_units', ['run_id', 'status'])
+
+
+def downgrade():
+    """Remove scheduler coordination tables."""
+    op.drop_index('ix_scheduler_work_units_run_status', 'scheduler_work_units')
+    op.drop_table('scheduler_work_units')
+    op.drop_table('scheduler_job_runs')
+    op.drop_table('scheduler_job_leases')
@@ -0,0 +1,44 @@
+"""Add provisioning_steps table for resumable install setup
+
+Revision ID: t5f6a7b8c9d0
+Revises: s4e5f6a7b8c9
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 't5f6a7b8c9d0'
+down_revision = 's4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create provisioning_steps table holding per-tenant install step state."""
+    op.create_table(
+        'provisioning_steps',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('step', sa.String(50), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], name='fk_provisioning_steps_tenant'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', 'step', name='uq_provisioning_step_tenant_step')
+    )
+
+    op.create_index('ix_provisioning_steps_tenant_id', 'provisioning_steps', ['tenant_id'])
+
+
+def downgrade():
+    """Remove provisioning_steps table."""
+    op.drop_index('ix_provisioning_steps_tenant_id', 'provisioning_steps')
+    op.drop_table('provisioning_steps')
@@ -0,0 +1,55 @@
+"""Add cashback_member_usages counters and one redemption per campaign order
+
+Revision ID: u6a7b8c9d0e1
+Revises: t5f6a7b8c9d0
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'u6a7b8c9d0e1'
+down_revision = 't5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create per-member cashback usage counters and make redemptions unique per order."""
+    op.create_table(
+        'cashback_member_usages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('member_id', sa.Integer(), nullable=False),
+        sa.Column('uses', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_used_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], name='fk_cashback_member_usages_tenant'),
+        sa.ForeignKeyConstraint(['campaign_id'], ['cashback_campaigns.id'], name='fk_cashback_member_usages_campaign', ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['member_id'], ['members.id'], name='fk_cashback_member_usages_member', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('campaign_id', 'member_id', name='uq_cashback_member_usage_campaign_member')
+    )
+    op.create_index('ix_cashback_member_usages_tenant', 'cashback_member_usages', ['tenant_id'])
+
+    # Backfill counters from existing redemptions
+    op.execute("""
+        INSERT INTO cashback_member_usages (tenant_id, campaign_id, member_id, uses, last_used_at)
+        SELECT tenant_id, campaign_id, member_id, COUNT(*), MAX(created_at)
+        FROM cashback_redemptions
+        WHERE member_id IS NOT NULL
+        GROUP BY tenant_id, campaign_id, member_id
+    """)
+
+    op.create_unique_constraint(
+        'uq_cashback_redemption_campaign_order', 'cashback_redemptions', ['campaign_id', 'shopify_order_id']
+    )
+
+
+def downgrade():
+    """Remove cashback usage counters and the per-order redemption constraint."""
+    op.drop_constraint('uq_cashback_redemption_campaign_order', 'cashback_redemptions', type_='unique')
+    op.drop_index('ix_cashback_member_usages_tenant', 'cashback_member_usages')
+    op.drop_table('cashback_member_usages')
@@ -0,0 +1,53 @@
+"""Add benchmark_distributions and tenant_benchmarks snapshot tables
+
+Revision ID: v7b8c9d0e1f2
+Revises: u6a7b8c9d0e1
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'v7b8c9d0e1f2'
+down_revision = 'u6a7b8c9d0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create the nightly benchmark snapshot tables."""
+    op.create_table(
+        'benchmark_distributions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('metric', sa.String(length=50), nullable=False),
+        sa.Column('sample_size', sa.Integer(), nullable=False),
+        sa.Column('quantiles', sa.JSON(), nullable=False),
+        sa.Column('p25', sa.Float(), nullable=True),
+        sa.Column('p50', sa.Float(), nullable=True),
+        sa.Column('p75', sa.Float(), nullable=True),
+        sa.Column('p90', sa.Float(), nullable=True),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('category', 'metric', name='uq_benchmark_distribution_category_metric')
+    )
+
+    op.create_table(
+        'tenant_benchmarks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=True),
+        sa.Column('metrics', sa.JSON(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], name='fk_tenant_benchmarks_tenant', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', name='uq_tenant_benchmarks_tenant')
+    )
+
+
+def downgrade():
+    """Remove the benchmark snapshot tables."""
+    op.drop_table('tenant_benchmarks')
+    op.drop_table('benchmark_distributions')
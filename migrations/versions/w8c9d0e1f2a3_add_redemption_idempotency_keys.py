@@ -0,0 +1,32 @@
+"""Add idempotency keys to reward_redemptions
+
+Revision ID: w8c9d0e1f2a3
+Revises: v7b8c9d0e1f2
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'w8c9d0e1f2a3'
+down_revision = 'v7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add the retry key and the per-member redemption count index."""
+    op.add_column('reward_redemptions', sa.Column('idempotency_key', sa.String(length=100), nullable=True))
+    op.create_unique_constraint(
+        'uq_redemptions_tenant_idempotency_key', 'reward_redemptions', ['tenant_id', 'idempotency_key']
+    )
+    op.create_index('ix_redemptions_reward_member', 'reward_redemptions', ['reward_id', 'member_id'])
+
+
+def downgrade():
+    """Drop the retry key and index."""
+    op.drop_index('ix_redemptions_reward_member', table_name='reward_redemptions')
+    op.drop_constraint('uq_redemptions_tenant_idempotency_key', 'reward_redemptions', type_='unique')
+    op.drop_column('reward_redemptions', 'idempotency_key')
@@ -0,0 +1,48 @@
+"""Add tenant_purges table for chunked shop redaction
+
+Revision ID: x9d0e1f2a3b4
+Revises: w8c9d0e1f2a3
+Create Date: 2026-10-18 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'x9d0e1f2a3b4'
+down_revision = 'w8c9d0e1f2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create the shop redaction progress table."""
+    op.create_table(
+        'tenant_purges',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('shop_domain', sa.String(length=255), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('current_table', sa.String(length=100), nullable=True),
+        sa.Column('phase', sa.String(length=20), nullable=True),
+        sa.Column('last_id', sa.BigInteger(), nullable=False),
+        sa.Column('rows_deleted', sa.Integer(), nullable=False),
+        sa.Column('table_counts', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('requested_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tenant_purges_tenant_id', 'tenant_purges', ['tenant_id'])
+    op.create_index('ix_tenant_purges_status', 'tenant_purges', ['status'])
+
+
+def downgrade():
+    """Drop the shop redaction progress table."""
+    op.drop_index('ix_tenant_purges_status', table_name='tenant_purges')
+    op.drop_index('ix_tenant_purges_tenant_id', table_name='tenant_purges')
+    op.drop_table('tenant_purges')
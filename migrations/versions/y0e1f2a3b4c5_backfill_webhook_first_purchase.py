@@ -0,0 +1,36 @@
+"""Backfill members.first_purchase_at for webhook purchase awards
+
+Revision ID: y0e1f2a3b4c5
+Revises: x9d0e1f2a3b4
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'y0e1f2a3b4c5'
+down_revision = 'x9d0e1f2a3b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Set first_purchase_at for members whose purchase points came from order webhooks."""
+    op.execute("""
+        UPDATE members
+        SET first_purchase_at = first_purchase.created_at
+        FROM (
+            SELECT member_id, MIN(created_at) AS created_at
+            FROM points_transactions
+            WHERE transaction_type = 'earn' AND source = 'purchase'
+            GROUP BY member_id
+        ) AS first_purchase
+        WHERE first_purchase.member_id = members.id
+          AND members.first_purchase_at IS NULL
+    """)
+
+
+def downgrade():
+    """Backfilled values are kept; there is no schema change to undo."""
+    pass
@@ -0,0 +1,45 @@
+"""Add simulation_runs table for background rule simulations
+
+Revision ID: z1f2a3b4c5d6
+Revises: y0e1f2a3b4c5
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'z1f2a3b4c5d6'
+down_revision = 'y0e1f2a3b4c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create the background rule simulation table."""
+    op.create_table(
+        'simulation_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('start_date', sa.String(length=40), nullable=False),
+        sa.Column('end_date', sa.String(length=40), nullable=False),
+        sa.Column('request', sa.JSON(), nullable=False),
+        sa.Column('orders', sa.Integer(), nullable=True),
+        sa.Column('history_loaded_at', sa.DateTime(), nullable=True),
+        sa.Column('results', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_simulation_runs_tenant_id', 'simulation_runs', ['tenant_id'])
+
+
+def downgrade():
+    """Drop the background rule simulation table."""
+    op.drop_index('ix_simulation_runs_tenant_id', table_name='simulation_runs')
+    op.drop_table('simulation_runs')
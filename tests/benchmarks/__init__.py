@@ -0,0 +1 @@
+"""Performance benchmarks over seeded synthetic tenants."""
@@ -0,0 +1,76 @@
+"""
+Benchmark fixtures.
+
+Benchmarks are skipped unless pytest runs with --benchmark:
+
+    pytest tests/benchmarks --benchmark -o addopts=""
+    pytest tests/benchmarks --benchmark --bench-members 100000
+    pytest tests/benchmarks --benchmark --bench-save-baseline   # refresh baselines.json
+"""
+import pytest
+
+from app.extensions import db
+from .factories import seed_tenant, purge_tenant
+from .harness import measure, compare, load_baselines, save_baselines, format_report
+
+# Smaller neighbouring tenants, so tenant filters are exercised
+NOISE_TENANTS = 2
+
+_results = []
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='benchmarks run with --benchmark')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope='session')
+def synthetic_tenant(app, request):
+    """Seeded tenant with --bench-members members, plus smaller noise tenants."""
+    members = request.config.getoption('--bench-members')
+    with app.app_context():
+        noise = [seed_tenant(members=max(1000, members // 10), seed=100 + i) for i in range(NOISE_TENANTS)]
+        data = seed_tenant(members=members, seed=1)
+        yield data
+        db.session.rollback()
+        for tenant in [data] + noise:
+            purge_tenant(tenant)
+
+
+@pytest.fixture
+def bench(request, synthetic_tenant):
+    """
+    Measure a callable against the stored baseline.
+
+    Usage:
+        def test_something(bench, synthetic_tenant):
+            bench('points.earn_for_order', lambda: ...)
+    """
+    config = request.config
+    baselines = load_baselines()
+
+    def run(name, fn):
+        result = measure(name, synthetic_tenant.member_count, fn, rounds=config.getoption('--bench-rounds'))
+        _results.append(result)
+        if config.getoption('--bench-save-baseline'):
+            return result
+        result.regressions = compare(result, baselines.get(result.key), config.getoption('--bench-tolerance'))
+        assert not result.regressions, f'{result.key} regressed: {", ".join(result.regressions)}'
+        return result
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _results:
+        return
+    terminalreporter.section('benchmarks')
+    for line in format_report(_results, load_baselines()):
+        terminalreporter.write_line(line)
+    if config.getoption('--bench-save-baseline'):
+        save_baselines(_results)
+        terminalreporter.write_line(f'Saved {len(_results)} baselines')
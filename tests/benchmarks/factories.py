@@ -0,0 +1,242 @@
+"""
+Seeded synthetic data for benchmarks.
+
+Builds a realistic multi-tenant dataset with bulk inserts: tenants, tiers,
+members, points and store credit ledgers, trade-in batches with items, and
+loyalty page views. The same seed always produces the same rows, so query
+counts and result sizes are comparable across runs.
+
+Usage:
+    from tests.benchmarks.factories import seed_tenant
+
+    data = seed_tenant(members=100_000, seed=7)
+    data.tenant_id, data.member_ids[:10]
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+from app.extensions import db
+from app.models import (
+    Tenant, MembershipTier, Member, PointsTransaction, TradeInBatch, TradeInItem
+)
+from app.models.loyalty_page_analytics import LoyaltyPageView
+from app.models.member import calendar_key
+from app.models.promotions import StoreCreditLedger, MemberCreditBalance
+
+# Signs benchmark webhook payloads
+WEBHOOK_SECRET = 'bench_webhook_secret'
+
+# Rows per bulk INSERT
+INSERT_CHUNK_SIZE = 5000
+
+TIER_SPECS = [
+    # name, monthly_price, bonus_rate, monthly_credit_amount, share of members
+    ('Silver', Decimal('9.99'), Decimal('0.05'), Decimal('0'), 0.6),
+    ('Gold', Decimal('19.99'), Decimal('0.10'), Decimal('5.00'), 0.3),
+    ('Platinum', Decimal('39.99'), Decimal('0.20'), Decimal('15.00'), 0.1),
+]
+
+TRADE_IN_CATEGORIES = ['sports', 'pokemon', 'magic', 'riftbound', 'tcg_other', 'other']
+DEVICE_TYPES = ['desktop', 'mobile', 'tablet']
+
+
+@dataclass
+class SyntheticTenant:
+    """Ids of a seeded tenant, for building benchmark inputs."""
+    tenant_id: int
+    shop_domain: str
+    tier_ids: List[int]
+    member_ids: List[int] = field(default_factory=list)
+    customer_ids: List[str] = field(default_factory=list)
+
+    @property
+    def member_count(self) -> int:
+        return len(self.member_ids)
+
+
+def _insert_chunked(model, rows) -> None:
+    """Bulk insert an iterable of mappings, committing every chunk."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= INSERT_CHUNK_SIZE:
+            db.session.bulk_insert_mappings(model, chunk)
+            db.session.commit()
+            chunk = []
+    if chunk:
+        db.session.bulk_insert_mappings(model, chunk)
+        db.session.commit()
+
+
+def seed_tenant(members: int = 10_000, seed: int = 1, ledger_per_member: int = 3,
+                trade_in_share: float = 0.3, page_views_per_member: int = 2,
+                now: datetime = None) -> SyntheticTenant:
+    """
+    Create one tenant with `members` members and their history.
+
+    Args:
+        members: Number of members (10k-1M is the intended range)
+        seed: Random seed; the same seed yields the same dataset
+        ledger_per_member: Average points and store credit entries per member
+        trade_in_share: Fraction of members with trade-in history
+        page_views_per_member: Average loyalty page views per member
+        now: Reference time for generated timestamps
+
+    Returns:
+        SyntheticTenant with the generated ids
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    suffix = uuid.UUID(int=rng.getrandbits(128)).hex[:8]
+
+    tenant = Tenant(
+        shopify_domain=f'bench-{suffix}.myshopify.com',
+        shop_name=f'Bench Shop {suffix}',
+        shop_slug=f'bench-{suffix}',
+        is_active=True,
+        settings={'auto_enrollment': {'enabled': True}},
+    )
+    tenant.shopify_access_token = 'shpat_bench'
+    tenant.webhook_secret = WEBHOOK_SECRET
+    db.session.add(tenant)
+    db.session.commit()
+
+    tiers = []
+    for position, (name, price, bonus, credit, _) in enumerate(TIER_SPECS):
+        tiers.append(MembershipTier(
+            tenant_id=tenant.id, name=name, monthly_price=price, bonus_rate=bonus,
+            monthly_credit_amount=credit, credit_expiration_days=90, display_order=position,
+            is_active=True
+        ))
+    db.session.add_all(tiers)
+    db.session.commit()
+
+    data = SyntheticTenant(tenant.id, tenant.shopify_domain, [t.id for t in tiers])
+    weights = [spec[4] for spec in TIER_SPECS]
+
+    def member_rows():
+        for i in range(members):
+            created = now - timedelta(days=rng.randint(0, 3 * 365), seconds=rng.randint(0, 86399))
+            birthday = created.date().replace(year=2000, day=min(created.day, 28))
+            last_trade = created + timedelta(days=rng.randint(0, max(0, (now - created).days)))
+            earned = rng.randint(0, 20_000)
+            yield {
+                'tenant_id': tenant.id,
+                'tier_id': rng.choices(data.tier_ids, weights)[0],
+                'member_number': f'BM{i:07d}',
+                'shopify_customer_id': str(7_000_000_000 + i),
+                'email': f'member{i}@{suffix}.example.com',
+                'name': f'Bench Member {i}',
+                'status': 'active' if rng.random() < 0.9 else rng.choice(['pending', 'cancelled']),
+                'membership_start_date': created.date(),
+                'points_balance': earned - earned // 3,
+                'lifetime_points_earned': earned,
+                'lifetime_points_spent': earned // 3,
+                'total_trade_ins': 0,
+                'total_trade_value': Decimal('0'),
+                'last_trade_in_at': last_trade if rng.random() < trade_in_share else None,
+                'birthday': birthday,
+                'anniversary_key': calendar_key(created),
+                'created_at': created,
+                'updated_at': created,
+            }
+
+    _insert_chunked(Member, member_rows())
+    rows = db.session.query(Member.id, Member.shopify_customer_id).filter(
+        Member.tenant_id == tenant.id
+    ).order_by(Member.id).all()
+    data.member_ids = [row.id for row in rows]
+    data.customer_ids = [row.shopify_customer_id for row in rows]
+
+    def points_rows():
+        for member_id in data.member_ids:
+            for _ in range(rng.randint(0, 2 * ledger_per_member)):
+                points = rng.randint(10, 500)
+                created = now - timedelta(days=rng.randint(0, 365))
+                yield {
+                    'tenant_id': tenant.id, 'member_id': member_id, 'points': points,
+                    'transaction_type': 'earn', 'source': 'order',
+                    'reference_id': str(rng.getrandbits(40)), 'reference_type': 'shopify_order',
+                    'expires_at': created + timedelta(days=365), 'remaining_points': points,
+                    'created_at': created,
+                }
+
+    def credit_rows():
+        for member_id in data.member_ids:
+            for _ in range(rng.randint(0, ledger_per_member)):
+                created = now - timedelta(days=rng.randint(0, 365))
+                yield {
+                    'member_id': member_id, 'event_type': 'trade_in',
+                    'amount': Decimal(rng.randint(100, 5000)) / 100, 'balance_after': Decimal('0'),
+                    'source_type': 'tradein', 'created_by': 'system:bench', 'created_at': created,
+                    'expires_at': created + timedelta(days=rng.choice([30, 90, 365])),
+                }
+
+    _insert_chunked(PointsTransaction, points_rows())
+    _insert_chunked(StoreCreditLedger, credit_rows())
+
+    trade_in_members = [mid for mid in data.member_ids if rng.random() < trade_in_share]
+
+    def batch_rows():
+        for index, member_id in enumerate(trade_in_members):
+            created = now - timedelta(days=rng.randint(0, 365))
+            status = rng.choice(['pending', 'listed', 'completed', 'completed'])
+            yield {
+                'tenant_id': tenant.id, 'member_id': member_id,
+                'batch_reference': f'BT-{suffix}-{index:07d}', 'trade_in_date': created,
+                'total_items': 0, 'total_trade_value': Decimal('0'), 'status': status,
+                'category': rng.choice(TRADE_IN_CATEGORIES),
+                'completed_at': created + timedelta(days=1) if status == 'completed' else None,
+                'created_at': created, 'updated_at': created,
+            }
+
+    _insert_chunked(TradeInBatch, batch_rows())
+    batch_ids = [bid for (bid,) in db.session.query(TradeInBatch.id).filter(
+        TradeInBatch.tenant_id == tenant.id
+    ).order_by(TradeInBatch.id)]
+
+    def item_rows():
+        for batch_id in batch_ids:
+            for _ in range(rng.randint(1, 4)):
+                value = Decimal(rng.randint(50, 20000)) / 100
+                yield {
+                    'batch_id': batch_id, 'product_title': 'Bench Card', 'trade_value': value,
+                    'market_value': value * 2,
+                }
+
+    def page_view_rows():
+        for _ in range(members * page_views_per_member):
+            member_id = rng.choice(data.member_ids) if rng.random() < 0.4 else None
+            yield {
+                'tenant_id': tenant.id, 'session_id': uuid.UUID(int=rng.getrandbits(128)).hex,
+                'device_type': rng.choice(DEVICE_TYPES), 'member_id': member_id,
+                'is_member': member_id is not None,
+                'viewed_at': now - timedelta(minutes=rng.randint(0, 90 * 24 * 60)),
+            }
+
+    _insert_chunked(TradeInItem, item_rows())
+    _insert_chunked(LoyaltyPageView, page_view_rows())
+    return data
+
+
+def purge_tenant(data: SyntheticTenant) -> None:
+    """Delete everything seed_tenant() created."""
+    member_ids = db.session.query(Member.id).filter(Member.tenant_id == data.tenant_id)
+    batch_ids = db.session.query(TradeInBatch.id).filter(TradeInBatch.tenant_id == data.tenant_id)
+    for query in (
+        LoyaltyPageView.query.filter(LoyaltyPageView.tenant_id == data.tenant_id),
+        TradeInItem.query.filter(TradeInItem.batch_id.in_(batch_ids)),
+        TradeInBatch.query.filter(TradeInBatch.tenant_id == data.tenant_id),
+        StoreCreditLedger.query.filter(StoreCreditLedger.member_id.in_(member_ids)),
+        MemberCreditBalance.query.filter(MemberCreditBalance.member_id.in_(member_ids)),
+        PointsTransaction.query.filter(PointsTransaction.tenant_id == data.tenant_id),
+        Member.query.filter(Member.tenant_id == data.tenant_id),
+        MembershipTier.query.filter(MembershipTier.tenant_id == data.tenant_id),
+        Tenant.query.filter(Tenant.id == data.tenant_id),
+    ):
+        query.delete(synchronize_session=False)
+    db.session.commit()
@@ -0,0 +1,155 @@
+"""
+Measurement and baseline comparison for benchmarks.
+
+Each benchmark reports:
+- wall time (median and min over timed rounds)
+- SQL query count, collected by the query_profiler event hooks
+- peak Python memory, from tracemalloc
+
+Baselines live in baselines.json next to this file, keyed by
+"<name>[<members>]". Query counts may grow by at most 1% (benchmarks that
+write, such as order webhooks, shift later ones slightly); wall time and
+peak memory may exceed the baseline by the configured tolerance.
+"""
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.middleware.query_profiler import get_query_stats, reset_query_stats
+
+BASELINES_PATH = Path(__file__).with_name('baselines.json')
+
+# Allowed query count growth over baseline
+QUERY_SLACK = 1.01
+
+
+@dataclass
+class BenchResult:
+    """One benchmark's measurements."""
+    name: str
+    members: int
+    wall_ms: float
+    wall_min_ms: float
+    queries: int
+    peak_kb: float
+    rounds: int
+    regressions: List[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return f'{self.name}[{self.members}]'
+
+    def baseline(self) -> Dict:
+        """Values stored in baselines.json."""
+        return {
+            'wall_ms': round(self.wall_ms, 2),
+            'queries': self.queries,
+            'peak_kb': round(self.peak_kb, 1),
+        }
+
+
+@contextmanager
+def counting_queries():
+    """Enable the query profiler hooks and reset their per-thread counters."""
+    previous = os.environ.get('QUERY_PROFILING')
+    os.environ['QUERY_PROFILING'] = 'true'
+    reset_query_stats()
+    try:
+        yield get_query_stats()
+    finally:
+        if previous is None:
+            os.environ.pop('QUERY_PROFILING', None)
+        else:
+            os.environ['QUERY_PROFILING'] = previous
+
+
+def measure(name: str, members: int, fn: Callable[[], object], rounds: int = 5) -> BenchResult:
+    """
+    Run `fn` once to warm up, once traced (queries and memory), then `rounds` timed.
+
+    Tracing slows execution, so timing runs are separate from the traced run.
+    """
+    fn()
+
+    with counting_queries() as stats:
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        queries = stats.query_count
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return BenchResult(
+        name=name, members=members, wall_ms=statistics.median(timings),
+        wall_min_ms=min(timings), queries=queries, peak_kb=peak / 1024, rounds=rounds
+    )
+
+
+def load_baselines(path: Path = BASELINES_PATH) -> Dict[str, Dict]:
+    if not path.exists():
+        return {}
+    with path.open() as f:
+        return json.load(f)
+
+
+def save_baselines(results: List[BenchResult], path: Path = BASELINES_PATH) -> None:
+    """Merge results into the baseline file."""
+    baselines = load_baselines(path)
+    for result in results:
+        baselines[result.key] = result.baseline()
+    with path.open('w') as f:
+        json.dump(dict(sorted(baselines.items())), f, indent=2)
+        f.write('\n')
+
+
+def compare(result: BenchResult, baseline: Optional[Dict], tolerance: float) -> List[str]:
+    """
+    Regressions of `result` against its baseline.
+
+    Args:
+        result: Fresh measurement
+        baseline: Stored values, or None if this benchmark has no baseline yet
+        tolerance: Allowed relative growth of wall time and peak memory (0.5 = +50%)
+
+    Returns:
+        Human-readable regression messages (empty if within budget)
+    """
+    if not baseline:
+        return []
+
+    regressions = []
+    if result.queries > baseline['queries'] * QUERY_SLACK:
+        regressions.append(f"queries {baseline['queries']} -> {result.queries}")
+    if result.wall_ms > baseline['wall_ms'] * (1 + tolerance):
+        regressions.append(f"wall {baseline['wall_ms']:.1f}ms -> {result.wall_ms:.1f}ms")
+    if result.peak_kb > baseline['peak_kb'] * (1 + tolerance):
+        regressions.append(f"peak {baseline['peak_kb']:.0f}KB -> {result.peak_kb:.0f}KB")
+    return regressions
+
+
+def format_report(results: List[BenchResult], baselines: Dict[str, Dict]) -> List[str]:
+    """Table rows for the terminal summary."""
+    lines = [f"{'benchmark':<56} {'wall ms':>10} {'base':>10} {'queries':>8} {'base':>6} {'peak KB':>10} {'base':>10}"]
+    for result in results:
+        base = baselines.get(result.key) or {}
+        lines.append(
+            f"{result.key:<56} {result.wall_ms:>10.1f} {base.get('wall_ms', '-'):>10} "
+            f"{result.queries:>8} {base.get('queries', '-'):>6} "
+            f"{result.peak_kb:>10.0f} {base.get('peak_kb', '-'):>10}"
+            + (f"  REGRESSED: {', '.join(result.regressions)}" if result.regressions else '')
+        )
+    return lines
+
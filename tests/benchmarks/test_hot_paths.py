@@ -0,0 +1,131 @@
+"""
+Benchmarks for request and job hot paths over a seeded tenant.
+
+Each benchmark reports wall time, query count and peak memory against
+baselines.json; see tests/benchmarks/conftest.py for how to run them.
+"""
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+
+import pytest
+
+from app.extensions import db
+from app.models import Member
+from app.services.analytics_service import AnalyticsService
+from app.services.nudges_service import NudgesService
+from app.services.points_service import PointsService
+from app.services.scheduled_tasks import ScheduledTasksService
+from .factories import WEBHOOK_SECRET
+
+pytestmark = pytest.mark.benchmark
+
+_order_ids = itertools.count(9_000_000_000)
+
+
+def _member(synthetic_tenant, index=0):
+    """An active member of the synthetic tenant, stable for a given index."""
+    return Member.query.filter_by(tenant_id=synthetic_tenant.tenant_id, status='active').order_by(
+        Member.id
+    ).offset(index).first()
+
+
+def _order_payload(customer_id):
+    order_id = next(_order_ids)
+    return {
+        'id': order_id,
+        'order_number': order_id % 100000,
+        'subtotal_price': '84.50',
+        'total_price': '91.25',
+        'customer': {'id': int(customer_id), 'email': f'{customer_id}@example.com', 'tags': ''},
+        'line_items': [
+            {'product_id': 1, 'variant_id': 11, 'title': 'Booster Box', 'quantity': 1, 'price': '84.50'},
+        ],
+    }
+
+
+class TestPointsHotPaths:
+
+    def test_earn_points_for_order(self, bench, synthetic_tenant):
+        member = _member(synthetic_tenant)
+        service = PointsService(synthetic_tenant.tenant_id)
+
+        def earn_for_order():
+            order = _order_payload(member.shopify_customer_id)
+            calculated = service.calculate_points_for_order(order, member)
+            service.earn_points(
+                member.id, max(1, calculated['base_points']), 'purchase',
+                source_id=str(order['id']), apply_multipliers=True
+            )
+
+        bench('points.earn_for_order', earn_for_order)
+
+
+class TestWebhookHotPaths:
+
+    def test_handle_order_created(self, bench, client, synthetic_tenant):
+        customer_ids = iter(synthetic_tenant.customer_ids)
+
+        def order_created():
+            body = json.dumps(_order_payload(next(customer_ids))).encode()
+            signature = base64.b64encode(hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).digest()).decode()
+            response = client.post('/webhook/orders/create', data=body, headers={
+                'X-Shopify-Shop-Domain': synthetic_tenant.shop_domain,
+                'X-Shopify-Hmac-SHA256': signature,
+                'Content-Type': 'application/json',
+            })
+            assert response.status_code == 200, response.get_data(as_text=True)
+
+        bench('webhooks.orders_create', order_created)
+
+
+class TestProxyHotPaths:
+
+    def test_rewards_page(self, bench, client, synthetic_tenant):
+        customer_id = synthetic_tenant.customer_ids[len(synthetic_tenant.customer_ids) // 2]
+
+        def rewards_page():
+            response = client.get('/proxy/', query_string={
+                'shop': synthetic_tenant.shop_domain, 'logged_in_customer_id': customer_id
+            })
+            assert response.status_code == 200
+
+        bench('proxy.rewards_page', rewards_page)
+
+
+class TestAnalyticsHotPaths:
+
+    @pytest.mark.xfail(raises=AttributeError, strict=True,
+                       reason='CLV reads Member.order_count/total_spent, which Member does not define')
+    def test_clv_dashboard(self, bench, synthetic_tenant):
+        service = AnalyticsService(synthetic_tenant.tenant_id)
+        bench('analytics.clv_dashboard', service.get_clv_dashboard)
+
+
+class TestNudgeSelectors:
+
+    @pytest.mark.parametrize('selector', [
+        'get_members_near_tier_progress',
+        'get_members_needing_trade_in_reminder',
+        pytest.param('get_inactive_members_for_reengagement', marks=pytest.mark.xfail(
+            raises=AttributeError, strict=True, reason='NudgeType has no INACTIVE_MEMBER')),
+        pytest.param('get_members_with_expiring_points', marks=pytest.mark.xfail(
+            raises=AttributeError, strict=True, reason='PointsLedger has no expired column')),
+    ])
+    def test_selector(self, bench, synthetic_tenant, selector):
+        service = NudgesService(synthetic_tenant.tenant_id)
+        bench(f'nudges.{selector}', getattr(service, selector))
+
+
+class TestScheduledTaskHotPaths:
+
+    def test_distribute_monthly_credits_preview(self, bench, synthetic_tenant):
+        service = ScheduledTasksService()
+
+        def preview():
+            service.distribute_monthly_credits(synthetic_tenant.tenant_id, dry_run=True)
+            db.session.rollback()
+
+        bench('scheduled.distribute_monthly_credits', preview)
@@ -8,6 +8,21 @@ from app import create_app
 from app.extensions import db
 
 
+def pytest_addoption(parser):
+    """Benchmark options (see tests/benchmarks)."""
+    group = parser.getgroup('benchmarks')
+    group.addoption('--benchmark', action='store_true', default=False,
+                    help='Run the benchmarks in tests/benchmarks (skipped otherwise)')
+    group.addoption('--bench-members', type=int, default=10_000,
+                    help='Members in the synthetic benchmark tenant (default 10000)')
+    group.addoption('--bench-rounds', type=int, default=5,
+                    help='Timed rounds per benchmark (default 5)')
+    group.addoption('--bench-tolerance', type=float, default=0.5,
+                    help='Allowed wall time / peak memory growth over baseline (default 0.5 = +50%%)')
+    group.addoption('--bench-save-baseline', action='store_true', default=False,
+                    help='Write results to tests/benchmarks/baselines.json instead of comparing')
+
+
 @pytest.fixture(scope='session')
 def app():
     """Create application for testing."""
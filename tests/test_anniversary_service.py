@@ -0,0 +1,106 @@
+"""
+Tests for the anniversary calendar index.
+
+Tests cover:
+- The anniversary key is maintained when members are created and updated
+- Today's anniversaries come from the indexed key lookup
+- Upcoming windows wrap around the year end
+- Feb 29 enrollments match Feb 28 in non-leap years
+- Cross-tenant lookup used by the scheduler
+"""
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.models import Member
+from app.services.anniversary_service import AnniversaryService, find_upcoming_anniversaries
+
+
+@pytest.fixture
+def make_member(app, sample_tenant):
+    """Factory for active members with a given enrollment date."""
+    created = []
+
+    def _make(start_date, birthday=None):
+        unique_id = str(uuid.uuid4())[:8]
+        member = Member(
+            tenant_id=sample_tenant.id,
+            member_number=f'TA{unique_id}',
+            email=f'anniv-{unique_id}@example.com',
+            name='Anniversary Test',
+            shopify_customer_id=f'cust_anniv_{unique_id}',
+            status='active',
+            membership_start_date=start_date,
+            birthday=birthday
+        )
+        db.session.add(member)
+        db.session.commit()
+        created.append(member.id)
+        return member
+
+    with app.app_context():
+        yield _make
+        Member.query.filter(Member.id.in_(created)).delete(synchronize_session=False)
+        db.session.commit()
+
+
+class TestCalendarKeys:
+    """Test anniversary key maintenance on Member."""
+
+    def test_key_set_on_insert_and_update(self, make_member):
+        """Should derive the key from the enrollment date."""
+        member = make_member(date(2021, 3, 7), birthday=date(2000, 12, 25))
+        assert member.anniversary_key == 307
+
+        member.membership_start_date = date(2022, 11, 30)
+        db.session.commit()
+        assert member.anniversary_key == 1130
+
+
+class TestAnniversaryLookups:
+    """Test AnniversaryService range queries."""
+
+    def test_todays_anniversaries(self, make_member, sample_tenant):
+        """Should return only members enrolled on today's month/day."""
+        today = date.today()
+        match = make_member(today.replace(year=today.year - 4))
+        make_member(today.replace(year=today.year - 4) - timedelta(days=1))
+
+        members = AnniversaryService(sample_tenant.id).get_todays_anniversaries()
+        assert [m.id for m in members] == [match.id]
+
+    def test_upcoming_anniversaries_window(self, make_member, sample_tenant):
+        """Should include members due within the window, sorted by days until."""
+        today = date.today()
+        base = today.replace(year=today.year - 4)
+        in_three = make_member(base + timedelta(days=3))
+        in_one = make_member(base + timedelta(days=1))
+        make_member(base + timedelta(days=30))
+
+        upcoming = AnniversaryService(sample_tenant.id).get_members_with_upcoming_anniversaries(days_ahead=7)
+        assert [u['member_id'] for u in upcoming] == [in_one.id, in_three.id]
+        assert upcoming[0]['member']['id'] == in_one.id
+
+
+class TestCrossTenantAnniversaries:
+    """Test find_upcoming_anniversaries."""
+
+    def test_leap_day_matches_feb_28_in_non_leap_year(self, make_member, sample_tenant):
+        """Should treat a Feb 29 enrollment as due on Feb 28 in non-leap years."""
+        member = make_member(date(2020, 2, 29))
+
+        due = find_upcoming_anniversaries(tenant_ids=[sample_tenant.id], start=date(2027, 2, 28))
+        assert due == {sample_tenant.id: [{'member_id': member.id, 'days_until': 0}]}
+
+        due = find_upcoming_anniversaries(tenant_ids=[sample_tenant.id], start=date(2027, 3, 1))
+        assert due == {}
+
+    def test_window_wraps_year_end(self, make_member, sample_tenant):
+        """Should find January anniversaries from a late-December window."""
+        member = make_member(date(2020, 1, 2))
+        make_member(date(2020, 1, 20))
+
+        due = find_upcoming_anniversaries(days_ahead=5, tenant_ids=[sample_tenant.id], start=date(2026, 12, 30))
+        assert due == {sample_tenant.id: [{'member_id': member.id, 'days_until': 3}]}
@@ -1020,3 +1020,175 @@ class TestMemberDeleteEnhanced:
             headers=headers
         )
         assert get_response.status_code == 404
+
+
+class TestMembersListSerialization:
+    """Tests for the column-projected member list serializer."""
+
+    def test_serializer_matches_to_dict(self, app, sample_member):
+        """Bulk serializer should produce the same payload as Member.to_dict()."""
+        from app.models import Member
+        from app.services.member_serializer import project_member_columns, serialize_members
+
+        with app.app_context():
+            member = Member.query.get(sample_member.id)
+            rows = project_member_columns(Member.query.filter_by(id=member.id)).all()
+
+            serialized = serialize_members(member.tenant_id, rows, include_stats=True)
+
+            assert serialized == [member.to_dict(include_stats=True)]
+            assert serialized[0]['tier']['name'] == 'Gold'
+
+    def test_list_page_query_count(self, app, sample_tenant, sample_tier):
+        """Serializing a page should not issue per-member queries."""
+        from sqlalchemy import event
+        from app.extensions import db
+        from app.models import Member
+        from app.services.member_serializer import project_member_columns, serialize_members
+
+        with app.app_context():
+            members = []
+            for i in range(25):
+                unique_id = str(uuid.uuid4())[:8]
+                members.append(Member(
+                    tenant_id=sample_tenant.id,
+                    tier_id=sample_tier.id,
+                    member_number=f'TQ{unique_id}',
+                    email=f'qc-{unique_id}@example.com',
+                    name=f'Query Count {i}',
+                    shopify_customer_id=f'cust_qc_{unique_id}',
+                    status='active'
+                ))
+            db.session.add_all(members)
+            db.session.commit()
+
+            statements = []
+
+            def _count(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            try:
+                event.listen(db.engine, 'before_cursor_execute', _count)
+                query = Member.query.filter_by(tenant_id=sample_tenant.id)
+                pagination = project_member_columns(query).order_by(Member.created_at.desc()).paginate(
+                    page=1, per_page=20, error_out=False
+                )
+                serialized = serialize_members(sample_tenant.id, pagination.items, include_stats=True)
+                event.remove(db.engine, 'before_cursor_execute', _count)
+
+                assert len(serialized) == 20
+                assert all(m['tier']['id'] == sample_tier.id for m in serialized)
+                # Page + count, plus at most one tier read on a cold cache
+                assert len(statements) <= 3
+            finally:
+                if event.contains(db.engine, 'before_cursor_execute', _count):
+                    event.remove(db.engine, 'before_cursor_execute', _count)
+                for member in members:
+                    db.session.delete(member)
+                db.session.commit()
+
+
+class TestMemberSearch:
+    """Tests for ranked member search and POS lookup."""
+
+    @pytest.fixture
+    def search_members(self, app, sample_tenant, sample_tier):
+        """Members whose numbers and emails share a searchable prefix."""
+        from app.extensions import db
+        from app.models import Member
+
+        with app.app_context():
+            base = str(uuid.uuid4().int)[:6]
+            members = [
+                Member(
+                    tenant_id=sample_tenant.id,
+                    tier_id=sample_tier.id,
+                    member_number=f'TU{base}{i}',
+                    email=f'search{i}-{base}@example.com',
+                    name=name,
+                    shopify_customer_id=f'cust_search_{base}_{i}',
+                    status='active'
+                )
+                for i, name in enumerate(['Alice Search', 'Bob 100% Search', f'Carol TU{base}1 Fan'])
+            ]
+            db.session.add_all(members)
+            db.session.commit()
+            yield base, [m.id for m in members]
+            Member.query.filter(Member.id.in_([m.id for m in members])).delete(synchronize_session=False)
+            db.session.commit()
+
+    def test_search_ranks_exact_member_number_first(self, client, auth_headers, search_members):
+        """Exact member number should outrank names that merely contain it."""
+        base, ids = search_members
+        response = client.get(f'/api/members/search?q=tu{base}1', headers=auth_headers)
+        assert response.status_code == 200
+        found = [m['id'] for m in response.get_json()['members']]
+        assert found == [ids[1], ids[2]]
+
+    def test_search_escapes_like_wildcards(self, client, auth_headers, search_members):
+        """A literal % in the term should not act as a wildcard."""
+        _, ids = search_members
+        response = client.get('/api/members?search=100%25', headers=auth_headers)
+        assert [m['id'] for m in response.get_json()['members']] == [ids[1]]
+
+    def test_lookup_uses_number_and_email_prefixes(self, client, auth_headers, search_members):
+        """POS lookup should accept bare digits and email prefixes only."""
+        base, ids = search_members
+        response = client.get(f'/api/members/lookup?q={base}0', headers=auth_headers)
+        assert [m['id'] for m in response.get_json()['members']] == [ids[0]]
+
+        response = client.get(f'/api/members/lookup?q=search2-{base}@', headers=auth_headers)
+        assert [m['id'] for m in response.get_json()['members']] == [ids[2]]
+
+        response = client.get('/api/members/lookup?q=Alice', headers=auth_headers)
+        assert response.get_json()['members'] == []
+
+
+class TestMembersCursorPagination:
+    """Tests for keyset pagination of the members list."""
+
+    def test_cursor_pages_match_offset_order(self, client, app, auth_headers, sample_tenant, sample_tier):
+        """Walking cursors should return the same members as offset pages, without repeats."""
+        from app.extensions import db
+        from app.models import Member
+
+        with app.app_context():
+            members = []
+            for i in range(7):
+                unique_id = str(uuid.uuid4())[:8]
+                members.append(Member(
+                    tenant_id=sample_tenant.id,
+                    tier_id=sample_tier.id,
+                    member_number=f'TK{unique_id}',
+                    email=f'cursor-{unique_id}@example.com',
+                    name=f'Cursor {i}',
+                    shopify_customer_id=f'cust_cursor_{unique_id}',
+                    status='active'
+                ))
+            db.session.add_all(members)
+            db.session.commit()
+            member_ids = [m.id for m in members]
+
+        try:
+            offset = client.get('/api/members?per_page=50', headers=auth_headers).get_json()
+
+            seen = []
+            response = client.get('/api/members?per_page=3&cursor=&total=approx', headers=auth_headers)
+            data = response.get_json()
+            assert data['total'] == 7
+            assert data['total_is_estimate'] is False  # SQLite counts exactly
+            while True:
+                seen.extend(m['id'] for m in data['members'])
+                if not data['has_more']:
+                    break
+                data = client.get(
+                    f"/api/members?per_page=3&cursor={data['next_cursor']}", headers=auth_headers
+                ).get_json()
+                assert data['total'] is None
+
+            assert seen == [m['id'] for m in offset['members']]
+            assert sorted(seen) == sorted(member_ids)
+        finally:
+            with app.app_context():
+                Member.query.filter(Member.id.in_(member_ids)).delete(synchronize_session=False)
+                db.session.commit()
@@ -97,6 +97,54 @@ class TestPointsHistory:
         )
         assert response.status_code == 200
 
+    def test_get_history_cursor_pagination(self, app, client, sample_member, auth_headers):
+        """Cursor pages should cover every row once, breaking created_at ties by id."""
+        from datetime import datetime
+        from app.extensions import db
+        from app.models import PointsTransaction
+
+        with app.app_context():
+            created_at = datetime(2026, 1, 1, 12, 0, 0)
+            txns = [
+                PointsTransaction(
+                    tenant_id=sample_member.tenant_id, member_id=sample_member.id,
+                    points=10, transaction_type='earn', source='admin', created_at=created_at
+                )
+                for _ in range(5)
+            ]
+            db.session.add_all(txns)
+            db.session.commit()
+            expected = sorted((t.id for t in txns), reverse=True)
+
+        seen = []
+        cursor = ''
+        for _ in range(5):
+            response = client.get(
+                f'/api/points/history?member_id={sample_member.id}&per_page=2&cursor={cursor}&total=exact',
+                headers=auth_headers
+            )
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data['pagination']['total'] == 5
+            seen.extend(t['id'] for t in data['transactions'])
+            cursor = data['pagination']['next_cursor']
+            if not data['pagination']['has_more']:
+                break
+
+        assert seen == expected
+
+        with app.app_context():
+            PointsTransaction.query.filter(PointsTransaction.id.in_(expected)).delete(synchronize_session=False)
+            db.session.commit()
+
+    def test_get_history_invalid_cursor(self, client, sample_member, auth_headers):
+        """A malformed cursor should be rejected."""
+        response = client.get(
+            f'/api/points/history?member_id={sample_member.id}&cursor=not-a-cursor',
+            headers=auth_headers
+        )
+        assert response.status_code == 400
+
 
 class TestPointsSummary:
     """Tests for GET /api/points/summary endpoint."""
@@ -1148,6 +1148,36 @@ class TestTradeInServiceUnit:
             assert result['eligible'] is False
             assert result['bonus_amount'] == 0
 
+    def test_complete_batch_sets_last_trade_in_at(self, app, sample_tenant, sample_trade_in_batch):
+        """Test that completing a batch records the member's last trade-in date."""
+        from app.models import Member, TradeInBatch
+        from app.services.trade_in_service import TradeInService
+
+        with app.app_context():
+            batch = TradeInBatch.query.get(sample_trade_in_batch.id)
+            assert batch.member.last_trade_in_at is None
+
+            TradeInService(sample_tenant.id).complete_batch(batch.id)
+
+            member = Member.query.get(batch.member_id)
+            assert member.last_trade_in_at == batch.created_at
+            assert member.to_dict()['last_trade_in_at'] == batch.created_at.isoformat()
+
+    def test_status_change_maintains_last_trade_in_at(self, app, sample_tenant, sample_trade_in_batch):
+        """Test that completing via status update, then cancelling, keeps last_trade_in_at current."""
+        from app.models import Member, TradeInBatch
+        from app.services.trade_in_service import TradeInService
+
+        with app.app_context():
+            batch = TradeInBatch.query.get(sample_trade_in_batch.id)
+            service = TradeInService(sample_tenant.id)
+
+            service.update_status(batch.id, 'completed')
+            assert Member.query.get(batch.member_id).last_trade_in_at == batch.created_at
+
+            service.update_status(batch.id, 'cancelled', reason='Entered in error')
+            assert Member.query.get(batch.member_id).last_trade_in_at is None
+
 
 class TestStatusTransitions:
     """Tests for valid status transitions."""
@@ -0,0 +1,129 @@
+"""
+Tests for the nightly cross-tenant benchmark engine.
+
+Tests cover:
+- Empirical quantiles and percentile ranks
+- No single store's value published at the minimum sample size
+- Per-category distributions, withheld below the minimum sample size
+- Comparison report served from the snapshot row, and live before one exists
+"""
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Tenant, TradeInBatch, BenchmarkDistribution, TenantBenchmark
+from app.services.benchmark_engine import (
+    MIN_SAMPLE_SIZE, BenchmarkEngine, StoreMetrics, empirical_quantiles, percentile_rank
+)
+from app.services.benchmark_service import BenchmarkService
+
+
+def _store(category, trade_value):
+    unique_id = str(uuid.uuid4())[:8]
+    tenant = Tenant(
+        shop_name=f'Bench {unique_id}', shop_slug=f'bench-{unique_id}',
+        shopify_domain=f'bench-{unique_id}.myshopify.com', is_active=True,
+        settings={'benchmark_category': category}
+    )
+    db.session.add(tenant)
+    db.session.flush()
+    # Batches left behind by earlier tests' tenants that reused this id
+    TradeInBatch.query.filter_by(tenant_id=tenant.id).delete()
+    db.session.add(TradeInBatch(
+        tenant_id=tenant.id, batch_reference=f'TI-BENCH-{unique_id}',
+        total_trade_value=trade_value, status='completed'
+    ))
+    return tenant
+
+
+@pytest.fixture
+def stores(app):
+    """Twenty Pokemon stores trading 10..200 on average and one comics store."""
+    pokemon = [_store('pokemon', 10 * (i + 1)) for i in range(20)]
+    comics = _store('comics', 1000)
+    db.session.commit()
+    tenant_ids = [t.id for t in pokemon + [comics]]
+    yield [t.id for t in pokemon], comics.id
+
+    TenantBenchmark.query.delete()
+    BenchmarkDistribution.query.delete()
+    TradeInBatch.query.filter(TradeInBatch.tenant_id.in_(tenant_ids)).delete(synchronize_session=False)
+    Tenant.query.filter(Tenant.id.in_(tenant_ids)).delete(synchronize_session=False)
+    db.session.commit()
+
+
+class TestQuantiles:
+
+    def test_percentile_rank(self):
+        quantiles = empirical_quantiles([float(v) for v in range(1, 12)])
+        assert quantiles[0] == 3 and quantiles[50] == 6 and quantiles[100] == 9
+        assert percentile_rank(6, quantiles) == 50
+        assert percentile_rank(3.5, quantiles) == 25
+        assert percentile_rank(0, quantiles) == 0
+        assert percentile_rank(12, quantiles) == 99
+        assert percentile_rank(4, empirical_quantiles([4.0] * 5)) == 50
+
+    def test_smallest_published_sample_hides_every_store(self):
+        values = [float(v * v) for v in range(1, MIN_SAMPLE_SIZE + 1)]
+        stores = [StoreMetrics(tenant_id=i, category='pokemon', values={'average_trade_value': v})
+                  for i, v in enumerate(values)]
+        engine = BenchmarkEngine()
+
+        assert engine.build_distributions(stores[1:]) == {}
+        distribution = engine.build_distributions(stores)[('pokemon', 'average_trade_value')]
+        assert distribution.sample_size == MIN_SAMPLE_SIZE
+        assert not set(distribution.quantiles) & set(values)
+        assert min(values) < distribution.quantiles[0] and distribution.quantiles[-1] < max(values)
+
+
+class TestNightlySnapshot:
+
+    def test_category_distributions(self, stores):
+        pokemon_ids, comics_id = stores
+
+        summary = BenchmarkEngine().run()
+        assert summary['stores'] >= 7
+
+        distribution = BenchmarkDistribution.query.filter_by(category='pokemon', metric='average_trade_value').one()
+        assert distribution.sample_size == 20
+        assert distribution.p50 == 105.0
+        assert BenchmarkDistribution.query.filter_by(category='comics').count() == 0
+
+        lowest, third = (
+            TenantBenchmark.query.filter_by(tenant_id=tid).one().metrics['average_trade_value']
+            for tid in (pokemon_ids[0], pokemon_ids[2])
+        )
+        assert lowest == {'value': 10.0, 'percentile': 0, 'p50': 105.0}
+        assert third['percentile'] == 5
+
+        # Too few comics stores to publish: ranked against all stores
+        comics = TenantBenchmark.query.filter_by(tenant_id=comics_id).one()
+        assert comics.metrics['average_trade_value']['percentile'] == 99
+
+    def test_report_is_one_row_read(self, app, stores):
+        pokemon_ids, _ = stores
+        BenchmarkEngine().run()
+
+        statements = []
+
+        def _count(conn, cursor, statement, parameters, ctx, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', _count)
+        try:
+            report = BenchmarkService(pokemon_ids[19]).get_comparison_report()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', _count)
+
+        assert len(statements) == 1
+        assert report['metrics']['average_trade_value']['percentile'] == 99
+        assert report['metrics']['average_trade_value']['p50'] == 105.0
+
+    def test_live_report_before_first_snapshot(self, stores):
+        pokemon_ids, _ = stores
+
+        report = BenchmarkService(pokemon_ids[1]).get_comparison_report()
+        assert report['metrics']['average_trade_value']['your_value'] == 20.0
+        assert report['metrics']['average_trade_value']['p50'] == 125  # Industry default for collectibles
@@ -0,0 +1,130 @@
+"""
+Tests for atomic cashback campaign accounting.
+
+Tests cover:
+- Budget reserved in full, then the remainder, then nothing
+- Per-member use limit from the usage counter
+- Redelivered order webhooks issuing no second cashback, across campaigns
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.extensions import db
+from app.models import CashbackCampaign, CashbackMemberUsage
+from app.services import store_credit_service as store_credit_module
+from app.services.cashback_accounting import (
+    CashbackAccounting, get_live_campaigns, invalidate_cashback_campaign_cache
+)
+from app.services.cashback_service import CashbackService
+
+
+@pytest.fixture
+def campaign(app, sample_tenant):
+    """A live 10% campaign with a $15 budget, five uses per member."""
+    campaign = CashbackCampaign(
+        tenant_id=sample_tenant.id, name='Spring Cashback', cashback_rate=Decimal('10'),
+        max_total_cashback=Decimal('15.00'), max_uses_per_customer=5,
+        start_date=datetime.utcnow() - timedelta(days=1), end_date=datetime.utcnow() + timedelta(days=7),
+        status='active'
+    )
+    db.session.add(campaign)
+    db.session.commit()
+    invalidate_cashback_campaign_cache(sample_tenant.id)
+    yield campaign
+    invalidate_cashback_campaign_cache(sample_tenant.id)
+
+
+@pytest.fixture
+def no_shopify_credit(monkeypatch):
+    add_credit = MagicMock(return_value=None)
+    monkeypatch.setattr(store_credit_module.store_credit_service, 'add_credit', add_credit)
+    return add_credit
+
+
+def _order(order_id, total):
+    return {'id': order_id, 'order_number': order_id, 'subtotal_price': total, 'customer': {'orders_count': 3}}
+
+
+class TestBudgetReservation:
+
+    def test_full_then_remainder_then_nothing(self, sample_tenant, campaign):
+        accounting = CashbackAccounting(sample_tenant.id)
+        compiled = get_live_campaigns(sample_tenant.id)[0]
+
+        assert accounting.reserve_budget(compiled, Decimal('10.00')) == Decimal('10.00')
+        assert accounting.reserve_budget(compiled, Decimal('10.00')) == Decimal('5.00')
+        assert accounting.reserve_budget(compiled, Decimal('10.00')) == Decimal('0')
+        db.session.commit()
+
+        db.session.refresh(campaign)
+        assert campaign.total_cashback_issued == Decimal('15.00')
+        assert campaign.current_uses == 2
+        assert get_live_campaigns(sample_tenant.id) == []
+
+
+class TestMemberUsage:
+
+    def test_per_member_limit(self, sample_tenant, sample_member, campaign):
+        campaign.max_uses_per_customer = 2
+        db.session.commit()
+        invalidate_cashback_campaign_cache(sample_tenant.id)
+
+        accounting = CashbackAccounting(sample_tenant.id)
+        compiled = get_live_campaigns(sample_tenant.id)[0]
+        assert accounting.claim_member_use(compiled, sample_member.id) is True
+        assert accounting.claim_member_use(compiled, sample_member.id) is True
+        assert accounting.claim_member_use(compiled, sample_member.id) is False
+
+        accounting.release_member_use(compiled, sample_member.id)
+        assert accounting.claim_member_use(compiled, sample_member.id) is True
+        db.session.commit()
+
+        usage = CashbackMemberUsage.query.filter_by(campaign_id=campaign.id, member_id=sample_member.id).one()
+        assert usage.uses == 2
+
+
+class TestProcessOrderCashback:
+
+    def test_redelivered_order_is_not_paid_twice(self, sample_tenant, sample_member, campaign, no_shopify_credit):
+        service = CashbackService(sample_tenant.id)
+
+        first = service.process_order_cashback(_order('1001', '80.00'), member=sample_member)
+        assert first['total_cashback'] == 8.0
+        assert no_shopify_credit.call_count == 1
+
+        again = service.process_order_cashback(_order('1001', '80.00'), member=sample_member)
+        assert again['message'] == 'Cashback already processed for this order'
+        assert no_shopify_credit.call_count == 1
+
+        last = service.process_order_cashback(_order('1002', '80.00'), member=sample_member)
+        assert last['total_cashback'] == 7.0
+
+        db.session.refresh(campaign)
+        assert campaign.total_cashback_issued == Decimal('15.00')
+        assert campaign.current_uses == 2
+
+    def test_redelivered_order_with_two_campaigns(self, sample_tenant, sample_member, campaign, no_shopify_credit):
+        second = CashbackCampaign(
+            tenant_id=sample_tenant.id, name='Member Bonus', cashback_rate=Decimal('5'),
+            max_uses_per_customer=5, start_date=campaign.start_date, end_date=campaign.end_date,
+            status='active'
+        )
+        db.session.add(second)
+        db.session.commit()
+        invalidate_cashback_campaign_cache(sample_tenant.id)
+        service = CashbackService(sample_tenant.id)
+
+        first = service.process_order_cashback(_order('2001', '100.00'), member=sample_member)
+        assert len(first['campaigns_applied']) == 2
+
+        again = service.process_order_cashback(_order('2001', '100.00'), member=sample_member)
+        assert again['message'] == 'Cashback already processed for this order'
+        assert no_shopify_credit.call_count == 1
+
+        usage = CashbackMemberUsage.query.filter_by(campaign_id=campaign.id, member_id=sample_member.id).one()
+        assert usage.uses == 1
+        db.session.refresh(campaign)
+        assert campaign.current_uses == 1
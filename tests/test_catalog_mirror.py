@@ -0,0 +1,152 @@
+"""
+Tests for the local product catalog mirror.
+
+Tests cover:
+- Product webhooks upsert and delete mirror rows
+- Full reconcile creates, updates and removes products
+- Order-time lookups resolve from the mirror with a live fallback
+- Credit event collection and tag filters resolve against the mirror
+"""
+import base64
+import hashlib
+import hmac
+import json
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.extensions import db
+from app.models import CatalogProduct
+from app.services.catalog_mirror_service import CatalogMirrorService
+from app.services.store_credit_events import StoreCreditEventsService
+
+COLLECTION_CARDS = 'gid://shopify/Collection/1001'
+COLLECTION_SEALED = 'gid://shopify/Collection/1002'
+
+
+def _mock_client(collections=None):
+    client = MagicMock()
+    client.get_product_collections.side_effect = lambda ids: {
+        pid: list((collections or {}).get(pid, [])) for pid in ids if pid in (collections or {})
+    }
+    return client
+
+
+@pytest.fixture
+def catalog_tenant(app, sample_tenant):
+    """Tenant whose mirror rows are removed after the test."""
+    yield sample_tenant
+    CatalogProduct.query.filter_by(tenant_id=sample_tenant.id).delete()
+    db.session.commit()
+
+
+class TestCatalogWebhooks:
+    """Test webhook-driven mirror maintenance."""
+
+    def test_upsert_from_webhook(self, catalog_tenant):
+        """Should mirror tags, vendor, type and collections for a product."""
+        client = _mock_client({'501': [COLLECTION_CARDS]})
+        service = CatalogMirrorService(catalog_tenant.id, client=client)
+
+        row = service.upsert_from_webhook({
+            'id': 501, 'tags': 'Pokemon, Sealed ,', 'vendor': 'TPCi', 'product_type': 'Booster Box',
+            'updated_at': '2026-10-01T12:00:00-04:00'
+        })
+        assert row.tags == ['pokemon', 'sealed']
+        assert row.collection_ids == [COLLECTION_CARDS]
+
+        # A failed collection lookup keeps the last known collections
+        client.get_product_collections.side_effect = Exception('throttled')
+        row = service.upsert_from_webhook({'id': 501, 'tags': 'pokemon', 'vendor': 'TPCi'})
+        assert row.tags == ['pokemon']
+        assert row.collection_ids == [COLLECTION_CARDS]
+        assert CatalogProduct.query.filter_by(tenant_id=catalog_tenant.id).count() == 1
+
+    def test_products_delete_webhook(self, client, catalog_tenant):
+        """Should remove the product from the mirror on a signed delete webhook."""
+        db.session.add(CatalogProduct(tenant_id=catalog_tenant.id, product_id=777, collection_ids=[], tags=[]))
+        catalog_tenant.webhook_secret = 'catalog_secret'
+        db.session.commit()
+
+        payload = json.dumps({'id': 777}).encode('utf-8')
+        signature = base64.b64encode(hmac.new(b'catalog_secret', payload, hashlib.sha256).digest()).decode()
+        response = client.post('/webhook/products/delete', data=payload, headers={
+            'X-Shopify-Shop-Domain': catalog_tenant.shopify_domain,
+            'X-Shopify-Hmac-SHA256': signature,
+            'Content-Type': 'application/json'
+        })
+
+        assert response.status_code == 200
+        assert response.get_json()['deleted'] is True
+        assert CatalogProduct.query.filter_by(tenant_id=catalog_tenant.id).count() == 0
+
+
+class TestCatalogReconcile:
+    """Test full catalog reconcile."""
+
+    def test_reconcile_diffs_catalog(self, catalog_tenant):
+        """Should create new, update changed, keep unchanged and drop removed products."""
+        service = CatalogMirrorService(catalog_tenant.id, client=_mock_client())
+        service.reconcile({
+            1: {'collection_ids': [COLLECTION_CARDS], 'tags': ['singles'], 'vendor': 'A', 'product_type': 'Card'},
+            2: {'collection_ids': [], 'tags': [], 'vendor': 'B', 'product_type': 'Card'},
+            3: {'collection_ids': [], 'tags': [], 'vendor': 'C', 'product_type': 'Card'},
+        })
+
+        stats = service.reconcile({
+            1: {'collection_ids': [COLLECTION_CARDS], 'tags': ['singles'], 'vendor': 'A', 'product_type': 'Card'},
+            2: {'collection_ids': [COLLECTION_SEALED], 'tags': [], 'vendor': 'B', 'product_type': 'Card'},
+            4: {'collection_ids': [], 'tags': ['new'], 'vendor': 'D', 'product_type': 'Card'},
+        })
+
+        assert stats == {'created': 1, 'updated': 1, 'unchanged': 1, 'deleted': 1}
+        rows = {r.product_id: r for r in CatalogProduct.query.filter_by(tenant_id=catalog_tenant.id)}
+        assert sorted(rows) == [1, 2, 4]
+        assert rows[2].collection_ids == [COLLECTION_SEALED]
+
+
+class TestCatalogLookups:
+    """Test mirror-backed filter resolution."""
+
+    def test_resolve_products_falls_back_for_unmirrored(self, catalog_tenant):
+        """Should read mirrored products locally and fetch only the rest live."""
+        client = _mock_client({'9': [COLLECTION_SEALED]})
+        service = CatalogMirrorService(catalog_tenant.id, client=client)
+        service.reconcile({8: {'collection_ids': [COLLECTION_CARDS], 'tags': ['foil']}})
+
+        resolved = service.resolve_products(['8', 'gid://shopify/Product/9'])
+
+        assert resolved['8']['collection_ids'] == [COLLECTION_CARDS]
+        assert resolved['8']['tags'] == ['foil']
+        assert resolved['9']['collection_ids'] == [COLLECTION_SEALED]
+        client.get_product_collections.assert_called_once_with(['9'])
+
+    @patch.object(StoreCreditEventsService, '_fetch_orders_rest')
+    @patch.object(StoreCreditEventsService, '_get_collection_product_ids')
+    def test_event_filters_use_mirror(self, mock_collection, mock_rest, catalog_tenant):
+        """Collection and product-tag filters should qualify line items from the mirror."""
+        CatalogMirrorService(catalog_tenant.id, client=_mock_client()).reconcile({
+            1: {'collection_ids': [COLLECTION_CARDS], 'tags': []},
+            2: {'collection_ids': [], 'tags': ['preorder']},
+            3: {'collection_ids': [], 'tags': []},
+        })
+        mock_rest.return_value = [{
+            'id': 1, 'name': '#1001', 'total_price': '100.00', 'source_name': 'pos',
+            'created_at': '2026-01-24T17:00:00Z', 'financial_status': 'paid',
+            'customer': {'id': 100, 'email': 'a@example.com', 'first_name': 'A', 'last_name': 'B', 'tags': ''},
+            'line_items': [
+                {'product_id': 1, 'price': '50.00', 'quantity': 1},
+                {'product_id': 2, 'price': '30.00', 'quantity': 1},
+                {'product_id': 3, 'price': '20.00', 'quantity': 1},
+            ]
+        }]
+
+        service = StoreCreditEventsService('test.myshopify.com', 'token', tenant_id=catalog_tenant.id)
+        orders = list(service.fetch_orders(
+            '2026-01-24T17:00:00Z', '2026-01-24T20:00:00Z', sources=[],
+            collection_ids=[COLLECTION_CARDS], product_tags=['PreOrder']
+        ))
+
+        assert orders[0].qualifying_subtotal == Decimal('80.00')
+        mock_collection.assert_not_called()
@@ -0,0 +1,69 @@
+"""
+Tests for cooperative (gevent) worker support.
+
+Tests cover:
+- Sync-mode defaults when the process is not monkey-patched
+- Pool and transport sizing in cooperative mode
+- One Fernet key derivation per process under concurrent first use
+"""
+import threading
+
+import httpx
+
+from app.utils import cooperative, encryption
+
+
+class TestSyncMode:
+
+    def test_defaults_unchanged(self):
+        options = {'pool_size': 5, 'pool_pre_ping': True}
+        assert cooperative.is_cooperative() is False
+        assert cooperative.engine_options(options, 'postgresql://db/tradeup') is options
+        assert cooperative.run_blocking(sum, [1, 2, 3]) == 6
+        assert cooperative.scheduler_class().__name__ == 'BackgroundScheduler'
+
+        transport = cooperative.http_transport(httpx.Limits(max_connections=50))
+        assert transport._pool._max_connections == 50
+
+
+class TestCooperativeMode:
+
+    def test_pool_and_transport_sizing(self, monkeypatch):
+        monkeypatch.setattr(cooperative, 'is_cooperative', lambda: True)
+        monkeypatch.setenv('DB_POOL_SIZE', '25')
+        monkeypatch.setenv('HTTP_MAX_CONNECTIONS', '300')
+
+        options = cooperative.engine_options({'pool_pre_ping': True}, 'postgresql://db/tradeup')
+        assert options == {'pool_pre_ping': True, 'pool_size': 25, 'max_overflow': 20, 'pool_timeout': 10}
+        assert cooperative.engine_options({}, 'sqlite:///:memory:') == {}
+
+        transport = cooperative.http_transport(httpx.Limits(max_connections=50, max_keepalive_connections=20))
+        assert transport._pool._max_connections == 300
+        assert transport._pool._max_keepalive_connections == 20
+
+
+class TestFernetHelpers:
+
+    def test_key_derived_once(self, monkeypatch):
+        calls = []
+        barrier = threading.Barrier(4)
+
+        def derive():
+            calls.append(1)
+            return encryption.Fernet.generate_key()
+
+        monkeypatch.setattr(encryption, '_fernet_instance', None)
+        monkeypatch.setattr(encryption, 'get_encryption_key', derive)
+
+        def first_use():
+            barrier.wait()
+            encryption.get_fernet()
+
+        threads = [threading.Thread(target=first_use) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert encryption.decrypt_value(encryption.encrypt_value('shpat_token')) == 'shpat_token'
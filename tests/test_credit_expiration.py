@@ -0,0 +1,155 @@
+"""
+Tests for the set-based credit expiration engine.
+
+Tests cover:
+- Chunked expiration with balance recompute
+- Preview agreeing with the run it describes
+- Trigger.dev process-batch paging and error counts
+"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.extensions import db
+from app.models import Member
+from app.models.promotions import StoreCreditLedger, MemberCreditBalance
+from app.services.credit_expiration import CreditExpirationEngine
+
+
+@pytest.fixture
+def expiring_lots(app, sample_tenant, sample_tier):
+    """Two members with five expired lots, one future lot and one already expired lot."""
+    past = datetime.utcnow() - timedelta(days=1)
+    members = []
+    for i in range(2):
+        unique_id = str(uuid.uuid4())[:8]
+        members.append(Member(
+            tenant_id=sample_tenant.id, tier_id=sample_tier.id, member_number=f'TU{unique_id}',
+            email=f'exp{i}-{unique_id}@example.com', name=f'Expiry Member{i}',
+            shopify_customer_id=f'exp_{unique_id}', status='active'
+        ))
+    db.session.add_all(members)
+    db.session.commit()
+
+    first, second = members
+    amounts = [(first, '10.00'), (first, '15.00'), (second, '5.00'), (second, '20.00'), (first, '7.50')]
+    for member, amount in amounts:
+        db.session.add(StoreCreditLedger(
+            member_id=member.id, event_type='manual_adjustment', amount=Decimal(amount),
+            balance_after=Decimal('0'), expires_at=past
+        ))
+    db.session.add(StoreCreditLedger(
+        member_id=second.id, event_type='manual_adjustment', amount=Decimal('40.00'),
+        balance_after=Decimal('0'), expires_at=datetime.utcnow() + timedelta(days=30)
+    ))
+    handled = StoreCreditLedger(
+        member_id=second.id, event_type='manual_adjustment', amount=Decimal('3.00'),
+        balance_after=Decimal('0'), expires_at=past
+    )
+    db.session.add(handled)
+    db.session.flush()
+    db.session.add(StoreCreditLedger(
+        member_id=second.id, event_type='expiration', amount=Decimal('-3.00'),
+        balance_after=Decimal('0'), source_id=f'expired:{handled.id}'
+    ))
+    db.session.commit()
+
+    yield [m.id for m in members]
+
+    for member in members:
+        StoreCreditLedger.query.filter_by(member_id=member.id).delete()
+        MemberCreditBalance.query.filter_by(member_id=member.id).delete()
+        Member.query.filter_by(id=member.id).delete()
+    db.session.commit()
+
+
+class TestCreditExpirationEngine:
+    """Test run() and preview()."""
+
+    def test_preview_matches_chunked_run(self, app, sample_tenant, expiring_lots):
+        engine = CreditExpirationEngine(sample_tenant.id)
+        preview = engine.run(dry_run=True)
+
+        assert preview['dry_run'] is True
+        assert preview['expired_entries'] == 5
+        assert preview['members_affected'] == 2
+        assert preview['total_expired'] == 57.5
+        assert preview['details'][0]['expired_amount'] == 32.5
+        assert StoreCreditLedger.query.filter(
+            StoreCreditLedger.member_id.in_(expiring_lots),
+            StoreCreditLedger.event_type == 'expiration'
+        ).count() == 1
+
+        result = engine.run(chunk_size=2)
+
+        assert result['errors'] == []
+        assert result['expired_entries'] == preview['expired_entries']
+        assert result['members_affected'] == preview['members_affected']
+        assert result['total_expired'] == preview['total_expired']
+        assert result['details'] == preview['details']
+
+        # Nothing left to expire
+        assert CreditExpirationEngine(sample_tenant.id).run(dry_run=True)['expired_entries'] == 0
+
+    def test_details_capped(self, app, sample_tenant, expiring_lots, monkeypatch):
+        from app.services import credit_expiration
+
+        monkeypatch.setattr(credit_expiration, 'DETAILS_LIMIT', 1)
+        result = CreditExpirationEngine(sample_tenant.id).run(chunk_size=2)
+
+        assert result['members_affected'] == 2
+        assert result['details_truncated'] is True
+        assert [d['expired_amount'] for d in result['details']] == [32.5]
+
+    def test_balances_recomputed_from_ledger(self, app, sample_tenant, expiring_lots):
+        first_id, second_id = expiring_lots
+        CreditExpirationEngine(sample_tenant.id).run(chunk_size=3)
+
+        first = MemberCreditBalance.query.filter_by(member_id=first_id).one()
+        second = MemberCreditBalance.query.filter_by(member_id=second_id).one()
+        assert first.total_balance == Decimal('0')
+        assert first.total_expired == Decimal('32.5')
+        # Future lot remains; the earlier expiration counts towards total_expired
+        assert second.total_balance == Decimal('40')
+        assert second.available_balance == Decimal('40')
+        assert second.total_expired == Decimal('28')
+
+        entries = StoreCreditLedger.query.filter_by(member_id=first_id, event_type='expiration').all()
+        assert sorted(e.amount for e in entries) == [Decimal('-15'), Decimal('-10'), Decimal('-7.5')]
+        assert all(e.source_id.startswith('expired:') for e in entries)
+
+
+class TestProcessBatchEndpoint:
+    """Test POST /api/scheduled-tasks/expiration/process-batch."""
+
+    def test_pages_through_lots(self, client, sample_tenant, expiring_lots):
+        headers = {'X-Shop-Domain': sample_tenant.shopify_domain, 'Content-Type': 'application/json'}
+
+        response = client.post('/api/scheduled-tasks/expiration/process-batch',
+                               json={'batchSize': 3}, headers=headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['expired'] == 3 and data['hasMore'] is True
+
+        response = client.post('/api/scheduled-tasks/expiration/process-batch',
+                               json={'batchSize': 3, 'cursor': data['nextCursor']}, headers=headers)
+        data = response.get_json()
+        assert data['expired'] == 2 and data['hasMore'] is False
+        assert data['expiredAmount'] == 27.5
+
+    def test_failed_page_reports_error(self, client, sample_tenant, expiring_lots, monkeypatch):
+        def fail(*args, **kwargs):
+            raise RuntimeError('deadlock detected')
+
+        monkeypatch.setattr(CreditExpirationEngine, '_recompute_balances', fail)
+        response = client.post('/api/scheduled-tasks/expiration/process-batch', json={'batchSize': 3},
+                               headers={'X-Shop-Domain': sample_tenant.shopify_domain})
+
+        data = response.get_json()
+        assert data['errors'] == 1 and data['expired'] == 0 and data['hasMore'] is False
+        assert StoreCreditLedger.query.filter(
+            StoreCreditLedger.member_id.in_(expiring_lots),
+            StoreCreditLedger.event_type == 'expiration'
+        ).count() == 1
@@ -0,0 +1,147 @@
+"""
+Tests for the diff-based customer tag sync.
+
+Tests cover:
+- Initial sync seeds the mirror from Shopify and pushes only missing tags
+- Re-running on an unchanged store makes no mutations
+- Tier changes produce a combined add/remove diff
+- Members leaving the program have their managed tags stripped
+- Failed customers are retried on the next run
+"""
+from unittest.mock import MagicMock
+
+from app.extensions import db
+from app.models import Member, MembershipTier, CustomerTagMirror
+from app.services.customer_tag_sync_service import CustomerTagSyncService
+
+
+def _mock_client(existing_tags=None):
+    client = MagicMock()
+    client.get_customers_tags.side_effect = lambda ids: {
+        cid: list((existing_tags or {}).get(cid, [])) for cid in ids
+    }
+    client.update_customer_tags_bulk.side_effect = lambda changes: {
+        'succeeded': [c['customer_id'] for c in changes],
+        'failed': {}
+    }
+    return client
+
+
+class TestCustomerTagSync:
+    """Test CustomerTagSyncService diffing against the local mirror."""
+
+    def test_initial_sync_keeps_unmanaged_tags(self, app, sample_member):
+        """Should read current tags once and only push what is missing."""
+        with app.app_context():
+            member = Member.query.get(sample_member.id)
+            client = _mock_client({
+                member.shopify_customer_id: ['tradeup-member', 'wholesale', 'tradeup-silver']
+            })
+
+            result = CustomerTagSyncService(member.tenant_id, client=client).sync()
+
+            assert result['synced'] == 1
+            assert client.get_customers_tags.call_count == 1
+            change = client.update_customer_tags_bulk.call_args[0][0][0]
+            assert 'tradeup-gold' in change['add']
+            assert 'tradeup-member' not in change['add']
+            # Merchant tag is not managed; unknown tradeup-* tag is not a tier of this tenant
+            assert change['remove'] == []
+
+            mirror = CustomerTagMirror.query.filter_by(member_id=member.id).first()
+            assert 'tradeup-gold' in mirror.tags
+            assert 'wholesale' not in mirror.tags
+
+    def test_resync_unchanged_makes_no_api_calls(self, app, sample_member):
+        """Should skip every customer when nothing changed."""
+        with app.app_context():
+            tenant_id = sample_member.tenant_id
+            CustomerTagSyncService(tenant_id, client=_mock_client()).sync()
+
+            client = _mock_client()
+            result = CustomerTagSyncService(tenant_id, client=client).sync()
+
+            assert result['unchanged'] == 1
+            assert result['synced'] == 0
+            assert result['api_calls'] == 0
+            client.get_customers_tags.assert_not_called()
+            client.update_customer_tags_bulk.assert_not_called()
+
+    def test_tier_change_pushes_add_and_remove(self, app, sample_member):
+        """Should swap the tier tag in a single combined change."""
+        with app.app_context():
+            tenant_id = sample_member.tenant_id
+            CustomerTagSyncService(tenant_id, client=_mock_client()).sync()
+
+            platinum = MembershipTier(
+                tenant_id=tenant_id,
+                name='Platinum',
+                monthly_price=49.99,
+                bonus_rate=0.2,
+                is_active=True
+            )
+            db.session.add(platinum)
+            db.session.flush()
+            member = Member.query.get(sample_member.id)
+            member.tier_id = platinum.id
+            db.session.commit()
+
+            try:
+                client = _mock_client()
+                result = CustomerTagSyncService(tenant_id, client=client).sync()
+
+                assert result['synced'] == 1
+                assert client.update_customer_tags_bulk.call_count == 1
+                change = client.update_customer_tags_bulk.call_args[0][0][0]
+                assert change['add'] == ['tradeup-platinum']
+                assert change['remove'] == ['tradeup-gold']
+            finally:
+                member.tier_id = sample_member.tier_id
+                db.session.commit()
+                CustomerTagMirror.query.filter_by(member_id=member.id).delete()
+                db.session.delete(platinum)
+                db.session.commit()
+
+    def test_cancelled_member_tags_removed(self, app, sample_member):
+        """Should strip managed tags and drop the mirror row for departed members."""
+        with app.app_context():
+            tenant_id = sample_member.tenant_id
+            CustomerTagSyncService(tenant_id, client=_mock_client()).sync()
+
+            member = Member.query.get(sample_member.id)
+            member.status = 'cancelled'
+            db.session.commit()
+
+            try:
+                client = _mock_client()
+                result = CustomerTagSyncService(tenant_id, client=client).sync()
+
+                assert result['removed'] == 1
+                change = client.update_customer_tags_bulk.call_args[0][0][0]
+                assert change['add'] == []
+                assert 'tradeup-member' in change['remove']
+                assert CustomerTagMirror.query.filter_by(member_id=member.id).count() == 0
+            finally:
+                member.status = 'active'
+                db.session.commit()
+
+    def test_failed_customer_retried_next_run(self, app, sample_member):
+        """Should leave the mirror untouched when Shopify rejects the change."""
+        with app.app_context():
+            tenant_id = sample_member.tenant_id
+            client = _mock_client()
+            client.update_customer_tags_bulk.side_effect = lambda changes: {
+                'succeeded': [],
+                'failed': {c['customer_id']: 'boom' for c in changes}
+            }
+
+            result = CustomerTagSyncService(tenant_id, client=client).sync()
+            assert result['failed'] == 1
+            assert result['errors'][0]['member_id'] == sample_member.id
+
+            client = _mock_client()
+            result = CustomerTagSyncService(tenant_id, client=client).sync()
+            assert result['synced'] == 1
+            assert client.update_customer_tags_bulk.call_count == 1
+            CustomerTagMirror.query.filter_by(member_id=sample_member.id).delete()
+            db.session.commit()
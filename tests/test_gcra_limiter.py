@@ -0,0 +1,155 @@
+"""
+Tests for the GCRA rate limiter.
+
+Tests cover:
+- Burst and steady-rate admission
+- Reconciliation of local hits through a shared store
+- Fallback when the shared store fails
+- 429 responses for proxy paths
+- Proxy keys taken from the Shopify signature, not the caller's address
+- Beacon tenant buckets only for registered shops
+"""
+import hashlib
+import hmac
+
+from app.middleware import gcra
+from app.middleware.gcra import GCRALimiter, GCRALimit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class SharedStore:
+    """In-memory stand-in for the Redis script, shared by several limiters."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.tats = {}
+        self.calls = 0
+
+    def consume(self, key, limit, hits):
+        self.calls += 1
+        now = self.clock()
+        tat = max(self.tats.get(key, now), now) + limit.interval * hits
+        self.tats[key] = tat
+        return tat - now
+
+
+class FailingStore:
+    def consume(self, key, limit, hits):
+        raise ConnectionError('redis down')
+
+
+LIMIT = GCRALimit(rate=60, period=60, burst=5)  # 1/s, bursts of 5
+
+
+class TestLocalGCRA:
+
+    def test_burst_then_steady_rate(self):
+        clock = FakeClock()
+        limiter = GCRALimiter(clock=clock)
+
+        assert all(limiter.hit('k', LIMIT)[0] for _ in range(5))
+        allowed, retry_after = limiter.hit('k', LIMIT)
+        assert allowed is False
+        assert retry_after == 1.0
+
+        clock.now += 1.0
+        assert limiter.hit('k', LIMIT)[0] is True
+        assert limiter.hit('k', LIMIT)[0] is False
+        assert limiter.hit('other', LIMIT)[0] is True
+
+
+class TestReconciliation:
+
+    def test_workers_share_budget(self, monkeypatch):
+        monkeypatch.setattr(gcra, 'RECONCILE_BATCH', 2)
+        clock = FakeClock()
+        store = SharedStore(clock)
+        worker_a = GCRALimiter(store=store, clock=clock)
+        worker_b = GCRALimiter(store=store, clock=clock)
+
+        assert all(worker_a.hit('k', LIMIT)[0] for _ in range(4))
+        assert store.calls == 2
+
+        # Worker B learns of A's hits at its first sync and stops early
+        results = [worker_b.hit('k', LIMIT)[0] for _ in range(5)]
+        assert results == [True, True, False, False, False]
+
+    def test_store_failure_falls_back_to_local(self, monkeypatch):
+        monkeypatch.setattr(gcra, 'RECONCILE_BATCH', 1)
+        limiter = GCRALimiter(store=FailingStore(), clock=FakeClock())
+
+        assert all(limiter.hit('k', LIMIT)[0] for _ in range(5))
+        assert limiter.hit('k', LIMIT)[0] is False
+
+
+class TestCheckRequest:
+
+    def test_proxy_client_limited(self, app):
+        limiter = GCRALimiter()
+        for _ in range(40):
+            with app.test_request_context('/proxy/', query_string={'shop': 'a.myshopify.com'}):
+                assert gcra.check_request(limiter) is None
+
+        with app.test_request_context('/proxy/', query_string={'shop': 'a.myshopify.com'}):
+            response = gcra.check_request(limiter)
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+
+        with app.test_request_context('/api/members'):
+            assert gcra.check_request(limiter) is None
+
+    def test_proxy_keyed_on_signed_customer(self, app, monkeypatch):
+        monkeypatch.setenv('SHOPIFY_API_SECRET', 'proxy-secret')
+        limiter = GCRALimiter()
+
+        def signed(customer_id):
+            params = {'shop': 'a.myshopify.com', 'logged_in_customer_id': customer_id, 'timestamp': '1'}
+            message = '&'.join(f'{key}={params[key]}' for key in sorted(params))
+            params['signature'] = hmac.new(b'proxy-secret', message.encode(), hashlib.sha256).hexdigest()
+            return params
+
+        # Every request comes from the same (Shopify) address
+        for _ in range(40):
+            with app.test_request_context('/proxy/', query_string=signed('1')):
+                assert gcra.check_request(limiter) is None
+        with app.test_request_context('/proxy/', query_string=signed('1')):
+            assert gcra.check_request(limiter).status_code == 429
+        with app.test_request_context('/proxy/', query_string=signed('2')):
+            assert gcra.check_request(limiter) is None
+
+        # A forged signature falls back to the address and a shared tenant
+        with app.test_request_context('/proxy/', query_string={**signed('1'), 'signature': 'forged'}):
+            assert gcra.get_proxy_keys() == ('ip:127.0.0.1', 'unverified')
+
+    def test_beacon_tenant_only_for_registered_shop(self, app, sample_tenant):
+        gcra.registered_shops.reset()
+        path = '/api/nudges/track/impression'
+        shop = sample_tenant.shopify_domain
+
+        with app.test_request_context(path, query_string={'shop': shop.upper()}):
+            assert gcra.get_tenant_key() == shop
+        with app.test_request_context(path, headers={'X-Shop-Domain': 'forged.myshopify.com'}):
+            assert gcra.get_tenant_key() == 'unverified'
+        with app.test_request_context(path):
+            assert gcra.get_tenant_key() == 'unverified'
+
+        # Made-up shops share one low-limit bucket instead of minting their own
+        limiter = GCRALimiter()
+        burst = gcra.ENDPOINT_CLASSES[1].unverified_limit.burst
+        for i in range(burst):
+            with app.test_request_context(path, query_string={'shop': f'fake-{i}.myshopify.com'},
+                                          environ_base={'REMOTE_ADDR': f'10.0.{i // 250}.{i % 250}'}):
+                assert gcra.check_request(limiter) is None
+        with app.test_request_context(path, query_string={'shop': 'fake-x.myshopify.com'},
+                                      environ_base={'REMOTE_ADDR': '10.9.9.9'}):
+            assert gcra.check_request(limiter).status_code == 429
+        with app.test_request_context(path, query_string={'shop': shop}):
+            assert gcra.check_request(limiter) is None
+        gcra.registered_shops.reset()
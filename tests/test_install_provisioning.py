@@ -0,0 +1,165 @@
+"""
+Tests for the install provisioning pipeline.
+
+Tests cover:
+- Running every setup step with dependency ordering
+- Failed steps blocking only their dependents
+- Resuming a partial install through the retry endpoint
+- Re-running steps left 'running' by a dead worker
+- Leaving tiers (and their segments) to the onboarding template
+"""
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.extensions import db
+from app.models import ProvisioningStep, Tenant
+from app.services import install_provisioning
+from app.services.install_provisioning import ProvisioningPipeline, start_provisioning
+
+
+def _response(status_code=200, body=None, text=''):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = body or {}
+    response.text = text
+    if status_code >= 400:
+        response.raise_for_status.side_effect = RuntimeError(f'HTTP {status_code}')
+    return response
+
+
+@pytest.fixture
+def provisioning_tenant(app, sample_tenant, sample_tier):
+    """Tenant with one tier and no provisioning state."""
+    yield sample_tenant
+    ProvisioningStep.query.filter_by(tenant_id=sample_tenant.id).delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def new_shop(app, sample_tenant):
+    """Tenant still onboarding: no tiers and no provisioning state."""
+    yield sample_tenant
+    ProvisioningStep.query.filter_by(tenant_id=sample_tenant.id).delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def shopify_mocks():
+    """Mock REST session and GraphQL client used by the steps."""
+    session = MagicMock()
+    session.get.return_value = _response(body={'shop': {
+        'name': 'Renamed Shop', 'iana_timezone': 'Europe/London', 'currency': 'GBP'
+    }})
+    session.post.return_value = _response(201)
+
+    client = MagicMock()
+    client.create_tradeup_segments.return_value = {'success': True, 'segments': [{}, {}], 'errors': []}
+    client.get_products_by_tag.return_value = []
+
+    with patch.object(install_provisioning, 'get_http_session', return_value=session), \
+            patch('app.services.shopify_client.ShopifyClient', return_value=client):
+        yield session, client
+
+
+class TestProvisioningPipeline:
+    """Test step execution and resume."""
+
+    def test_all_steps_complete(self, provisioning_tenant, shopify_mocks):
+        session, client = shopify_mocks
+
+        progress = start_provisioning(provisioning_tenant.id, reset=True)
+
+        assert progress['status'] == 'complete'
+        assert progress['percent'] == 100
+        steps = {s['step']: s for s in progress['steps']}
+        assert len(steps['webhooks']['result']['registered']) == 5
+        assert steps['default_tiers']['result'] == {'created': False}
+        assert steps['segments']['result'] == {'segments': 2}
+        assert steps['membership_products']['result']['skipped']
+        assert session.post.call_args[1]['timeout'] == install_provisioning.REQUEST_TIMEOUT
+
+        tenant = Tenant.query.get(provisioning_tenant.id)
+        assert tenant.settings['general'] == {'timezone': 'Europe/London', 'currency': 'GBP'}
+
+    def test_failed_step_blocks_dependents_and_resumes(self, client, provisioning_tenant, shopify_mocks):
+        session, shopify_client = shopify_mocks
+        session.get.return_value = _response(503)
+        # Webhook already registered from an earlier install
+        session.post.return_value = _response(422, text='{"errors":{"address":["for this topic has already been taken"]}}')
+
+        progress = start_provisioning(provisioning_tenant.id, reset=True)
+        steps = {s['step']: s for s in progress['steps']}
+
+        assert progress['status'] == 'failed'
+        assert steps['shop_info']['status'] == 'failed'
+        assert steps['membership_products']['status'] == 'pending'  # Waits on shop_info
+        assert steps['segments']['status'] == 'done'
+        assert len(steps['webhooks']['result']['existing']) == 5
+
+        session.get.return_value = _response(body={'shop': {'name': 'Fixed'}})
+        response = client.post(
+            '/api/onboarding/provisioning/retry',
+            headers={'X-Shop-Domain': provisioning_tenant.shopify_domain}
+        )
+        assert response.status_code == 202
+        assert response.get_json()['status'] == 'complete'
+
+        attempts = {row.step: row.attempts for row in ProvisioningStep.query.filter_by(tenant_id=provisioning_tenant.id)}
+        assert attempts['shop_info'] == 2
+        assert attempts['webhooks'] == 1 and attempts['segments'] == 1
+        assert shopify_client.create_tradeup_segments.call_count == 1
+
+        response = client.get(
+            '/api/onboarding/provisioning',
+            headers={'X-Shop-Domain': provisioning_tenant.shopify_domain}
+        )
+        assert response.get_json()['completed'] == len(install_provisioning.STEPS)
+
+    def test_onboarding_shop_gets_no_default_tiers(self, new_shop, shopify_mocks):
+        from app.models import MembershipTier
+        from app.services.onboarding import OnboardingService
+
+        _, client = shopify_mocks
+        progress = start_provisioning(new_shop.id, reset=True)
+
+        assert progress['status'] == 'complete'
+        steps = {s['step']: s for s in progress['steps']}
+        assert steps['default_tiers']['result']['skipped']
+        assert steps['segments']['result']['skipped']
+        client.create_tradeup_segments.assert_not_called()
+        assert MembershipTier.query.filter_by(tenant_id=new_shop.id).count() == 0
+        assert OnboardingService(new_shop.id).get_onboarding_status()['has_tiers'] is False
+
+    def test_running_step_not_claimed_twice(self, provisioning_tenant):
+        pipeline = ProvisioningPipeline(provisioning_tenant.id)
+        pipeline.ensure_steps()
+        assert pipeline._claim('webhooks') is True
+        assert pipeline._claim('webhooks') is False
+        assert pipeline.run_step('webhooks') == 'skipped'
+
+    def test_stale_running_step_resumed(self, provisioning_tenant, shopify_mocks):
+        pipeline = ProvisioningPipeline(provisioning_tenant.id)
+        pipeline.ensure_steps()
+        assert pipeline._claim('shop_info') is True
+
+        # A live claim is left alone, even by a reset
+        pipeline.ensure_steps(reset=True)
+        assert 'shop_info' not in pipeline._ready(set())
+
+        # The worker died mid-step
+        ProvisioningStep.query.filter_by(tenant_id=provisioning_tenant.id, step='shop_info').update({
+            'updated_at': datetime.utcnow() - timedelta(seconds=install_provisioning.STALE_STEP_SECONDS + 1)
+        })
+        db.session.commit()
+        assert 'shop_info' in pipeline._ready(set())
+        pipeline.ensure_steps(reset=True)
+        assert ProvisioningStep.query.filter_by(
+            tenant_id=provisioning_tenant.id, step='shop_info'
+        ).one().status == 'pending'
+
+        progress = pipeline.run()
+        steps = {s['step']: s for s in progress['steps']}
+        assert progress['status'] == 'complete'
+        assert steps['shop_info']['attempts'] == 2
@@ -0,0 +1,146 @@
+"""
+Tests for the lease-based scheduler job runner.
+
+Tests cover:
+- Lease acquisition, takeover of expired leases and release
+- Leases held until timed-out units exit
+- Sharded per-tenant runs with aggregated summaries
+- Resuming a run: finished tenants are not re-run, failed ones are retried
+"""
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.models import SchedulerJobLease, SchedulerJobRun, SchedulerWorkUnit
+from app.utils import job_runner
+from app.utils.job_runner import acquire_lease, job_lease, release_lease, run_tenant_job, summarize_results
+
+
+@pytest.fixture
+def job_id(app):
+    """Unique job ID, with its lease and runs removed afterwards."""
+    job_id = f'test_job_{datetime.utcnow().timestamp()}'
+    yield job_id
+    SchedulerJobLease.query.filter_by(job_id=job_id).delete()
+    for run in SchedulerJobRun.query.filter_by(job_id=job_id):
+        db.session.delete(run)
+    db.session.commit()
+
+
+def _hold_lease_elsewhere(job_id, expires_in):
+    db.session.add(SchedulerJobLease(
+        job_id=job_id, owner='other-host:1:abc',
+        expires_at=datetime.utcnow() + timedelta(seconds=expires_in)
+    ))
+    db.session.commit()
+
+
+class TestLeases:
+    """Test job lease acquisition."""
+
+    def test_lease_exclusive_until_expired(self, job_id):
+        _hold_lease_elsewhere(job_id, expires_in=60)
+        assert acquire_lease(job_id) is False
+
+        SchedulerJobLease.query.filter_by(job_id=job_id).update(
+            {'expires_at': datetime.utcnow() - timedelta(seconds=1)}
+        )
+        db.session.commit()
+        assert acquire_lease(job_id) is True
+        assert SchedulerJobLease.query.filter_by(job_id=job_id).first().owner == job_runner.OWNER_ID
+
+        # Re-entrant for the holder; released leases are free for others
+        assert acquire_lease(job_id) is True
+        release_lease(job_id)
+        assert SchedulerJobLease.query.filter_by(job_id=job_id).first().expires_at <= datetime.utcnow()
+
+    def test_job_skipped_while_leased_elsewhere(self, app, job_id):
+        _hold_lease_elsewhere(job_id, expires_in=60)
+        calls = []
+        assert run_tenant_job(app, job_id, '2026-10-18', [1, 2], calls.append) is None
+        assert calls == []
+
+    def test_lease_held_until_timed_out_unit_exits(self, app, job_id, monkeypatch):
+        monkeypatch.setattr(job_runner, '_inline', lambda app: False)
+        straggler = Future()
+
+        with job_lease(app, job_id, ttl=60) as heartbeat:
+            heartbeat.hold_for([straggler])
+
+        # The job returned while a timed-out unit's thread is still running
+        lease = SchedulerJobLease.query.filter_by(job_id=job_id).first()
+        assert lease.expires_at > datetime.utcnow()
+
+        straggler.set_result(None)
+        for thread in threading.enumerate():
+            if thread.name == f'lease-release-{job_id}':
+                thread.join(timeout=5)
+        db.session.expire_all()
+        assert SchedulerJobLease.query.filter_by(job_id=job_id).first().expires_at <= datetime.utcnow()
+
+
+class TestShardedRuns:
+    """Test per-tenant work units."""
+
+    def test_units_run_once_per_run_key(self, app, job_id):
+        calls = []
+
+        def unit(tenant_id):
+            calls.append(tenant_id)
+            return {'processed': 1, 'amount': tenant_id * 1.5, 'nested': {'sent': 2}}
+
+        report = run_tenant_job(app, job_id, '2026-10-18', [3, 1, 2], unit)
+
+        assert calls == [1, 2, 3]
+        assert report['status'] == 'completed'
+        assert report['units'] == {'done': 3}
+        assert report['summary'] == {'processed': 3, 'amount': 9.0, 'nested': {'sent': 6}}
+
+        # Same period again (second process, redeploy): nothing re-runs
+        assert run_tenant_job(app, job_id, '2026-10-18', [1, 2, 3], unit)['status'] == 'completed'
+        assert calls == [1, 2, 3]
+
+        # Next period is a new run
+        run_tenant_job(app, job_id, '2026-10-19', [1], unit)
+        assert calls == [1, 2, 3, 1]
+
+    def test_failed_unit_resumes_alone(self, app, job_id):
+        calls = []
+        failing = {2}
+
+        def unit(tenant_id):
+            calls.append(tenant_id)
+            if tenant_id in failing:
+                raise RuntimeError('shop unavailable')
+            return {'processed': 1}
+
+        report = run_tenant_job(app, job_id, '2026-10-18', [1, 2, 3], unit)
+        assert report['status'] == 'running'
+        assert report['units'] == {'done': 2, 'failed': 1}
+        unit_row = SchedulerWorkUnit.query.filter_by(tenant_id=2).join(SchedulerJobRun).filter(
+            SchedulerJobRun.job_id == job_id
+        ).first()
+        assert unit_row.error == 'shop unavailable' and unit_row.attempts == 1
+
+        failing.clear()
+        report = run_tenant_job(app, job_id, '2026-10-18', [1, 2, 3], unit)
+        assert calls == [1, 2, 3, 2]
+        assert report['status'] == 'completed'
+        assert report['summary'] == {'processed': 3}
+
+    def test_unit_given_up_after_max_attempts(self, app, job_id):
+        def unit(tenant_id):
+            raise RuntimeError('boom')
+
+        for _ in range(job_runner.MAX_UNIT_ATTEMPTS):
+            report = run_tenant_job(app, job_id, '2026-10-18', [1], unit)
+
+        assert report['status'] == 'completed'
+        assert report['units'] == {'failed': 1}
+
+
+def test_summarize_results_sums_counters():
+    assert summarize_results([{'a': 1, 'ok': True}, {'a': 2, 'ok': False, 'label': 'x'}, {}]) == {'a': 3, 'ok': 1}
@@ -0,0 +1,178 @@
+"""
+Tests for the Klaviyo integration service.
+
+Tests cover:
+- Bulk profile sync via import jobs with change detection
+- Job splitting at the per-job profile limit
+- Buffered loyalty events sent as bulk event jobs
+- POSTs retried only on rate limits
+- Sync endpoint validating batch_size
+"""
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.orm.attributes import flag_modified
+
+from app.extensions import db
+from app.models import Member, KlaviyoProfileSync, Tenant
+from app.services import klaviyo_service
+from app.services.klaviyo_service import KlaviyoService, get_event_buffer
+
+
+def _response(status_code=202, job_id='job-1'):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = {'data': {'id': job_id}}
+    response.text = ''
+    return response
+
+
+@pytest.fixture
+def klaviyo_tenant(app, sample_tenant, sample_tier):
+    """Tenant with Klaviyo enabled and three active members."""
+    tenant = Tenant.query.get(sample_tenant.id)
+    tenant.settings = {'integrations': {'klaviyo': {'enabled': True, 'api_key': 'pk_test', 'list_id': 'L1'}}}
+    flag_modified(tenant, 'settings')
+    members = []
+    for i in range(3):
+        unique_id = str(uuid.uuid4())[:8]
+        members.append(Member(
+            tenant_id=sample_tenant.id, tier_id=sample_tier.id, member_number=f'TU{unique_id}',
+            email=f'k{i}-{unique_id}@example.com', name=f'Klaviyo Member{i}',
+            shopify_customer_id=f'k_{unique_id}', status='active', points_balance=10 * i
+        ))
+    db.session.add_all(members)
+    db.session.commit()
+
+    yield tenant, members
+
+    KlaviyoProfileSync.query.filter_by(tenant_id=sample_tenant.id).delete()
+    for member in members:
+        db.session.delete(member)
+    db.session.commit()
+    get_event_buffer().drain(sample_tenant.id)
+
+
+class TestBulkProfileSync:
+    """Test sync_all_members bulk import jobs."""
+
+    def test_sync_sends_only_changed_members(self, klaviyo_tenant):
+        tenant, members = klaviyo_tenant
+        session = MagicMock()
+        session.post.return_value = _response(job_id='job-1')
+
+        with patch.object(klaviyo_service, 'get_http_session', return_value=session):
+            result = KlaviyoService(tenant.id).sync_all_members(batch_size=2)
+
+            assert result['success'] is True
+            assert result['total'] == 3 and result['synced'] == 3
+            assert result['jobs'] == ['job-1']
+            url = session.post.call_args[0][0]
+            payload = session.post.call_args[1]['json']['data']
+            assert url.endswith('/profile-bulk-import-jobs/')
+            assert payload['relationships']['lists']['data'][0]['id'] == 'L1'
+            profile = payload['attributes']['profiles']['data'][0]['attributes']
+            assert profile['first_name'] == 'Klaviyo'
+            assert profile['properties']['tradeup_tier'] == 'Gold'
+
+            # Nothing changed: no job
+            session.post.reset_mock()
+            result = KlaviyoService(tenant.id).sync_all_members()
+            assert result['unchanged'] == 3 and result['synced'] == 0
+            session.post.assert_not_called()
+
+            # One member changed: a job with just that profile
+            members[1].points_balance = 500
+            db.session.commit()
+            session.post.return_value = _response(job_id='job-2')
+            result = KlaviyoService(tenant.id).sync_all_members()
+            assert result['changed'] == 1 and result['jobs'] == ['job-2']
+            sent = session.post.call_args[1]['json']['data']['attributes']['profiles']['data']
+            assert [p['attributes']['email'] for p in sent] == [members[1].email]
+
+        state = KlaviyoProfileSync.query.filter_by(member_id=members[1].id).first()
+        assert state.job_id == 'job-2'
+
+    def test_jobs_split_and_failed_jobs_not_recorded(self, klaviyo_tenant):
+        tenant, members = klaviyo_tenant
+        session = MagicMock()
+        session.post.side_effect = [_response(job_id='job-a'), _response(status_code=400)]
+
+        with patch.object(klaviyo_service, 'get_http_session', return_value=session), \
+                patch.object(klaviyo_service, 'BULK_IMPORT_MAX_PROFILES', 2):
+            result = KlaviyoService(tenant.id).sync_all_members()
+
+        assert session.post.call_count == 2
+        assert result['success'] is False
+        assert result['synced'] == 2 and result['jobs'] == ['job-a']
+        assert KlaviyoProfileSync.query.filter_by(tenant_id=tenant.id).count() == 2
+
+
+class TestBufferedEvents:
+    """Test buffered track_* events."""
+
+    def test_events_flush_as_bulk_job(self, klaviyo_tenant):
+        tenant, members = klaviyo_tenant
+        session = MagicMock()
+        session.post.return_value = _response()
+
+        with patch.object(klaviyo_service, 'get_http_session', return_value=session):
+            service = KlaviyoService(tenant.id)
+            assert service.track_points_earned(members[0], 50, 'purchase', 60)['queued'] is True
+            service.track_points_earned(members[0], 10, 'referral', 70)
+            service.track_member_enrolled(members[1])
+            session.post.assert_not_called()
+            assert get_event_buffer().pending(tenant.id) == 3
+
+            result = service.flush_events()
+
+        assert result == {'success': True, 'sent': 3, 'failed': 0}
+        assert get_event_buffer().pending(tenant.id) == 0
+        url = session.post.call_args[0][0]
+        entries = session.post.call_args[1]['json']['data']['attributes']['events-bulk-create']['data']
+        assert url.endswith('/event-bulk-create-jobs/')
+        assert len(entries) == 2  # Grouped per profile
+        assert len(entries[0]['attributes']['events']['data']) == 2
+
+    def test_size_threshold_and_requeue(self, klaviyo_tenant):
+        tenant, members = klaviyo_tenant
+        session = MagicMock()
+        session.post.return_value = _response(status_code=503)
+
+        with patch.object(klaviyo_service, 'get_http_session', return_value=session), \
+                patch.object(klaviyo_service, 'EVENT_BUFFER_FLUSH_SIZE', 2):
+            service = KlaviyoService(tenant.id)
+            service.track_member_enrolled(members[0])
+            service.track_member_enrolled(members[1])
+
+        # Threshold reached: flushed inline, failed job kept for the next flush
+        session.post.assert_called_once()
+        assert get_event_buffer().pending(tenant.id) == 2
+
+
+class TestRetryPolicy:
+    """Test the shared session's retry rules."""
+
+    def test_post_retried_only_on_rate_limit(self):
+        retry = klaviyo_service.get_http_session().get_adapter('https://a.klaviyo.com/api/').max_retries
+
+        assert retry.is_retry('POST', 429) is True
+        assert retry.is_retry('POST', 503) is False  # The job may already exist
+        assert retry.is_retry('PATCH', 503) is True
+        assert retry.is_retry('GET', 502) is True
+
+
+class TestSyncMembersEndpoint:
+    """Test /sync-members input validation."""
+
+    @pytest.mark.parametrize('batch_size', ['lots', 0, None])
+    def test_invalid_batch_size(self, client, klaviyo_tenant, batch_size):
+        tenant, _ = klaviyo_tenant
+        response = client.post(
+            '/api/integrations/klaviyo/sync-members',
+            headers={'X-Shop-Domain': tenant.shopify_domain},
+            json={'batch_size': batch_size}
+        )
+        assert response.status_code == 400
+        assert 'batch_size' in response.get_json()['error']
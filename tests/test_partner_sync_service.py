@@ -0,0 +1,121 @@
+"""
+Tests for queued partner sync delivery.
+
+Tests cover:
+- Trade-in syncs queued and delivered over the partner's pooled session
+- Exponential backoff and dead-lettering of failed deliveries
+- Atomic claiming so a log is only sent once
+- Per-endpoint latency/error stats
+"""
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.extensions import db
+from app.models import PartnerIntegration, PartnerSyncLog
+from app.services import partner_sync_service
+from app.services.partner_sync_service import (
+    PartnerSyncService, deliver_sync_log, process_due_deliveries, MAX_DELIVERY_ATTEMPTS
+)
+
+
+def _response(status_code=200):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {'content-type': 'application/json'}
+    response.text = '{"ok": true}'
+    return response
+
+
+@pytest.fixture
+def integration(app, sample_tenant):
+    """Enabled WordPress partner integration."""
+    integration = PartnerIntegration(
+        tenant_id=sample_tenant.id,
+        name='Test Partner',
+        slug=f'test-partner-{uuid.uuid4().hex[:8]}',
+        partner_type='wordpress',
+        api_url='https://partner.example.com/wp-json/v1',
+        api_token='secret',
+        enabled=True,
+        sync_trade_ins=True
+    )
+    db.session.add(integration)
+    db.session.commit()
+
+    yield integration
+
+    db.session.delete(integration)
+    db.session.commit()
+
+
+def _session(*responses):
+    session = MagicMock()
+    session.post.side_effect = list(responses)
+    return session
+
+
+class TestQueuedDelivery:
+    """Test queueing and delivery of trade-in syncs."""
+
+    def test_trade_in_queued_and_delivered(self, integration, sample_trade_in_batch):
+        session = _session(_response(201))
+        with patch.object(partner_sync_service, 'get_partner_session', return_value=session):
+            results = PartnerSyncService(integration.tenant_id).sync_trade_in(sample_trade_in_batch)
+
+        assert results[0]['queued'] is True
+        log = PartnerSyncLog.query.get(results[0]['log_id'])
+        assert log.status == 'success'
+        assert log.endpoint == 'https://partner.example.com/wp-json/v1/tradeup/trade-in'
+        assert log.duration_ms is not None and log.next_attempt_at is None
+        assert session.post.call_args[1]['headers']['Authorization'] == 'Bearer secret'
+        assert PartnerIntegration.query.get(integration.id).sync_count == 1
+
+    def test_failure_backs_off_then_dead_letters(self, integration, sample_trade_in_batch):
+        session = _session(*[_response(503)] * MAX_DELIVERY_ATTEMPTS)
+        with patch.object(partner_sync_service, 'get_partner_session', return_value=session):
+            log_id = PartnerSyncService(integration.tenant_id).sync_trade_in(sample_trade_in_batch)[0]['log_id']
+            log = PartnerSyncLog.query.get(log_id)
+            assert log.status == 'failed' and log.retry_count == 1
+            first_delay = log.next_attempt_at - log.last_attempt_at
+            assert timedelta(seconds=20) < first_delay < timedelta(seconds=40)
+
+            # Not due yet: the sweep leaves it alone
+            assert deliver_sync_log(log_id)['status'] == 'skipped'
+
+            for attempt in range(2, MAX_DELIVERY_ATTEMPTS + 1):
+                log.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+                db.session.commit()
+                assert process_due_deliveries() >= 1
+                assert log.retry_count == attempt
+
+        assert log.status == 'dead' and log.next_attempt_at is None
+        assert session.post.call_count == MAX_DELIVERY_ATTEMPTS
+
+    def test_client_error_dead_letters_and_manual_retry_requeues(self, integration, sample_trade_in_batch):
+        session = _session(_response(422), _response(200))
+        with patch.object(partner_sync_service, 'get_partner_session', return_value=session):
+            service = PartnerSyncService(integration.tenant_id)
+            log_id = service.sync_trade_in(sample_trade_in_batch)[0]['log_id']
+            assert PartnerSyncLog.query.get(log_id).status == 'dead'
+
+            results = service.retry_failed_syncs()
+
+        assert [r['log_id'] for r in results] == [log_id]
+        assert PartnerSyncLog.query.get(log_id).status == 'success'
+
+    def test_endpoint_stats(self, integration, sample_trade_in_batch):
+        session = _session(_response(200), _response(500))
+        with patch.object(partner_sync_service, 'get_partner_session', return_value=session):
+            service = PartnerSyncService(integration.tenant_id)
+            service.sync_trade_in(sample_trade_in_batch)
+            service.sync_trade_in(sample_trade_in_batch)
+
+            stats = service.get_endpoint_stats()
+
+        assert len(stats) == 1
+        assert stats[0]['delivered'] == 1 and stats[0]['failed'] == 1 and stats[0]['queued'] == 1
+        assert stats[0]['error_rate'] == 0.5
+        assert stats[0]['latency_ms']['max'] is not None
@@ -835,3 +835,193 @@ class TestPointsServiceFIFO:
             # The one expiring sooner should be consumed first
             assert expires_soon.remaining_points == 50
             assert expires_later.remaining_points == 100
+
+
+class TestPointsServiceEarningRules:
+    """Tests for compiled earning rules and per-member usage counters."""
+
+    @pytest.fixture
+    def bonus_rule(self, app, sample_tenant):
+        """Active purchase bonus rule; yields a factory applying overrides."""
+        from app.extensions import db
+        from app.models import EarningRule, EarningRuleUsage
+        from app.services.earning_rule_cache import invalidate_earning_rules_cache
+
+        created = []
+
+        def _make(**overrides):
+            fields = dict(
+                tenant_id=sample_tenant.id,
+                name='Order bonus',
+                rule_type='bonus_points',
+                bonus_points=25,
+                trigger_source='purchase',
+                is_active=True
+            )
+            fields.update(overrides)
+            rule = EarningRule(**fields)
+            db.session.add(rule)
+            db.session.commit()
+            created.append(rule.id)
+            invalidate_earning_rules_cache(sample_tenant.id)
+            return rule
+
+        with app.app_context():
+            yield _make
+            EarningRuleUsage.query.filter(EarningRuleUsage.rule_id.in_(created)).delete(synchronize_session=False)
+            EarningRule.query.filter(EarningRule.id.in_(created)).delete(synchronize_session=False)
+            db.session.commit()
+            invalidate_earning_rules_cache(sample_tenant.id)
+
+    def test_max_uses_per_member_counter(self, app, sample_member, bonus_rule):
+        """Should award once, then stop at the per-member limit."""
+        from app.models import Member, EarningRule, EarningRuleUsage
+
+        rule = bonus_rule(max_uses_per_member=1)
+        member = Member.query.get(sample_member.id)
+        service = PointsService(tenant_id=member.tenant_id)
+
+        first = service.evaluate_earning_rules(member, 'purchase', {'order_value': 50})
+        assert first['total_points'] == 25
+        award = service.earn_points(member.id, 25, 'bonus', apply_multipliers=False, earning_rule_ids=[rule.id])
+        assert award['success'] is True
+
+        second = service.evaluate_earning_rules(member, 'purchase', {'order_value': 50})
+        assert second['eligible'] is False
+
+        usage = EarningRuleUsage.query.filter_by(member_id=member.id, rule_id=rule.id).one()
+        assert usage.uses == 1
+        assert EarningRule.query.get(rule.id).current_uses == 1
+
+    def test_max_uses_total_enforced_at_award(self, app, sample_member, bonus_rule):
+        """Should refuse an award past max_uses_total even if the cached rule looked eligible."""
+        from app.models import Member, EarningRule
+
+        rule = bonus_rule(max_uses_total=1)
+        member = Member.query.get(sample_member.id)
+        service = PointsService(tenant_id=member.tenant_id)
+        balance = member.points_balance or 0
+
+        # Both evaluations see the rule unused, as two workers' caches would
+        assert service.evaluate_earning_rules(member, 'purchase', {})['eligible'] is True
+        assert service.evaluate_earning_rules(member, 'purchase', {})['eligible'] is True
+
+        first = service.earn_points(member.id, 25, 'bonus', apply_multipliers=False, earning_rule_ids=[rule.id])
+        second = service.earn_points(member.id, 25, 'bonus', apply_multipliers=False, earning_rule_ids=[rule.id])
+
+        assert first['success'] is True
+        assert second['success'] is False
+        assert EarningRule.query.get(rule.id).current_uses == 1
+        assert Member.query.get(member.id).points_balance == balance + 25
+
+    def test_new_member_only_uses_first_purchase_flag(self, app, sample_member, bonus_rule):
+        """Should stop applying first-purchase rules once purchase points were earned."""
+        from app.models import Member
+
+        bonus_rule(new_member_only=True)
+        member = Member.query.get(sample_member.id)
+        service = PointsService(tenant_id=member.tenant_id)
+
+        assert service.evaluate_earning_rules(member, 'purchase', {})['eligible'] is True
+
+        service.earn_points(member.id, 10, 'purchase', 'order_1', apply_multipliers=False)
+        member = Member.query.get(sample_member.id)
+        assert member.first_purchase_at is not None
+
+        assert service.evaluate_earning_rules(member, 'purchase', {})['eligible'] is False
+
+    def test_compiled_rules_cached_until_invalidated(self, app, sample_member, bonus_rule):
+        """Should serve rules from the compiled cache without re-querying."""
+        from sqlalchemy import event
+        from app.extensions import db
+        from app.models import Member
+        from app.services.earning_rule_cache import invalidate_earning_rules_cache
+
+        rule = bonus_rule(tier_restriction=json.dumps(['gold']), vendor_filter=json.dumps(['Pokemon']))
+        member = Member.query.get(sample_member.id)
+        service = PointsService(tenant_id=member.tenant_id)
+        context = {'products': [{'vendor': 'pokemon', 'tags': []}]}
+
+        assert service.evaluate_earning_rules(member, 'purchase', context)['total_points'] == 25
+
+        statements = []
+
+        def _count(conn, cursor, statement, parameters, ctx, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', _count)
+        try:
+            result = service.evaluate_earning_rules(member, 'purchase', context)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', _count)
+        assert result['total_points'] == 25
+        assert not any('earning_rules' in s for s in statements)
+
+        rule.bonus_points = 40
+        db.session.commit()
+        invalidate_earning_rules_cache(member.tenant_id)
+        assert service.evaluate_earning_rules(member, 'purchase', context)['total_points'] == 40
+
+
+class TestPointsLotBenchmark:
+    """Benchmark FIFO consumption for long-tenured members (10k+ earn records)."""
+
+    LOT_COUNT = 10000
+
+    def test_consume_touches_only_drained_lots(self, app, sample_member):
+        """Redeeming a few lots out of 10k should read one batch and issue one UPDATE."""
+        import time
+        from sqlalchemy import event
+        from app.extensions import db
+        from app.models import Member
+
+        member = Member.query.get(sample_member.id)
+        service = PointsService(tenant_id=member.tenant_id)
+        start = datetime.utcnow() - timedelta(days=self.LOT_COUNT)
+        db.session.bulk_insert_mappings(PointsTransaction, [
+            {
+                'tenant_id': member.tenant_id,
+                'member_id': member.id,
+                'points': 5,
+                'remaining_points': 5,
+                'transaction_type': 'earn',
+                'source': 'purchase',
+                'expires_at': start + timedelta(days=365 + i),
+                'created_at': start + timedelta(days=i),
+            }
+            for i in range(self.LOT_COUNT)
+        ])
+        db.session.commit()
+
+        statements = []
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            if 'points_transactions' in statement:
+                statements.append(statement)
+
+        member_id = member.id
+        try:
+            event.listen(db.engine, 'before_cursor_execute', _count)
+            started = time.perf_counter()
+            consumed = service._consume_points_fifo(member_id, 102)
+            elapsed = time.perf_counter() - started
+            event.remove(db.engine, 'before_cursor_execute', _count)
+            db.session.commit()
+
+            print(f'\nFIFO consume over {self.LOT_COUNT} lots: {elapsed * 1000:.2f} ms, {len(statements)} statements')
+
+            assert consumed == 102
+            assert len([s for s in statements if s.lstrip().upper().startswith('SELECT')]) == 1
+            assert len([s for s in statements if s.lstrip().upper().startswith('UPDATE')]) == 1
+
+            remaining = [
+                row.remaining_points for row in db.session.query(PointsTransaction.remaining_points).filter(
+                    PointsTransaction.member_id == member.id
+                ).order_by(PointsTransaction.expires_at).limit(22)
+            ]
+            assert remaining == [0] * 20 + [3, 5]
+        finally:
+            if event.contains(db.engine, 'before_cursor_execute', _count):
+                event.remove(db.engine, 'before_cursor_execute', _count)
+            PointsTransaction.query.filter_by(member_id=member.id).delete()
+            db.session.commit()
@@ -0,0 +1,187 @@
+"""
+Tests for contention-safe reward redemption.
+
+Tests cover:
+- Stock taken atomically, even after a stale availability check
+- Insufficient points leaving balance and stock untouched
+- Idempotency keys replaying the original redemption, including a racing duplicate
+- Redeem endpoint responses and replay status
+- Over-long idempotency keys refused with a 400
+- Extension redemptions creating their Shopify discount code
+- Cancelling a redemption refunding points and stock once
+"""
+import uuid
+
+import pytest
+
+from app.extensions import db
+from app.models import Member, PointsTransaction
+from app.models.loyalty_points import Reward, RewardRedemption
+from app.services.reward_redemption import RedemptionError, RewardRedemptionEngine
+
+
+@pytest.fixture
+def reward(app, sample_tenant):
+    """A 100-point product reward with two units of stock."""
+    reward = Reward(
+        tenant_id=sample_tenant.id, name='Booster Box', reward_type='product',
+        points_cost=100, available_quantity=2, redeemed_quantity=0
+    )
+    db.session.add(reward)
+    db.session.commit()
+    yield reward
+    RewardRedemption.query.filter_by(reward_id=reward.id).delete()
+    db.session.delete(reward)
+    db.session.commit()
+
+
+def _member(tenant_id, points):
+    unique_id = str(uuid.uuid4())[:8]
+    member = Member(
+        tenant_id=tenant_id, member_number=f'TU{unique_id}', email=f'r-{unique_id}@example.com',
+        shopify_customer_id=f'cust_{unique_id}', status='active', points_balance=points
+    )
+    db.session.add(member)
+    db.session.commit()
+    return member
+
+
+class TestRewardRedemptionEngine:
+
+    def test_stock_cap_holds_after_stale_check(self, app, sample_tenant, reward, monkeypatch):
+        engine = RewardRedemptionEngine(sample_tenant.id)
+        # Every request passes the unlocked check, as racing requests would
+        monkeypatch.setattr(engine, '_check_available', lambda reward, member: None)
+        members = [_member(sample_tenant.id, 150) for _ in range(3)]
+
+        engine.redeem(reward.id, members[0].id, created_by='staff')
+        engine.redeem(reward.id, members[1].id, created_by='staff')
+        with pytest.raises(RedemptionError) as exc:
+            engine.redeem(reward.id, members[2].id, created_by='staff')
+
+        assert exc.value.code == 'OUT_OF_STOCK'
+        db.session.expire_all()
+        assert db.session.get(Reward, reward.id).redeemed_quantity == 2
+        assert [db.session.get(Member, m.id).points_balance for m in members] == [50, 50, 150]
+        assert PointsTransaction.query.filter_by(member_id=members[2].id).count() == 0
+
+    def test_insufficient_points(self, app, sample_tenant, reward):
+        member = _member(sample_tenant.id, 99)
+
+        with pytest.raises(RedemptionError) as exc:
+            RewardRedemptionEngine(sample_tenant.id).redeem(reward.id, member.id, created_by='staff')
+
+        assert exc.value.code == 'INSUFFICIENT_POINTS'
+        assert exc.value.details == {'points_balance': 99, 'points_needed': 100}
+        db.session.expire_all()
+        assert db.session.get(Member, member.id).points_balance == 99
+        assert db.session.get(Reward, reward.id).redeemed_quantity == 0
+
+    def test_idempotency_key_replays(self, app, sample_tenant, reward):
+        member = _member(sample_tenant.id, 300)
+        engine = RewardRedemptionEngine(sample_tenant.id)
+
+        first = engine.redeem(reward.id, member.id, created_by='staff', idempotency_key='retry-1')
+        second = engine.redeem(reward.id, member.id, created_by='staff', idempotency_key='retry-1')
+
+        assert second.replayed and second.redemption.id == first.redemption.id
+        assert first.new_balance == second.new_balance == 200
+        assert RewardRedemption.query.filter_by(member_id=member.id).count() == 1
+
+        other = _member(sample_tenant.id, 300)
+        with pytest.raises(RedemptionError) as exc:
+            engine.redeem(reward.id, other.id, created_by='staff', idempotency_key='retry-1')
+        assert exc.value.status == 422
+
+    def test_racing_duplicate_key_replays(self, app, sample_tenant, reward, monkeypatch):
+        member = _member(sample_tenant.id, 300)
+        engine = RewardRedemptionEngine(sample_tenant.id)
+        first = engine.redeem(reward.id, member.id, created_by='staff', idempotency_key='race-1')
+
+        # The racing request's replay check ran before the first one committed
+        original_replay = engine._replay
+        misses = []
+
+        def late_replay(*args):
+            if not misses:
+                misses.append(args)
+                return None
+            return original_replay(*args)
+
+        monkeypatch.setattr(engine, '_replay', late_replay)
+        second = engine.redeem(reward.id, member.id, created_by='staff', idempotency_key='race-1')
+
+        assert misses and second.replayed and second.redemption.id == first.redemption.id
+        db.session.expire_all()
+        assert db.session.get(Member, member.id).points_balance == 200
+        assert db.session.get(Reward, reward.id).redeemed_quantity == 1
+        assert PointsTransaction.query.filter_by(member_id=member.id).count() == 1
+
+
+class TestRedeemEndpoint:
+
+    def test_redeem_then_replay(self, client, auth_headers, sample_tenant, reward):
+        member = _member(sample_tenant.id, 250)
+        headers = {**auth_headers, 'Idempotency-Key': 'checkout-42'}
+        url = f'/api/rewards/{reward.id}/redeem'
+
+        response = client.post(url, headers=headers, json={'member_id': member.id})
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data['new_balance'] == 150
+        assert data['redemption']['status'] == 'pending'
+
+        replay = client.post(url, headers=headers, json={'member_id': member.id})
+        assert replay.status_code == 200
+        assert replay.get_json()['redemption']['id'] == data['redemption']['id']
+
+        short = client.post(url, headers=auth_headers, json={'member_id': _member(sample_tenant.id, 10).id})
+        assert short.status_code == 400
+        assert short.get_json()['points_needed'] == 100
+
+    def test_long_idempotency_key_rejected(self, client, auth_headers, sample_tenant, reward):
+        member = _member(sample_tenant.id, 250)
+        headers = {**auth_headers, 'Idempotency-Key': 'k' * 101}
+
+        response = client.post(f'/api/rewards/{reward.id}/redeem', headers=headers, json={'member_id': member.id})
+        assert response.status_code == 400
+        assert RewardRedemption.query.filter_by(member_id=member.id).count() == 0
+
+    def test_extension_redeem_creates_discount(self, client, sample_tenant, monkeypatch):
+        reward = Reward(
+            tenant_id=sample_tenant.id, name='$5 Off', reward_type='discount',
+            points_cost=100, discount_amount=5
+        )
+        db.session.add(reward)
+        db.session.commit()
+        member = _member(sample_tenant.id, 250)
+        created = []
+        monkeypatch.setattr(RewardRedemptionEngine, 'create_shopify_discount',
+                            lambda self, result, member: created.append(result.redemption.voucher_code))
+
+        url = f'/api/customer/extension/rewards/{reward.id}/redeem'
+        body = {'customer_id': member.shopify_customer_id, 'idempotency_key': 'ext-1'}
+        response = client.post(url, json=body)
+        assert response.status_code == 201
+        assert created == [response.get_json()['redemption']['discount_code']]
+
+        assert client.post(url, json=body).status_code == 200
+        assert len(created) == 1
+
+        RewardRedemption.query.filter_by(reward_id=reward.id).delete()
+        db.session.delete(reward)
+        db.session.commit()
+
+    def test_cancel_refunds_once(self, client, auth_headers, sample_tenant, reward):
+        member = _member(sample_tenant.id, 100)
+        redemption = RewardRedemptionEngine(sample_tenant.id).redeem(reward.id, member.id, created_by='staff').redemption
+        url = f'/api/rewards/redemptions/{redemption.id}/cancel'
+
+        response = client.post(url, headers=auth_headers, json={'reason': 'Out of stock in store'})
+        assert response.status_code == 200
+        assert response.get_json()['new_balance'] == 100
+        assert client.post(url, headers=auth_headers, json={'reason': 'again'}).status_code == 400
+
+        db.session.expire_all()
+        assert db.session.get(Member, member.id).points_balance == 100
+        assert db.session.get(Reward, reward.id).redeemed_quantity == 0
@@ -0,0 +1,320 @@
+"""
+Tests for the vectorised rule simulator.
+
+Tests cover:
+- Earning rule masks, rates and caps match EarningRule.calculate_points
+- Promotion channel and product filters (via the catalog mirror)
+- Cashback campaign eligibility and budget exhaustion
+- Simulation over a million synthetic orders
+- The history cache dropping expired entries and capping its size
+- The /api/analytics/simulate endpoint, exporting in a background run
+"""
+import time
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.extensions import db
+from app.models import CatalogProduct
+from app.models.cashback_campaign import CashbackCampaign
+from app.models.loyalty_points import EarningRule
+from app.models.promotions import Promotion
+from app.models import SimulationRun
+from app.services import rule_simulator
+from app.services.rule_simulator import (
+    OrderHistory, RuleSimulator, NO_TIMESTAMP, cached_order_history, invalidate_order_history_cache,
+    load_order_history
+)
+
+GOLD = SimpleNamespace(id=1, name='Gold', benefits={'points_per_dollar': 2})
+SILVER = SimpleNamespace(id=2, name='Silver', benefits={})
+
+MEMBERS = [
+    SimpleNamespace(id=10, shopify_customer_id='100', tier_id=1, status='active',
+                    created_at=datetime(2026, 1, 1), first_purchase_at=None),
+    SimpleNamespace(id=11, shopify_customer_id='101', tier_id=2, status='active',
+                    created_at=datetime(2025, 1, 1), first_purchase_at=datetime(2025, 2, 1)),
+    SimpleNamespace(id=12, shopify_customer_id='102', tier_id=1, status='cancelled',
+                    created_at=datetime(2025, 1, 1), first_purchase_at=None),
+]
+
+
+def _order(order_id, customer_id, total, created_at, source='web', items=None):
+    return {
+        'id': order_id,
+        'created_at': created_at,
+        'source_name': source,
+        'total_price': str(total),
+        'customer': {'id': customer_id} if customer_id else None,
+        'line_items': items or [],
+    }
+
+
+ORDERS = [
+    _order(1, 100, 120, '2026-03-01T10:00:00Z', items=[
+        {'product_id': 501, 'price': '100.00', 'quantity': 1},
+        {'product_id': 502, 'price': '10.00', 'quantity': 2},
+    ]),
+    _order(2, 100, 40, '2026-03-05T10:00:00Z', source='pos', items=[
+        {'product_id': 502, 'price': '20.00', 'quantity': 2},
+    ]),
+    _order(3, 101, 300, '2026-03-02T10:00:00Z', items=[
+        {'product_id': 501, 'price': '300.00', 'quantity': 1},
+    ]),
+    _order(4, 102, 80, '2026-03-03T10:00:00Z'),   # Cancelled member: customer, not member
+    _order(5, None, 60, '2026-03-04T10:00:00Z', source='pos'),  # Guest checkout
+]
+
+
+@pytest.fixture
+def history():
+    return OrderHistory.build(ORDERS, MEMBERS, [GOLD, SILVER])
+
+
+class TestOrderHistory:
+    """Test packing orders into columns."""
+
+    def test_build(self, history):
+        """Should index customers, members, tiers and line items."""
+        assert history.n_orders == 5
+        assert history.n_customers == 3
+        assert list(history.customer_idx) == [0, 0, 1, 2, -1]
+        assert list(history.order_is_member()) == [True, True, True, False, False]
+        assert list(history.order_tier()) == [0, 0, 1, -1, -1]
+        assert list(history.item_amount_per_order(history.item_product == 502)) == [20.0, 40.0, 0, 0, 0]
+        assert history.first_purchase_at[1] != NO_TIMESTAMP
+
+        # Customer 101 bought before the period, so only 100 and 102 have a first order here
+        assert list(history.first_order()) == [True, False, False, True, False]
+
+
+class TestEarningRuleSimulation:
+    """Test earning rule masks and arithmetic."""
+
+    def test_base_rate_matches_calculate_points(self, history):
+        """Totals should equal the per-order model calculation for eligible orders."""
+        rule = EarningRule(
+            name='Double points', rule_type='base_rate', points_per_dollar=2,
+            min_order_value=Decimal('50'), max_order_value=Decimal('200'), max_points_per_order=300
+        )
+        result = RuleSimulator(1, history).simulate_earning_rule(rule)
+
+        # Member orders only; order 2 is below the minimum
+        expected = rule.calculate_points(Decimal('120')) + rule.calculate_points(Decimal('300'))
+        assert result.total == expected == 240 + 300
+        assert result.orders_rewarded == 2
+        assert result.by_tier == {
+            'Gold': {'total': 240, 'orders_rewarded': 1},
+            'Silver': {'total': 300, 'orders_rewarded': 1},
+        }
+        assert result.distribution['customers_rewarded'] == 2
+        assert result.distribution['top_customers'][0]['member_id'] == 11
+
+    def test_conditions_and_caps(self, history):
+        """Tier restriction, first purchase, multiplier and per-member caps."""
+        simulator = RuleSimulator(1, history)
+
+        gold_only = EarningRule(name='Gold bonus', rule_type='bonus_points', bonus_points=50,
+                                tier_restriction='["gold"]', max_uses_per_member=1)
+        result = simulator.simulate_earning_rule(gold_only)
+        assert result.total == 50
+        assert list(np.flatnonzero(result.awards)) == [0]  # Earliest Gold order only
+
+        welcome = EarningRule(name='Welcome', rule_type='bonus_points', bonus_points=100, new_member_only=True)
+        assert simulator.simulate_earning_rule(welcome).total == 100
+
+        # 2x: extra points equal to tier base points (Gold earns 2/$, Silver default 1/$)
+        double = EarningRule(name='2x', rule_type='multiplier', multiplier=Decimal('2.0'))
+        assert simulator.simulate_earning_rule(double).total == 240 + 80 + 300
+
+    def test_respect_schedule(self, history):
+        """Rule windows only apply when requested."""
+        rule = EarningRule(name='Spring', rule_type='bonus_points', bonus_points=10,
+                           starts_at=datetime(2026, 3, 4), ends_at=datetime(2026, 3, 31))
+        simulator = RuleSimulator(1, history)
+        assert simulator.simulate_earning_rule(rule).total == 30
+        assert simulator.simulate_earning_rule(rule, respect_schedule=True).total == 10
+
+
+class TestPromotionSimulation:
+    """Test purchase promotion simulation."""
+
+    def test_channel_audience_and_collections(self, app, sample_tenant, history):
+        """Collection filters should count only qualifying line items."""
+        db.session.add_all([
+            CatalogProduct(tenant_id=sample_tenant.id, product_id=501, tags=[],
+                           collection_ids=['gid://shopify/Collection/1']),
+            CatalogProduct(tenant_id=sample_tenant.id, product_id=502, tags=['sale'], collection_ids=[]),
+        ])
+        db.session.commit()
+        try:
+            simulator = RuleSimulator(sample_tenant.id, history)
+
+            in_store = Promotion(name='POS 10%', promo_type='purchase_cashback', bonus_percent=Decimal('10'),
+                                 channel='in_store', audience='all_customers',
+                                 starts_at=datetime(2026, 1, 1), ends_at=datetime(2026, 12, 31))
+            result = simulator.simulate_promotion(in_store)
+            assert result.total == 10.0  # Orders 2 (member) and 5 (guest)
+            assert result.by_tier['No tier'] == {'total': 6.0, 'orders_rewarded': 1}
+
+            cards = Promotion(name='Cards 5%', promo_type='purchase_cashback', bonus_percent=Decimal('5'),
+                              channel='all', collection_ids='["gid://shopify/Collection/1"]',
+                              starts_at=datetime(2026, 1, 1), ends_at=datetime(2026, 12, 31))
+            assert simulator.simulate_promotion(cards).total == 20.0  # 5% of 100 + 300
+
+            tagged = Promotion(name='Sale flat', promo_type='flat_bonus', bonus_flat=Decimal('3'),
+                               product_tags_filter='["SALE"]',
+                               starts_at=datetime(2026, 1, 1), ends_at=datetime(2026, 12, 31))
+            assert simulator.simulate_promotion(tagged).orders_rewarded == 2
+        finally:
+            CatalogProduct.query.filter_by(tenant_id=sample_tenant.id).delete()
+            db.session.commit()
+
+
+class TestCashbackCampaignSimulation:
+    """Test cashback campaign simulation."""
+
+    def test_budget_and_caps(self, history):
+        """Per-order cap, per-customer limit and budget should apply in time order."""
+        campaign = CashbackCampaign(
+            name='10% back', cashback_rate=Decimal('10'), max_cashback=Decimal('20'),
+            max_uses_per_customer=1, max_total_cashback=Decimal('30'),
+            start_date=datetime(2026, 1, 1), end_date=datetime(2026, 12, 31)
+        )
+        result = RuleSimulator(1, history).simulate_cashback_campaign(campaign)
+
+        # First orders per customer in time order: 12 (order 1), 20 capped (order 3), 8 (order 4) -> budget 30
+        assert list(result.awards) == [12.0, 0.0, 18.0, 0.0, 0.0]
+        assert result.total == 30.0
+
+    def test_new_customers_only(self, history):
+        campaign = CashbackCampaign(
+            name='Welcome back', cashback_rate=Decimal('5'), applies_to_existing_customers=False,
+            start_date=datetime(2026, 1, 1), end_date=datetime(2026, 12, 31)
+        )
+        result = RuleSimulator(1, history).simulate_cashback_campaign(campaign)
+        assert result.orders_rewarded == 2
+        assert result.total == 10.0
+
+
+class TestSimulationScale:
+    """Test simulation over a large synthetic history."""
+
+    def test_million_orders(self):
+        """All three candidate types should evaluate a million orders in seconds."""
+        rng = np.random.default_rng(7)
+        n_orders, n_customers = 1_000_000, 50_000
+        items_per_order = 3
+        history = OrderHistory(
+            order_total=rng.gamma(2.0, 40.0, n_orders),
+            created_at=1767225600 + rng.integers(0, 90 * 86400, n_orders),
+            customer_idx=rng.integers(-1, n_customers, n_orders).astype(np.int32),
+            in_store=rng.random(n_orders) < 0.3,
+            item_order=np.repeat(np.arange(n_orders, dtype=np.int32), items_per_order),
+            item_product=rng.integers(1, 5000, n_orders * items_per_order),
+            item_amount=rng.gamma(2.0, 13.0, n_orders * items_per_order),
+            customer_ids=np.arange(1, n_customers + 1, dtype=np.int64),
+            customer_member_id=np.where(rng.random(n_customers) < 0.6, np.arange(1, n_customers + 1), 0),
+            customer_tier=rng.integers(-1, 2, n_customers).astype(np.int32),
+            member_created_at=np.full(n_customers, 1735689600, dtype=np.int64),
+            first_purchase_at=np.full(n_customers, NO_TIMESTAMP, dtype=np.int64),
+            tier_names=['Gold', 'Silver'],
+            tier_points_rate=np.array([2.0, 1.0]),
+        )
+        simulator = RuleSimulator(1, history)
+        simulator._catalog = [(pid, set(), {'sale'} if pid % 10 == 0 else set(), '', '') for pid in range(1, 5000)]
+
+        started = time.perf_counter()
+        rule = simulator.simulate_earning_rule(EarningRule(
+            name='Sale 3x', rule_type='base_rate', points_per_dollar=3,
+            product_tags_filter='["sale"]', tier_restriction='["Gold"]', max_uses_per_member=5
+        ))
+        promo = simulator.simulate_promotion(Promotion(
+            name='POS 5%', promo_type='purchase_cashback', bonus_percent=Decimal('5'), channel='in_store',
+            starts_at=datetime(2026, 1, 1), ends_at=datetime(2026, 12, 31)
+        ))
+        campaign = simulator.simulate_cashback_campaign(CashbackCampaign(
+            name='Q1', cashback_rate=Decimal('2'), max_total_cashback=Decimal('50000'),
+            start_date=datetime(2026, 1, 1), end_date=datetime(2026, 3, 31)
+        ))
+        elapsed = time.perf_counter() - started
+
+        assert rule.total > 0 and set(rule.by_tier) == {'Gold'}
+        assert promo.orders_rewarded > 0
+        assert campaign.total == pytest.approx(50000.0, abs=0.01)
+        assert elapsed < 10
+
+
+class TestHistoryCache:
+    """Test the per-process order history cache."""
+
+    def test_expired_and_least_recent_evicted(self, app, sample_tenant, monkeypatch):
+        invalidate_order_history_cache()
+        monkeypatch.setattr(rule_simulator, 'HISTORY_CACHE_SIZE', 2)
+        monkeypatch.setattr(rule_simulator, '_fetch_raw_orders', lambda *args: iter(ORDERS))
+
+        load_order_history(sample_tenant.id, '2026-01-01', '2026-01-31')
+        load_order_history(sample_tenant.id, '2026-02-01', '2026-02-28')
+        assert cached_order_history(sample_tenant.id, '2026-01-01', '2026-01-31') is not None
+
+        # January was used last, so February is evicted
+        load_order_history(sample_tenant.id, '2026-03-01', '2026-03-31')
+        assert cached_order_history(sample_tenant.id, '2026-02-01', '2026-02-28') is None
+        assert cached_order_history(sample_tenant.id, '2026-01-01', '2026-01-31') is not None
+
+        # Expired entries are dropped when the next history is stored
+        for key, (_, history) in list(rule_simulator._history_cache.items()):
+            rule_simulator._history_cache[key] = (0, history)
+        load_order_history(sample_tenant.id, '2026-04-01', '2026-04-30')
+        assert list(rule_simulator._history_cache) == [(sample_tenant.id, '2026-04-01', '2026-04-30')]
+        invalidate_order_history_cache()
+
+
+class TestSimulateEndpoint:
+    """Test POST /api/analytics/simulate."""
+
+    def test_simulate(self, client, app, sample_tenant, auth_headers):
+        invalidate_order_history_cache()
+        body = {
+            'start_date': '2026-03-01', 'end_date': '2026-03-31',
+            'candidates': [
+                {'type': 'cashback_campaign', 'config': {
+                    'name': 'Draft', 'cashback_rate': 10,
+                    'start_date': '2026-01-01T00:00:00Z', 'end_date': '2026-12-31T00:00:00Z'
+                }},
+            ],
+        }
+        with patch('app.services.rule_simulator._fetch_raw_orders', return_value=iter(ORDERS)) as fetch:
+            # Not loaded yet: exported by a background run (inline under TESTING)
+            queued = client.post('/api/analytics/simulate', headers=auth_headers, json=body)
+            assert queued.status_code == 202
+            run_id = queued.get_json()['run_id']
+
+            response = client.get(f'/api/analytics/simulate/{run_id}', headers=auth_headers)
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data['status'] == 'done'
+            assert data['orders'] == 5
+            assert data['results'][0]['unit'] == 'credit'
+            assert data['results'][0]['total'] == 60.0
+
+            # Loaded now: answered in the request
+            cached = client.post('/api/analytics/simulate', headers=auth_headers, json=body)
+            assert cached.status_code == 200
+            assert cached.get_json()['results'][0]['total'] == 60.0
+            assert fetch.call_count == 1
+
+        SimulationRun.query.filter_by(tenant_id=sample_tenant.id).delete()
+        db.session.commit()
+        invalidate_order_history_cache()
+
+    def test_invalid_candidate(self, client, sample_tenant, auth_headers):
+        response = client.post('/api/analytics/simulate', headers=auth_headers, json={
+            'candidates': [{'type': 'reward'}],
+        })
+        assert response.status_code == 400
+        invalidate_order_history_cache()
@@ -412,7 +412,7 @@ class TestBalanceRecalculation:
         """Test recalculating member balance from ledger."""
         with app.app_context():
             from app.models import Member
-            from app.services.scheduled_tasks import ScheduledTasksService
+            from app.services.credit_expiration import CreditExpirationEngine
             from app.models.promotions import StoreCreditLedger, MemberCreditBalance
             from app.extensions import db
 
@@ -450,8 +450,8 @@ class TestBalanceRecalculation:
             db.session.add_all([entry1, entry2, entry3])
             db.session.commit()
 
-            service = ScheduledTasksService()
-            service._recalculate_member_balance(member.id)
+            CreditExpirationEngine(member.tenant_id)._recompute_balances([member.id])
+            db.session.commit()
 
             balance = MemberCreditBalance.query.filter_by(member_id=member.id).first()
             assert balance is not None
@@ -0,0 +1,53 @@
+"""
+Tests for the search service.
+
+Tests cover:
+- Trade ledger list filtering through the shared search clause
+- Ranked ledger search (reference prefix first)
+"""
+import uuid
+
+import pytest
+
+from app.extensions import db
+from app.models import TradeInLedger
+from app.services.search_service import search_ledger
+
+
+@pytest.fixture
+def ledger_entries(app, sample_tenant):
+    """Ledger entries with distinct references, guests and notes."""
+    with app.app_context():
+        tag = uuid.uuid4().hex[:6]
+        entries = [
+            TradeInLedger(tenant_id=sample_tenant.id, reference=f'TI-{tag}-001',
+                          guest_name='Dana Guest', total_value=10, notes=f'binder ref TI-{tag}-002'),
+            TradeInLedger(tenant_id=sample_tenant.id, reference=f'TI-{tag}-002',
+                          guest_name='Evan Guest', total_value=20, category='Pokemon'),
+            TradeInLedger(tenant_id=sample_tenant.id, reference=f'TI-{tag}-003',
+                          guest_name='Fran Guest', total_value=30, notes='Sealed booster box'),
+        ]
+        db.session.add_all(entries)
+        db.session.commit()
+        yield tag, [e.id for e in entries]
+        TradeInLedger.query.filter(TradeInLedger.id.in_([e.id for e in entries])).delete(synchronize_session=False)
+        db.session.commit()
+
+
+class TestLedgerSearch:
+    """Test trade ledger search."""
+
+    def test_list_entries_search(self, client, auth_headers, ledger_entries):
+        """Should match guest name, category and notes case-insensitively."""
+        _, ids = ledger_entries
+        for term, expected in (('fran', ids[2]), ('POKEMON', ids[1]), ('booster', ids[2])):
+            response = client.get(f'/api/trade-ledger/?search={term}', headers=auth_headers)
+            assert response.status_code == 200
+            assert [e['id'] for e in response.get_json()['entries']] == [expected]
+
+    def test_search_ranks_reference_prefix_first(self, app, sample_tenant, ledger_entries):
+        """Reference matches should outrank mentions in notes."""
+        tag, ids = ledger_entries
+        with app.app_context():
+            results = search_ledger(sample_tenant.id, f'ti-{tag}-002')
+            assert [e.id for e in results] == [ids[1], ids[0]]
@@ -0,0 +1,116 @@
+"""
+Tests for blueprint registration and the cached SPA shell.
+
+Tests cover:
+- Every blueprint registered in create_app, with load time recorded
+- SPA shell rendered once from memory with escaped context
+- Malformed shop/host rejected before caching
+- ETag revalidation and compressed variants on /app
+"""
+import gzip
+import os
+import subprocess
+import sys
+
+import pytest
+from flask import Flask
+
+from app.startup import BLUEPRINTS, BlueprintLoader, BlueprintSpec, SpaShell
+
+TIERS = BlueprintSpec('.api.tiers', 'tiers_bp', '/api/tiers')
+POINTS = BlueprintSpec('.api.points', 'points_bp', '/api/points')
+
+
+class TestBlueprintLoader:
+
+    def test_registers_and_times_each_blueprint(self):
+        flask_app = Flask(__name__)
+        loader = BlueprintLoader(flask_app, (TIERS, POINTS))
+        loader.load_all()
+        loader.load_all()  # Idempotent
+
+        assert set(loader.load_times) == {'tiers_bp', 'points_bp'}
+        assert 'tiers.list_promotions' in flask_app.view_functions
+        assert any(rule.rule.startswith('/api/points') for rule in flask_app.url_map.iter_rules())
+
+    def test_app_registers_every_blueprint(self, app):
+        loader = app.extensions['blueprint_loader']
+        assert len(loader.load_times) == len(BLUEPRINTS) == 55
+        rules = {rule.rule for rule in app.url_map.iter_rules()}
+        assert '/api/tiers/promotions' in rules and any(rule.startswith('/proxy') for rule in rules)
+
+    def test_boot_does_not_import_sendgrid(self):
+        # Fresh process: other tests may already have sent (mocked) email
+        code = ("import sys; from app import create_app; create_app('testing'); "
+                "assert 'app.services.email_service' in sys.modules; "
+                "assert 'sendgrid' not in sys.modules")
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        assert result.returncode == 0, result.stderr[-2000:]
+
+
+class TestSpaShell:
+
+    def test_renders_from_memory(self, tmp_path):
+        index = tmp_path / 'index.html'
+        index.write_text('<html><head><title>TradeUp</title></head><body></body></html>')
+        shell = SpaShell(str(index))
+        shell.load()
+        index.unlink()
+
+        html = shell.html('a.myshopify.com', '', 'key', 'https://app.example.com')
+        assert 'shop: "a.myshopify.com"' in html
+        assert 'host: null' in html
+        assert html.index('__TRADEUP_CONFIG__') < html.index('</head>')
+
+        injected = shell.html('x"</script><script>alert(1)//', '', 'key', 'https://app.example.com')
+        assert '</script><script>alert' not in injected
+
+        first = shell.render('a.myshopify.com', '', 'key', 'https://app.example.com')
+        assert shell.render('a.myshopify.com', '', 'key', 'https://app.example.com') is first
+        body, _ = first.variants['identity']
+        assert 'gzip' not in first.variants
+        assert gzip.decompress(first.variant('gzip')[0]) == body
+        assert first.variant('gzip') is first.variants['gzip']
+
+    def test_rejects_malformed_context(self, tmp_path):
+        shell = SpaShell(str(tmp_path / 'missing.html'))
+        for shop, host in (('x"</script>', ''), ('evil.example.com', ''), ('a.myshopify.com', 'a b')):
+            with pytest.raises(ValueError):
+                shell.render(shop, host, 'key', 'https://app.example.com')
+        assert not shell._rendered
+        shell.render('a.myshopify.com', 'YWRtaW4uc2hvcGlmeS5jb20vc3RvcmUvYQ', 'key', 'https://app.example.com')
+        assert len(shell._rendered) == 1
+
+    def test_missing_build_renders_notice(self, tmp_path):
+        shell = SpaShell(str(tmp_path / 'missing.html'))
+        assert 'Frontend Build Not Found' in shell.html('', '', '', '')
+
+
+class TestShopifyAppRoute:
+
+    def test_etag_revalidation(self, client):
+        response = client.get('/app?shop=a.myshopify.com', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert response.headers['Cache-Control'] == 'no-cache, must-revalidate'
+        etag = response.headers['ETag']
+
+        revalidated = client.get('/app?shop=a.myshopify.com', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': etag,
+        })
+        assert revalidated.status_code == 304
+
+        other_shop = client.get('/app?shop=b.myshopify.com', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': etag,
+        })
+        assert other_shop.status_code == 200
+
+        plain = client.get('/app?shop=a.myshopify.com', headers={'If-None-Match': etag})
+        assert plain.status_code == 200
+        assert 'Content-Encoding' not in plain.headers
+        assert b'window.__TRADEUP_CONFIG__' in plain.data
+
+    def test_malformed_shop_rejected(self, client):
+        assert client.get('/app?shop=%3Cscript%3E').status_code == 400
@@ -383,11 +383,11 @@ class TestFetchOrders:
         ]
 
         service = StoreCreditEventsService('test.myshopify.com', 'token')
-        orders = service.fetch_orders(
+        orders = list(service.fetch_orders(
             '2026-01-24T17:00:00Z',
             '2026-01-24T20:00:00Z',
             sources=['pos']
-        )
+        ))
 
         assert len(orders) == 1
         assert orders[0].total_price == Decimal('100.00')
@@ -417,12 +417,12 @@ class TestFetchOrders:
         ]
 
         service = StoreCreditEventsService('test.myshopify.com', 'token')
-        orders = service.fetch_orders(
+        orders = list(service.fetch_orders(
             '2026-01-24T17:00:00Z',
             '2026-01-24T20:00:00Z',
             sources=['pos'],
             collection_ids=['gid://shopify/Collection/1001']
-        )
+        ))
 
         assert len(orders) == 1
         assert orders[0].total_price == Decimal('100.00')
@@ -451,12 +451,12 @@ class TestFetchOrders:
         ]
 
         service = StoreCreditEventsService('test.myshopify.com', 'token')
-        orders = service.fetch_orders(
+        orders = list(service.fetch_orders(
             '2026-01-24T17:00:00Z',
             '2026-01-24T20:00:00Z',
             sources=['pos'],
             collection_ids=['gid://shopify/Collection/1001']
-        )
+        ))
 
         # Order should be skipped - no qualifying items
         assert len(orders) == 0
@@ -488,11 +488,11 @@ class TestFetchOrders:
         ]
 
         service = StoreCreditEventsService('test.myshopify.com', 'token')
-        orders = service.fetch_orders(
+        orders = list(service.fetch_orders(
             '2026-01-24T17:00:00Z',
             '2026-01-24T20:00:00Z',
             sources=['pos']  # Only POS
-        )
+        ))
 
         assert len(orders) == 1
         assert orders[0].source_name == 'Point of Sale'
@@ -524,12 +524,12 @@ class TestFetchOrders:
         ]
 
         service = StoreCreditEventsService('test.myshopify.com', 'token')
-        orders = service.fetch_orders(
+        orders = list(service.fetch_orders(
             '2026-01-24T17:00:00Z',
             '2026-01-24T20:00:00Z',
             sources=[],
             include_authorized=False  # Only paid
-        )
+        ))
 
         assert len(orders) == 1
         assert orders[0].financial_status == 'paid'
@@ -896,3 +896,282 @@ class TestIntegrationScenarios:
         # Only customer A should be included
         assert result['unique_customers'] == 1
         assert result['total_credit_amount'] == 10.0  # 10% of $100
+
+
+class TestBulkOperationFetch:
+    """Test the Bulk Operations order export path."""
+
+    def _bulk_lines(self):
+        return [
+            {
+                'id': 'gid://shopify/Order/1',
+                'name': '#1001',
+                'createdAt': '2026-01-24T17:00:00Z',
+                'sourceName': 'pos',
+                'displayFinancialStatus': 'PAID',
+                'totalPriceSet': {'shopMoney': {'amount': '100.00'}},
+                'customer': {
+                    'id': 'gid://shopify/Customer/100',
+                    'email': 'a@test.com',
+                    'firstName': 'A',
+                    'lastName': 'Buyer',
+                    'tags': ['vip']
+                }
+            },
+            {
+                'id': 'gid://shopify/LineItem/11',
+                'quantity': 1,
+                'product': {'id': 'gid://shopify/Product/1'},
+                'originalUnitPriceSet': {'shopMoney': {'amount': '60.00'}},
+                '__parentId': 'gid://shopify/Order/1'
+            },
+            {
+                'id': 'gid://shopify/LineItem/12',
+                'quantity': 2,
+                'product': {'id': 'gid://shopify/Product/5'},
+                'originalUnitPriceSet': {'shopMoney': {'amount': '20.00'}},
+                '__parentId': 'gid://shopify/Order/1'
+            },
+            {
+                'id': 'gid://shopify/Order/2',
+                'name': '#1002',
+                'createdAt': '2026-01-24T18:00:00Z',
+                'sourceName': 'web',
+                'displayFinancialStatus': 'AUTHORIZED',
+                'totalPriceSet': {'shopMoney': {'amount': '50.00'}},
+                'customer': None
+            },
+        ]
+
+    @patch('app.services.store_credit_events.time.sleep')
+    @patch.object(StoreCreditEventsService, '_execute_graphql')
+    def test_waits_for_completion(self, mock_graphql, mock_sleep):
+        """Should poll until COMPLETED and return the result URL."""
+        mock_graphql.side_effect = [
+            {'node': {'id': 'gid://shopify/BulkOperation/9', 'status': 'RUNNING'}},
+            {'node': {'id': 'gid://shopify/BulkOperation/9', 'status': 'COMPLETED',
+                      'objectCount': '4', 'url': 'https://storage.example.com/result.jsonl'}},
+        ]
+
+        service = StoreCreditEventsService('test.myshopify.com', 'token')
+        url = service._wait_for_bulk_operation('gid://shopify/BulkOperation/9')
+
+        assert url == 'https://storage.example.com/result.jsonl'
+        assert mock_sleep.call_count == 1
+
+    @patch.object(StoreCreditEventsService, '_execute_graphql')
+    def test_failed_operation_raises(self, mock_graphql):
+        """Should raise when the bulk operation fails."""
+        mock_graphql.return_value = {
+            'node': {'id': 'gid://shopify/BulkOperation/9', 'status': 'FAILED', 'errorCode': 'TIMEOUT'}
+        }
+
+        service = StoreCreditEventsService('test.myshopify.com', 'token')
+        with pytest.raises(Exception, match='failed'):
+            service._wait_for_bulk_operation('gid://shopify/BulkOperation/9')
+
+    @patch.object(StoreCreditEventsService, '_stream_jsonl')
+    @patch.object(StoreCreditEventsService, '_wait_for_bulk_operation')
+    @patch.object(StoreCreditEventsService, '_start_bulk_query')
+    def test_regroups_line_items_under_orders(self, mock_start, mock_wait, mock_stream):
+        """Should attach child line items to their parent order in REST shape."""
+        mock_start.return_value = 'gid://shopify/BulkOperation/9'
+        mock_wait.return_value = 'https://storage.example.com/result.jsonl'
+        mock_stream.return_value = iter(self._bulk_lines())
+
+        service = StoreCreditEventsService('test.myshopify.com', 'token')
+        orders = list(service._fetch_orders_bulk(
+            '2026-01-24T17:00:00Z', '2026-01-24T20:00:00Z', include_line_items=True
+        ))
+
+        assert len(orders) == 2
+        assert orders[0]['id'] == 1
+        assert orders[0]['financial_status'] == 'paid'
+        assert orders[0]['customer']['id'] == 100
+        assert orders[0]['customer']['tags'] == 'vip'
+        assert orders[0]['line_items'] == [
+            {'product_id': 1, 'price': '60.00', 'quantity': 1},
+            {'product_id': 5, 'price': '20.00', 'quantity': 2},
+        ]
+        assert orders[1]['customer'] is None
+        assert 'lineItems' in mock_start.call_args[0][0]
+
+    @patch.object(StoreCreditEventsService, '_stream_jsonl')
+    @patch.object(StoreCreditEventsService, '_wait_for_bulk_operation')
+    @patch.object(StoreCreditEventsService, '_start_bulk_query')
+    @patch.object(StoreCreditEventsService, '_get_collection_product_ids')
+    def test_preview_with_bulk_mode(self, mock_collection, mock_start, mock_wait, mock_stream):
+        """Should stream bulk results through the same filter and credit stages."""
+        mock_collection.return_value = {1}
+        mock_start.return_value = 'gid://shopify/BulkOperation/9'
+        mock_wait.return_value = 'https://storage.example.com/result.jsonl'
+        mock_stream.return_value = iter(self._bulk_lines())
+
+        service = StoreCreditEventsService('test.myshopify.com', 'token')
+        result = service.preview_event(
+            '2026-01-24T17:00:00Z',
+            '2026-01-24T20:00:00Z',
+            sources=[],
+            credit_percent=10.0,
+            collection_ids=['gid://shopify/Collection/1001'],
+            fetch_mode='bulk'
+        )
+
+        # Only order 1 has a qualifying item ($60 of $100)
+        assert result['total_orders'] == 1
+        assert result['unique_customers'] == 1
+        assert result['total_credit_amount'] == 6.0
+        assert result['by_source'] == {'pos': 1}
+
+    @patch.object(StoreCreditEventsService, '_wait_for_bulk_operation')
+    @patch.object(StoreCreditEventsService, '_start_bulk_query')
+    def test_empty_result_yields_nothing(self, mock_start, mock_wait):
+        """Should yield no orders when the export has no URL."""
+        mock_start.return_value = 'gid://shopify/BulkOperation/9'
+        mock_wait.return_value = None
+
+        service = StoreCreditEventsService('test.myshopify.com', 'token')
+        assert list(service._fetch_orders_bulk('2026-01-24', '2026-01-25')) == []
+
+    def test_rejects_unknown_fetch_mode(self):
+        """Should reject fetch modes other than rest/bulk."""
+        service = StoreCreditEventsService('test.myshopify.com', 'token')
+        with pytest.raises(ValueError, match='fetch_mode'):
+            service.fetch_orders('2026-01-24', '2026-01-25', [], fetch_mode='graphql')
+
+
+class TestStreamingPipeline:
+    """Test lazy order fetching and preview credit reuse."""
+
+    def _rest_order(self, order_id, customer_id, total='100.00'):
+        return {
+            'id': order_id,
+            'name': f'#{order_id}',
+            'total_price': total,
+            'source_name': 'pos',
+            'created_at': '2026-02-01T17:00:00Z',
+            'financial_status': 'paid',
+            'customer': {'id': customer_id, 'email': f'{customer_id}@test.com',
+                         'first_name': 'C', 'last_name': str(customer_id), 'tags': ''},
+            'line_items': []
+        }
+
+    @patch.object(StoreCreditEventsService, '_execute_rest')
+    def test_fetch_orders_is_lazy(self, mock_rest):
+        """Should not call Shopify until the iterator is consumed, then page on demand."""
+        mock_rest.side_effect = [
+            ({'orders': [self._rest_order(1, 100)]},
+             {'link': '<https://test.myshopify.com/admin/api/2024-01/orders.json?page_info=abc>; rel="next"'}),
+            ({'orders': [self._rest_order(2, 200)]}, {}),
+        ]
+
+        service = StoreCreditEventsService('test.myshopify.com', 'token')
+        orders = service.fetch_orders('2026-02-01', '2026-02-02', sources=[])
+        assert mock_rest.call_count == 0
+
+        first = next(orders)
+        assert first.id == 'gid://shopify/Order/1'
+        assert mock_rest.call_count == 1
+
+        assert [o.id for o in orders] == ['gid://shopify/Order/2']
+        assert mock_rest.call_count == 2
+
+    def test_fetch_orders_validates_eagerly(self):
+        """Should reject bad datetimes at call time, not on first iteration."""
+        service = StoreCreditEventsService('test.myshopify.com', 'token')
+        with pytest.raises(ValueError, match='invalid format'):
+            service.fetch_orders('01/24/2026', '2026-02-02', sources=[])
+
+    @patch.object(StoreCreditEventsService, '_fetch_customer_tags', return_value={})
+    @patch.object(StoreCreditEventsService, 'add_customer_tag')
+    @patch.object(StoreCreditEventsService, 'apply_credit')
+    @patch.object(StoreCreditEventsService, '_fetch_orders_rest')
+    def test_run_reuses_preview_credits(self, mock_rest, mock_apply, mock_tag, mock_tags, app):
+        """Should fetch orders once for a preview followed by a matching run."""
+        mock_rest.side_effect = lambda *args, **kwargs: iter([
+            self._rest_order(1, 100),
+            self._rest_order(2, 100, '50.00'),
+        ])
+        mock_apply.return_value = CreditResult(
+            customer_id='gid://shopify/Customer/100',
+            customer_email=None,
+            credit_amount=15.0,
+            success=True
+        )
+
+        with app.app_context():
+            service = StoreCreditEventsService('reuse-test.myshopify.com', 'token')
+            preview = service.preview_event(
+                '2026-02-01T00:00:00Z', '2026-02-02T00:00:00Z',
+                sources=['pos'], credit_percent=10.0
+            )
+            result = service.run_event(
+                '2026-02-01T00:00:00Z', '2026-02-02T00:00:00Z',
+                sources=['POS'], credit_percent=10.0,
+                job_id='reuse-1', delay_ms=0, reuse_preview=True
+            )
+
+            assert preview['total_credit_amount'] == 15.0
+            assert result['summary']['successful'] == 1
+            assert mock_rest.call_count == 1
+            mock_apply.assert_called_once_with('gid://shopify/Customer/100', 15.0, None)
+
+            # Cached credits are single-use: a second run re-fetches
+            service.run_event(
+                '2026-02-01T00:00:00Z', '2026-02-02T00:00:00Z',
+                sources=['pos'], credit_percent=10.0,
+                job_id='reuse-2', delay_ms=0, reuse_preview=True
+            )
+            assert mock_rest.call_count == 2
+
+    @patch.object(StoreCreditEventsService, '_fetch_customer_tags')
+    @patch.object(StoreCreditEventsService, 'add_customer_tag')
+    @patch.object(StoreCreditEventsService, 'apply_credit')
+    @patch.object(StoreCreditEventsService, '_fetch_orders_rest')
+    def test_reused_preview_checks_live_tags(self, mock_rest, mock_apply, mock_tag, mock_tags, app):
+        """Should skip customers tagged since the preview, not trust the cached tags."""
+        mock_rest.side_effect = lambda *args, **kwargs: iter([self._rest_order(1, 100)])
+        mock_tags.return_value = {'gid://shopify/Customer/100': ['received-credit-retry-1']}
+
+        with app.app_context():
+            service = StoreCreditEventsService('reuse-test-3.myshopify.com', 'token')
+            service.preview_event(
+                '2026-02-01T00:00:00Z', '2026-02-02T00:00:00Z',
+                sources=['pos'], credit_percent=10.0
+            )
+            result = service.run_event(
+                '2026-02-01T00:00:00Z', '2026-02-02T00:00:00Z',
+                sources=['pos'], credit_percent=10.0,
+                job_id='retry-1', delay_ms=0, reuse_preview=True
+            )
+
+        assert mock_rest.call_count == 1
+        mock_tags.assert_called_once_with(['gid://shopify/Customer/100'])
+        assert result['summary']['skipped'] == 1
+        mock_apply.assert_not_called()
+
+    @patch.object(StoreCreditEventsService, '_fetch_orders_rest')
+    def test_different_filters_do_not_share_cache(self, mock_rest, app):
+        """Should re-fetch when the run's filters differ from the preview."""
+        mock_rest.side_effect = lambda *args, **kwargs: iter([self._rest_order(1, 100)])
+
+        with app.app_context():
+            service = StoreCreditEventsService('reuse-test-2.myshopify.com', 'token')
+            service.preview_event(
+                '2026-02-01T00:00:00Z', '2026-02-02T00:00:00Z',
+                sources=['pos'], credit_percent=10.0
+            )
+            with patch.object(StoreCreditEventsService, 'apply_credit') as mock_apply:
+                mock_apply.return_value = CreditResult(
+                    customer_id='gid://shopify/Customer/100',
+                    customer_email=None,
+                    credit_amount=20.0,
+                    success=True
+                )
+                service.run_event(
+                    '2026-02-01T00:00:00Z', '2026-02-02T00:00:00Z',
+                    sources=['pos'], credit_percent=20.0,
+                    delay_ms=0, reuse_preview=True
+                )
+
+            assert mock_rest.call_count == 2
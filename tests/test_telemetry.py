@@ -0,0 +1,95 @@
+"""
+Tests for request, query and outbound call telemetry.
+
+Tests cover:
+- Sharded registry totals across threads
+- Statement fingerprint normalization and N+1 detection
+- Request latency and outbound call metrics on /metrics
+"""
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.middleware import telemetry
+from app.middleware.telemetry import MetricsRegistry, fingerprint, registry
+from app.models import Tenant
+
+
+@pytest.fixture
+def clean_registry():
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+class TestMetricsRegistry:
+
+    def test_shards_sum_across_threads(self):
+        metrics = MetricsRegistry()
+
+        def work():
+            for _ in range(1000):
+                metrics.inc('tradeup_db_repeated_statements_total', (('endpoint', 'x'),))
+                metrics.observe('tradeup_http_request_duration_seconds', (('endpoint', 'x'),), 0.02)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        collected = metrics.collect()
+        assert collected[('tradeup_db_repeated_statements_total', (('endpoint', 'x'),))] == [4000]
+        histogram = collected[('tradeup_http_request_duration_seconds', (('endpoint', 'x'),))]
+        assert histogram[2] == 4000  # 0.025 bucket
+        assert histogram[-2] == 4000
+        assert histogram[-1] == pytest.approx(80.0)
+
+    def test_fingerprint_ignores_literals_and_in_lists(self):
+        a = fingerprint("SELECT * FROM members WHERE id = 5 AND email = 'a@x.com'")
+        b = fingerprint("SELECT *  FROM members WHERE id = 77 AND email = 'b@y.com'")
+        c = fingerprint('SELECT * FROM members WHERE id IN (?, ?, ?)')
+        d = fingerprint('SELECT * FROM members WHERE id IN (?)')
+        assert a == b
+        assert c == d
+        assert a[0] != c[0]
+
+
+class TestRequestTelemetry:
+
+    def test_repeated_statements_counted(self, app, sample_tenant, clean_registry):
+        telemetry._start_query_capture(True)
+        for _ in range(3):
+            Tenant.query.filter_by(id=sample_tenant.id).first()
+        telemetry._finish_query_capture('members.list', threshold=3)
+
+        collected = clean_registry.collect()
+        queries = collected[('tradeup_db_queries_per_request', (('endpoint', 'members.list'),))]
+        assert queries[-2] == 1 and queries[-1] == 3
+        repeats = [key for key in collected if key[0] == 'tradeup_db_repeated_statements_total']
+        assert len(repeats) == 1 and repeats[0][1][0] == ('endpoint', 'members.list')
+
+    def test_metrics_endpoint(self, client, clean_registry):
+        client.get('/health')
+        session = MagicMock(hooks={'response': []})
+        telemetry.instrument_session(session, 'klaviyo')
+        response = MagicMock(status_code=429)
+        response.elapsed.total_seconds.return_value = 0.3
+        session.hooks['response'][0](response)
+
+        body = client.get('/metrics').get_data(as_text=True)
+
+        assert '# TYPE tradeup_http_request_duration_seconds histogram' in body
+        assert 'tradeup_http_request_duration_seconds_count{endpoint="health_check",method="GET",status="2xx"} 1' in body
+        assert 'tradeup_outbound_request_duration_seconds_bucket{service="klaviyo",status="4xx",le="0.5"} 1' in body
+        assert 'endpoint="telemetry_metrics"' not in body
+
+    def test_metrics_token(self, app, client, clean_registry):
+        app.config['METRICS_TOKEN'] = 'scrape-secret'
+        try:
+            assert client.get('/metrics').status_code == 401
+            response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+            assert response.status_code == 200
+        finally:
+            app.config['METRICS_TOKEN'] = None
@@ -0,0 +1,211 @@
+"""
+Tests for chunked, resumable shop redaction purges.
+
+Tests cover:
+- Registry covering every tenant table, children before parents
+- Chunked purge resuming from its checkpoint after a time budget and a failure
+- Failed purges retried with backoff, then abandoned with an alert
+- SHOP_REDACT webhook recording and running the purge
+"""
+import base64
+import hashlib
+import hmac
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.extensions import db
+from app.models import (
+    Badge, LoyaltyPageView, Member, MemberBadge, NudgeSent, PointsTransaction,
+    StoreCreditLedger, Tenant, TenantPurge, TradeInBatch, TradeInItem
+)
+from app.services import tenant_purge
+from app.services.tenant_purge import TenantPurger, purge_registry, request_tenant_purge, resume_tenant_purges
+
+PURGED_MODELS = (
+    Member, PointsTransaction, TradeInBatch, StoreCreditLedger, LoyaltyPageView, NudgeSent, Badge
+)
+
+
+def _shop():
+    """A tenant with members, self-referencing ledger rows and child-only tables."""
+    unique_id = str(uuid.uuid4())[:8]
+    tenant = Tenant(
+        shop_name=f'Purge {unique_id}', shop_slug=f'purge-{unique_id}',
+        shopify_domain=f'purge-{unique_id}.myshopify.com', is_active=True
+    )
+    db.session.add(tenant)
+    db.session.flush()
+
+    referrer = Member(tenant_id=tenant.id, member_number=f'TUA{unique_id}', email=f'a-{unique_id}@example.com',
+                      shopify_customer_id=f'a_{unique_id}')
+    db.session.add(referrer)
+    db.session.flush()
+    referee = Member(tenant_id=tenant.id, member_number=f'TUB{unique_id}', email=f'b-{unique_id}@example.com',
+                     shopify_customer_id=f'b_{unique_id}', referred_by_id=referrer.id)
+    db.session.add(referee)
+    db.session.flush()
+
+    earn = PointsTransaction(tenant_id=tenant.id, member_id=referrer.id, points=100, transaction_type='earn')
+    db.session.add(earn)
+    db.session.flush()
+    db.session.add(PointsTransaction(tenant_id=tenant.id, member_id=referrer.id, points=-100,
+                                     transaction_type='cancel', related_transaction_id=earn.id))
+
+    batch = TradeInBatch(tenant_id=tenant.id, member_id=referee.id, batch_reference=f'TI-PURGE-{unique_id}')
+    db.session.add(batch)
+    db.session.flush()
+    db.session.add_all([TradeInItem(batch_id=batch.id, trade_value=Decimal('5.00')) for _ in range(3)])
+
+    badge = Badge(tenant_id=tenant.id, name='First Trade', criteria_type='trade_ins')
+    db.session.add(badge)
+    db.session.flush()
+    db.session.add_all([
+        MemberBadge(member_id=referee.id, badge_id=badge.id),
+        StoreCreditLedger(member_id=referee.id, event_type='trade_in', amount=Decimal('15.00'),
+                          balance_after=Decimal('15.00')),
+        LoyaltyPageView(tenant_id=tenant.id, member_id=referee.id),
+        NudgeSent(tenant_id=tenant.id, member_id=referee.id, nudge_type='points_expiring'),
+    ])
+    db.session.commit()
+    return tenant
+
+
+def _remaining(tenant_id, member_ids):
+    counts = {model.__tablename__: model.query.filter_by(tenant_id=tenant_id).count()
+              for model in PURGED_MODELS if hasattr(model, 'tenant_id')}
+    counts['store_credit_ledger'] = StoreCreditLedger.query.filter(StoreCreditLedger.member_id.in_(member_ids)).count()
+    counts['member_badges'] = MemberBadge.query.filter(MemberBadge.member_id.in_(member_ids)).count()
+    counts['trade_in_items'] = TradeInItem.query.join(
+        TradeInBatch, TradeInItem.batch_id == TradeInBatch.id
+    ).filter(TradeInBatch.tenant_id == tenant_id).count()
+    return {table: count for table, count in counts.items() if count}
+
+
+@pytest.fixture
+def shops(app):
+    purged_id, kept_id = _shop().id, _shop().id
+    member_ids = {
+        tid: [mid for (mid,) in db.session.query(Member.id).filter_by(tenant_id=tid)] for tid in (purged_id, kept_id)
+    }
+    yield purged_id, kept_id, member_ids
+
+    kept = db.session.get(Tenant, kept_id)
+    if kept:
+        TenantPurger(request_tenant_purge(kept).id).run()
+    TenantPurge.query.filter(TenantPurge.tenant_id.in_([purged_id, kept_id])).delete(synchronize_session=False)
+    db.session.commit()
+    db.session.expunge_all()
+
+
+class TestPurgeRegistry:
+
+    def test_children_before_parents(self, app):
+        names = [entry.name for entry in purge_registry()]
+
+        for table in ('loyalty_page_views', 'badges', 'nudges_sent', 'store_credit_ledger',
+                      'trade_in_items', 'referrals', 'member_badges', 'partner_sync_logs'):
+            assert table in names
+        assert 'tenants' not in names and 'tenant_purges' not in names
+        assert names.index('trade_in_items') < names.index('trade_in_batches') < names.index('members')
+        assert names.index('member_badges') < names.index('badges')
+        assert names.index('members') < names.index('membership_tiers')
+
+
+class TestTenantPurger:
+
+    def test_resumes_from_checkpoint(self, app, shops, monkeypatch):
+        tenant_id, kept_id, member_ids = shops
+        purge = request_tenant_purge(db.session.get(Tenant, tenant_id))
+
+        # Out of time before the first chunk: nothing deleted, still resumable
+        assert TenantPurger(purge.id).run(max_seconds=0) == 'pending'
+
+        # Fail part way through
+        calls = []
+        original_apply = TenantPurger._apply
+
+        def flaky_apply(self, entry, purge, ids):
+            calls.append(entry.name)
+            if len(calls) == 4:
+                raise RuntimeError('connection reset')
+            original_apply(self, entry, purge, ids)
+
+        monkeypatch.setattr(TenantPurger, '_apply', flaky_apply)
+        assert TenantPurger(purge.id, batch_size=2).run() == 'failed'
+        failed = db.session.get(TenantPurge, purge.id)
+        # The checkpoint is the last committed chunk
+        assert failed.error == 'connection reset' and failed.current_table in calls[:-1]
+        assert failed.failures == 1 and failed.next_attempt_at > datetime.utcnow()
+
+        # Not retried before its backoff has passed
+        monkeypatch.setattr(TenantPurger, '_apply', original_apply)
+        assert TenantPurger(purge.id, batch_size=2).run() == 'skipped'
+        failed.next_attempt_at = datetime.utcnow()
+        db.session.commit()
+        assert TenantPurger(purge.id, batch_size=2).run() == 'done'
+
+        db.session.expire_all()
+        done = db.session.get(TenantPurge, purge.id)
+        assert done.status == 'done' and done.attempts == 3
+        assert done.table_counts['trade_in_items'] == 3 and done.table_counts['members'] == 2
+        assert db.session.get(Tenant, tenant_id) is None
+        assert _remaining(tenant_id, member_ids[tenant_id]) == {}
+
+        # The other shop is untouched
+        assert _remaining(kept_id, member_ids[kept_id]) == {
+            'members': 2, 'points_transactions': 2, 'trade_in_batches': 1, 'store_credit_ledger': 1,
+            'loyalty_page_views': 1, 'nudges_sent': 1, 'badges': 1, 'member_badges': 1, 'trade_in_items': 3
+        }
+        assert TenantPurger(purge.id).run() == 'skipped'
+
+    def test_abandoned_after_max_failures(self, app, shops, monkeypatch):
+        tenant_id, _, _ = shops
+        purge = request_tenant_purge(db.session.get(Tenant, tenant_id))
+        alerts = []
+        monkeypatch.setattr(tenant_purge, 'MAX_PURGE_FAILURES', 2)
+        monkeypatch.setattr('app.utils.sentry.capture_message',
+                            lambda message, level='info', extra=None: alerts.append(level))
+
+        def broken_apply(self, entry, purge, ids):
+            raise RuntimeError('constraint violation')
+
+        monkeypatch.setattr(TenantPurger, '_apply', broken_apply)
+        assert resume_tenant_purges()['failed'] == 1
+        assert resume_tenant_purges()['failed'] == 0  # Backing off
+
+        db.session.get(TenantPurge, purge.id).next_attempt_at = datetime.utcnow()
+        db.session.commit()
+        assert resume_tenant_purges()['abandoned'] == 1
+        assert alerts == ['error']
+
+        abandoned = db.session.get(TenantPurge, purge.id)
+        assert abandoned.status == 'abandoned' and abandoned.failures == 2
+        assert sum(resume_tenant_purges().values()) == 0
+        assert db.session.get(Tenant, tenant_id) is not None
+
+
+class TestShopRedactWebhook:
+
+    def test_acknowledges_and_purges(self, app, client, shops, monkeypatch):
+        tenant_id, _, member_ids = shops
+        monkeypatch.setitem(app.config, 'SHOPIFY_API_SECRET', 'redact-secret')
+        body = json.dumps({'shop_id': 1}).encode()
+        signature = base64.b64encode(hmac.new(b'redact-secret', body, hashlib.sha256).digest()).decode()
+        domain = db.session.get(Tenant, tenant_id).shopify_domain
+
+        response = client.post('/webhook/shop/redact', data=body, headers={
+            'X-Shopify-Shop-Domain': domain,
+            'X-Shopify-Hmac-SHA256': signature,
+            'Content-Type': 'application/json'
+        })
+
+        assert response.status_code == 200
+        assert response.get_json()['action'] == 'data_deletion_scheduled'
+        db.session.expire_all()
+        assert TenantPurge.query.filter_by(shop_domain=domain).one().status == 'done'
+        assert db.session.get(Tenant, tenant_id) is None
+        assert _remaining(tenant_id, member_ids[tenant_id]) == {}
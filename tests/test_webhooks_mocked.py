@@ -515,6 +515,29 @@ class TestOrdersPaidWebhook:
         # Should process (with or without HMAC depending on mode)
         assert response.status_code in [200, 401]
 
+    def test_orders_paid_marks_first_purchase(self, app, client, sample_tenant, sample_member):
+        """Test purchase points from orders/paid end new-member-only rules."""
+        from app.extensions import db
+        from app.models import Member, Tenant
+
+        db.session.get(Tenant, sample_tenant.id).settings = {'award_points_on_paid': True, 'points_per_dollar': 1}
+        member = db.session.get(Member, sample_member.id)
+        member.shopify_customer_id = str(SAMPLE_ORDER_PAID['customer']['id'])
+        db.session.commit()
+        assert member.first_purchase_at is None
+
+        order = dict(SAMPLE_ORDER_PAID, id=int(datetime.utcnow().timestamp() * 1000))
+        response = client.post(
+            '/webhook/orders/paid',
+            headers={'X-Shopify-Shop-Domain': sample_tenant.shopify_domain, 'Content-Type': 'application/json'},
+            data=json.dumps(order)
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()['points_earned'] > 0
+        db.session.expire_all()
+        assert db.session.get(Member, member.id).first_purchase_at is not None
+
     def test_orders_paid_payload_format(self):
         """Test orders/paid payload format is correct."""
         payload = SAMPLE_ORDER_PAID.copy()